@@ -1,9 +1,11 @@
-"""Admin endpoints for user management."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+"""Admin endpoints for user management and diagnostics."""
+import os
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.infrastructure.database.query_stats import query_stats_registry
 from app.infrastructure.database.session import get_db
 from app.domain.entities.user import User
 from app.api.deps import get_current_user
@@ -149,3 +151,31 @@ async def remove_admin(
     await db.refresh(user)
 
     return {"message": "Administratorrettigheter fjernet", "user": user}
+
+
+@router.get("/query-stats")
+async def get_query_stats(
+    admin: User = Depends(get_current_admin),
+    sort: Literal["db_time_ms", "statements", "max_statements", "n_plus_one_requests"] = "db_time_ms",
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    SQL statement counts and database time per endpoint (admin only).
+
+    Aggregates cover this worker process since it started or was reset.
+    repeated_statements lists statement shapes flagged as probable N+1.
+    """
+    return {
+        "worker_pid": os.getpid(),
+        "since": query_stats_registry.started_at,
+        "endpoints": query_stats_registry.snapshot(limit=limit, sort=sort),
+    }
+
+
+@router.delete("/query-stats")
+async def reset_query_stats(
+    admin: User = Depends(get_current_admin),
+):
+    """Reset the SQL statement aggregates of this worker process (admin only)."""
+    query_stats_registry.reset()
+    return {"message": "Statistikk nullstilt"}
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.security import verify_token
-from app.infrastructure.database.session import get_db
+from app.infrastructure.database.session import get_db, get_read_db  # noqa: F401
 from app.domain.entities.user import User
 from app.domain.services.user_service import UserService
 
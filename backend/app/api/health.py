@@ -7,7 +7,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.infrastructure.database.session import get_db
+from app.infrastructure.database.engine import pool_status
+from app.infrastructure.database.session import get_db, get_engine, get_replica_router
 from app.core.redis import get_redis
 from app.core.config import settings
 
@@ -72,9 +73,41 @@ async def readiness(db: AsyncSession = Depends(get_db)):
         checks["redis"] = "error"
         # Redis is optional, don't fail readiness
 
+    # Read replica is optional; read-only endpoints fall back to the primary
+    replica = get_replica_router()
+    if replica is None:
+        checks["replica"] = "not configured"
+    else:
+        await replica.is_usable()
+        checks["replica"] = replica.status()["state"]
+
     return {
         "status": "ready" if all_ready else "not ready",
         "version": BACKEND_VERSION,
         "database": _get_database_name(),
         "checks": checks
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/pool")
+async def database_pool():
+    """
+    Connection pool occupancy and checkout waits of this API worker.
+
+    Also returns the configured per-process limits for API and Celery
+    workers, for sizing max_connections, and the read replica's state.
+    """
+    replica = get_replica_router()
+    return {
+        "mode": "pgbouncer" if settings.DATABASE_PGBOUNCER else "pooled",
+        "api": pool_status(get_engine()),
+        "replica": None if replica is None else {**replica.status(), **pool_status(replica.engine)},
+        "config": {
+            "api_pool_size": settings.DATABASE_POOL_SIZE,
+            "api_max_overflow": settings.DATABASE_MAX_OVERFLOW,
+            "pool_timeout_seconds": settings.DATABASE_POOL_TIMEOUT,
+            "celery_pool_size": settings.CELERY_DB_POOL_SIZE,
+            "celery_max_overflow": settings.CELERY_DB_MAX_OVERFLOW,
+            "statement_cache_size": 0 if settings.DATABASE_PGBOUNCER else settings.DATABASE_STATEMENT_CACHE_SIZE,
+        },
+    }
@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_active_user, get_db
+from app.api.deps import get_current_active_user, get_db, get_read_db
+from app.infrastructure.database.session import read_session
 from app.domain.entities.user import User
 from app.services.activity_log_service import ActivityLogService
 from app.schemas.activity_log import (
@@ -31,7 +32,7 @@ def require_admin(current_user: User) -> User:
 @router.get("/", response_model=ActivityLogListResponse)
 async def get_activity_logs(
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     user_id: Optional[int] = Query(None),
@@ -76,7 +77,7 @@ async def get_activity_logs(
 @router.get("/stats", response_model=ActivityLogStats)
 async def get_activity_stats(
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
 ):
@@ -90,30 +91,42 @@ async def get_activity_stats(
 @router.get("/export")
 async def export_activity_logs(
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
     user_id: Optional[int] = Query(None),
     action: Optional[str] = Query(None),
     resource_type: Optional[str] = Query(None),
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
+    compress: bool = Query(False, description="Gzip-komprimer eksporten (.csv.gz)"),
+    use_copy: Optional[bool] = Query(
+        None,
+        description="Bruk COPY for store eksporter. Standard: automatisk for lange datoperioder",
+    ),
 ):
-    """Export activity logs to CSV. Admin only."""
+    """Export activity logs to CSV as a stream. Admin only."""
     require_admin(current_user)
 
-    service = ActivityLogService(db)
-    csv_content = await service.export_to_csv(
-        user_id=user_id,
-        action=action,
-        resource_type=resource_type,
-        date_from=date_from,
-        date_to=date_to,
-    )
+    async def content():
+        # The stream outlives the request-scoped session, so it owns its own
+        async with read_session() as db:
+            service = ActivityLogService(db)
+            async for chunk in service.export_csv_stream(
+                user_id=user_id,
+                action=action,
+                resource_type=resource_type,
+                date_from=date_from,
+                date_to=date_to,
+                compress=compress,
+                use_copy=use_copy,
+            ):
+                yield chunk
 
     filename = f"aktivitetslogg-{datetime.now().strftime('%Y%m%d-%H%M%S')}.csv"
+    if compress:
+        filename += ".gz"
 
     return StreamingResponse(
-        iter(['\ufeff' + csv_content]),  # BOM for Excel compatibility
-        media_type="text/csv; charset=utf-8",
+        content(),
+        media_type="application/gzip" if compress else "text/csv; charset=utf-8",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
@@ -121,7 +134,7 @@ async def export_activity_logs(
 @router.get("/actions", response_model=List[str])
 async def get_available_actions(
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of available action types from logs."""
     require_admin(current_user)
@@ -132,7 +145,7 @@ async def get_available_actions(
 @router.get("/resource-types", response_model=List[str])
 async def get_resource_types(
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get list of unique resource types from logs."""
     require_admin(current_user)
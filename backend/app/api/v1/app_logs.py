@@ -1,6 +1,4 @@
 """Application logs API endpoints."""
-import csv
-import io
 from datetime import datetime
 from typing import Optional
 
@@ -8,7 +6,8 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_active_user, get_db
+from app.api.deps import get_current_active_user, get_db, get_read_db
+from app.infrastructure.database.session import read_session
 from app.domain.entities.user import User
 from app.services.app_log_service import AppLogService
 from app.schemas.app_log import (
@@ -43,7 +42,7 @@ async def get_app_logs(
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
     search: Optional[str] = Query(None, max_length=200),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get paginated application logs. Requires admin access."""
@@ -78,7 +77,7 @@ async def get_app_logs(
 @router.get("/stats", response_model=AppLogStats)
 async def get_app_log_stats(
     days: int = Query(7, ge=1, le=90),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get application log statistics for the last N days. Requires admin access."""
@@ -89,7 +88,7 @@ async def get_app_log_stats(
 
 @router.get("/levels")
 async def get_log_levels(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get all distinct log levels. Requires admin access."""
@@ -100,7 +99,7 @@ async def get_log_levels(
 
 @router.get("/loggers")
 async def get_logger_names(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get all distinct logger names. Requires admin access."""
@@ -111,7 +110,7 @@ async def get_logger_names(
 
 @router.get("/exception-types")
 async def get_exception_types(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get all distinct exception types. Requires admin access."""
@@ -128,10 +127,14 @@ async def export_app_logs(
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
     search: Optional[str] = Query(None, max_length=200),
-    db: AsyncSession = Depends(get_db),
+    compress: bool = Query(False, description="Gzip-compress the export (.csv.gz)"),
+    use_copy: Optional[bool] = Query(
+        None,
+        description="Use COPY for large exports. Default: automatic for long date ranges",
+    ),
     current_user: User = Depends(get_current_active_user),
 ):
-    """Export application logs as CSV. Requires admin access."""
+    """Export application logs as a streamed CSV. Requires admin access."""
     require_admin(current_user)
     filters = AppLogFilters(
         level=level,
@@ -142,22 +145,24 @@ async def export_app_logs(
         search=search,
     )
 
-    service = AppLogService(db)
-    logs = await service.export_logs(filters=filters)
-
-    # Generate CSV
-    output = io.StringIO()
-    if logs:
-        writer = csv.DictWriter(output, fieldnames=logs[0].keys())
-        writer.writeheader()
-        writer.writerows(logs)
+    async def content():
+        # The stream outlives the request-scoped session, so it owns its own
+        async with read_session() as db:
+            service = AppLogService(db)
+            async for chunk in service.export_csv_stream(
+                filters=filters,
+                compress=compress,
+                use_copy=use_copy,
+            ):
+                yield chunk
 
-    output.seek(0)
     filename = f"app_logs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+    if compress:
+        filename += ".gz"
 
     return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
+        content(),
+        media_type="application/gzip" if compress else "text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
@@ -165,7 +170,7 @@ async def export_app_logs(
 @router.get("/{log_id}", response_model=AppLog)
 async def get_app_log(
     log_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """Get a single application log by ID. Requires admin access."""
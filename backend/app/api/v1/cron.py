@@ -16,6 +16,7 @@ from app.api.deps import get_db
 from app.core.config import settings
 from app.services.activity_log_service import ActivityLogService
 from app.services.app_log_service import AppLogService
+from app.services.log_stats_rollup_service import LogStatsRollupService
 
 router = APIRouter(prefix="/cron", tags=["cron"])
 logger = logging.getLogger(__name__)
@@ -128,6 +129,28 @@ async def cleanup_app_logs(
     }
 
 
+@router.post("/rollup-log-stats")
+async def rollup_log_stats(
+    db: AsyncSession = Depends(get_db),
+    _: bool = Depends(verify_cron_api_key),
+):
+    """
+    Refresh the hourly activity/app log statistics rollups.
+
+    The stats endpoints only read the rollups, so they are as fresh as the
+    last run of this job.
+
+    Example crontab entry (run every 5 minutes):
+    ```
+    */5 * * * * curl -X POST "https://api.example.com/api/v1/cron/rollup-log-stats" -H "X-Cron-API-Key: your-secret-key"
+    ```
+    """
+    service = LogStatsRollupService(db)
+    await service.refresh_all()
+
+    return {"message": "Log statistics rollups refreshed"}
+
+
 @router.get("/health")
 async def cron_health(
     _: bool = Depends(verify_cron_api_key),
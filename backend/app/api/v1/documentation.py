@@ -9,6 +9,7 @@ from app.services.documentation_service import DocumentationService
 from app.schemas.documentation import (
     DocumentationFile,
     DocumentationContent,
+    DocumentationSearchResult,
     ImageUploadResponse,
     GitHubStatusResponse,
 )
@@ -89,6 +90,20 @@ async def list_documentation_files(
     return files
 
 
+@router.get("/search", response_model=List[DocumentationSearchResult])
+async def search_documentation(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: int = Query(20, ge=1, le=100),
+    admin: User = Depends(get_current_admin),
+) -> List[DocumentationSearchResult]:
+    """
+    Full-text search in documentation files (admin only).
+
+    Results are ranked by relevance and include a snippet around the first match.
+    """
+    return doc_service.search(q, limit)
+
+
 @router.get("/files/{file_path:path}", response_model=DocumentationContent)
 async def get_documentation_file(
     file_path: str,
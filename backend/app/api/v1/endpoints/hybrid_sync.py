@@ -33,7 +33,10 @@ class HybridSearchResponse(BaseModel):
     query: str
     total: int
     matinfo_results: list
+    ngdata_results: list = []
     vetduat_results: list
+    partial: bool = False
+    sources: dict = {}
 
 
 @router.post("/sync", response_model=HybridSyncResponse)
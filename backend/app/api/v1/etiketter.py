@@ -3,13 +3,22 @@ import logging
 from datetime import date, datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user
 from app.domain.entities.user import User
+from app.infrastructure.database.session import AsyncSessionLocal
+from app.services.delivery_label_service import (
+    build_label_query,
+    group_label_rows,
+    render_pdf_labels,
+    stream_zpl_labels,
+)
+from app.services.label_template_service import label_template_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -81,118 +90,78 @@ async def get_etiketter(
     - Non-cancelled orders
     """
     try:
-        # Build the query dynamically to avoid asyncpg NULL parameter type issues
-        base_query = """
-            SELECT
-                k.kundeid,
-                k.kundenavn,
-                k.leveringsdag,
-                k.adresse,
-                k.postnr,
-                k.sted,
-                k.rute,
-                k.sjaforparute,
-                k.diett,
-                k.menyinfo,
-                k.menygruppeid,
-                mg.beskrivelse as menygruppe_beskrivelse,
-                s.sone,
-                od.ordreid,
-                od.produktid,
-                p.produktnavn,
-                od.pris,
-                od.antall,
-                o.leveringsdato,
-                o.ansattid
-            FROM tblkunder k
-            INNER JOIN tblordrer o ON k.kundeid = o.kundeid
-            INNER JOIN tblordredetaljer od ON o.ordreid = od.ordreid
-            INNER JOIN tblprodukter p ON od.produktid = p.produktid
-            LEFT JOIN tblmenygruppe mg ON k.menygruppeid = mg.menygruppeid
-            LEFT JOIN tblsone s ON k.velgsone = s.idsone
-            WHERE o.leveringsdato BETWEEN :fra_dato AND :til_dato
-                AND (k.avsluttet = false OR k.avsluttet IS NULL)
-                AND (k.kundeinaktiv = false OR k.kundeinaktiv IS NULL)
-                AND o.ordrestatusid = :ordrestatus
-                AND o.kansellertdato IS NULL
-        """
-
-        # Build parameters dict
-        params = {
-            "fra_dato": fra_dato,
-            "til_dato": til_dato,
-            "ordrestatus": ordrestatus,
-        }
-
-        # Add optional filters only if they have values
-        if sone_id is not None:
-            base_query += " AND k.velgsone = :sone_id"
-            params["sone_id"] = sone_id
-
-        if rute is not None:
-            base_query += " AND k.rute = :rute"
-            params["rute"] = rute
-
-        base_query += " ORDER BY k.adresse, k.kundenavn, o.leveringsdato, p.produktnavn"
-
-        result = await db.execute(text(base_query), params)
-        rows = result.fetchall()
-
-        # Group results by customer and order
-        kunder_dict: dict = {}
-        total_ordrer = set()
-
-        for row in rows:
-            kundeid = row.kundeid
-            ordreid = row.ordreid
-
-            # Create customer if not exists
-            if kundeid not in kunder_dict:
-                kunder_dict[kundeid] = EtikettKunde(
-                    kundeid=kundeid,
-                    kundenavn=row.kundenavn,
-                    leveringsdag=row.leveringsdag,
-                    adresse=row.adresse,
-                    postnr=row.postnr,
-                    sted=row.sted,
-                    rute=row.rute,
-                    sjaforparute=row.sjaforparute,
-                    diett=row.diett,
-                    menyinfo=row.menyinfo,
-                    menygruppeid=row.menygruppeid,
-                    menygruppe_beskrivelse=row.menygruppe_beskrivelse,
-                    sone=row.sone,
-                    ordrer=[],
-                )
-
-            # Find or create order
-            kunde = kunder_dict[kundeid]
-            ordre = next((o for o in kunde.ordrer if o.ordreid == ordreid), None)
-            if ordre is None:
-                ordre = EtikettOrdre(
-                    ordreid=ordreid,
-                    leveringsdato=row.leveringsdato,
-                    ansattid=row.ansattid,
-                    produkter=[],
-                )
-                kunde.ordrer.append(ordre)
-                total_ordrer.add(ordreid)
-
-            # Add product to order
-            ordre.produkter.append(EtikettProdukt(
-                produktid=row.produktid,
-                produktnavn=row.produktnavn,
-                pris=row.pris,
-                antall=row.antall,
-            ))
+        query, params = build_label_query(fra_dato, til_dato, sone_id, rute, ordrestatus)
+        result = await db.execute(text(query), params)
+        kunder, total_ordrer = group_label_rows(result.fetchall())
 
         return EtikettResponse(
             fra_dato=fra_dato,
             til_dato=til_dato,
-            kunder=list(kunder_dict.values()),
-            total_kunder=len(kunder_dict),
-            total_ordrer=len(total_ordrer),
+            kunder=[EtikettKunde(**kunde) for kunde in kunder],
+            total_kunder=len(kunder),
+            total_ordrer=total_ordrer,
         )
     except Exception as e:
         logger.error(f"Error in get_etiketter: {e}", exc_info=True)
         raise
+
+
+@router.get("/batch")
+async def get_etiketter_batch(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    fra_dato: date = Query(..., description="Start date for delivery period"),
+    til_dato: date = Query(..., description="End date for delivery period"),
+    sone_id: Optional[int] = Query(None, description="Filter by zone ID"),
+    rute: Optional[int] = Query(None, description="Filter by route"),
+    ordrestatus: int = Query(35, description="Order status to filter by (default: 35)"),
+    format: str = Query("zpl", pattern="^(zpl|pdf)$", description="Label format"),
+    template_id: Optional[int] = Query(None, description="Label template for PDF labels"),
+):
+    """
+    Print delivery labels for a whole route batch, one label per customer order.
+
+    ZPL is streamed label by label so the printer can start before the batch
+    is finished. PDF labels use a label template and are returned as one file.
+    """
+    query, params = build_label_query(fra_dato, til_dato, sone_id, rute, ordrestatus)
+    filename = f"etiketter_{fra_dato.isoformat()}_{til_dato.isoformat()}"
+
+    if format == "pdf":
+        if template_id is None:
+            raise HTTPException(status_code=400, detail="template_id er påkrevd for PDF-etiketter")
+
+        template = await label_template_service.get_template(
+            db=db,
+            template_id=template_id,
+            user_id=current_user.id
+        )
+        if not template:
+            raise HTTPException(status_code=404, detail="Mal ikke funnet")
+
+        pdf_bytes = await render_pdf_labels(
+            db, query, params,
+            template_json=template.template_json,
+            width_mm=float(template.width_mm),
+            height_mm=float(template.height_mm),
+        )
+        if not pdf_bytes:
+            raise HTTPException(status_code=404, detail="Ingen ordrer å skrive ut")
+
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.pdf"'}
+        )
+
+    async def content():
+        # The stream outlives the request-scoped session, so it owns its own
+        async with AsyncSessionLocal() as stream_db:
+            async for chunk in stream_zpl_labels(stream_db, query, params):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type="application/zpl",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.zpl"'}
+    )
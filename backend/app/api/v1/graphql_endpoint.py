@@ -4,16 +4,19 @@ from strawberry.fastapi import GraphQLRouter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.graphql.schema import schema
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_read_db, get_current_user
 from app.domain.entities.user import User
 
 
 # Custom context getter for GraphQL
 async def get_context(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get GraphQL context with database session and current user."""
+    """Get GraphQL context with a read-only database session and current user.
+
+    The schema only reads (generateAiReport included), so it may use the replica.
+    """
     return {
         "db": db,
         "user": current_user
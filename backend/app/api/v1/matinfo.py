@@ -1,14 +1,21 @@
 """API endpoints for product information with allergens and nutrients - Full CRUD."""
 import json
 import uuid
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text, delete, func
+from sqlalchemy import select, text, delete, func, update
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_db
-from app.models.matinfo_products import MatinfoProduct as ProductDetail, MatinfoAllergen, MatinfoNutrient
+from app.models.matinfo_products import (
+    MatinfoProduct as ProductDetail,
+    MatinfoAllergen,
+    MatinfoAllergen as Allergen,
+    MatinfoNutrient,
+    MatinfoNutrient as Nutrient,
+)
 from app.models.produkter import Produkter
 from app.core.gtin_utils import normalize_gtin
 from app.schemas.matinfo import (
@@ -26,9 +33,9 @@ from app.schemas.matinfo import (
     ProductExportRequest,
     ProductExportResponse
 )
+from app.services.matinfo_search import refresh_search_document
 from app.services.product_export import ProductExporter
 from app.services.enhanced_product_search import EnhancedProductSearchService
-from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -72,6 +79,15 @@ def map_allergen_level_to_int(level: str) -> int:
     return level_map.get(level.upper(), 0)
 
 
+def changed_at() -> str:
+    """Value for ``updated`` when a product changes, as the sync services write it.
+
+    Incremental product exports pick up products by this column, so every
+    write in this API sets it.
+    """
+    return datetime.now().isoformat()
+
+
 async def get_product_response(product: ProductDetail) -> ProductDetailResponse:
     """Convert product model to response schema."""
     # Parse markings if stored as JSON string
@@ -172,8 +188,10 @@ async def create_product(
         producturl=product_data.productUrl,
         packagesize=product_data.packageSize,
         markings=json.dumps([m.dict() for m in product_data.markings]) if product_data.markings else None,
-        images=json.dumps(product_data.images) if product_data.images else None
+        images=json.dumps(product_data.images) if product_data.images else None,
+        updated=changed_at()
     )
+    refresh_search_document(product)
     
     db.add(product)
     await db.flush()
@@ -398,6 +416,9 @@ async def update_product(
     if product_data.images is not None:
         product.images = json.dumps(product_data.images)
     
+    product.updated = changed_at()
+    refresh_search_document(product)
+    
     # Update allergens if provided
     if product_data.allergens is not None:
         # Delete existing allergens
@@ -490,8 +511,10 @@ async def update_product_allergen(
     product_exists = await db.execute(
         select(ProductDetail).where(ProductDetail.id == product_id)
     )
-    if not product_exists.scalar_one_or_none():
+    product = product_exists.scalar_one_or_none()
+    if not product:
         raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    product.updated = changed_at()
     
     # Check if allergen exists
     stmt = select(MatinfoAllergen).where(
@@ -551,6 +574,7 @@ async def delete_product_allergen(
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail=f"Allergen {allergen_code} not found for product {product_id}")
     
+    await db.execute(update(ProductDetail).where(ProductDetail.id == product_id).values(updated=changed_at()))
     await db.commit()
     
     return {"message": f"Allergen {allergen_code} deleted from product {product_id}"}
@@ -570,8 +594,10 @@ async def update_product_nutrient(
     product_exists = await db.execute(
         select(ProductDetail).where(ProductDetail.id == product_id)
     )
-    if not product_exists.scalar_one_or_none():
+    product = product_exists.scalar_one_or_none()
+    if not product:
         raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
+    product.updated = changed_at()
     
     # Check if nutrient exists
     stmt = select(MatinfoNutrient).where(
@@ -637,6 +663,7 @@ async def delete_product_nutrient(
     if result.rowcount == 0:
         raise HTTPException(status_code=404, detail=f"Nutrient {nutrient_code} not found for product {product_id}")
     
+    await db.execute(update(ProductDetail).where(ProductDetail.id == product_id).values(updated=changed_at()))
     await db.commit()
     
     return {"message": f"Nutrient {nutrient_code} deleted from product {product_id}"}
@@ -683,9 +710,10 @@ async def import_vendor_product(
         existing_product.dpakk = vendor_data.dpakk
         existing_product.pall = vendor_data.pall
         existing_product.created = vendor_data.created
-        existing_product.updated = vendor_data.updated
+        existing_product.updated = changed_at()
         existing_product.markings = json.dumps([m.dict() for m in vendor_data.markings]) if vendor_data.markings else None
         existing_product.images = json.dumps(vendor_data.images) if vendor_data.images else None
+        refresh_search_document(existing_product)
         
         # Delete existing allergens and nutrients
         await db.execute(delete(Allergen).where(Allergen.productid == product_id))
@@ -715,10 +743,11 @@ async def import_vendor_product(
             dpakk=vendor_data.dpakk,
             pall=vendor_data.pall,
             created=vendor_data.created,
-            updated=vendor_data.updated,
+            updated=changed_at(),
             markings=json.dumps([m.dict() for m in vendor_data.markings]) if vendor_data.markings else None,
             images=json.dumps(vendor_data.images) if vendor_data.images else None
         )
+        refresh_search_document(product)
         db.add(product)
     
     # Add allergens
@@ -798,15 +827,23 @@ async def export_products_for_rag(
     This endpoint exports products in formats optimized for search and retrieval:
     - json: Single JSON file containing all products
     - jsonl: Multiple JSONL files with ~100 products each (default)
-    - markdown: Individual Markdown files (one per product)
-    
-    Files are organized by timestamp in the exportcatalog directory.
+    - markdown: Multiple Markdown files with ~100 products each
+
+    Files are gzip-compressed unless compress is false, and organized by
+    timestamp in the exportcatalog directory. With incremental, only products
+    updated since the previous export are included, and products deleted
+    since then are listed in export_metadata.json.
     
     Returns:
         Export status including file paths and statistics
     """
     exporter = ProductExporter()
-    result = await exporter.export_products(db, format=request.format)
+    result = await exporter.export_products(
+        db,
+        format=request.format,
+        incremental=request.incremental,
+        compress=request.compress,
+    )
     return ProductExportResponse(**result)
 
 
@@ -975,33 +1012,8 @@ async def hybrid_search_products(
     
     search_service = EnhancedProductSearchService()
     
-    # Always do database search
-    db_results = await search_service.search_database(query, db, limit)
-    
-    # Optionally add LLM results
-    if use_llm and settings.ANYTHINGLLM_API_KEY:
-        llm_results = await search_service.search_llm(query, db, limit)
-        
-        # Merge results, prioritizing LLM results for relevance
-        if llm_results.get("success") and llm_results.get("items"):
-            # Deduplicate by GTIN
-            seen_gtins = {item["gtin"] for item in llm_results["items"] if item.get("gtin")}
-            
-            # Add unique database results
-            for item in db_results.get("items", []):
-                if item.get("gtin") not in seen_gtins:
-                    llm_results["items"].append(item)
-            
-            return {
-                "success": True,
-                "source": "hybrid",
-                "query": query,
-                "total": len(llm_results["items"]),
-                "items": llm_results["items"],
-                "sources_used": ["database", "llm"]
-            }
-    
-    return db_results
+    # Database and LLM searches run concurrently under one deadline
+    return await search_service.hybrid_search(query, db, limit, use_llm=use_llm)
 
 
 @router.get("/products/gtin/{gtin}/linked")
@@ -12,6 +12,8 @@ from app.models import (
     Periode, PeriodeMeny, Meny, MenyProdukt, 
     Produkter, Kunder, Menygruppe
 )
+from app.services.periode_view_service import periode_view_service
+from app.services.period_report_service import build_period_report
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -147,87 +149,19 @@ async def get_customer_period_report(
     current_user: User = Depends(get_current_user)
 ):
     """Generate customer report for a specific period."""
-    # Get the period
-    periode_query = select(Periode).where(Periode.menyperiodeid == periode_id)
-    periode_result = await db.execute(periode_query)
-    periode = periode_result.scalar_one_or_none()
-    
-    if not periode:
-        raise HTTPException(status_code=404, detail="Period not found")
-    
-    # Get all menus for this period
-    periode_meny_query = select(PeriodeMeny).options(
-        selectinload(PeriodeMeny.meny).options(
-            selectinload(Meny.meny_produkter).selectinload(MenyProdukt.produkt),
-            selectinload(Meny.gruppe)
-        )
-    ).where(PeriodeMeny.periodeid == periode_id)
-    
-    if menu_group_id:
-        periode_meny_query = periode_meny_query.join(Meny).where(Meny.menygruppe == menu_group_id)
-    
-    periode_meny_result = await db.execute(periode_meny_query)
-    periode_menyer = periode_meny_result.scalars().all()
-
-    # Collect all menu group IDs for batch customer query
-    menu_group_ids = set()
-    for pm in periode_menyer:
-        if pm.meny and pm.meny.menygruppe:
-            menu_group_ids.add(pm.meny.menygruppe)
-
-    # Batch query: Get all customers for all menu groups in one query
-    customers_by_group = {}
-    if menu_group_ids:
-        customers_query = select(Kunder).where(Kunder.menygruppeid.in_(menu_group_ids))
-        customers_result = await db.execute(customers_query)
-        all_customers = customers_result.scalars().all()
-        for customer in all_customers:
-            if customer.menygruppeid not in customers_by_group:
-                customers_by_group[customer.menygruppeid] = []
-            customers_by_group[customer.menygruppeid].append(customer)
+    data = await build_period_report(db, periode_id, menu_group_id)
 
-    reports = []
-
-    for pm in periode_menyer:
-        menu = pm.meny
-
-        # Get customers from cached data
-        customers = customers_by_group.get(menu.menygruppe, [])
-
-        # Get products for this menu
-        products = []
-        for mp in menu.meny_produkter:
-            product = mp.produkt
-            products.append({
-                "produktid": product.produktid,
-                "produktnavn": product.produktnavn,
-                "enhet": product.pakningstype,
-                "pris": product.pris
-            })
+    if data is None:
+        raise HTTPException(status_code=404, detail="Period not found")
 
-        report = CustomerMenuReport(
-            period_start=periode.fradato,
-            period_end=periode.tildato,
-            menu_group={
-                "gruppeid": menu.gruppe.menygruppeid if menu.gruppe else None,
-                "gruppe": menu.gruppe.beskrivelse if menu.gruppe else None
-            },
-            customers=[{
-                "kundeid": k.kundeid,
-                "kundenavn": k.kundenavn,
-                "adresse": k.adresse,
-                "postnr": k.postnr,
-                "sted": k.sted,
-                "telefonnummer": k.telefonnummer,
-                "e_post": k.e_post
-            } for k in customers],
-            menu={
-                "menyid": menu.menyid,
-                "beskrivelse": menu.beskrivelse
-            },
-            products=products
+    reports = [
+        CustomerMenuReport(
+            period_start=data.periode.fradato,
+            period_end=data.periode.tildato,
+            **entry.as_dict()
         )
-        reports.append(report)
+        for entry in data.entries
+    ]
 
     return reports
 
@@ -279,41 +213,21 @@ async def clone_period_menus(
     current_user: User = Depends(get_current_user)
 ):
     """Clone all menu assignments from one period to another."""
-    # Get source period menus
-    source_query = select(PeriodeMeny).where(PeriodeMeny.periodeid == source_periode_id)
-    source_result = await db.execute(source_query)
-    source_menus = source_result.scalars().all()
-    
-    if not source_menus:
+    # Check source period has menus
+    source_query = select(PeriodeMeny.menyid).where(PeriodeMeny.periodeid == source_periode_id).limit(1)
+    if (await db.execute(source_query)).first() is None:
         raise HTTPException(status_code=404, detail="No menus found in source period")
-    
+
     # Check target period exists
-    target_query = select(Periode).where(Periode.menyperiodeid == target_periode_id)
+    target_query = select(Periode.menyperiodeid).where(Periode.menyperiodeid == target_periode_id)
     target_result = await db.execute(target_query)
     if not target_result.scalar_one_or_none():
         raise HTTPException(status_code=404, detail="Target period not found")
-    
-    # Batch query: Get all existing menu IDs in target period in one query
-    source_meny_ids = [sm.menyid for sm in source_menus]
-    existing_query = select(PeriodeMeny.menyid).where(
-        and_(
-            PeriodeMeny.periodeid == target_periode_id,
-            PeriodeMeny.menyid.in_(source_meny_ids)
-        )
-    )
-    existing_result = await db.execute(existing_query)
-    existing_meny_ids = set(row[0] for row in existing_result.all())
-
-    # Clone menu assignments that don't already exist
-    cloned = 0
-    for sm in source_menus:
-        if sm.menyid not in existing_meny_ids:
-            new_pm = PeriodeMeny(periodeid=target_periode_id, menyid=sm.menyid)
-            db.add(new_pm)
-            cloned += 1
 
+    # Clone menu assignments that don't already exist in one INSERT ... SELECT
+    cloned = await periode_view_service.link_periode_menyer(db, source_periode_id, target_periode_id)
     await db.commit()
-    
+
     return {
         "message": f"Cloned {cloned} menu assignments",
         "source_periode_id": source_periode_id,
@@ -3,7 +3,8 @@ from datetime import datetime
 from typing import Optional, List
 from enum import Enum
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
@@ -18,6 +19,7 @@ from app.models.kunder import Kunder
 from app.models.kunde_gruppe import Kundegruppe
 from app.schemas.ordredetaljer import RegisterPickRequest
 from app.services.pick_list_scanner_service import get_pick_list_scanner_service
+from app.services.picking_events import format_sse, picking_events
 
 router = APIRouter(prefix="/plukking", tags=["Plukking"])
 
@@ -97,13 +99,21 @@ async def get_plukking_list(
     - ordrestatusid: Filter by order status (25=Plukkliste, 30=Plukket)
     - leveringsdato_fra/til: Delivery date range
     """
+    # Count order lines in a subquery instead of loading every line
+    antall_produkter = (
+        select(func.count())
+        .select_from(Ordredetaljer)
+        .where(Ordredetaljer.ordreid == Ordrer.ordreid)
+        .correlate(Ordrer)
+        .scalar_subquery()
+    )
+
     # Build query
     query = (
-        select(Ordrer)
+        select(Ordrer, antall_produkter.label("antall_produkter"))
         .options(
             joinedload(Ordrer.kunde).joinedload(Kunder.gruppe),
             joinedload(Ordrer.plukker),
-            joinedload(Ordrer.detaljer),
             joinedload(Ordrer.status),
         )
     )
@@ -151,11 +161,10 @@ async def get_plukking_list(
     query = query.offset(offset).limit(page_size)
 
     result = await db.execute(query)
-    orders = result.unique().scalars().all()
 
     # Transform to response
     items = []
-    for ordre in orders:
+    for ordre, antall in result.all():
         item = OrdreForPlukking(
             ordreid=ordre.ordreid,
             kundenavn=ordre.kundenavn,
@@ -167,7 +176,7 @@ async def get_plukking_list(
             plukket_dato=ordre.plukket_dato,
             plukket_av_navn=ordre.plukker.full_name if ordre.plukker else None,
             pakkseddel_skrevet=ordre.pakkseddel_skrevet,
-            antall_produkter=len(ordre.detaljer) if ordre.detaljer else 0,
+            antall_produkter=antall or 0,
             ordrestatusid=ordre.ordrestatusid,
             ordrestatus_navn=ordre.status.status if ordre.status else None,
         )
@@ -192,47 +201,55 @@ async def get_plukking_stats(
 ):
     """Get statistics for picking workflow based on ordrestatusid."""
     # Base query conditions (exclude cancelled)
-    base_conditions = [Ordrer.kansellertdato.is_(None)]
+    conditions = [Ordrer.kansellertdato.is_(None)]
 
     if leveringsdato_fra:
-        base_conditions.append(Ordrer.leveringsdato >= leveringsdato_fra)
+        conditions.append(Ordrer.leveringsdato >= leveringsdato_fra)
     if leveringsdato_til:
-        base_conditions.append(Ordrer.leveringsdato <= leveringsdato_til)
-
-    # Count by ordrestatusid
-    async def count_by_ordrestatus(status_id: int) -> int:
-        if kundegruppe_id is not None:
-            q = (
-                select(func.count(Ordrer.ordreid))
-                .join(Ordrer.kunde)
-                .where(and_(*base_conditions, Ordrer.ordrestatusid == status_id, Kunder.kundegruppe == kundegruppe_id))
-            )
-        else:
-            q = select(func.count(Ordrer.ordreid)).where(and_(*base_conditions, Ordrer.ordrestatusid == status_id))
+        conditions.append(Ordrer.leveringsdato <= leveringsdato_til)
 
-        res = await db.execute(q)
-        return res.scalar() or 0
+    # All counts in one pass with FILTER clauses
+    query = select(
+        func.count(Ordrer.ordreid).label("total"),
+        func.count(Ordrer.ordreid).filter(Ordrer.ordrestatusid == ORDRESTATUS_PLUKKLISTE).label("klar_til_plukking"),
+        func.count(Ordrer.ordreid).filter(Ordrer.ordrestatusid == ORDRESTATUS_PLUKKET).label("plukket"),
+    )
 
-    # Count total orders
     if kundegruppe_id is not None:
-        total_query = (
-            select(func.count(Ordrer.ordreid))
-            .join(Ordrer.kunde)
-            .where(and_(*base_conditions, Kunder.kundegruppe == kundegruppe_id))
-        )
-    else:
-        total_query = select(func.count(Ordrer.ordreid)).where(and_(*base_conditions))
-
-    total_result = await db.execute(total_query)
-    total = total_result.scalar() or 0
+        query = query.join(Ordrer.kunde)
+        conditions.append(Kunder.kundegruppe == kundegruppe_id)
 
-    klar_til_plukking = await count_by_ordrestatus(ORDRESTATUS_PLUKKLISTE)
-    plukket = await count_by_ordrestatus(ORDRESTATUS_PLUKKET)
+    counts = (await db.execute(query.where(and_(*conditions)))).one()
 
     return PlukkingStats(
-        total_ordrer=total,
-        klar_til_plukking=klar_til_plukking,
-        plukket=plukket,
+        total_ordrer=counts.total or 0,
+        klar_til_plukking=counts.klar_til_plukking or 0,
+        plukket=counts.plukket or 0,
+    )
+
+
+@router.get("/events")
+async def stream_plukking_events(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Server-Sent Events feed of order status changes.
+
+    Emits ``status_changed`` when orders move between statuses and
+    ``pick_registered`` when picked quantities are registered, each with the
+    affected ordre_ids, so picking clients can refresh instead of polling.
+    """
+    async def content():
+        async for event in picking_events.subscribe():
+            if await request.is_disconnected():
+                break
+            yield format_sse(event)
+
+    return StreamingResponse(
+        content(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
@@ -289,6 +306,7 @@ async def update_ordrestatus(
         ordre.plukket_av = None
 
     await db.commit()
+    await picking_events.publish([ordre.ordreid], ordre.ordrestatusid)
 
     # Get status name
     status_result = await db.execute(
@@ -370,6 +388,7 @@ async def bulk_update_ordrestatus(
         updated_count += 1
 
     await db.commit()
+    await picking_events.publish([ordre.ordreid for ordre in orders], ordrestatusid)
 
     return {
         "message": f"{updated_count} ordrer oppdatert til {status_navn}",
@@ -489,6 +508,7 @@ async def register_pick_quantities(
     ordre.plukket_av = current_user.id
 
     await db.commit()
+    await picking_events.publish([ordre_id], ordre.ordrestatusid, event_type="pick_registered")
 
     return {
         "message": f"Plukk registrert for {updated_count} linjer",
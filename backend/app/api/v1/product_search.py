@@ -58,7 +58,6 @@ async def fuzzy_search_products(
 async def get_search_suggestions(
     q: str = Query(..., description="Delvis søkeord", min_length=2),
     limit: int = Query(10, ge=1, le=20, description="Maks antall forslag"),
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -66,14 +65,13 @@ async def get_search_suggestions(
 
     Returnerer forslag basert på:
     - Tidligere søk
-    - Produktnavn som starter med søkeordet
+    - Produktnavn som starter med søkeordet, mest brukte først
 
     - **q**: Delvis søkeord (minimum 2 tegn)
     - **limit**: Maksimalt antall forslag (standard: 10)
     """
     suggestions = await search_service.get_suggestions(
         query=q,
-        session=db,
         limit=limit
     )
 
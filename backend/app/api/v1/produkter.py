@@ -1,7 +1,7 @@
 """Product API endpoints."""
 import json
 from typing import List, Optional, Dict, Any
-from sqlalchemy import select, or_, func, text, String
+from sqlalchemy import select, or_, func, String
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from pydantic import BaseModel
@@ -12,7 +12,7 @@ from app.domain.entities.user import User
 from app.models.produkter import Produkter as ProdukterModel
 from app.models.matinfo_products import MatinfoProduct, MatinfoAllergen, MatinfoNutrient
 from app.schemas.produkter import Produkter, ProdukterCreate, ProdukterUpdate
-from sqlalchemy.orm import selectinload
+from app.services.matinfo_search import ALLERGEN_LEVELS, search_matinfo_products as search_matinfo
 
 router = APIRouter()
 
@@ -298,7 +298,7 @@ class MatinfoNutrientInfo(BaseModel):
 
 class MatinfoSearchResult(BaseModel):
     """Matinfo søkeresultat."""
-    id: int
+    id: str
     gtin: str
     name: str
     brand: Optional[str] = None
@@ -308,6 +308,33 @@ class MatinfoSearchResult(BaseModel):
     nutrients: List["MatinfoNutrientInfo"] = []
 
 
+def _matinfo_search_result(product: MatinfoProduct, score: float) -> MatinfoSearchResult:
+    return MatinfoSearchResult(
+        id=product.id,
+        gtin=product.gtin,
+        name=product.name,
+        brand=product.brandname,
+        ingredients=product.ingredientstatement,
+        similarity_score=round(score, 3),
+        allergens=[
+            MatinfoAllergenInfo(
+                code=a.code,
+                name=a.name,
+                level=ALLERGEN_LEVELS.get(a.level, "UNKNOWN")
+            ) for a in product.allergens
+        ],
+        nutrients=[
+            MatinfoNutrientInfo(
+                code=n.code,
+                name=n.name,
+                measurement=float(n.measurement) if n.measurement else None,
+                measurement_precision=n.measurementprecision,
+                measurement_type=n.measurementtype
+            ) for n in product.nutrients
+        ]
+    )
+
+
 @router.get("/matinfo/search", response_model=List[MatinfoSearchResult])
 async def search_matinfo_products(
     query: str = Query(..., min_length=2, description="Søketekst (produktnavn, merke, ingredienser)"),
@@ -321,9 +348,10 @@ async def search_matinfo_products(
     Søker i:
     - Produktnavn
     - Merkenavn
+    - Produsent
     - Ingredienser
 
-    Bruker PostgreSQL trigram similarity for fuzzy matching.
+    Bruker det indekserte søkedokumentet (trigram + fulltekst) for rangering.
     Returnerer også allergen og nutrition data.
     Resultater caches i 1 time.
     """
@@ -336,78 +364,8 @@ async def search_matinfo_products(
     if cached:
         return [MatinfoSearchResult(**item) for item in json.loads(cached)]
 
-    # PostgreSQL trigram similarity søk for å få IDs
-    # Krever extension: CREATE EXTENSION IF NOT EXISTS pg_trgm;
-    sql = text("""
-        SELECT
-            id,
-            GREATEST(
-                similarity(LOWER(name), :search),
-                similarity(LOWER(COALESCE(brand_name, '')), :search),
-                similarity(LOWER(COALESCE(ingredient_statement, '')), :search)
-            ) as similarity_score
-        FROM matinfo_products
-        WHERE
-            LOWER(name) % :search
-            OR LOWER(COALESCE(brand_name, '')) % :search
-            OR LOWER(COALESCE(ingredient_statement, '')) % :search
-            OR LOWER(name) LIKE :like_search
-            OR LOWER(COALESCE(brand_name, '')) LIKE :like_search
-        ORDER BY similarity_score DESC
-        LIMIT :limit
-    """)
-
-    result = await db.execute(
-        sql,
-        {
-            "search": search_term,
-            "like_search": f"%{search_term}%",
-            "limit": limit
-        }
-    )
-
-    rows = result.fetchall()
-    product_ids = [row.id for row in rows]
-    similarity_map = {row.id: row.similarity_score for row in rows}
-
-    # Hent produkter med allergen og nutrition data
-    products_result = await db.execute(
-        select(MatinfoProduct)
-        .options(selectinload(MatinfoProduct.allergens), selectinload(MatinfoProduct.nutrients))
-        .where(MatinfoProduct.id.in_(product_ids))
-    )
-    products = products_result.scalars().all()
-
-    # Bygg respons med sortering basert på similarity
-    products_map = {p.id: p for p in products}
-
-    results = [
-        MatinfoSearchResult(
-            id=pid,
-            gtin=products_map[pid].gtin,
-            name=products_map[pid].name,
-            brand=products_map[pid].brand_name,
-            ingredients=products_map[pid].ingredient_statement,
-            similarity_score=round(float(similarity_map[pid]), 3) if similarity_map[pid] else None,
-            allergens=[
-                MatinfoAllergenInfo(
-                    code=a.code,
-                    name=a.name,
-                    level=a.level
-                ) for a in products_map[pid].allergens
-            ],
-            nutrients=[
-                MatinfoNutrientInfo(
-                    code=n.code,
-                    name=n.name,
-                    measurement=float(n.measurement) if n.measurement else None,
-                    measurement_precision=n.measurement_precision,
-                    measurement_type=n.measurement_type
-                ) for n in products_map[pid].nutrients
-            ]
-        )
-        for pid in product_ids if pid in products_map
-    ]
+    ranked = await search_matinfo(db, search_term, limit)
+    results = [_matinfo_search_result(product, score) for product, score in ranked]
 
     # Cache results
     await cache_set(cache_key, json.dumps([r.model_dump() for r in results]), CACHE_TTL_MEDIUM)
@@ -444,78 +402,13 @@ async def get_matinfo_suggestions(
         raise HTTPException(status_code=404, detail="Produkt ikke funnet")
 
     # Bruk produktnavn for søk
-    search_term = produkt.produktnavn.strip().lower()
+    search_term = (produkt.produktnavn or "").strip().lower()
 
     # Fjern vanlige prefikser/suffikser som kan forstyrre søket
     search_term = search_term.replace("kg", "").replace("stk", "").replace("gram", "").strip()
 
-    sql = text("""
-        SELECT
-            id,
-            GREATEST(
-                similarity(LOWER(name), :search),
-                similarity(LOWER(COALESCE(brand_name, '')), :search)
-            ) as similarity_score
-        FROM matinfo_products
-        WHERE
-            LOWER(name) % :search
-            OR LOWER(name) LIKE :like_search
-            OR LOWER(COALESCE(brand_name, '')) % :search
-        ORDER BY similarity_score DESC
-        LIMIT :limit
-    """)
-
-    result = await db.execute(
-        sql,
-        {
-            "search": search_term,
-            "like_search": f"%{search_term}%",
-            "limit": limit
-        }
-    )
-
-    rows = result.fetchall()
-    product_ids = [row.id for row in rows]
-    similarity_map = {row.id: row.similarity_score for row in rows}
-
-    # Hent produkter med allergen og nutrition data
-    products_result = await db.execute(
-        select(MatinfoProduct)
-        .options(selectinload(MatinfoProduct.allergens), selectinload(MatinfoProduct.nutrients))
-        .where(MatinfoProduct.id.in_(product_ids))
-    )
-    products = products_result.scalars().all()
-
-    # Bygg respons med sortering basert på similarity
-    products_map = {p.id: p for p in products}
-
-    results = [
-        MatinfoSearchResult(
-            id=pid,
-            gtin=products_map[pid].gtin,
-            name=products_map[pid].name,
-            brand=products_map[pid].brand_name,
-            ingredients=products_map[pid].ingredient_statement,
-            similarity_score=round(float(similarity_map[pid]), 3) if similarity_map[pid] else None,
-            allergens=[
-                MatinfoAllergenInfo(
-                    code=a.code,
-                    name=a.name,
-                    level=a.level
-                ) for a in products_map[pid].allergens
-            ],
-            nutrients=[
-                MatinfoNutrientInfo(
-                    code=n.code,
-                    name=n.name,
-                    measurement=float(n.measurement) if n.measurement else None,
-                    measurement_precision=n.measurement_precision,
-                    measurement_type=n.measurement_type
-                ) for n in products_map[pid].nutrients
-            ]
-        )
-        for pid in product_ids if pid in products_map
-    ]
+    ranked = await search_matinfo(db, search_term, limit)
+    results = [_matinfo_search_result(product, score) for product, score in ranked]
 
     # Cache results
     await cache_set(cache_key, json.dumps([r.model_dump() for r in results]), CACHE_TTL_MEDIUM)
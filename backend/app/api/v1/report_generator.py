@@ -1,13 +1,18 @@
 """Report generator API endpoints."""
 from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from pydantic import BaseModel
 
 from app.api.deps import get_db, get_current_user
 from app.domain.entities.user import User
+from app.infrastructure.database.session import AsyncSessionLocal
+from app.models.kunder import Kunder
 from app.services.report_service import ReportService
-from app.graphql.resolvers import get_ordre, get_kunder
+from app.graphql.resolvers import get_ordre
+from app.utils.csv_export import stream_rows
 
 
 class BatchPickListRequest(BaseModel):
@@ -260,49 +265,46 @@ async def generate_batch_pick_list_pdf(
 
 @router.get("/kundeliste-excel")
 async def generate_customer_list_excel(
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     limit: int = 1000
 ):
     """
-    Generate customer list as Excel file.
+    Generate customer list as Excel file, streamed from a database cursor.
 
     Args:
-        db: Database session
         current_user: Authenticated user
         limit: Maximum number of customers to export
 
     Returns:
         Excel file download
     """
-    # Fetch customers via GraphQL resolver
-    kunder = await get_kunder(db, limit=limit)
-
-    # Prepare headers and rows for Excel
-    headers = ["Kundenavn", "Adresse", "Postnr", "Sted", "Telefon", "E-post"]
-
-    rows = [
-        [
-            k.kundenavn,
-            k.adresse or "",
-            k.postnr or "",
-            k.sted or "",
-            k.telefonnummer or "",
-            k.e_post or ""
-        ]
-        for k in kunder
-    ]
-
-    # Generate Excel
-    report_service = ReportService()
-    excel_bytes = await report_service.generate_simple_excel(
-        headers=headers,
-        rows=rows,
-        sheet_name="Kundeliste"
+    query = (
+        select(
+            Kunder.kundenavn,
+            Kunder.adresse,
+            Kunder.postnr,
+            Kunder.sted,
+            Kunder.telefonnummer,
+            Kunder.e_post,
+        )
+        .order_by(Kunder.kundeid)
+        .limit(limit)
     )
+    headers = ["Kundenavn", "Adresse", "Postnr", "Sted", "Telefon", "E-post"]
 
-    return Response(
-        content=excel_bytes,
+    async def content():
+        # The stream outlives the request-scoped session, so it owns its own
+        async with AsyncSessionLocal() as session:
+            async for chunk in ReportService().stream_excel(
+                headers=headers,
+                rows=stream_rows(session, query),
+                sheet_name="Kundeliste",
+                format_row=lambda row: [value or "" for value in row],
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": "attachment; filename=kundeliste.xlsx"
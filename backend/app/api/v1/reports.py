@@ -1,10 +1,9 @@
 """API endpoints for report generation."""
+import asyncio
 from typing import Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 import io
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -13,8 +12,8 @@ from reportlab.lib.units import cm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 
-from app.api.deps import get_db
-from app.models import Periode, PeriodeMeny, Meny, MenyProdukt, Kunder, Produkter
+from app.api.deps import get_read_db
+from app.services.period_report_service import build_period_report, create_period_menu_excel
 
 router = APIRouter()
 
@@ -140,92 +139,53 @@ def create_period_menu_pdf(period_data: dict, report_data: list) -> bytes:
 async def generate_period_menu_pdf(
     periode_id: int,
     menu_group_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Generate PDF report for customers in a specific period."""
-    # Get the period
-    periode_query = select(Periode).where(Periode.menyperiodeid == periode_id)
-    periode_result = await db.execute(periode_query)
-    periode = periode_result.scalar_one_or_none()
-    
-    if not periode:
+    data = await build_period_report(db, periode_id, menu_group_id)
+
+    if data is None:
         raise HTTPException(status_code=404, detail="Period not found")
-    
-    # Get all menus for this period
-    periode_meny_query = select(PeriodeMeny).options(
-        selectinload(PeriodeMeny.meny).options(
-            selectinload(Meny.meny_produkter).selectinload(MenyProdukt.produkt),
-            selectinload(Meny.gruppe)
-        )
-    ).where(PeriodeMeny.periodeid == periode_id)
-    
-    if menu_group_id:
-        periode_meny_query = periode_meny_query.join(Meny).where(Meny.menygruppe == menu_group_id)
-    
-    periode_meny_result = await db.execute(periode_meny_query)
-    periode_menyer = periode_meny_result.scalars().all()
-    
-    if not periode_menyer:
+    if not data.entries:
         raise HTTPException(status_code=404, detail="No menus found for this period")
-    
-    # Build report data
-    report_data = []
-    
-    for pm in periode_menyer:
-        menu = pm.meny
-        
-        # Get customers for this menu group
-        customer_query = select(Kunder).where(Kunder.menygruppeid == menu.menygruppe)
-        customer_result = await db.execute(customer_query)
-        customers = customer_result.scalars().all()
-        
-        # Get products for this menu
-        products = []
-        for mp in menu.meny_produkter:
-            product = mp.produkt
-            products.append({
-                "produktid": product.produktid,
-                "produktnavn": product.produktnavn,
-                "enhet": product.pakningstype,
-                "pris": float(product.pris) if product.pris else None
-            })
-        
-        report_data.append({
-            "menu_group": {
-                "gruppeid": menu.gruppe.menygruppeid if menu.gruppe else None,
-                "gruppe": menu.gruppe.beskrivelse if menu.gruppe else None
-            },
-            "customers": [{
-                "kundeid": k.kundeid,
-                "kundenavn": k.kundenavn,
-                "adresse": k.adresse,
-                "postnr": k.postnr,
-                "sted": k.sted,
-                "telefonnummer": k.telefonnummer,
-                "e_post": k.e_post
-            } for k in customers],
-            "menu": {
-                "menyid": menu.menyid,
-                "beskrivelse": menu.beskrivelse
-            },
-            "products": products
-        })
-    
-    # Create PDF
-    period_data = {
-        "ukenr": periode.ukenr,
-        "fradato": periode.fradato.strftime("%d.%m.%Y") if periode.fradato else "",
-        "tildato": periode.tildato.strftime("%d.%m.%Y") if periode.tildato else ""
-    }
-    
-    pdf_content = create_period_menu_pdf(period_data, report_data)
-    
+
+    report_data = [entry.as_dict(float_prices=True) for entry in data.entries]
+
+    # Render off the event loop
+    pdf_content = await asyncio.to_thread(create_period_menu_pdf, data.period_header(), report_data)
+
     # Return PDF response
-    filename = f"periode_{periode.ukenr}_meny_rapport.pdf"
+    filename = f"periode_{data.periode.ukenr}_meny_rapport.pdf"
     return Response(
         content=pdf_content,
         media_type="application/pdf",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/period-menu-excel")
+async def generate_period_menu_excel(
+    periode_id: int,
+    menu_group_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Generate Excel report with menus, products and customers for a period."""
+    data = await build_period_report(db, periode_id, menu_group_id)
+
+    if data is None:
+        raise HTTPException(status_code=404, detail="Period not found")
+    if not data.entries:
+        raise HTTPException(status_code=404, detail="No menus found for this period")
+
+    excel_content = await asyncio.to_thread(create_period_menu_excel, data)
+
+    filename = f"periode_{data.periode.ukenr}_meny_rapport.xlsx"
+    return Response(
+        content=excel_content,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
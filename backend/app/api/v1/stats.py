@@ -3,7 +3,7 @@ from datetime import date, datetime, timedelta
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_read_db, get_current_user
 from app.models.kunder import Kunder
 from app.models.ansatte import Ansatte
 from app.models.produkter import Produkter as ProdukterModel
@@ -79,7 +79,7 @@ class TopProductsResponse(BaseModel):
 
 @router.get("/", response_model=DashboardStats)
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -213,7 +213,7 @@ async def get_dashboard_stats(
 @router.get("/sales-history", response_model=SalesHistoryResponse)
 async def get_sales_history(
     days: int = 30,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -261,7 +261,7 @@ async def get_sales_history(
 async def get_top_products(
     days: int = 30,
     limit: int = 10,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
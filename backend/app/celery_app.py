@@ -63,6 +63,14 @@ app.conf.beat_schedule = {
             'expires': 50,  # Task expires if not picked up within 50 seconds
         }
     },
+    'resume-waiting-executions': {
+        'task': 'app.tasks.workflow_tasks.resume_waiting_executions',
+        'schedule': 60.0,  # Every 60 seconds
+        'options': {
+            'queue': 'workflows',
+            'expires': 50,
+        }
+    },
 }
 
 # Task routes - send tasks to specific queues
@@ -79,6 +87,7 @@ app.conf.task_default_routing_key = 'default'
 # Import tasks to register them with Celery
 # This ensures tasks are discovered when the Celery worker starts
 try:
-    from app.tasks import workflow_tasks
+    from app.tasks import workflow_tasks  # noqa: F401
+    from app.tasks import email_tasks  # noqa: F401
 except ImportError:
     pass  # Tasks module may not be available during initial setup
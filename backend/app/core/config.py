@@ -35,8 +35,23 @@ class Settings(BaseSettings):
         env="DATABASE_URL"
     )
     DATABASE_ECHO: bool = Field(default=False, env="DATABASE_ECHO")
-    DATABASE_POOL_SIZE: int = Field(default=20, env="DATABASE_POOL_SIZE")
-    DATABASE_MAX_OVERFLOW: int = Field(default=10, env="DATABASE_MAX_OVERFLOW")
+    # Per API worker process: pooled connections plus temporary overflow ones
+    DATABASE_POOL_SIZE: int = Field(default=10, env="DATABASE_POOL_SIZE")
+    DATABASE_MAX_OVERFLOW: int = Field(default=20, env="DATABASE_MAX_OVERFLOW")
+    # Seconds to wait for a free pooled connection before failing
+    DATABASE_POOL_TIMEOUT: float = Field(default=30.0, env="DATABASE_POOL_TIMEOUT")
+    # Seconds after which a pooled connection is replaced
+    DATABASE_POOL_RECYCLE: int = Field(default=3600, env="DATABASE_POOL_RECYCLE")
+    DATABASE_POOL_PRE_PING: bool = Field(default=True, env="DATABASE_POOL_PRE_PING")
+    # Connect through PgBouncer in transaction mode: no local pool, no prepared statement cache
+    DATABASE_PGBOUNCER: bool = Field(default=False, env="DATABASE_PGBOUNCER")
+    # Prepared statements asyncpg caches per connection (ignored in PgBouncer mode)
+    DATABASE_STATEMENT_CACHE_SIZE: int = Field(default=100, env="DATABASE_STATEMENT_CACHE_SIZE")
+    # Optional read replica for reporting endpoints, used while it lags at most the max
+    DATABASE_REPLICA_URL: Optional[str] = Field(default=None, env="DATABASE_REPLICA_URL")
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = Field(default=30.0, env="DATABASE_REPLICA_MAX_LAG_SECONDS")
+    # Seconds between replica lag checks per process
+    DATABASE_REPLICA_CHECK_SECONDS: float = Field(default=10.0, env="DATABASE_REPLICA_CHECK_SECONDS")
     
     # CORS - Use Union to accept both string and list
     CORS_ORIGINS: Union[str, List[str]] = Field(default="http://localhost:3000")
@@ -93,6 +108,12 @@ class Settings(BaseSettings):
     ANTHROPIC_MODEL: str = Field(default="claude-3-sonnet-20240229", env="ANTHROPIC_MODEL")
     ANTHROPIC_MAX_TOKENS: int = Field(default=4096, env="ANTHROPIC_MAX_TOKENS")
 
+    # Vision (pick list scanning). Model defaults to gpt-4o for OpenAI and
+    # to the provider's configured model otherwise.
+    AI_VISION_MODEL: Optional[str] = Field(default=None, env="AI_VISION_MODEL")
+    AI_VISION_TIMEOUT_SECONDS: float = Field(default=60.0, env="AI_VISION_TIMEOUT_SECONDS")
+    AI_VISION_MAX_IMAGE_SIDE: int = Field(default=1600, env="AI_VISION_MAX_IMAGE_SIDE")
+
     # GitHub Integration for Feedback System
     GITHUB_TOKEN: str = Field(default="", env="GITHUB_TOKEN")
     GITHUB_REPO_BACKEND: str = Field(default="isyvertsen/easycatering", env="GITHUB_REPO_BACKEND")
@@ -112,6 +133,44 @@ class Settings(BaseSettings):
     SMTP_FROM_EMAIL: str = Field(default="noreply@lkc.no", env="SMTP_FROM_EMAIL")
     SMTP_FROM_NAME: str = Field(default="Larvik Kommunale Catering", env="SMTP_FROM_NAME")
     SMTP_USE_TLS: bool = Field(default=True, env="SMTP_USE_TLS")
+    SMTP_TIMEOUT: float = Field(default=30.0, env="SMTP_TIMEOUT")
+
+    # Bulk email delivery (pooled SMTP connections, used by app.tasks.email_tasks)
+    SMTP_POOL_SIZE: int = Field(default=4, env="SMTP_POOL_SIZE")
+    SMTP_BATCH_SIZE: int = Field(default=50, env="SMTP_BATCH_SIZE")
+    SMTP_RATE_LIMIT_PER_SECOND: float = Field(default=10.0, env="SMTP_RATE_LIMIT_PER_SECOND")
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = Field(default=100, env="SMTP_MAX_MESSAGES_PER_CONNECTION")
+
+    # Celery workers (one event loop and engine per worker process)
+    CELERY_ASYNC_CONCURRENCY: int = Field(default=8, env="CELERY_ASYNC_CONCURRENCY")
+    CELERY_DB_POOL_SIZE: int = Field(default=5, env="CELERY_DB_POOL_SIZE")
+    CELERY_DB_MAX_OVERFLOW: int = Field(default=10, env="CELERY_DB_MAX_OVERFLOW")
+    WORKFLOW_MAX_PARALLEL_STEPS: int = Field(default=4, env="WORKFLOW_MAX_PARALLEL_STEPS")
+
+    # Documentation index: seconds between checks for changed docs files
+    DOCS_INDEX_REFRESH_SECONDS: float = Field(default=5.0, env="DOCS_INDEX_REFRESH_SECONDS")
+
+    # Documentation chatbot: retrieved chunks per question and their size budget
+    DOCS_CHAT_TOP_K: int = Field(default=6, env="DOCS_CHAT_TOP_K")
+    DOCS_CHAT_MAX_CONTEXT_CHARS: int = Field(default=6000, env="DOCS_CHAT_MAX_CONTEXT_CHARS")
+
+    # Product name autocomplete: seconds before the in-memory index is rebuilt
+    PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS: float = Field(default=300.0, env="PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS")
+
+    # Federated product search: overall deadline for all sources together
+    PRODUCT_SEARCH_DEADLINE_SECONDS: float = Field(default=8.0, env="PRODUCT_SEARCH_DEADLINE_SECONDS")
+
+    # Product and search popularity: decay half-life and members kept per sorted set
+    POPULARITY_HALF_LIFE_DAYS: float = Field(default=14.0, env="POPULARITY_HALF_LIFE_DAYS")
+    POPULARITY_MAX_MEMBERS: int = Field(default=20000, env="POPULARITY_MAX_MEMBERS")
+
+    # Product export: worker processes that format and compress shards
+    PRODUCT_EXPORT_WORKERS: int = Field(default=4, env="PRODUCT_EXPORT_WORKERS")
+
+    # SQL instrumentation: per-request statement counts, N+1 warnings and Server-Timing
+    SQL_INSTRUMENTATION_ENABLED: bool = Field(default=True, env="SQL_INSTRUMENTATION_ENABLED")
+    # Runs of one statement shape in a request that count as a probable N+1
+    SQL_N_PLUS_ONE_THRESHOLD: int = Field(default=10, env="SQL_N_PLUS_ONE_THRESHOLD")
 
     # Frontend URL for email links
     FRONTEND_URL: str = Field(default="http://localhost:3000", env="FRONTEND_URL")
@@ -461,6 +461,13 @@ def get_migration_runner(engine: AsyncEngine) -> MigrationRunner:
         migration_runner.add_migration(DropKundeidFromUsers())
         migration_runner.add_migration(CreateProduksjonssystemTables())
         migration_runner.add_migration(CreateWorkflowAutomationTables())
+        migration_runner.add_migration(PartitionLogTables())
+        migration_runner.add_migration(CreateLogStatsRollupTables())
+        migration_runner.add_migration(AddWorkflowExecutionResumePoint())
+        migration_runner.add_migration(AddParallelGroupToWorkflowSteps())
+        migration_runner.add_migration(AddMatinfoSearchColumns())
+        migration_runner.add_migration(AddDefaultLogPartitions())
+        migration_runner.add_migration(BackfillLogStatsRollups())
     return migration_runner
 
 
@@ -1763,7 +1770,362 @@ class CreateWorkflowAutomationTables(Migration):
             """))
 
 
+class PartitionLogTables(Migration):
+    """Convert activity_logs and app_logs to monthly range partitions.
+
+    Both tables receive a row per request, so retention by DELETE caused long
+    running deletes, bloat and autovacuum pressure. After this migration
+    retention detaches and drops whole months (see LogPartitionService), and
+    queries filtering on created_at only touch the relevant partitions.
+
+    Existing rows are copied into the new partitioned table; the id sequence
+    is reused so ids keep increasing across the conversion.
+    """
+
+    TABLES = {
+        "activity_logs": {
+            "columns": """
+                id BIGINT NOT NULL DEFAULT nextval('activity_logs_id_seq'),
+                user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                user_email VARCHAR(255),
+                user_name VARCHAR(255),
+                action VARCHAR(100) NOT NULL,
+                resource_type VARCHAR(100) NOT NULL,
+                resource_id VARCHAR(100),
+                http_method VARCHAR(10),
+                endpoint VARCHAR(500),
+                ip_address VARCHAR(45),
+                user_agent TEXT,
+                response_status INTEGER,
+                response_time_ms INTEGER,
+                details JSONB,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, created_at)
+            """,
+            "column_names": (
+                "id, user_id, user_email, user_name, action, resource_type, resource_id, "
+                "http_method, endpoint, ip_address, user_agent, response_status, "
+                "response_time_ms, details, created_at"
+            ),
+            "indexes": [
+                "CREATE INDEX IF NOT EXISTS idx_activity_logs_user_id ON activity_logs(user_id)",
+                "CREATE INDEX IF NOT EXISTS idx_activity_logs_action ON activity_logs(action)",
+                "CREATE INDEX IF NOT EXISTS idx_activity_logs_resource_type ON activity_logs(resource_type)",
+                "CREATE INDEX IF NOT EXISTS idx_activity_logs_created_at ON activity_logs(created_at)",
+                "CREATE INDEX IF NOT EXISTS idx_activity_logs_response_status ON activity_logs(response_status)",
+                """CREATE INDEX IF NOT EXISTS idx_activity_logs_filters
+                   ON activity_logs(created_at, user_id, action, resource_type)""",
+            ],
+        },
+        "app_logs": {
+            "columns": """
+                id BIGINT NOT NULL DEFAULT nextval('app_logs_id_seq'),
+                level VARCHAR(20) NOT NULL,
+                logger_name VARCHAR(255),
+                message TEXT NOT NULL,
+                exception_type VARCHAR(255),
+                exception_message TEXT,
+                traceback TEXT,
+                module VARCHAR(255),
+                function_name VARCHAR(255),
+                line_number INTEGER,
+                path VARCHAR(500),
+                request_id VARCHAR(100),
+                user_id INTEGER,
+                user_email VARCHAR(255),
+                ip_address VARCHAR(45),
+                endpoint VARCHAR(500),
+                http_method VARCHAR(10),
+                extra JSONB,
+                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (id, created_at)
+            """,
+            "column_names": (
+                "id, level, logger_name, message, exception_type, exception_message, "
+                "traceback, module, function_name, line_number, path, request_id, user_id, "
+                "user_email, ip_address, endpoint, http_method, extra, created_at"
+            ),
+            "indexes": [
+                "CREATE INDEX IF NOT EXISTS idx_app_logs_level ON app_logs(level)",
+                "CREATE INDEX IF NOT EXISTS idx_app_logs_created_at ON app_logs(created_at)",
+                "CREATE INDEX IF NOT EXISTS idx_app_logs_logger_name ON app_logs(logger_name)",
+                "CREATE INDEX IF NOT EXISTS idx_app_logs_exception_type ON app_logs(exception_type)",
+                """CREATE INDEX IF NOT EXISTS idx_app_logs_filters
+                   ON app_logs(created_at, level, logger_name)""",
+            ],
+        },
+    }
+
+    def __init__(self):
+        super().__init__(
+            version="20261018_001_partition_log_tables",
+            description="Convert activity_logs and app_logs to monthly range partitions"
+        )
+
+    async def up(self, engine: AsyncEngine):
+        from app.services.log_partition_service import LogPartitionService
+
+        async with engine.begin() as conn:
+            partitions = LogPartitionService(conn)
+
+            for table, spec in self.TABLES.items():
+                if await partitions.is_partitioned(table):
+                    continue
+
+                legacy = f"{table}_legacy"
+
+                # 1. Move the old table aside, keeping its id sequence alive
+                await conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+                await conn.execute(text(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE"))
+                await conn.execute(text(
+                    f"ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey"
+                ))
+
+                # Free index names so they can be recreated on the new table
+                index_result = await conn.execute(
+                    text("""
+                        SELECT i.indexname FROM pg_indexes i
+                        WHERE i.tablename = :legacy
+                        AND i.indexname NOT IN (
+                            SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:legacy)
+                        )
+                    """),
+                    {"legacy": legacy},
+                )
+                for (index_name,) in index_result.fetchall():
+                    await conn.execute(text(f'DROP INDEX IF EXISTS "{index_name}"'))
+
+                # 2. Create the partitioned table and its indexes
+                await conn.execute(text(
+                    f"CREATE TABLE {table} ({spec['columns']}) PARTITION BY RANGE (created_at)"
+                ))
+                for index_sql in spec["indexes"]:
+                    await conn.execute(text(index_sql))
+
+                # 3. Partitions from the oldest row up to a few months ahead
+                oldest_result = await conn.execute(text(f"SELECT min(created_at) FROM {legacy}"))
+                oldest = oldest_result.scalar() or datetime.utcnow()
+                months = (datetime.utcnow().year - oldest.year) * 12 + (
+                    datetime.utcnow().month - oldest.month
+                )
+                await partitions.ensure_partitions(table, months_ahead=months, from_date=oldest)
+                await partitions.ensure_partitions(table)
+
+                # 4. Copy rows over and retire the old table
+                columns = spec["column_names"]
+                await conn.execute(text(
+                    f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}"
+                ))
+                await conn.execute(text(f"DROP TABLE {legacy}"))
+                await conn.execute(text(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id"))
+
+
+class CreateLogStatsRollupTables(Migration):
+    """Create hourly rollup tables for activity and app log statistics.
+
+    The admin dashboard reads these instead of aggregating the raw log tables.
+    They are filled by LogStatsRollupService via /cron/rollup-log-stats.
+    """
+
+    def __init__(self):
+        super().__init__(
+            version="20261018_002_log_stats_rollups",
+            description="Create hourly rollup tables for log statistics"
+        )
+
+    async def up(self, engine: AsyncEngine):
+        async with engine.begin() as conn:
+            await conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS activity_log_hourly_stats (
+                    id BIGSERIAL PRIMARY KEY,
+                    hour TIMESTAMP NOT NULL,
+                    action VARCHAR(100) NOT NULL,
+                    resource_type VARCHAR(100) NOT NULL,
+                    status_class SMALLINT NOT NULL,
+                    user_id INTEGER,
+                    user_email VARCHAR(255),
+                    user_name VARCHAR(255),
+                    request_count BIGINT NOT NULL DEFAULT 0,
+                    response_time_count BIGINT NOT NULL DEFAULT 0,
+                    response_time_sum BIGINT NOT NULL DEFAULT 0,
+                    response_time_histogram BIGINT[] NOT NULL
+                )
+            """))
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_activity_log_hourly_stats_hour
+                ON activity_log_hourly_stats(hour)
+            """))
+
+            await conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS app_log_hourly_stats (
+                    id BIGSERIAL PRIMARY KEY,
+                    hour TIMESTAMP NOT NULL,
+                    level VARCHAR(20) NOT NULL,
+                    logger_name VARCHAR(255),
+                    exception_type VARCHAR(255),
+                    exception_message TEXT,
+                    log_count BIGINT NOT NULL DEFAULT 0,
+                    last_occurrence TIMESTAMP NOT NULL
+                )
+            """))
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_app_log_hourly_stats_hour
+                ON app_log_hourly_stats(hour)
+            """))
+
+
+class AddWorkflowExecutionResumePoint(Migration):
+    """Let workflow executions wait at a wait_until step and resume later.
+
+    Adds the 'waiting' status and a resume_at timestamp. The partial index
+    keeps the due-time sweep cheap no matter how many executions finished.
+    """
+
+    def __init__(self):
+        super().__init__(
+            version="20261018_003_workflow_execution_resume",
+            description="Add resume point to workflow executions"
+        )
+
+    async def up(self, engine: AsyncEngine):
+        async with engine.begin() as conn:
+            await conn.execute(text("""
+                ALTER TABLE workflow_executions
+                ADD COLUMN IF NOT EXISTS resume_at TIMESTAMP
+            """))
+            await conn.execute(text("""
+                ALTER TABLE workflow_executions
+                DROP CONSTRAINT IF EXISTS check_execution_status
+            """))
+            await conn.execute(text("""
+                ALTER TABLE workflow_executions
+                ADD CONSTRAINT check_execution_status CHECK (status IN (
+                    'running', 'completed', 'failed', 'paused', 'waiting'
+                ))
+            """))
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_workflow_executions_resume_at
+                ON workflow_executions(resume_at)
+                WHERE status = 'waiting'
+            """))
+
+
+class AddParallelGroupToWorkflowSteps(Migration):
+    """Let consecutive workflow steps run concurrently as a parallel group."""
+
+    def __init__(self):
+        super().__init__(
+            version="20261018_004_workflow_step_parallel_group",
+            description="Add parallel_group to workflow steps"
+        )
+
+    async def up(self, engine: AsyncEngine):
+        async with engine.begin() as conn:
+            await conn.execute(text("""
+                ALTER TABLE workflow_steps
+                ADD COLUMN IF NOT EXISTS parallel_group VARCHAR(100)
+            """))
+
+
+class AddMatinfoSearchColumns(Migration):
+    """Add indexed search columns to matinfo_products.
+
+    search_document (normalized name, brand, producer and the first 500
+    characters of the ingredients) is backfilled here and maintained by the
+    sync services; search_vector is a generated, weighted Norwegian tsvector.
+    """
+
+    def __init__(self):
+        super().__init__(
+            version="20261018_005_matinfo_search_columns",
+            description="Add search_document and search_vector to matinfo_products"
+        )
+
+    async def up(self, engine: AsyncEngine):
+        async with engine.begin() as conn:
+            await conn.execute(text("""
+                CREATE EXTENSION IF NOT EXISTS pg_trgm
+            """))
+            await conn.execute(text("""
+                ALTER TABLE matinfo_products
+                ADD COLUMN IF NOT EXISTS search_document TEXT
+            """))
+            # Same normalization as matinfo_search.build_search_document
+            await conn.execute(text("""
+                UPDATE matinfo_products
+                SET search_document = btrim(regexp_replace(
+                    lower(
+                        coalesce(name, '') || ' ' || coalesce(brandname, '') || ' '
+                        || coalesce(producername, '') || ' '
+                        || left(coalesce(ingredientstatement, ''), 500)
+                    ),
+                    '[^[:alnum:]]+', ' ', 'g'
+                ))
+                WHERE search_document IS NULL
+            """))
+            await conn.execute(text("""
+                ALTER TABLE matinfo_products
+                ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('norwegian', coalesce(name, '')), 'A')
+                    || setweight(to_tsvector('norwegian', coalesce(brandname, '')), 'B')
+                    || setweight(to_tsvector('norwegian', coalesce(producername, '')), 'C')
+                    || setweight(to_tsvector('norwegian', left(coalesce(ingredientstatement, ''), 500)), 'D')
+                ) STORED
+            """))
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_matinfo_products_search_document_trgm
+                ON matinfo_products USING gin(search_document gin_trgm_ops)
+            """))
+            await conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_matinfo_products_search_vector
+                ON matinfo_products USING gin(search_vector)
+            """))
+
+
+class AddDefaultLogPartitions(Migration):
+    """Add a DEFAULT partition to each partitioned log table.
+
+    Without it, inserts for a month nobody created a partition for fail.
+    """
+
+    def __init__(self):
+        super().__init__(
+            version="20261018_006_default_log_partitions",
+            description="Add DEFAULT partitions to activity_logs and app_logs"
+        )
+
+    async def up(self, engine: AsyncEngine):
+        from app.services.log_partition_service import PARTITIONED_LOG_TABLES, LogPartitionService
+
+        async with engine.begin() as conn:
+            partitions = LogPartitionService(conn)
+            for table in PARTITIONED_LOG_TABLES:
+                if await partitions.is_partitioned(table):
+                    await partitions.create_default_partition(table)
+
+
+class BackfillLogStatsRollups(Migration):
+    """Backfill the hourly log statistics rollups.
+
+    Fills the last INITIAL_BACKFILL_DAYS of history once, so neither the
+    stats endpoints nor the first /cron/rollup-log-stats run has to.
+    """
+
+    def __init__(self):
+        super().__init__(
+            version="20261018_007_backfill_log_stats_rollups",
+            description="Backfill hourly log statistics rollups"
+        )
+
+    async def up(self, engine: AsyncEngine):
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from app.services.log_stats_rollup_service import LogStatsRollupService
+
+        async with AsyncSession(engine) as session:
+            await LogStatsRollupService(session).refresh_all()
+
+
 async def run_migrations(engine: AsyncEngine):
     """Run all pending migrations."""
     runner = get_migration_runner(engine)
-    await runner.run_migrations()
\ No newline at end of file
+    await runner.run_migrations()
@@ -0,0 +1,146 @@
+"""Database engine factory and connection pool telemetry.
+
+All engines, the API's and each Celery worker's, are built by
+``create_engine_from_settings``, so pool sizes and driver options come from
+one place:
+
+- Pooled mode (default): a queue pool of ``pool_size`` connections plus up
+  to ``max_overflow`` temporary ones, waiting at most
+  ``DATABASE_POOL_TIMEOUT`` seconds for a free connection. asyncpg keeps up
+  to ``DATABASE_STATEMENT_CACHE_SIZE`` prepared statements per connection.
+- PgBouncer mode (``DATABASE_PGBOUNCER``): no pool in the process, since
+  PgBouncer does the pooling, and no prepared statement caching, which
+  transaction pooling does not support. Statement names are made unique
+  so they never collide on a shared server connection.
+
+The pool counts checkouts, time spent waiting for a connection and
+checkout timeouts; ``pool_status`` reports them with the current pool
+occupancy for the health API.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Type
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+
+@dataclass
+class PoolMetrics:
+    """Checkout counts and waits of one pool."""
+    checkouts: int = 0
+    wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    timeouts: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_checkout_wait_ms": round(self.wait_ms / self.checkouts, 2) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait_ms, 2),
+                "checkout_timeouts": self.timeouts,
+            }
+
+
+def metered_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Subclass of a pool class that records checkouts in metrics.
+
+    The metrics live on the class, so they survive ``Pool.recreate`` on
+    engine disposal.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = base.connect(self)
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout((time.perf_counter() - start) * 1000)
+        return connection
+
+    return type(f"Metered{base.__name__}", (base,), {"metrics": metrics, "connect": connect})
+
+
+def create_engine_from_settings(
+    database_url: Optional[str] = None,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+) -> AsyncEngine:
+    """Create an async engine configured from settings.
+
+    pool_size and max_overflow default to the API's DATABASE_POOL_SIZE and
+    DATABASE_MAX_OVERFLOW; Celery workers pass their own.
+    """
+    url = make_url(database_url or settings.DATABASE_URL)
+    pgbouncer = settings.DATABASE_PGBOUNCER
+    metrics = PoolMetrics()
+
+    connect_args: Dict[str, Any] = {}
+    if url.get_driver_name() == "asyncpg":
+        if pgbouncer:
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        else:
+            connect_args["prepared_statement_cache_size"] = settings.DATABASE_STATEMENT_CACHE_SIZE
+
+    options: Dict[str, Any] = {
+        "echo": settings.DATABASE_ECHO,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+    if pgbouncer:
+        options["poolclass"] = metered_pool_class(NullPool, metrics)
+    else:
+        options.update(
+            poolclass=metered_pool_class(AsyncAdaptedQueuePool, metrics),
+            pool_size=settings.DATABASE_POOL_SIZE if pool_size is None else pool_size,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW if max_overflow is None else max_overflow,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+
+    return create_async_engine(url, **options)
+
+
+def pool_status(engine: Any) -> Dict[str, Any]:
+    """Occupancy and checkout metrics of an engine's pool."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        # overflow() counts from -pool_size until every pooled connection is open
+        opened = pool.size() + pool.overflow()
+        status.update(
+            pool_size=pool.size(),
+            max_overflow=pool._max_overflow,
+            open_connections=opened,
+            in_use=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow_in_use=max(0, pool.overflow()),
+            timeout_seconds=pool.timeout(),
+        )
+
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.as_dict())
+    return status
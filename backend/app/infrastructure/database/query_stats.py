@@ -0,0 +1,198 @@
+"""Per-request SQL statement counts and database time.
+
+Cursor execute events on the engine add every statement to the stats of
+the current request, found through a context variable. The middleware
+starts the stats with the request_id from ``set_request_context``. The
+same statement shape (the SQL with bind parameters and IN lists
+collapsed) running ``SQL_N_PLUS_ONE_THRESHOLD`` or more times in one
+request is reported as a probable N+1.
+
+Finished requests are added to per-endpoint aggregates, kept in memory in
+each worker process. Statements outside a request, such as Celery tasks or
+startup, are not counted.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BIND_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|:\w+|\?")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statement shapes kept per endpoint in the aggregates
+MAX_SHAPES_PER_ENDPOINT = 5
+
+# Aggregate for requests that no route handled
+UNMATCHED_ENDPOINT = "unmatched"
+
+
+@lru_cache(maxsize=4096)
+def statement_shape(statement: str) -> str:
+    """SQL with bind parameters, IN lists and numbers replaced, for grouping."""
+    shape = _BIND_PARAMETER.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PARAMETER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class RequestQueryStats:
+    """Statements executed while handling one request."""
+    request_id: Optional[str] = None
+    statements: int = 0
+    db_time_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.statements += 1
+        self.db_time_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_statements(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Statement shapes run at least threshold times, most repeated first."""
+        threshold = settings.SQL_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value."""
+        return f'db;dur={self.db_time_ms:.1f};desc="{self.statements} queries"'
+
+    def as_details(self) -> Dict[str, Any]:
+        """Summary for ActivityLog.details."""
+        details: Dict[str, Any] = {
+            "statements": self.statements,
+            "db_time_ms": round(self.db_time_ms, 1),
+        }
+        repeated = self.repeated_statements()
+        if repeated:
+            details["n_plus_one"] = [{"statement": shape[:500], "count": count} for shape, count in repeated]
+        return details
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def start_request_stats(request_id: Optional[str]) -> Tuple[RequestQueryStats, Token]:
+    """Start counting statements for the current request."""
+    stats = RequestQueryStats(request_id=request_id)
+    return stats, current_query_stats.set(stats)
+
+
+def stop_request_stats(token: Token) -> None:
+    """Stop counting statements for the current request."""
+    current_query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_query_stats.get() is not None:
+        context._query_stats_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    start = getattr(context, "_query_stats_start", None)
+    if stats is not None and start is not None:
+        stats.record(statement, (time.perf_counter() - start) * 1000)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count statements on an engine. For an AsyncEngine, pass its sync_engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def endpoint_template(method: str, scope: Dict[str, Any]) -> str:
+    """Endpoint name from the path template of the route that handled the request.
+
+    Requests that matched no route, or matched its path with another
+    method, share ``UNMATCHED_ENDPOINT``, so 404s and scanner traffic do
+    not add an aggregate per URL.
+    """
+    route = scope.get("route")
+    if route is None or method not in (getattr(route, "methods", None) or ()):
+        return UNMATCHED_ENDPOINT
+    return f"{method} {route.path}"
+
+
+@dataclass
+class EndpointQueryStats:
+    """Running totals for one endpoint."""
+    requests: int = 0
+    statements: int = 0
+    db_time_ms: float = 0.0
+    max_statements: int = 0
+    n_plus_one_requests: int = 0
+    repeated: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "statements": self.statements,
+            "avg_statements": round(self.statements / self.requests, 1) if self.requests else 0.0,
+            "max_statements": self.max_statements,
+            "db_time_ms": round(self.db_time_ms, 1),
+            "avg_db_time_ms": round(self.db_time_ms / self.requests, 1) if self.requests else 0.0,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "repeated_statements": [
+                {"statement": shape[:500], "count": count}
+                for shape, count in self.repeated.most_common(MAX_SHAPES_PER_ENDPOINT)
+            ],
+        }
+
+
+class QueryStatsRegistry:
+    """Per-endpoint aggregates of request query stats in this process."""
+
+    def __init__(self):
+        self._endpoints: Dict[str, EndpointQueryStats] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, endpoint: str, stats: RequestQueryStats) -> None:
+        repeated = stats.repeated_statements()
+        if repeated:
+            logger.warning(
+                f"Probable N+1 in {endpoint} (request {stats.request_id}): "
+                + "; ".join(f"{count}x {shape[:200]}" for shape, count in repeated)
+            )
+
+        with self._lock:
+            totals = self._endpoints.setdefault(endpoint, EndpointQueryStats())
+            totals.requests += 1
+            totals.statements += stats.statements
+            totals.db_time_ms += stats.db_time_ms
+            totals.max_statements = max(totals.max_statements, stats.statements)
+            if repeated:
+                totals.n_plus_one_requests += 1
+                for shape, count in repeated:
+                    totals.repeated[shape] = max(totals.repeated[shape], count)
+
+    def snapshot(self, limit: int = 50, sort: str = "db_time_ms") -> List[Dict[str, Any]]:
+        """Endpoints with the highest value of sort first."""
+        with self._lock:
+            rows = [{"endpoint": endpoint, **totals.as_dict()} for endpoint, totals in self._endpoints.items()]
+        rows.sort(key=lambda row: row.get(sort, 0), reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self.started_at = time.time()
+
+
+query_stats_registry = QueryStatsRegistry()
@@ -0,0 +1,109 @@
+"""Read replica health for routing read-only sessions.
+
+Read-only endpoints use the replica in ``DATABASE_REPLICA_URL`` while it is
+reachable and no more than ``DATABASE_REPLICA_MAX_LAG_SECONDS`` behind the
+primary. Otherwise they fall back to the primary. Lag is measured at most
+once per ``DATABASE_REPLICA_CHECK_SECONDS`` per process, not per request.
+
+A server that is not in recovery is taken to be a primary, with no lag, so
+pointing the setting at the primary is harmless.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds the lag check may take before the replica counts as unavailable
+REPLICA_CHECK_TIMEOUT_SECONDS = 2.0
+
+# Lag in seconds; 0 when caught up, NULL when the standby has not replayed anything yet
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END AS lag_seconds
+""")
+
+
+class ReplicaRouter:
+    """Tracks whether the replica engine is fit for reads."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_lag_seconds: Optional[float] = None,
+        check_seconds: Optional[float] = None,
+    ):
+        self.engine = engine
+        self.max_lag_seconds = (
+            settings.DATABASE_REPLICA_MAX_LAG_SECONDS if max_lag_seconds is None else max_lag_seconds
+        )
+        self.check_seconds = settings.DATABASE_REPLICA_CHECK_SECONDS if check_seconds is None else check_seconds
+        self.usable = False
+        self.lag_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.check_seconds
+
+    async def is_usable(self) -> bool:
+        """Whether reads should go to the replica, rechecking when the last check is stale."""
+        if self._is_fresh():
+            return self.usable
+
+        async with self._lock:
+            if not self._is_fresh():
+                await self._check()
+        return self.usable
+
+    async def _measure_lag(self) -> Optional[float]:
+        async with self.engine.connect() as conn:
+            lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+        return None if lag is None else float(lag)
+
+    async def _check(self) -> None:
+        was_usable = self.usable
+        first_check = self._checked_at is None
+        try:
+            self.lag_seconds = await asyncio.wait_for(self._measure_lag(), timeout=REPLICA_CHECK_TIMEOUT_SECONDS)
+            self.error = None
+            self.usable = self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+        except Exception as e:
+            self.lag_seconds = None
+            self.error = str(e) or type(e).__name__
+            self.usable = False
+        finally:
+            self._checked_at = time.monotonic()
+
+        if not self.usable and (was_usable or first_check):
+            logger.warning(
+                f"Read replica unusable (lag {self.lag_seconds}s, error {self.error}), reading from primary"
+            )
+        elif self.usable and not was_usable:
+            logger.info(f"Read replica usable again (lag {self.lag_seconds}s)")
+
+    def status(self) -> Dict[str, Any]:
+        if self._checked_at is None:
+            state = "unchecked"
+        elif self.usable:
+            state = "in use"
+        elif self.error:
+            state = "unavailable"
+        else:
+            state = "lagging"
+        return {
+            "state": state,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "error": self.error,
+        }
@@ -1,10 +1,14 @@
 """Database session management."""
-from typing import AsyncGenerator, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
+from app.infrastructure.database.engine import create_engine_from_settings
+from app.infrastructure.database.query_stats import instrument_engine
+from app.infrastructure.database.replica import ReplicaRouter
 
 # Create base class for models
 Base = declarative_base()
@@ -13,41 +17,65 @@ Base = declarative_base()
 # Each worker process needs its own engine instance created after forking
 _engine: Optional[AsyncEngine] = None
 _async_session_local: Optional[async_sessionmaker[AsyncSession]] = None
+_replica_router: Optional[ReplicaRouter] = None
+_read_session_local: Optional[async_sessionmaker[AsyncSession]] = None
 
 
 def get_engine() -> AsyncEngine:
     """Get or create the database engine.
 
     This creates the engine lazily on first call within each worker process,
-    which is necessary for multi-worker uvicorn deployments.
+    which is necessary for multi-worker uvicorn deployments. Pool sizes are
+    per worker: DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW connections each.
     """
     global _engine
     if _engine is None:
-        _engine = create_async_engine(
-            settings.DATABASE_URL,
-            echo=settings.DATABASE_ECHO,
-            pool_pre_ping=True,
-            pool_size=10,        # Per-worker pool size (10 * num_workers = total)
-            max_overflow=20,     # Per-worker overflow for burst traffic
-            pool_recycle=3600,   # Recycle connections after 1 hour
-        )
+        _engine = create_engine_from_settings()
+        if settings.SQL_INSTRUMENTATION_ENABLED:
+            instrument_engine(_engine.sync_engine)
     return _engine
 
 
+def _create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        autocommit=False,
+    )
+
+
 def get_session_factory() -> async_sessionmaker[AsyncSession]:
     """Get or create the session factory."""
     global _async_session_local
     if _async_session_local is None:
-        _async_session_local = async_sessionmaker(
-            get_engine(),
-            class_=AsyncSession,
-            expire_on_commit=False,
-            autoflush=False,
-            autocommit=False,
-        )
+        _async_session_local = _create_session_factory(get_engine())
     return _async_session_local
 
 
+def get_replica_router() -> Optional[ReplicaRouter]:
+    """Get or create the read replica router, or None without DATABASE_REPLICA_URL."""
+    global _replica_router
+    if _replica_router is None and settings.DATABASE_REPLICA_URL:
+        engine = create_engine_from_settings(settings.DATABASE_REPLICA_URL)
+        if settings.SQL_INSTRUMENTATION_ENABLED:
+            instrument_engine(engine.sync_engine)
+        _replica_router = ReplicaRouter(engine)
+    return _replica_router
+
+
+async def get_read_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Session factory for read-only work: the replica while usable, else the primary."""
+    global _read_session_local
+    router = get_replica_router()
+    if router is None or not await router.is_usable():
+        return get_session_factory()
+    if _read_session_local is None:
+        _read_session_local = _create_session_factory(router.engine)
+    return _read_session_local
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Get database session."""
     session_factory = get_session_factory()
@@ -58,13 +86,42 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get a database session for read-only endpoints.
+
+    Reads from the replica when one is configured and caught up, otherwise
+    from the primary. Do not write through it.
+    """
+    session_factory = await get_read_session_factory()
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """Read-only session outside a request, such as in a streamed response.
+
+    Usage: async with read_session() as session:
+    """
+    session_factory = await get_read_session_factory()
+    async with session_factory() as session:
+        yield session
+
+
 async def dispose_engine() -> None:
-    """Dispose of the database engine and clear references."""
-    global _engine, _async_session_local
+    """Dispose of the database engines and clear references."""
+    global _engine, _async_session_local, _replica_router, _read_session_local
     if _engine is not None:
         await _engine.dispose()
         _engine = None
         _async_session_local = None
+    if _replica_router is not None:
+        await _replica_router.engine.dispose()
+        _replica_router = None
+        _read_session_local = None
 
 
 class _LazySessionFactory:
@@ -12,6 +12,9 @@ from app.api import health, auth, anonymization, admin
 from app.api.v1 import api_router as v1_router
 from app.infrastructure.database.session import get_engine, dispose_engine, Base
 from app.middleware.activity_logger import ActivityLoggerMiddleware
+from app.services.log_partition_service import ensure_log_partitions
+from app.services.documentation_chat_service import get_documentation_chat_service
+from app.services.product_autocomplete import get_product_autocomplete_index
 
 # Import all models to ensure they're registered with Base.metadata
 import app.models  # noqa: F401
@@ -43,11 +46,24 @@ async def lifespan(app: FastAPI):
         engine = get_engine()
         await run_migrations(engine)
         logger.info("Database migrations completed successfully")
+
+        # Log tables are partitioned by month; keep upcoming partitions ready
+        async with engine.begin() as conn:
+            await ensure_log_partitions(conn)
     except Exception as e:
         logger.error(f"Failed to run migrations: {str(e)}")
         # You might want to fail startup if migrations fail
         # raise
 
+    # Build the documentation chatbot's retrieval index before the first question
+    try:
+        get_documentation_chat_service().warm_up()
+    except Exception as e:
+        logger.warning(f"Could not build documentation retrieval index: {e}")
+
+    # Load product names for autocomplete so the first keystroke does not wait
+    await get_product_autocomplete_index().refresh()
+
     yield
     logger.info(f"Shutting down Catering System API v{APP_VERSION}")
 
@@ -8,6 +8,14 @@ from datetime import datetime
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core.config import settings
+from app.infrastructure.database.query_stats import (
+    RequestQueryStats,
+    endpoint_template,
+    query_stats_registry,
+    start_request_stats,
+    stop_request_stats,
+)
 from app.infrastructure.database.session import AsyncSessionLocal
 from app.models.activity_log import ActivityLog
 from app.core.logging import set_request_context, clear_request_context
@@ -120,6 +128,9 @@ class ActivityLoggerMiddleware(BaseHTTPMiddleware):
             endpoint=request.url.path[:500],
             http_method=request.method,
         )
+        query_stats: Optional[RequestQueryStats] = None
+        if settings.SQL_INSTRUMENTATION_ENABLED:
+            query_stats, query_stats_token = start_request_stats(request_id)
 
         try:
             # Process request
@@ -127,10 +138,19 @@ class ActivityLoggerMiddleware(BaseHTTPMiddleware):
         finally:
             # Clear context after request is done
             clear_request_context()
+            if query_stats is not None:
+                stop_request_stats(query_stats_token)
 
         # Calculate response time
         response_time_ms = int((time.time() - start_time) * 1000)
 
+        if query_stats is not None:
+            # Streamed bodies run after this point, so their queries are not included
+            response.headers["Server-Timing"] = (
+                f"{query_stats.server_timing()}, app;dur={response_time_ms}"
+            )
+            query_stats_registry.record(endpoint_template(request.method, request.scope), query_stats)
+
         # Log asynchronously (fire and forget)
         try:
             await self._log_activity(
@@ -139,6 +159,7 @@ class ActivityLoggerMiddleware(BaseHTTPMiddleware):
                 response_time_ms=response_time_ms,
                 ip_address=ip_address,
                 user_agent=user_agent,
+                query_stats=query_stats,
             )
         except Exception as e:
             logger.error(f"Failed to log activity: {e}")
@@ -159,6 +180,7 @@ class ActivityLoggerMiddleware(BaseHTTPMiddleware):
         response_time_ms: int,
         ip_address: Optional[str],
         user_agent: str,
+        query_stats: Optional[RequestQueryStats] = None,
     ):
         """Create activity log entry."""
         path = request.url.path
@@ -183,6 +205,9 @@ class ActivityLoggerMiddleware(BaseHTTPMiddleware):
                         query_params[key] = "[REDACTED]"
                 details["query_params"] = query_params
 
+        if query_stats is not None and query_stats.statements:
+            details["db"] = query_stats.as_details()
+
         # Create log entry
         async with AsyncSessionLocal() as db:
             try:
@@ -27,6 +27,7 @@ from .report_templates import ReportTemplates
 from .customer_access_token import CustomerAccessToken
 from .activity_log import ActivityLog
 from .app_log import AppLog
+from .log_stats import ActivityLogHourlyStats, AppLogHourlyStats
 from .system_settings import SystemSettings
 from .produksjonstemplate import ProduksjonsTemplate, ProduksjonsTemplateDetaljer
 from .produksjon import Produksjon, ProduksjonsDetaljer
@@ -73,6 +74,8 @@ __all__ = [
     "CustomerAccessToken",
     "ActivityLog",
     "AppLog",
+    "ActivityLogHourlyStats",
+    "AppLogHourlyStats",
     "SystemSettings",
     "ProduksjonsTemplate",
     "ProduksjonsTemplateDetaljer",
@@ -10,7 +10,11 @@ from app.infrastructure.database.session import Base
 
 
 class ActivityLog(Base):
-    """Activity log table for audit trail and metrics."""
+    """Activity log table for audit trail and metrics.
+
+    Partitioned by month on created_at in the database (see
+    PartitionLogTables migration); the primary key there is (id, created_at).
+    """
     __tablename__ = "activity_logs"
 
     id = Column(BigInteger, primary_key=True, index=True)
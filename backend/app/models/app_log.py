@@ -9,7 +9,11 @@ from app.infrastructure.database.session import Base
 
 
 class AppLog(Base):
-    """Application log table for errors, warnings, and info logs."""
+    """Application log table for errors, warnings, and info logs.
+
+    Partitioned by month on created_at in the database (see
+    PartitionLogTables migration); the primary key there is (id, created_at).
+    """
     __tablename__ = "app_logs"
 
     id = Column(BigInteger, primary_key=True, index=True)
@@ -0,0 +1,47 @@
+"""Hourly rollup tables for activity and application log statistics."""
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, String, Text, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.infrastructure.database.session import Base
+
+
+class ActivityLogHourlyStats(Base):
+    """Activity log counts per hour, action, resource type, status class and user.
+
+    Filled by LogStatsRollupService from activity_logs. Response times are
+    kept as a fixed-bucket histogram (see RESPONSE_TIME_BUCKETS_MS) so
+    percentiles can be estimated without touching the raw rows.
+    """
+    __tablename__ = "activity_log_hourly_stats"
+
+    id = Column(BigInteger, primary_key=True)
+
+    hour = Column(DateTime, nullable=False, index=True)
+    action = Column(String(100), nullable=False)
+    resource_type = Column(String(100), nullable=False)
+    status_class = Column(SmallInteger, nullable=False)  # 2, 3, 4, 5 or 0 when unknown
+
+    user_id = Column(Integer)
+    user_email = Column(String(255))
+    user_name = Column(String(255))
+
+    request_count = Column(BigInteger, nullable=False, default=0)
+    response_time_count = Column(BigInteger, nullable=False, default=0)
+    response_time_sum = Column(BigInteger, nullable=False, default=0)
+    response_time_histogram = Column(ARRAY(BigInteger), nullable=False)
+
+
+class AppLogHourlyStats(Base):
+    """Application log counts per hour, level, logger and exception."""
+    __tablename__ = "app_log_hourly_stats"
+
+    id = Column(BigInteger, primary_key=True)
+
+    hour = Column(DateTime, nullable=False, index=True)
+    level = Column(String(20), nullable=False)
+    logger_name = Column(String(255))
+    exception_type = Column(String(255))
+    exception_message = Column(Text)  # Truncated to 200 characters
+
+    log_count = Column(BigInteger, nullable=False, default=0)
+    last_occurrence = Column(DateTime, nullable=False)
@@ -7,7 +7,8 @@ VIKTIG: Dette er IKKE hovedproduktene!
 
 Matinfo tabeller brukes kun som oppslag for næringsdata og allergener.
 """
-from sqlalchemy import Column, String, Text, Integer, Numeric, ForeignKey
+from sqlalchemy import Column, Computed, String, Text, Integer, Numeric, ForeignKey
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 
 from app.infrastructure.database.session import Base
@@ -49,6 +50,20 @@ class MatinfoProduct(Base):
     created = Column(String(50))
     updated = Column(String(50))
 
+    # Search columns (see app.services.matinfo_search). search_document is
+    # written by the sync services, search_vector is generated by PostgreSQL.
+    search_document = Column(Text)
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('norwegian', coalesce(name, '')), 'A')"
+            " || setweight(to_tsvector('norwegian', coalesce(brandname, '')), 'B')"
+            " || setweight(to_tsvector('norwegian', coalesce(producername, '')), 'C')"
+            " || setweight(to_tsvector('norwegian', left(coalesce(ingredientstatement, ''), 500)), 'D')",
+            persisted=True,
+        ),
+    )
+
     # Relationships
     nutrients = relationship("MatinfoNutrient", back_populates="product", cascade="all, delete-orphan")
     allergens = relationship("MatinfoAllergen", back_populates="product", cascade="all, delete-orphan")
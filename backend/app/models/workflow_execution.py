@@ -33,11 +33,15 @@ class WorkflowExecution(Base):
         String(50),
         default="running",
         nullable=False
-    )  # running, completed, failed, paused
+    )  # running, completed, failed, paused, waiting
     current_step: Mapped[Optional[int]] = mapped_column(
         Integer,
         nullable=True
-    )  # Current step order being executed
+    )  # Current step order being executed (the wait step while waiting)
+    resume_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True
+    )  # When a waiting execution should continue after current_step
     error_message: Mapped[Optional[str]] = mapped_column(
         Text,
         nullable=True
@@ -43,6 +43,12 @@ class WorkflowStep(Base):
         nullable=True
     )  # {"check": "orders_missing", "days_back": 3}
 
+    # Consecutive steps sharing a parallel_group run concurrently
+    parallel_group: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True
+    )
+
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
     # Relationships
@@ -41,6 +41,8 @@ class ActivityLogStats(BaseModel):
     total_errors: int
     error_rate: float  # Percentage
     avg_response_time_ms: float
+    p50_response_time_ms: Optional[float] = None
+    p95_response_time_ms: Optional[float] = None
     requests_by_action: Dict[str, int]
     requests_by_resource: Dict[str, int]
     requests_by_user: List[Dict[str, Any]]  # top users
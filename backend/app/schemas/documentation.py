@@ -23,6 +23,12 @@ class DocumentationContent(BaseModel):
     has_mermaid: bool = Field(False, description="Whether the document contains mermaid diagrams")
 
 
+class DocumentationSearchResult(DocumentationFile):
+    """Documentation search hit."""
+    score: float = Field(..., description="Relevance score")
+    snippet: str = Field("", description="Text around the first match")
+
+
 class ImageUploadResponse(BaseModel):
     """Image upload response."""
     url: str = Field(..., description="URL to access the uploaded image")
@@ -211,6 +211,8 @@ class VendorImportResponse(BaseModel):
 class ProductExportRequest(BaseModel):
     """Request for product export operation."""
     format: str = "jsonl"
+    incremental: bool = False  # Only products updated since the previous export
+    compress: bool = True  # Gzip the exported files
     
     @validator('format')
     def validate_format(cls, v):
@@ -227,4 +229,5 @@ class ProductExportResponse(BaseModel):
     export_path: Optional[str] = None
     files_created: int = 0
     total_products: int = 0
+    products_deleted: int = 0
     timestamp: Optional[str] = None
\ No newline at end of file
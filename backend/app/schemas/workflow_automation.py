@@ -51,6 +51,11 @@ class WorkflowStepBase(BaseSchema):
     trigger_config: Optional[Dict[str, Any]] = None
     action_config: Optional[Dict[str, Any]] = None
     condition_config: Optional[Dict[str, Any]] = None
+    parallel_group: Optional[str] = Field(
+        None,
+        max_length=100,
+        description="Consecutive steps with the same parallel_group run concurrently"
+    )
     is_active: bool = True
 
 
@@ -67,6 +72,7 @@ class WorkflowStepUpdate(BaseSchema):
     trigger_config: Optional[Dict[str, Any]] = None
     action_config: Optional[Dict[str, Any]] = None
     condition_config: Optional[Dict[str, Any]] = None
+    parallel_group: Optional[str] = Field(None, max_length=100)
     is_active: Optional[bool] = None
 
 
@@ -86,7 +92,10 @@ class WorkflowScheduleBase(BaseSchema):
     )
     schedule_config: Dict[str, Any] = Field(
         ...,
-        description="Schedule configuration: {day: 'monday', time: '09:00'} or {cron: '0 9 * * 1'}"
+        description=(
+            "Schedule configuration: daily {time: '09:00'}, weekly {day: 'monday', time: '09:00'} "
+            "or {days: [...], time}, monthly {day_of_month: 1 | 'last', time}, cron {cron: '0 9 * * 1'}"
+        )
     )
 
 
@@ -117,9 +126,10 @@ class WorkflowExecutionBase(BaseSchema):
     workflow_id: int
     status: str = Field(
         default="running",
-        pattern="^(running|completed|failed|paused)$"
+        pattern="^(running|completed|failed|paused|waiting)$"
     )
     current_step: Optional[int] = None
+    resume_at: Optional[datetime] = None
     error_message: Optional[str] = None
 
 
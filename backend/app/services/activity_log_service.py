@@ -1,18 +1,45 @@
 """Activity log service for business logic."""
-import csv
-import io
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 
 from sqlalchemy import select, func, and_, desc, or_, distinct
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.activity_log import ActivityLog
 from app.schemas.activity_log import ActivityLogStats
+from app.models.log_stats import ActivityLogHourlyStats
+from app.services.log_partition_service import LogPartitionService
+from app.services.log_stats_rollup_service import LogStatsRollupService, histogram_percentile
+from app.utils.csv_export import (
+    copy_query_csv,
+    gzip_chunks,
+    is_long_range,
+    iso_timestamp,
+    iter_csv,
+    stream_rows,
+)
 
 logger = logging.getLogger(__name__)
 
+# Date ranges longer than this (or open-ended) use the COPY fast path by default
+COPY_EXPORT_THRESHOLD_DAYS = 31
+
+EXPORT_COLUMNS = [
+    ('ID', ActivityLog.id),
+    ('Tidspunkt', iso_timestamp(ActivityLog.created_at)),
+    ('Bruker', ActivityLog.user_name),
+    ('E-post', ActivityLog.user_email),
+    ('Handling', ActivityLog.action),
+    ('Ressurstype', ActivityLog.resource_type),
+    ('Ressurs-ID', ActivityLog.resource_id),
+    ('Metode', ActivityLog.http_method),
+    ('Endepunkt', ActivityLog.endpoint),
+    ('Status', ActivityLog.response_status),
+    ('Responstid (ms)', ActivityLog.response_time_ms),
+    ('IP-adresse', ActivityLog.ip_address),
+]
+
 
 class ActivityLogService:
     """Service for activity log operations."""
@@ -20,10 +47,8 @@ class ActivityLogService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def list_logs(
-        self,
-        page: int = 1,
-        page_size: int = 50,
+    @staticmethod
+    def _build_filters(
         user_id: Optional[int] = None,
         action: Optional[str] = None,
         resource_type: Optional[str] = None,
@@ -31,14 +56,8 @@ class ActivityLogService:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
         search: Optional[str] = None,
-        sort_by: str = "created_at",
-        sort_order: str = "desc",
-    ) -> tuple[List[ActivityLog], int]:
-        """List activity logs with filters."""
-        query = select(ActivityLog)
-        count_query = select(func.count()).select_from(ActivityLog)
-
-        # Apply filters
+    ) -> list:
+        """Build WHERE clauses shared by listing and export."""
         filters = []
         if user_id:
             filters.append(ActivityLog.user_id == user_id)
@@ -61,6 +80,35 @@ class ActivityLogService:
                     ActivityLog.resource_type.ilike(search_term)
                 )
             )
+        return filters
+
+    async def list_logs(
+        self,
+        page: int = 1,
+        page_size: int = 50,
+        user_id: Optional[int] = None,
+        action: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        response_status: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        search: Optional[str] = None,
+        sort_by: str = "created_at",
+        sort_order: str = "desc",
+    ) -> tuple[List[ActivityLog], int]:
+        """List activity logs with filters."""
+        query = select(ActivityLog)
+        count_query = select(func.count()).select_from(ActivityLog)
+
+        filters = self._build_filters(
+            user_id=user_id,
+            action=action,
+            resource_type=resource_type,
+            response_status=response_status,
+            date_from=date_from,
+            date_to=date_to,
+            search=search,
+        )
 
         if filters:
             query = query.where(and_(*filters))
@@ -91,75 +139,80 @@ class ActivityLogService:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
     ) -> ActivityLogStats:
-        """Get activity log statistics."""
+        """Get activity log statistics from the hourly rollup table.
+
+        Read-only: the rollup is served as of its last refresh. The range is
+        aligned to whole hours. p50/p95 response times are
+        estimated from the rolled-up response time histograms.
+        """
         if not date_from:
             date_from = datetime.utcnow() - timedelta(days=7)
         if not date_to:
             date_to = datetime.utcnow()
 
+        stats = ActivityLogHourlyStats
         filters = [
-            ActivityLog.created_at >= date_from,
-            ActivityLog.created_at <= date_to,
+            stats.hour >= date_from.replace(minute=0, second=0, microsecond=0),
+            stats.hour <= date_to,
         ]
 
-        # Total requests
-        total_result = await self.db.execute(
-            select(func.count()).select_from(ActivityLog).where(and_(*filters))
-        )
-        total_requests = total_result.scalar() or 0
-
-        # Total errors (4xx and 5xx)
-        error_result = await self.db.execute(
-            select(func.count()).select_from(ActivityLog).where(
-                and_(*filters, ActivityLog.response_status >= 400)
-            )
-        )
-        total_errors = error_result.scalar() or 0
-
-        # Average response time
-        avg_time_result = await self.db.execute(
-            select(func.avg(ActivityLog.response_time_ms)).where(and_(*filters))
+        # Totals, errors, response time and histogram in a single pass
+        totals_result = await self.db.execute(
+            select(
+                func.coalesce(func.sum(stats.request_count), 0),
+                func.coalesce(
+                    func.sum(stats.request_count).filter(stats.status_class >= 4), 0
+                ),
+                func.coalesce(func.sum(stats.response_time_sum), 0),
+                func.coalesce(func.sum(stats.response_time_count), 0),
+                *LogStatsRollupService.histogram_sums(stats.response_time_histogram),
+            ).where(and_(*filters))
         )
-        avg_response_time = avg_time_result.scalar() or 0
+        totals = totals_result.one()
+        total_requests = int(totals[0])
+        total_errors = int(totals[1])
+        response_time_count = int(totals[3])
+        avg_response_time = totals[2] / response_time_count if response_time_count else 0
+        histogram = [int(count) for count in totals[4:]]
 
         # Requests by action
         action_result = await self.db.execute(
-            select(ActivityLog.action, func.count().label('count'))
+            select(stats.action, func.sum(stats.request_count).label('count'))
             .where(and_(*filters))
-            .group_by(ActivityLog.action)
+            .group_by(stats.action)
         )
-        requests_by_action = {row.action: row.count for row in action_result}
+        requests_by_action = {row.action: int(row.count) for row in action_result}
 
         # Requests by resource
         resource_result = await self.db.execute(
-            select(ActivityLog.resource_type, func.count().label('count'))
+            select(stats.resource_type, func.sum(stats.request_count).label('count'))
             .where(and_(*filters))
-            .group_by(ActivityLog.resource_type)
+            .group_by(stats.resource_type)
             .order_by(desc('count'))
             .limit(10)
         )
-        requests_by_resource = {row.resource_type: row.count for row in resource_result}
+        requests_by_resource = {row.resource_type: int(row.count) for row in resource_result}
 
         # Top users
         user_result = await self.db.execute(
             select(
-                ActivityLog.user_id,
-                ActivityLog.user_email,
-                ActivityLog.user_name,
-                func.count().label('count')
+                stats.user_id,
+                stats.user_email,
+                stats.user_name,
+                func.sum(stats.request_count).label('count')
             )
-            .where(and_(*filters, ActivityLog.user_id.isnot(None)))
-            .group_by(ActivityLog.user_id, ActivityLog.user_email, ActivityLog.user_name)
+            .where(and_(*filters, stats.user_id.isnot(None)))
+            .group_by(stats.user_id, stats.user_email, stats.user_name)
             .order_by(desc('count'))
             .limit(10)
         )
         requests_by_user = [
-            {"user_id": row.user_id, "email": row.user_email, "name": row.user_name, "count": row.count}
+            {"user_id": row.user_id, "email": row.user_email, "name": row.user_name, "count": int(row.count)}
             for row in user_result
         ]
 
         # Requests over time (hourly for last 24h, daily for longer periods)
-        requests_over_time = await self._get_requests_over_time(date_from, date_to)
+        requests_over_time = await self._get_requests_over_time(filters, date_to - date_from)
 
         error_rate = (total_errors / total_requests * 100) if total_requests > 0 else 0
 
@@ -168,6 +221,8 @@ class ActivityLogService:
             total_errors=total_errors,
             error_rate=round(error_rate, 2),
             avg_response_time_ms=round(avg_response_time, 2) if avg_response_time else 0,
+            p50_response_time_ms=round(histogram_percentile(histogram, 0.5), 2),
+            p95_response_time_ms=round(histogram_percentile(histogram, 0.95), 2),
             requests_by_action=requests_by_action,
             requests_by_resource=requests_by_resource,
             requests_by_user=requests_by_user,
@@ -176,44 +231,30 @@ class ActivityLogService:
 
     async def _get_requests_over_time(
         self,
-        date_from: datetime,
-        date_to: datetime,
+        filters: list,
+        delta: timedelta,
     ) -> List[Dict[str, Any]]:
-        """Get request counts over time."""
-        # Use hourly if less than 3 days, otherwise daily
-        delta = date_to - date_from
+        """Get request counts over time from the hourly rollup."""
+        stats = ActivityLogHourlyStats
 
+        # Use hourly if less than 3 days, otherwise daily
         if delta.days <= 3:
-            # Hourly breakdown
-            result = await self.db.execute(
-                select(
-                    func.date_trunc('hour', ActivityLog.created_at).label('period'),
-                    func.count().label('count')
-                )
-                .where(and_(
-                    ActivityLog.created_at >= date_from,
-                    ActivityLog.created_at <= date_to,
-                ))
-                .group_by('period')
-                .order_by('period')
-            )
+            period = stats.hour
         else:
-            # Daily breakdown
-            result = await self.db.execute(
-                select(
-                    func.date_trunc('day', ActivityLog.created_at).label('period'),
-                    func.count().label('count')
-                )
-                .where(and_(
-                    ActivityLog.created_at >= date_from,
-                    ActivityLog.created_at <= date_to,
-                ))
-                .group_by('period')
-                .order_by('period')
+            period = func.date_trunc('day', stats.hour)
+
+        result = await self.db.execute(
+            select(
+                period.label('period'),
+                func.sum(stats.request_count).label('count')
             )
+            .where(and_(*filters))
+            .group_by('period')
+            .order_by('period')
+        )
 
         return [
-            {"period": row.period.isoformat() if row.period else None, "count": row.count}
+            {"period": row.period.isoformat() if row.period else None, "count": int(row.count)}
             for row in result
         ]
 
@@ -235,58 +276,75 @@ class ActivityLogService:
         )
         return [row[0] for row in result]
 
-    async def export_to_csv(
+    def export_csv_stream(
         self,
         user_id: Optional[int] = None,
         action: Optional[str] = None,
         resource_type: Optional[str] = None,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
-    ) -> str:
-        """Export activity logs to CSV."""
-        items, _ = await self.list_logs(
-            page=1,
-            page_size=10000,  # Limit export
+        compress: bool = False,
+        use_copy: Optional[bool] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream activity logs as CSV without a row limit.
+
+        Rows are read through a server-side cursor and encoded in chunks, so
+        memory stays flat regardless of the export size. When ``use_copy`` is
+        None, open-ended or long date ranges switch to PostgreSQL COPY.
+        """
+        filters = self._build_filters(
             user_id=user_id,
             action=action,
             resource_type=resource_type,
             date_from=date_from,
             date_to=date_to,
         )
+        query = (
+            select(*[column.label(name) for name, column in EXPORT_COLUMNS])
+            .where(*filters)
+            .order_by(desc(ActivityLog.created_at))
+        )
+
+        if use_copy is None:
+            use_copy = is_long_range(date_from, date_to, COPY_EXPORT_THRESHOLD_DAYS)
 
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=';')
-
-        # Header
-        writer.writerow([
-            'ID', 'Tidspunkt', 'Bruker', 'E-post', 'Handling',
-            'Ressurstype', 'Ressurs-ID', 'Metode', 'Endepunkt',
-            'Status', 'Responstid (ms)', 'IP-adresse'
-        ])
-
-        # Rows
-        for log in items:
-            writer.writerow([
-                log.id,
-                log.created_at.isoformat() if log.created_at else '-',
-                log.user_name or '-',
-                log.user_email or '-',
-                log.action,
-                log.resource_type,
-                log.resource_id or '-',
-                log.http_method or '-',
-                log.endpoint or '-',
-                log.response_status or '-',
-                log.response_time_ms or '-',
-                log.ip_address or '-',
-            ])
-
-        return output.getvalue()
+        if use_copy:
+            chunks = copy_query_csv(self.db, query, delimiter=';', null='-', bom=True)
+        else:
+            chunks = iter_csv(
+                stream_rows(self.db, query),
+                header=[name for name, _ in EXPORT_COLUMNS],
+                bom=True,  # BOM for Excel compatibility
+                format_row=self._format_export_row,
+            )
+
+        return gzip_chunks(chunks) if compress else chunks
+
+    @staticmethod
+    def _format_export_row(row) -> list:
+        """Format a single export row the way the CSV has always looked."""
+        return [row[0], *[value if value is not None and value != '' else '-' for value in row[1:]]]
 
     async def cleanup_old_logs(self, days_to_keep: int = 90) -> int:
-        """Delete logs older than specified days (retention policy)."""
+        """Remove logs older than specified days (retention policy).
+
+        On the partitioned table whole monthly partitions are detached and
+        dropped, so retention is rounded up to the month boundary. Falls back
+        to DELETE when the table is not partitioned.
+        """
         cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
 
+        partitions = LogPartitionService(self.db)
+        if await partitions.is_partitioned(ActivityLog.__tablename__):
+            await partitions.ensure_partitions(ActivityLog.__tablename__)
+            count = await partitions.drop_partitions_before(
+                ActivityLog.__tablename__, cutoff_date
+            )
+            await self.db.commit()
+            if count > 0:
+                logger.info(f"Cleaned up {count} old activity log entries")
+            return count
+
         result = await self.db.execute(
             select(func.count()).select_from(ActivityLog)
             .where(ActivityLog.created_at < cutoff_date)
@@ -263,7 +263,7 @@ class AnthropicClient(AIClient):
             else:
                 anthropic_messages.append({
                     "role": msg["role"],
-                    "content": msg["content"]
+                    "content": self._convert_content(msg["content"])
                 })
 
         response = await self.client.messages.create(
@@ -275,6 +275,26 @@ class AnthropicClient(AIClient):
         )
         return response.content[0].text
 
+    @staticmethod
+    def _convert_content(content: Any) -> Any:
+        """Convert OpenAI-style content parts (text, image_url data URLs) to Anthropic blocks."""
+        if not isinstance(content, list):
+            return content
+
+        blocks = []
+        for part in content:
+            if part.get("type") == "image_url":
+                url = part["image_url"]["url"]
+                header, _, data = url.partition(",")
+                media_type = header[len("data:"):].split(";")[0] if header.startswith("data:") else "image/jpeg"
+                blocks.append({
+                    "type": "image",
+                    "source": {"type": "base64", "media_type": media_type, "data": data},
+                })
+            else:
+                blocks.append(part)
+        return blocks
+
     async def chat_completion_with_tools(
         self,
         messages: List[Dict[str, Any]],
@@ -7,6 +7,7 @@ from sqlalchemy import select, func, and_, desc
 import logging
 
 from app.core.config import settings
+from app.infrastructure.database.session import read_session
 from app.services.ai_client import get_default_ai_client, AIClient
 from app.models.ordrer import Ordrer as OrdrerModel
 from app.models.ordredetaljer import Ordredetaljer as OrdredetaljerModel
@@ -47,13 +48,20 @@ class AIReportService:
 
         return start_date, now
 
+    async def _fetch_rows(self, query) -> list:
+        async with read_session() as session:
+            return (await session.execute(query)).all()
+
     async def _fetch_sales_data(
         self,
-        db: AsyncSession,
         start_date: datetime,
         end_date: datetime
     ) -> Dict[str, Any]:
-        """Fetch sales data from database using parallel queries."""
+        """Fetch sales data using parallel queries.
+
+        A session runs one query at a time, so each query gets its own
+        read-only session (on the replica when one is in use).
+        """
         # Define all queries
         sales_query = select(
             func.count(OrdrerModel.ordreid).label("total_orders"),
@@ -125,29 +133,29 @@ class AIReportService:
         ).limit(10)
 
         # Execute all queries in parallel
-        sales_result, top_products_result, category_result, top_customers_result = await asyncio.gather(
-            db.execute(sales_query),
-            db.execute(top_products_query),
-            db.execute(category_query),
-            db.execute(top_customers_query)
+        sales_rows, top_products_rows, category_rows, top_customers_rows = await asyncio.gather(
+            self._fetch_rows(sales_query),
+            self._fetch_rows(top_products_query),
+            self._fetch_rows(category_query),
+            self._fetch_rows(top_customers_query)
         )
 
         # Process results
-        sales = sales_result.first()
+        sales = sales_rows[0]
         top_products = [
             {
                 "name": p.produktnavn or "Ukjent",
                 "quantity": int(p.quantity or 0),
                 "revenue": float(p.revenue or 0)
             }
-            for p in top_products_result.all()
+            for p in top_products_rows
         ]
         categories = [
             {
                 "category": c.kategori or "Ukjent",
                 "revenue": float(c.revenue or 0)
             }
-            for c in category_result.all()
+            for c in category_rows
         ]
         top_customers = [
             {
@@ -155,7 +163,7 @@ class AIReportService:
                 "orders": int(c.order_count or 0),
                 "revenue": float(c.revenue or 0)
             }
-            for c in top_customers_result.all()
+            for c in top_customers_rows
         ]
 
         return {
@@ -206,7 +214,7 @@ class AIReportService:
         Generate HTML report using GPT-4.
 
         Args:
-            db: Database session
+            db: Database session (sales queries run on their own read-only sessions)
             period: Time period (week, month, quarter, year)
             start_date: Custom start date (YYYY-MM-DD) - overrides period
             end_date: Custom end date (YYYY-MM-DD) - overrides period
@@ -228,7 +236,7 @@ class AIReportService:
             start_dt, end_dt = self._get_period_dates(period)
 
         # Fetch data based on selected data sources
-        data = await self._fetch_sales_data(db, start_dt, end_dt)
+        data = await self._fetch_sales_data(start_dt, end_dt)
 
         # Add additional data based on data_sources
         if "nutrition" in data_sources:
@@ -1,12 +1,44 @@
 """Application log service for querying logs from database."""
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Tuple, AsyncIterator
 
-from sqlalchemy import select, func, desc, and_, or_
+from sqlalchemy import select, func, desc, and_, or_, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.app_log import AppLog
+from app.models.log_stats import AppLogHourlyStats
 from app.schemas.app_log import AppLogFilters, AppLogStats
+from app.services.log_partition_service import LogPartitionService
+from app.utils.csv_export import (
+    copy_query_csv,
+    gzip_chunks,
+    is_long_range,
+    iso_timestamp,
+    iter_csv,
+    stream_rows,
+)
+
+# Date ranges longer than this (or open-ended) use the COPY fast path by default
+COPY_EXPORT_THRESHOLD_DAYS = 31
+
+EXPORT_COLUMNS = [
+    ("id", AppLog.id),
+    ("created_at", iso_timestamp(AppLog.created_at)),
+    ("level", AppLog.level),
+    ("logger_name", AppLog.logger_name),
+    ("message", func.left(AppLog.message, 500)),
+    ("exception_type", AppLog.exception_type),
+    ("exception_message", func.left(AppLog.exception_message, 200)),
+    ("module", AppLog.module),
+    ("function_name", AppLog.function_name),
+    ("line_number", AppLog.line_number),
+    ("request_id", AppLog.request_id),
+    ("user_id", AppLog.user_id),
+    ("user_email", AppLog.user_email),
+    ("endpoint", AppLog.endpoint),
+    ("http_method", AppLog.http_method),
+    ("ip_address", AppLog.ip_address),
+]
 
 
 class AppLogService:
@@ -15,6 +47,42 @@ class AppLogService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @staticmethod
+    def _build_conditions(filters: Optional[AppLogFilters]) -> list:
+        """Build WHERE clauses shared by listing and export."""
+        conditions = []
+        if not filters:
+            return conditions
+
+        if filters.level:
+            conditions.append(AppLog.level == filters.level.upper())
+
+        if filters.logger_name:
+            conditions.append(AppLog.logger_name.ilike(f"%{filters.logger_name}%"))
+
+        if filters.exception_type:
+            conditions.append(AppLog.exception_type.ilike(f"%{filters.exception_type}%"))
+
+        if filters.date_from:
+            conditions.append(AppLog.created_at >= filters.date_from)
+
+        if filters.date_to:
+            conditions.append(AppLog.created_at <= filters.date_to)
+
+        if filters.search:
+            search_term = f"%{filters.search}%"
+            conditions.append(
+                or_(
+                    AppLog.message.ilike(search_term),
+                    AppLog.exception_message.ilike(search_term),
+                    AppLog.logger_name.ilike(search_term),
+                    AppLog.module.ilike(search_term),
+                    AppLog.function_name.ilike(search_term),
+                )
+            )
+
+        return conditions
+
     async def get_logs(
         self,
         filters: Optional[AppLogFilters] = None,
@@ -26,39 +94,9 @@ class AppLogService:
         """Get paginated application logs with optional filtering."""
         query = select(AppLog)
 
-        # Apply filters
-        if filters:
-            conditions = []
-
-            if filters.level:
-                conditions.append(AppLog.level == filters.level.upper())
-
-            if filters.logger_name:
-                conditions.append(AppLog.logger_name.ilike(f"%{filters.logger_name}%"))
-
-            if filters.exception_type:
-                conditions.append(AppLog.exception_type.ilike(f"%{filters.exception_type}%"))
-
-            if filters.date_from:
-                conditions.append(AppLog.created_at >= filters.date_from)
-
-            if filters.date_to:
-                conditions.append(AppLog.created_at <= filters.date_to)
-
-            if filters.search:
-                search_term = f"%{filters.search}%"
-                conditions.append(
-                    or_(
-                        AppLog.message.ilike(search_term),
-                        AppLog.exception_message.ilike(search_term),
-                        AppLog.logger_name.ilike(search_term),
-                        AppLog.module.ilike(search_term),
-                        AppLog.function_name.ilike(search_term),
-                    )
-                )
-
-            if conditions:
-                query = query.where(and_(*conditions))
+        conditions = self._build_conditions(filters)
+        if conditions:
+            query = query.where(and_(*conditions))
 
         # Get total count
         count_query = select(func.count()).select_from(query.subquery())
@@ -89,70 +127,66 @@ class AppLogService:
         return result.scalar_one_or_none()
 
     async def get_stats(self, days: int = 7) -> AppLogStats:
-        """Get application log statistics for the last N days."""
-        since = datetime.utcnow() - timedelta(days=days)
-
-        # Total logs
-        total_result = await self.db.execute(
-            select(func.count()).select_from(AppLog).where(AppLog.created_at >= since)
+        """Get application log statistics for the last N days from the hourly rollup."""
+        since = (datetime.utcnow() - timedelta(days=days)).replace(
+            minute=0, second=0, microsecond=0
         )
-        total_logs = total_result.scalar() or 0
 
-        # Logs by level
+        stats = AppLogHourlyStats
+
+        # Logs by level (total is the sum over levels)
         level_result = await self.db.execute(
-            select(AppLog.level, func.count(AppLog.id))
-            .where(AppLog.created_at >= since)
-            .group_by(AppLog.level)
+            select(stats.level, func.sum(stats.log_count))
+            .where(stats.hour >= since)
+            .group_by(stats.level)
         )
-        logs_by_level = {row[0]: row[1] for row in level_result.all()}
+        logs_by_level = {row[0]: int(row[1]) for row in level_result.all()}
+        total_logs = sum(logs_by_level.values())
 
         # Logs by logger
         logger_result = await self.db.execute(
-            select(AppLog.logger_name, func.count(AppLog.id))
-            .where(AppLog.created_at >= since)
-            .where(AppLog.logger_name.isnot(None))
-            .group_by(AppLog.logger_name)
-            .order_by(desc(func.count(AppLog.id)))
+            select(stats.logger_name, func.sum(stats.log_count))
+            .where(stats.hour >= since)
+            .where(stats.logger_name.isnot(None))
+            .group_by(stats.logger_name)
+            .order_by(desc(func.sum(stats.log_count)))
             .limit(20)
         )
-        logs_by_logger = {row[0]: row[1] for row in logger_result.all()}
+        logs_by_logger = {row[0]: int(row[1]) for row in logger_result.all()}
 
         # Top exceptions
         exception_result = await self.db.execute(
             select(
-                AppLog.exception_type,
-                AppLog.exception_message,
-                func.count(AppLog.id).label("count"),
-                func.max(AppLog.created_at).label("last_occurrence"),
+                stats.exception_type,
+                stats.exception_message,
+                func.sum(stats.log_count).label("count"),
+                func.max(stats.last_occurrence).label("last_occurrence"),
             )
-            .where(AppLog.created_at >= since)
-            .where(AppLog.exception_type.isnot(None))
-            .group_by(AppLog.exception_type, AppLog.exception_message)
-            .order_by(desc(func.count(AppLog.id)))
+            .where(stats.hour >= since)
+            .where(stats.exception_type.isnot(None))
+            .group_by(stats.exception_type, stats.exception_message)
+            .order_by(desc(func.sum(stats.log_count)))
             .limit(10)
         )
         top_exceptions = [
             {
                 "exception_type": row[0],
-                "exception_message": row[1][:200] if row[1] else None,
-                "count": row[2],
+                "exception_message": row[1],
+                "count": int(row[2]),
                 "last_occurrence": row[3].isoformat() if row[3] else None,
             }
             for row in exception_result.all()
         ]
 
-        # Logs over time (hourly for last 7 days)
+        # Logs over time (hourly)
         time_result = await self.db.execute(
-            select(
-                func.date_trunc("hour", AppLog.created_at).label("period"),
-                func.count(AppLog.id).label("count"),
-            )
-            .where(AppLog.created_at >= since)
-            .group_by(func.date_trunc("hour", AppLog.created_at))
-            .order_by(func.date_trunc("hour", AppLog.created_at))
+            select(stats.hour, func.sum(stats.log_count))
+            .where(stats.hour >= since)
+            .group_by(stats.hour)
+            .order_by(stats.hour)
         )
         logs_over_time = [
-            {"period": row[0].isoformat() if row[0] else None, "count": row[1]}
+            {"period": row[0].isoformat() if row[0] else None, "count": int(row[1])}
             for row in time_result.all()
         ]
 
@@ -199,9 +233,20 @@ class AppLogService:
         return [row[0] for row in result.all()]
 
     async def cleanup_old_logs(self, days: int = 90) -> int:
-        """Delete logs older than specified days. Returns count of deleted logs."""
+        """Remove logs older than specified days. Returns count of removed logs.
+
+        On the partitioned table whole monthly partitions are detached and
+        dropped; otherwise falls back to DELETE.
+        """
         cutoff = datetime.utcnow() - timedelta(days=days)
 
+        partitions = LogPartitionService(self.db)
+        if await partitions.is_partitioned(AppLog.__tablename__):
+            await partitions.ensure_partitions(AppLog.__tablename__)
+            count = await partitions.drop_partitions_before(AppLog.__tablename__, cutoff)
+            await self.db.commit()
+            return count
+
         # Count logs to delete
         count_result = await self.db.execute(
             select(func.count()).select_from(AppLog).where(AppLog.created_at < cutoff)
@@ -209,9 +254,6 @@ class AppLogService:
         count = count_result.scalar() or 0
 
         if count > 0:
-            # Delete in batches to avoid locking
-            from sqlalchemy import delete
-
             await self.db.execute(
                 delete(AppLog).where(AppLog.created_at < cutoff)
             )
@@ -219,38 +261,35 @@ class AppLogService:
 
         return count
 
-    async def export_logs(
+    def export_csv_stream(
         self,
         filters: Optional[AppLogFilters] = None,
-        limit: int = 10000,
-    ) -> List[Dict[str, Any]]:
-        """Export logs as list of dictionaries for CSV generation."""
-        logs, _ = await self.get_logs(
-            filters=filters,
-            page=1,
-            page_size=limit,
-            sort_by="created_at",
-            sort_order="desc",
+        compress: bool = False,
+        use_copy: Optional[bool] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream logs as CSV without a row limit.
+
+        Uses a server-side cursor for normal exports and PostgreSQL COPY for
+        open-ended or long date ranges unless ``use_copy`` is given explicitly.
+        """
+        query = (
+            select(*[column.label(name) for name, column in EXPORT_COLUMNS])
+            .where(*self._build_conditions(filters))
+            .order_by(desc(AppLog.created_at))
         )
 
-        return [
-            {
-                "id": log.id,
-                "created_at": log.created_at.isoformat() if log.created_at else None,
-                "level": log.level,
-                "logger_name": log.logger_name,
-                "message": log.message[:500] if log.message else None,
-                "exception_type": log.exception_type,
-                "exception_message": log.exception_message[:200] if log.exception_message else None,
-                "module": log.module,
-                "function_name": log.function_name,
-                "line_number": log.line_number,
-                "request_id": log.request_id,
-                "user_id": log.user_id,
-                "user_email": log.user_email,
-                "endpoint": log.endpoint,
-                "http_method": log.http_method,
-                "ip_address": log.ip_address,
-            }
-            for log in logs
-        ]
+        if use_copy is None:
+            date_from = filters.date_from if filters else None
+            date_to = filters.date_to if filters else None
+            use_copy = is_long_range(date_from, date_to, COPY_EXPORT_THRESHOLD_DAYS)
+
+        if use_copy:
+            chunks = copy_query_csv(self.db, query, delimiter=",")
+        else:
+            chunks = iter_csv(
+                stream_rows(self.db, query),
+                header=[name for name, _ in EXPORT_COLUMNS],
+                delimiter=",",
+            )
+
+        return gzip_chunks(chunks) if compress else chunks
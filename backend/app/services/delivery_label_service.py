@@ -0,0 +1,224 @@
+"""Delivery label data and route-batch label rendering.
+
+Label rows (one per order line) are loaded with a single query ordered so
+that all lines of an order are adjacent. That lets route batches stream
+labels order by order from a server-side cursor: each label is rendered
+and sent as soon as its order is complete.
+"""
+import asyncio
+import logging
+from datetime import date
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.pdfme_generator import get_pdfme_generator
+from app.services.zpl_label_generator import DeliveryLabelZPL
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip when streaming labels
+LABEL_YIELD_PER = 500
+
+LABEL_ROWS_SQL = """
+    SELECT
+        k.kundeid,
+        k.kundenavn,
+        k.leveringsdag,
+        k.adresse,
+        k.postnr,
+        k.sted,
+        k.rute,
+        k.sjaforparute,
+        k.diett,
+        k.menyinfo,
+        k.menygruppeid,
+        mg.beskrivelse as menygruppe_beskrivelse,
+        s.sone,
+        od.ordreid,
+        od.produktid,
+        p.produktnavn,
+        od.pris,
+        od.antall,
+        o.leveringsdato,
+        o.ansattid
+    FROM tblkunder k
+    INNER JOIN tblordrer o ON k.kundeid = o.kundeid
+    INNER JOIN tblordredetaljer od ON o.ordreid = od.ordreid
+    INNER JOIN tblprodukter p ON od.produktid = p.produktid
+    LEFT JOIN tblmenygruppe mg ON k.menygruppeid = mg.menygruppeid
+    LEFT JOIN tblsone s ON k.velgsone = s.idsone
+    WHERE o.leveringsdato BETWEEN :fra_dato AND :til_dato
+        AND (k.avsluttet = false OR k.avsluttet IS NULL)
+        AND (k.kundeinaktiv = false OR k.kundeinaktiv IS NULL)
+        AND o.ordrestatusid = :ordrestatus
+        AND o.kansellertdato IS NULL
+"""
+
+KUNDE_FIELDS = (
+    "kundeid", "kundenavn", "leveringsdag", "adresse", "postnr", "sted", "rute",
+    "sjaforparute", "diett", "menyinfo", "menygruppeid", "menygruppe_beskrivelse", "sone",
+)
+
+
+def build_label_query(
+    fra_dato: date,
+    til_dato: date,
+    sone_id: Optional[int] = None,
+    rute: Optional[int] = None,
+    ordrestatus: int = 35,
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the label rows query and its parameters.
+
+    Optional filters are only added when set, to avoid asyncpg NULL
+    parameter type issues.
+    """
+    query = LABEL_ROWS_SQL
+    params: Dict[str, Any] = {
+        "fra_dato": fra_dato,
+        "til_dato": til_dato,
+        "ordrestatus": ordrestatus,
+    }
+
+    if sone_id is not None:
+        query += " AND k.velgsone = :sone_id"
+        params["sone_id"] = sone_id
+
+    if rute is not None:
+        query += " AND k.rute = :rute"
+        params["rute"] = rute
+
+    # kundeid/ordreid keep each customer's and order's lines adjacent
+    query += " ORDER BY k.adresse, k.kundenavn, k.kundeid, o.leveringsdato, o.ordreid, p.produktnavn"
+    return query, params
+
+
+def _kunde_from_row(row) -> Dict[str, Any]:
+    return {field: getattr(row, field) for field in KUNDE_FIELDS}
+
+
+def _ordre_from_row(row) -> Dict[str, Any]:
+    return {
+        "ordreid": row.ordreid,
+        "leveringsdato": row.leveringsdato,
+        "ansattid": row.ansattid,
+        "produkter": [],
+    }
+
+
+def _produkt_from_row(row) -> Dict[str, Any]:
+    return {
+        "produktid": row.produktid,
+        "produktnavn": row.produktnavn,
+        "pris": row.pris,
+        "antall": row.antall,
+    }
+
+
+def group_label_rows(rows: Iterable[Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """Group label rows by customer and order.
+
+    Returns:
+        (customers with their orders and products, number of orders)
+    """
+    kunder: Dict[int, Dict[str, Any]] = {}
+    ordrer: Dict[int, Dict[str, Any]] = {}
+
+    for row in rows:
+        kunde = kunder.get(row.kundeid)
+        if kunde is None:
+            kunde = kunder[row.kundeid] = {**_kunde_from_row(row), "ordrer": []}
+
+        ordre = ordrer.get(row.ordreid)
+        if ordre is None:
+            ordre = ordrer[row.ordreid] = _ordre_from_row(row)
+            kunde["ordrer"].append(ordre)
+
+        ordre["produkter"].append(_produkt_from_row(row))
+
+    return list(kunder.values()), len(ordrer)
+
+
+async def stream_order_labels(
+    db: AsyncSession,
+    query: str,
+    params: Dict[str, Any],
+) -> AsyncIterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Yield (customer, order) pairs, each as soon as its last line is read.
+
+    Requires the ordering from ``build_label_query``.
+    """
+    result = await db.stream(text(query).execution_options(yield_per=LABEL_YIELD_PER), params)
+
+    kunde: Optional[Dict[str, Any]] = None
+    ordre: Optional[Dict[str, Any]] = None
+
+    async for partition in result.partitions():
+        for row in partition:
+            if ordre is None or row.ordreid != ordre["ordreid"]:
+                if ordre is not None:
+                    yield kunde, ordre
+                if kunde is None or row.kundeid != kunde["kundeid"]:
+                    kunde = _kunde_from_row(row)
+                ordre = _ordre_from_row(row)
+            ordre["produkter"].append(_produkt_from_row(row))
+
+    if ordre is not None:
+        yield kunde, ordre
+
+
+async def stream_zpl_labels(
+    db: AsyncSession,
+    query: str,
+    params: Dict[str, Any],
+) -> AsyncIterator[bytes]:
+    """Stream one ZPL label per customer order."""
+    renderer = DeliveryLabelZPL()
+    async for kunde, ordre in stream_order_labels(db, query, params):
+        yield (renderer.render(kunde, ordre) + "\n").encode("utf-8")
+
+
+def label_inputs(kunde: Dict[str, Any], ordre: Dict[str, Any]) -> Dict[str, str]:
+    """Flatten a customer order into pdfme template inputs."""
+    leveringsdato = ordre.get("leveringsdato")
+    inputs = {
+        field: "" if kunde.get(field) is None else str(kunde[field])
+        for field in KUNDE_FIELDS
+    }
+    inputs.update({
+        "ordreid": str(ordre["ordreid"]),
+        "leveringsdato": leveringsdato.strftime("%d.%m.%Y") if leveringsdato else "",
+        "produkter": "\n".join(
+            f"{produkt['antall']:g} x {produkt['produktnavn'] or ''}"
+            if produkt["antall"] is not None else (produkt["produktnavn"] or "")
+            for produkt in ordre["produkter"]
+        ),
+    })
+    return inputs
+
+
+async def render_pdf_labels(
+    db: AsyncSession,
+    query: str,
+    params: Dict[str, Any],
+    template_json: Dict[str, Any],
+    width_mm: float,
+    height_mm: float,
+) -> bytes:
+    """Render all labels of a batch into one PDF with a pdfme template.
+
+    A PDF is only valid once complete, so pages are rendered in a worker
+    thread after all orders have been read.
+    """
+    inputs_list = [label_inputs(kunde, ordre) async for kunde, ordre in stream_order_labels(db, query, params)]
+    if not inputs_list:
+        return b""
+
+    return await asyncio.to_thread(
+        get_pdfme_generator().generate_pdf_batch,
+        template_json,
+        inputs_list,
+        width_mm,
+        height_mm,
+    )
@@ -2,6 +2,8 @@
 from typing import List, Dict, Any, Optional
 import logging
 from app.services.ai_client import get_default_ai_client, AIClient
+from app.services.documentation_retrieval import DocumentationRetriever
+from app.services.documentation_service import DocumentationService
 
 logger = logging.getLogger(__name__)
 
@@ -228,8 +230,13 @@ Klikk på tema-knappen i sidemenyen (sol/måne-ikon).
 class DocumentationChatService:
     """Service for handling documentation chat with AI providers."""
 
-    def __init__(self, ai_client: Optional[AIClient] = None):
+    def __init__(
+        self,
+        ai_client: Optional[AIClient] = None,
+        retriever: Optional[DocumentationRetriever] = None
+    ):
         self._ai_client = ai_client
+        self._retriever = retriever
 
     @property
     def ai_client(self) -> AIClient:
@@ -238,7 +245,37 @@ class DocumentationChatService:
             self._ai_client = get_default_ai_client()
         return self._ai_client
 
-    def _get_system_prompt(self) -> str:
+    @property
+    def retriever(self) -> DocumentationRetriever:
+        """Lazy-build retriever over USER_DOCS and the docs/ directory."""
+        if self._retriever is None:
+            index = DocumentationService().index
+            self._retriever = DocumentationRetriever(
+                USER_DOCS,
+                documents=lambda: [(doc.path, doc.raw_content) for doc in index.documents()],
+                version=lambda: index.version,
+            )
+        return self._retriever
+
+    def warm_up(self) -> None:
+        """Build the retrieval index ahead of the first question."""
+        self.retriever.build()
+
+    def _get_context(
+        self,
+        message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Documentation chunks relevant to the message (and recent user turns)."""
+        query_parts = [message]
+        if conversation_history:
+            query_parts.extend(
+                msg["content"] for msg in conversation_history[-4:] if msg.get("role") == "user"
+            )
+        chunks = self.retriever.retrieve(" ".join(query_parts))
+        return "\n\n".join(chunk.as_context() for chunk in chunks)
+
+    def _get_system_prompt(self, context: str) -> str:
         """Build system prompt with documentation context."""
         return f"""Du er en hjelpsom brukerstøtte-assistent for Larvik Kommune Catering (LKC) systemet.
 Svar alltid på norsk. Vær vennlig, tydelig og hjelpsom.
@@ -246,7 +283,9 @@ Svar alltid på norsk. Vær vennlig, tydelig og hjelpsom.
 Du hjelper brukere med å forstå hvordan de bruker systemet i praksis.
 Gi steg-for-steg instruksjoner når det er relevant.
 
-{USER_DOCS}
+Relevante utdrag fra brukerdokumentasjonen:
+
+{context}
 
 REGLER:
 1. Svar basert på brukerdokumentasjonen over
@@ -291,7 +330,8 @@ REGLER:
             }
 
         # Build messages for AI
-        messages = [{"role": "system", "content": self._get_system_prompt()}]
+        context = self._get_context(message, conversation_history)
+        messages = [{"role": "system", "content": self._get_system_prompt(context)}]
 
         # Add conversation history (limit to last 10 messages to avoid token overflow)
         if conversation_history:
@@ -0,0 +1,265 @@
+"""In-memory index of the markdown documentation.
+
+The index is built once per process and kept current by comparing file
+mtimes and sizes, at most once every ``DOCS_INDEX_REFRESH_SECONDS``. Only
+new or changed files are re-read. It holds file metadata for the listing,
+rendered HTML (rendered on first view and kept until the file changes), and
+an inverted index for full-text search.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Characters of context on each side of the first match in search snippets
+SNIPPET_CONTEXT = 80
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens (handles æøå)."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+
+def extract_title(raw_content: str, path: Path) -> str:
+    """Title from the first '# ' heading, or derived from the file name."""
+    for line in raw_content.split('\n'):
+        if line.startswith('# '):
+            return line[2:].strip()
+    return path.stem.replace('-', ' ').replace('_', ' ').title()
+
+
+@dataclass
+class IndexedDocument:
+    """A documentation file as held by the index."""
+    path: str
+    name: str
+    title: str
+    size: int
+    mtime_ns: int
+    raw_content: str
+    term_counts: Counter = field(repr=False)
+    html_content: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def modified(self) -> datetime:
+        return datetime.fromtimestamp(self.mtime_ns / 1e9)
+
+    @property
+    def has_mermaid(self) -> bool:
+        return '```mermaid' in self.raw_content
+
+    def metadata(self) -> dict:
+        return {
+            "path": self.path,
+            "name": self.name,
+            "title": self.title,
+            "size": self.size,
+            "modified": self.modified,
+        }
+
+
+class DocumentationIndex:
+    """Markdown files under a directory, indexed for listing, viewing and search."""
+
+    def __init__(
+        self,
+        docs_path: Path,
+        render: Callable[[str], str],
+        refresh_seconds: Optional[float] = None,
+    ):
+        self.docs_path = docs_path
+        self._render = render
+        self._refresh_seconds = (
+            settings.DOCS_INDEX_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._documents: Dict[str, IndexedDocument] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._listing: List[dict] = []
+        self._last_scan: Optional[float] = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever a document is added, changed or removed."""
+        self.refresh()
+        return self._version
+
+    def _is_fresh(self) -> bool:
+        return self._last_scan is not None and time.monotonic() - self._last_scan < self._refresh_seconds
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-index changed files. Returns True if anything changed."""
+        if not force and self._is_fresh():
+            return False
+
+        with self._lock:
+            if not force and self._is_fresh():
+                return False
+
+            changed = self._scan()
+            self._last_scan = time.monotonic()
+            if changed:
+                self._version += 1
+                self._listing = sorted(
+                    (doc.metadata() for doc in self._documents.values()),
+                    key=lambda x: x["name"]
+                )
+            return changed
+
+    def _scan(self) -> bool:
+        seen = set()
+        changed = False
+
+        if self.docs_path.exists():
+            for full_path in self.docs_path.rglob("*.md"):
+                try:
+                    stat = full_path.stat()
+                except OSError:
+                    continue
+                if not full_path.is_file():
+                    continue
+
+                path = full_path.relative_to(self.docs_path).as_posix()
+                seen.add(path)
+
+                current = self._documents.get(path)
+                if current and current.mtime_ns == stat.st_mtime_ns and current.size == stat.st_size:
+                    continue
+
+                try:
+                    raw_content = full_path.read_text(encoding='utf-8')
+                except (OSError, UnicodeDecodeError) as e:
+                    logger.warning(f"Could not index documentation file {path}: {e}")
+                    continue
+
+                self._remove(path)
+                self._add(IndexedDocument(
+                    path=path,
+                    name=full_path.name,
+                    title=extract_title(raw_content, full_path),
+                    size=stat.st_size,
+                    mtime_ns=stat.st_mtime_ns,
+                    raw_content=raw_content,
+                    term_counts=Counter(tokenize(raw_content)),
+                ))
+                changed = True
+
+        for path in set(self._documents) - seen:
+            self._remove(path)
+            changed = True
+
+        return changed
+
+    def _add(self, document: IndexedDocument) -> None:
+        self._documents[document.path] = document
+        for term, count in document.term_counts.items():
+            self._postings.setdefault(term, {})[document.path] = count
+
+    def _remove(self, path: str) -> None:
+        document = self._documents.pop(path, None)
+        if not document:
+            return
+        for term in document.term_counts:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(path, None)
+                if not postings:
+                    del self._postings[term]
+
+    def list_files(self) -> List[dict]:
+        """Metadata for all files, sorted by name."""
+        self.refresh()
+        return list(self._listing)
+
+    def documents(self) -> List[IndexedDocument]:
+        """All indexed documents."""
+        self.refresh()
+        return list(self._documents.values())
+
+    def get(self, path: str) -> Optional[IndexedDocument]:
+        """Get a document by its path relative to the docs directory."""
+        self.refresh()
+        return self._documents.get(path)
+
+    def get_html(self, document: IndexedDocument) -> str:
+        """Rendered HTML for a document, cached until the file changes."""
+        if document.html_content is None:
+            document.html_content = self._render(document.raw_content)
+        return document.html_content
+
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """
+        Full-text search ranked by TF-IDF.
+
+        All query terms contribute; documents matching more and rarer terms
+        rank higher. Each result has a snippet around the first match.
+        """
+        self.refresh()
+        terms = set(tokenize(query))
+        if not terms or not self._documents:
+            return []
+
+        total = len(self._documents)
+        scores: Dict[str, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for path, count in postings.items():
+                scores[path] = scores.get(path, 0.0) + (1 + math.log(count)) * idf
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        results = []
+        for path, score in ranked:
+            document = self._documents[path]
+            results.append({
+                **document.metadata(),
+                "score": round(score, 4),
+                "snippet": self._snippet(document.raw_content, terms),
+            })
+        return results
+
+    @staticmethod
+    def _snippet(text: str, terms: set) -> str:
+        match = re.search(
+            r"\b(" + "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)) + r")\b",
+            text,
+            re.IGNORECASE,
+        )
+        if not match:
+            return text[:2 * SNIPPET_CONTEXT].strip()
+
+        start = max(0, match.start() - SNIPPET_CONTEXT)
+        end = min(len(text), match.end() + SNIPPET_CONTEXT)
+        snippet = " ".join(text[start:end].split())
+        return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+_indexes: Dict[Path, DocumentationIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_documentation_index(docs_path: Path, render: Callable[[str], str]) -> DocumentationIndex:
+    """Get the process-wide index for a docs directory."""
+    key = docs_path.resolve()
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = DocumentationIndex(docs_path, render)
+    return index
@@ -0,0 +1,201 @@
+"""BM25 retrieval over documentation chunks for the documentation chatbot.
+
+The built-in user guide (``USER_DOCS``) and the markdown files in docs/ are
+split into heading-sized chunks and indexed with Okapi BM25. The chatbot
+puts only the top-k chunks for a question into its prompt, so prompt size
+follows the question rather than the size of the documentation.
+
+The index is rebuilt when the documentation index reports changed files.
+"""
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.documentation_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+HEADING_PATTERN = re.compile(r"^(#{1,4})\s+(.+)$")
+
+# Chunks longer than this are split at paragraph boundaries
+MAX_CHUNK_CHARS = 1200
+
+
+@dataclass
+class DocChunk:
+    """A heading-sized piece of documentation."""
+    source: str
+    heading: str
+    text: str
+    term_counts: Counter = field(default_factory=Counter, repr=False)
+    length: int = 0
+
+    def as_context(self) -> str:
+        return f"[{self.source} – {self.heading}]\n{self.text}"
+
+
+def chunk_markdown(text: str, source: str, max_chars: int = MAX_CHUNK_CHARS) -> List[DocChunk]:
+    """
+    Split markdown into chunks at headings, then at paragraphs if too long.
+
+    Each chunk's heading is the path of headings above it
+    (e.g. "Oppskrifter > Legge til ingredienser"), and the heading text is
+    indexed with the chunk.
+    """
+    sections: List[Tuple[str, str]] = []
+    headings: List[str] = []
+    lines: List[str] = []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            sections.append((" > ".join(headings) or source, body))
+
+    in_code = False
+    for line in text.split("\n"):
+        if line.startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING_PATTERN.match(line)
+        if match:
+            flush()
+            lines = []
+            level = len(match.group(1))
+            headings = headings[:level - 1] + [match.group(2).strip()]
+        else:
+            lines.append(line)
+    flush()
+
+    chunks = []
+    for heading, body in sections:
+        for part in _split_long(body, max_chars):
+            chunk = DocChunk(source=source, heading=heading, text=part)
+            tokens = tokenize(f"{heading}\n{part}")
+            chunk.term_counts = Counter(tokens)
+            chunk.length = len(tokens)
+            chunks.append(chunk)
+    return chunks
+
+
+def _split_long(body: str, max_chars: int) -> List[str]:
+    if len(body) <= max_chars:
+        return [body]
+
+    parts: List[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", body):
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            parts.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        parts.append(current)
+    return parts
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of chunks."""
+
+    def __init__(self, chunks: Sequence[DocChunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = list(chunks)
+        self.k1 = k1
+        self.b = b
+        self.avg_length = (sum(c.length for c in self.chunks) / len(self.chunks)) if self.chunks else 0.0
+
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for i, chunk in enumerate(self.chunks):
+            for term, count in chunk.term_counts.items():
+                self._postings.setdefault(term, []).append((i, count))
+
+        total = len(self.chunks)
+        self._idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def search(self, query: str, k: int) -> List[Tuple[DocChunk, float]]:
+        """Top-k chunks for a query, best first."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for i, count in postings:
+                length_norm = 1 - self.b + self.b * self.chunks[i].length / (self.avg_length or 1)
+                scores[i] = scores.get(i, 0.0) + idf * count * (self.k1 + 1) / (count + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.chunks[i], score) for i, score in ranked]
+
+
+class DocumentationRetriever:
+    """Keeps a BM25 index over the user guide and docs/ current."""
+
+    def __init__(
+        self,
+        user_docs: str,
+        documents: Optional[Callable[[], List[Tuple[str, str]]]] = None,
+        version: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Args:
+            user_docs: Built-in user guide markdown
+            documents: Returns (path, markdown) for each docs/ file
+            version: Returns a number that changes when docs/ changes
+        """
+        self._user_docs = user_docs
+        self._documents = documents
+        self._version = version
+        self._index: Optional[BM25Index] = None
+        self._built_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> int:
+        return self._version() if self._version else 0
+
+    def build(self) -> BM25Index:
+        """Build the index now if it is missing or out of date."""
+        return self.index
+
+    @property
+    def index(self) -> BM25Index:
+        version = self._current_version()
+        if self._index is None or version != self._built_version:
+            with self._lock:
+                if self._index is None or version != self._built_version:
+                    self._index = self._build()
+                    self._built_version = version
+        return self._index
+
+    def _build(self) -> BM25Index:
+        chunks = chunk_markdown(self._user_docs, "Brukerveiledning")
+        if self._documents:
+            for path, text in self._documents():
+                chunks.extend(chunk_markdown(text, path))
+        logger.info(f"Built documentation retrieval index with {len(chunks)} chunks")
+        return BM25Index(chunks)
+
+    def retrieve(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[DocChunk]:
+        """Most relevant chunks for a query, within a character budget."""
+        k = k or settings.DOCS_CHAT_TOP_K
+        max_chars = max_chars or settings.DOCS_CHAT_MAX_CONTEXT_CHARS
+
+        selected = []
+        used = 0
+        for chunk, _score in self.index.search(query, k):
+            if selected and used + len(chunk.text) > max_chars:
+                break
+            selected.append(chunk)
+            used += len(chunk.text)
+        return selected
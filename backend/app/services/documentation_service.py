@@ -3,10 +3,10 @@ import os
 import re
 from pathlib import Path
 from typing import List, Optional
-from datetime import datetime
 import httpx
 
 from app.core.config import settings
+from app.services.documentation_index import DocumentationIndex, get_documentation_index
 
 
 class DocumentationService:
@@ -20,37 +20,14 @@ class DocumentationService:
             project_root = Path(__file__).parent.parent.parent
             self.docs_path = project_root / docs_path
 
+    @property
+    def index(self) -> DocumentationIndex:
+        """Process-wide index of the docs directory."""
+        return get_documentation_index(self.docs_path, self._markdown_to_html)
+
     def list_files(self) -> List[dict]:
         """List all markdown files in the docs directory."""
-        if not self.docs_path.exists():
-            return []
-
-        files = []
-        for file_path in self.docs_path.rglob("*.md"):
-            if file_path.is_file():
-                stat = file_path.stat()
-                relative_path = file_path.relative_to(self.docs_path)
-
-                # Try to extract title from first # heading
-                title = None
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            if line.startswith('# '):
-                                title = line[2:].strip()
-                                break
-                except Exception:
-                    pass
-
-                files.append({
-                    "path": str(relative_path),
-                    "name": file_path.name,
-                    "title": title or file_path.stem.replace('-', ' ').replace('_', ' ').title(),
-                    "size": stat.st_size,
-                    "modified": datetime.fromtimestamp(stat.st_mtime),
-                })
-
-        return sorted(files, key=lambda x: x["name"])
+        return self.index.list_files()
 
     def get_file_content(self, file_path: str) -> Optional[dict]:
         """Get content of a specific documentation file."""
@@ -59,44 +36,22 @@ class DocumentationService:
         if ".." in safe_path or safe_path.startswith("/"):
             return None
 
-        full_path = self.docs_path / safe_path
-
-        if not full_path.exists() or not full_path.is_file():
-            return None
-
-        # Verify the file is within docs directory
-        try:
-            full_path.resolve().relative_to(self.docs_path.resolve())
-        except ValueError:
+        document = self.index.get(safe_path)
+        if not document:
             return None
 
-        try:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                raw_content = f.read()
-
-            # Extract title from first # heading
-            title = None
-            for line in raw_content.split('\n'):
-                if line.startswith('# '):
-                    title = line[2:].strip()
-                    break
-
-            # Convert markdown to HTML
-            html_content = self._markdown_to_html(raw_content)
-
-            # Check for mermaid diagrams
-            has_mermaid = '```mermaid' in raw_content
+        return {
+            "path": file_path,
+            "name": document.name,
+            "title": document.title,
+            "raw_content": document.raw_content,
+            "html_content": self.index.get_html(document),
+            "has_mermaid": document.has_mermaid,
+        }
 
-            return {
-                "path": file_path,
-                "name": Path(file_path).name,
-                "title": title or Path(file_path).stem.replace('-', ' ').replace('_', ' ').title(),
-                "raw_content": raw_content,
-                "html_content": html_content,
-                "has_mermaid": has_mermaid,
-            }
-        except Exception as e:
-            return None
+    def search(self, query: str, limit: int = 20) -> List[dict]:
+        """Full-text search over all documentation files."""
+        return self.index.search(query, limit)
 
     def _markdown_to_html(self, markdown_text: str) -> str:
         """Convert markdown to HTML with mermaid support."""
@@ -1,13 +1,18 @@
 """Email service for sending SMTP emails."""
 import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.services.smtp_sender import (
+    CompiledTemplate,
+    DeliveryResult,
+    OutgoingEmail,
+    PooledSMTPSender,
+    build_mime_message,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +31,11 @@ class EmailService:
         self.use_tls = settings.SMTP_USE_TLS
 
     def is_configured(self) -> bool:
-        """Check if SMTP is properly configured."""
-        return bool(self.host and self.user and self.password)
+        """Check if SMTP is properly configured.
+
+        Credentials are optional so local SMTP sinks can be used in development.
+        """
+        return bool(self.host and (self.password or not self.user))
 
     def send_email(
         self,
@@ -54,25 +62,21 @@ class EmailService:
 
         try:
             # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = f"{self.from_name} <{self.from_email}>"
-            msg["To"] = to_email
-
-            # Add plain text version
-            if text_content:
-                part1 = MIMEText(text_content, "plain", "utf-8")
-                msg.attach(part1)
-
-            # Add HTML version
-            part2 = MIMEText(html_content, "html", "utf-8")
-            msg.attach(part2)
+            msg = build_mime_message(
+                self.from_email,
+                self.from_name,
+                to_email,
+                subject,
+                html_content,
+                text_content,
+            )
 
             # Connect and send
             with smtplib.SMTP(self.host, self.port) as server:
                 if self.use_tls:
                     server.starttls()
-                server.login(self.user, self.password)
+                if self.user:
+                    server.login(self.user, self.password)
                 server.sendmail(self.from_email, to_email, msg.as_string())
 
             logger.info(f"Email sent successfully to {to_email}")
@@ -227,15 +231,18 @@ Vikingveien 4, 3274 Larvik
 
         return self.send_email(to_email, subject, html_content, text_content)
 
-    async def send_bulk_emails(
+    def render_bulk_emails(
         self,
         recipients: List[Dict[str, Any]],
         template_name: Optional[str] = None,
         subject: Optional[str] = None,
         body_html: Optional[str] = None,
         body_text: Optional[str] = None,
-    ) -> int:
-        """Send emails to multiple recipients for workflow automation.
+    ) -> List[OutgoingEmail]:
+        """Render one email per recipient.
+
+        The template is resolved and compiled once; each recipient then only
+        costs a substitution of its own variables.
 
         Args:
             recipients: List of dicts with 'email', 'name', and optional template variables
@@ -245,15 +252,8 @@ Vikingveien 4, 3274 Larvik
             body_text: Plain text email body (used if no template)
 
         Returns:
-            Number of emails successfully sent
+            List of rendered emails, skipping recipients without an address
         """
-        if not recipients:
-            return 0
-
-        sent_count = 0
-        failed_count = 0
-
-        # Get template if specified
         if template_name:
             template = self._get_template(template_name)
             if template:
@@ -261,44 +261,78 @@ Vikingveien 4, 3274 Larvik
                 body_html = template.get("body_html", body_html)
                 body_text = template.get("body_text", body_text)
 
-        # Send to each recipient
+        subject_template = CompiledTemplate(subject or "No Subject")
+        html_template = CompiledTemplate(body_html) if body_html else None
+        text_template = CompiledTemplate(body_text) if body_text else None
+
+        emails = []
         for recipient in recipients:
-            try:
-                # Replace variables in subject and body
-                recipient_subject = self._replace_variables(subject or "No Subject", recipient)
-                recipient_body_html = self._replace_variables(
-                    body_html or "",
-                    recipient
-                ) if body_html else None
-                recipient_body_text = self._replace_variables(
-                    body_text or "",
-                    recipient
-                ) if body_text else None
-
-                # Send email
-                success = self.send_email(
-                    to_email=recipient["email"],
-                    subject=recipient_subject,
-                    html_content=recipient_body_html or "",
-                    text_content=recipient_body_text,
-                )
-
-                if success:
-                    sent_count += 1
-                else:
-                    failed_count += 1
-
-            except Exception as e:
-                failed_count += 1
-                logger.error(
-                    f"Failed to send email to {recipient.get('email', 'unknown')}: {str(e)}"
-                )
-
-        logger.info(
-            f"Bulk email completed: {sent_count} sent, {failed_count} failed out of {len(recipients)} total"
+            if not recipient.get("email"):
+                logger.warning(f"Skipping recipient without email address: {recipient}")
+                continue
+            emails.append(OutgoingEmail(
+                to_email=recipient["email"],
+                subject=subject_template.render(recipient),
+                html_content=html_template.render(recipient) if html_template else "",
+                text_content=text_template.render(recipient) if text_template else None,
+                customer_id=recipient.get("customer_id"),
+            ))
+        return emails
+
+    async def deliver_bulk_emails(
+        self,
+        emails: List[OutgoingEmail],
+        sender: Optional[PooledSMTPSender] = None,
+    ) -> List[DeliveryResult]:
+        """Deliver pre-rendered emails over pooled SMTP connections."""
+        if not self.is_configured():
+            logger.warning("SMTP not configured, skipping bulk email send")
+            return [
+                DeliveryResult(email.to_email, False, email.customer_id, "SMTP not configured")
+                for email in emails
+            ]
+
+        sender = sender or PooledSMTPSender(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            use_tls=self.use_tls,
+            from_email=self.from_email,
+            from_name=self.from_name,
         )
+        return await sender.send_all(emails)
+
+    async def send_bulk_emails(
+        self,
+        recipients: List[Dict[str, Any]],
+        template_name: Optional[str] = None,
+        subject: Optional[str] = None,
+        body_html: Optional[str] = None,
+        body_text: Optional[str] = None,
+    ) -> int:
+        """Send emails to multiple recipients for workflow automation.
 
-        return sent_count
+        Emails are rendered once up front and delivered over pooled,
+        rate-limited SMTP connections without blocking the event loop.
+        Workflows should prefer the ``app.tasks.email_tasks`` queue, which
+        also records per-recipient results.
+
+        Returns:
+            Number of emails successfully sent
+        """
+        if not recipients:
+            return 0
+
+        emails = self.render_bulk_emails(
+            recipients,
+            template_name=template_name,
+            subject=subject,
+            body_html=body_html,
+            body_text=body_text,
+        )
+        results = await self.deliver_bulk_emails(emails)
+        return sum(1 for result in results if result.success)
 
     def _replace_variables(self, text: str, variables: Dict[str, Any]) -> str:
         """Replace {{variable}} placeholders in text.
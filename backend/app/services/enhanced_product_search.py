@@ -3,40 +3,40 @@ import asyncio
 import json
 import logging
 import math
-from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, func, cast, String, and_, text
+from sqlalchemy import select, or_, func, cast, String, and_
 from sqlalchemy.orm import selectinload
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process, utils
 from collections import defaultdict
-import redis.asyncio as redis
 
 from app.models.matinfo_products import MatinfoProduct as ProductDetail, MatinfoNutrient, MatinfoAllergen
 from app.models.produkter import Produkter
 from app.core.config import settings
 from app.core.gtin_utils import normalize_gtin
+from app.core.cache import make_cache_key
+from app.services.federated_search import ProviderOutcome, SearchProvider, merge_by_gtin, run_providers
+from app.services.matinfo_search import search_matinfo_products
+from app.services.product_autocomplete import get_product_autocomplete_index
+from app.services.product_popularity import PRODUCTS, SEARCHES, ProductPopularity, product_popularity
 
 logger = logging.getLogger(__name__)
 
+# Most a relevance score can be raised for popular products, and the
+# decayed use count that gives half of that
+POPULARITY_BOOST = 0.1
+POPULARITY_HALF_BOOST_USES = 5.0
+
+# Popular searches scanned for suggestions
+SUGGESTION_SEARCH_POOL = 200
+
 
 class EnhancedProductSearchService:
     """Enhanced service for searching products with fuzzy matching and ranking."""
 
-    def __init__(self):
-        self.redis_client = None
-        self.init_redis()
-
-    def init_redis(self):
-        """Initialize Redis connection for caching."""
-        try:
-            self.redis_client = redis.from_url(
-                settings.REDIS_URL,
-                decode_responses=True
-            )
-        except Exception as e:
-            logger.warning(f"Redis not available: {e}. Continuing without caching.")
-            self.redis_client = None
+    def __init__(self, popularity: Optional[ProductPopularity] = None):
+        # Use and search tracking on the shared Redis client
+        self.popularity = popularity or product_popularity
 
     async def fuzzy_search(
         self,
@@ -78,12 +78,14 @@ class EnhancedProductSearchService:
             # Fetch candidates from database
             candidates = await self._fetch_candidates(query_lower, session, limit * 3)
 
-            # Score and rank candidates
-            scored_results = []
-            for product in candidates:
-                score = self._calculate_relevance_score(query_lower, product)
-                if score >= threshold:
-                    scored_results.append((score, product))
+            # Score all candidates in one batch and rank them
+            scores = self._score_candidates(query_lower, candidates)
+            usage = await self.popularity.product_usage([p.gtin for p in candidates if p.gtin])
+            scored_results = [
+                (self._boost_by_popularity(score, usage.get(product.gtin, (0.0, None))[0]), product)
+                for score, product in zip(scores, candidates)
+                if score >= threshold
+            ]
 
             # Sort by score descending
             scored_results.sort(key=lambda x: x[0], reverse=True)
@@ -92,14 +94,14 @@ class EnhancedProductSearchService:
             paginated_results = scored_results[offset:offset + limit]
 
             # Format results
-            items = []
-            for score, product in paginated_results:
-                item = await self._format_product_result(product, session, score)
-                items.append(item)
+            items = await self._format_product_results(
+                [(product, score) for score, product in paginated_results],
+                session,
+                usage
+            )
 
             # Track search for suggestions
-            if self.redis_client:
-                await self._track_search(query_lower)
+            await self.popularity.record_search(query_lower)
 
             return {
                 "success": True,
@@ -140,12 +142,7 @@ class EnhancedProductSearchService:
         result = await session.execute(stmt)
         products = result.scalars().all()
 
-        items = []
-        for product in products:
-            item = await self._format_product_result(product, session, 1.0)
-            items.append(item)
-
-        return items
+        return await self._format_product_results([(product, 1.0) for product in products], session)
 
     async def _fetch_candidates(
         self,
@@ -153,78 +150,21 @@ class EnhancedProductSearchService:
         session: AsyncSession,
         limit: int
     ) -> List[ProductDetail]:
-        """Fetch candidate products from database."""
-        # Use trigram similarity if PostgreSQL
-        if settings.DATABASE_URL.startswith("postgresql"):
-            # Create trigram index if not exists
-            await session.execute(text("""
-                CREATE EXTENSION IF NOT EXISTS pg_trgm;
-            """))
-            await session.commit()
-
-            # Use trigram similarity search
-            stmt = text("""
-                SELECT * FROM products
-                WHERE
-                    similarity(LOWER(name), :query) > 0.1
-                    OR similarity(LOWER(brandname), :query) > 0.1
-                    OR similarity(LOWER(producername), :query) > 0.1
-                    OR LOWER(name) LIKE :pattern
-                    OR LOWER(brandname) LIKE :pattern
-                    OR gtin LIKE :pattern
-                ORDER BY
-                    GREATEST(
-                        similarity(LOWER(name), :query),
-                        similarity(LOWER(brandname), :query),
-                        similarity(LOWER(producername), :query)
-                    ) DESC
-                LIMIT :limit
-            """)
-
-            result = await session.execute(
-                stmt,
-                {
-                    "query": query,
-                    "pattern": f"%{query}%",
-                    "limit": limit
-                }
-            )
-
-            # Convert to ProductDetail objects
-            products = []
-            for row in result:
-                product = await session.get(ProductDetail, row.id)
-                if product:
-                    await session.refresh(product, ['allergens', 'nutrients'])
-                    products.append(product)
-
-            return products
-        else:
-            # Fallback to ILIKE for non-PostgreSQL
-            search_pattern = f"%{query}%"
-            stmt = (
-                select(ProductDetail)
-                .options(
-                    selectinload(ProductDetail.allergens),
-                    selectinload(ProductDetail.nutrients)
-                )
-                .where(
-                    or_(
-                        ProductDetail.name.ilike(search_pattern),
-                        ProductDetail.brandname.ilike(search_pattern),
-                        ProductDetail.producername.ilike(search_pattern),
-                        ProductDetail.gtin.ilike(search_pattern)
-                    )
-                )
-                .limit(limit)
-            )
-
-            result = await session.execute(stmt)
-            return result.scalars().all()
+        """Fetch candidate products with the shared ranked Matinfo search."""
+        ranked = await search_matinfo_products(session, query, limit)
+        return [product for product, _score in ranked]
 
     def _calculate_relevance_score(self, query: str, product: ProductDetail) -> float:
+        """Calculate relevance score for a single product (see _score_candidates)."""
+        return self._score_candidates(query, [product])[0]
+
+    def _score_candidates(self, query: str, products: List[ProductDetail]) -> List[float]:
         """
-        Calculate relevance score for a product.
+        Calculate relevance scores for all candidates at once.
+
+        Name, brand and producer are each scored against the query with one
+        RapidFuzz batch call over all candidates, instead of three Python
+        level ratio calls per product.
 
         Scoring factors:
         - Exact match: 1.0
@@ -235,76 +175,120 @@ class EnhancedProductSearchService:
         - Has nutrition data: +10
         - Has allergen data: +10
         """
-        scores = []
+        if not products:
+            return []
+
+        # Best weighted score per product; None until some field matched
+        best: List[Optional[float]] = [None] * len(products)
+
+        fields = (
+            # Name matching (highest weight)
+            ([p.name or None for p in products], fuzz.token_sort_ratio, utils.default_process, 1.0),
+            # Brand matching
+            ([p.brandname.lower() if p.brandname else None for p in products], fuzz.partial_ratio, None, 0.5),
+            # Producer matching
+            ([p.producername.lower() if p.producername else None for p in products], fuzz.partial_ratio, None, 0.3),
+        )
+        for choices, scorer, processor, weight in fields:
+            if not any(choices):
+                continue
+            # None choices are skipped, so products without the field get no score
+            for _choice, score, index in process.extract(
+                query, choices, scorer=scorer, processor=processor, limit=None
+            ):
+                weighted = score * weight
+                if best[index] is None or weighted > best[index]:
+                    best[index] = weighted
 
-        # Name matching (highest weight)
-        if product.name:
-            name_score = fuzz.token_sort_ratio(query, product.name.lower())
-            scores.append(name_score * 1.0)  # Full weight
-
-        # Brand matching
-        if product.brandname:
-            brand_score = fuzz.partial_ratio(query, product.brandname.lower())
-            scores.append(brand_score * 0.5)  # Half weight
-
-        # Producer matching
-        if product.producername:
-            producer_score = fuzz.partial_ratio(query, product.producername.lower())
-            scores.append(producer_score * 0.3)  # 30% weight
-
-        # GTIN matching
-        if product.gtin and query.isdigit():
-            if product.gtin.startswith(query):
-                scores.append(80)
-            elif query in product.gtin:
-                scores.append(40)
-
-        # Bonus for data completeness
-        bonus = 0
-        if product.nutrients:
-            bonus += 10
-        if product.allergens:
-            bonus += 10
-
-        # Calculate final score
-        if scores:
-            base_score = max(scores)  # Use best match
-            final_score = min(100, base_score + bonus)
-            return final_score / 100.0  # Normalize to 0-1
-
-        return 0.0
-
-    async def _format_product_result(
+        scores = []
+        for product, base_score in zip(products, best):
+            # GTIN matching
+            if product.gtin and query.isdigit():
+                gtin_score = 80 if product.gtin.startswith(query) else 40 if query in product.gtin else None
+                if gtin_score is not None:
+                    base_score = max(base_score or 0, gtin_score)
+
+            if base_score is None:
+                scores.append(0.0)
+                continue
+
+            # Bonus for data completeness
+            bonus = 0
+            if product.nutrients:
+                bonus += 10
+            if product.allergens:
+                bonus += 10
+
+            # Normalize to 0-1
+            scores.append(min(100, base_score + bonus) / 100.0)
+
+        return scores
+
+    async def _fetch_linked_products(
         self,
-        product: ProductDetail,
+        gtins: List[Optional[str]],
+        session: AsyncSession
+    ) -> Dict[str, Produkter]:
+        """Linked tblprodukter rows for several GTINs in one query, keyed by normalized GTIN."""
+        normalized = {normalize_gtin(gtin) for gtin in gtins if gtin}
+        normalized.discard(None)
+        if not normalized:
+            return {}
+
+        ean_gtin = func.lpad(func.regexp_replace(Produkter.ean_kode, r'[^0-9]', '', 'g'), 14, '0')
+        result = await session.execute(
+            select(Produkter, ean_gtin.label("normalized_gtin")).where(ean_gtin.in_(normalized))
+        )
+        linked: Dict[str, Produkter] = {}
+        for produkt, normalized_gtin in result:
+            linked.setdefault(normalized_gtin, produkt)
+        return linked
+
+    def _boost_by_popularity(self, score: float, popularity: float) -> float:
+        """Raise a relevance score by up to POPULARITY_BOOST for often used products."""
+        if popularity <= 0:
+            return score
+        return min(1.0, score + POPULARITY_BOOST * popularity / (popularity + POPULARITY_HALF_BOOST_USES))
+
+    async def _format_product_results(
+        self,
+        scored_products: List[Tuple[ProductDetail, float]],
         session: AsyncSession,
-        score: float
+        usage: Optional[Dict[str, Tuple[float, Optional[str]]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Format products for response, loading links and usage for all of them at once."""
+        gtins = [product.gtin for product, _score in scored_products]
+        linked_products = await self._fetch_linked_products(gtins, session)
+        if usage is None:
+            usage = await self.popularity.product_usage([gtin for gtin in gtins if gtin])
+
+        results = []
+        for product, score in scored_products:
+            use_count, last_used = usage.get(product.gtin, (0.0, None))
+            results.append(self._format_product_result(
+                product,
+                score,
+                linked_products.get(normalize_gtin(product.gtin)) if product.gtin else None,
+                round(use_count),
+                last_used
+            ))
+        return results
+
+    def _format_product_result(
+        self,
+        product: ProductDetail,
+        score: float,
+        linked_product: Optional[Produkter],
+        use_count: int,
+        last_used: Optional[str]
     ) -> Dict[str, Any]:
         """Format product for response."""
-        # Get linked product from tblprodukter
-        linked_product = None
-        if product.gtin:
-            # Normalize GTIN for matching (pad to 14 digits)
-            normalized_gtin = normalize_gtin(product.gtin)
-            linked_stmt = select(Produkter).where(
-                func.lpad(func.regexp_replace(Produkter.ean_kode, r'[^0-9]', '', 'g'), 14, '0') == normalized_gtin
-            )
-            linked_result = await session.execute(linked_stmt)
-            linked_product = linked_result.scalar_one_or_none()
-
         # Calculate nutrition summary
         nutrition_summary = self._get_nutrition_summary(product.nutrients)
 
         # Check nutrition completeness
         nutrition_complete = self._is_nutrition_complete(product.nutrients)
 
-        # Get use count if tracking is enabled
-        use_count = 0
-        last_used = None
-        if self.redis_client and product.gtin:
-            use_count = await self._get_product_use_count(product.gtin)
-            last_used = await self._get_product_last_used(product.gtin)
-
         return {
             "gtin": product.gtin,
             "name": product.name,
@@ -404,62 +388,20 @@ class EnhancedProductSearchService:
         }
         return level_map.get(level, "UNKNOWN")
 
-    async def _track_search(self, query: str):
-        """Track search query for suggestions."""
-        if not self.redis_client:
-            return
-
-        try:
-            # Track search query
-            key = f"search:queries:{query.lower()}"
-            await self.redis_client.incr(key)
-            await self.redis_client.expire(key, 86400 * 30)  # 30 days
-
-            # Track recent searches
-            recent_key = "search:recent"
-            await self.redis_client.lpush(recent_key, query)
-            await self.redis_client.ltrim(recent_key, 0, 99)  # Keep last 100
-        except Exception as e:
-            logger.warning(f"Failed to track search: {e}")
-
-    async def _get_product_use_count(self, gtin: str) -> int:
-        """Get product use count from cache."""
-        if not self.redis_client:
-            return 0
-
-        try:
-            key = f"product:use_count:{gtin}"
-            count = await self.redis_client.get(key)
-            return int(count) if count else 0
-        except Exception:
-            return 0
-
-    async def _get_product_last_used(self, gtin: str) -> Optional[str]:
-        """Get product last used date from cache."""
-        if not self.redis_client:
-            return None
-
-        try:
-            key = f"product:last_used:{gtin}"
-            timestamp = await self.redis_client.get(key)
-            if timestamp:
-                return datetime.fromtimestamp(float(timestamp)).isoformat()
-            return None
-        except Exception:
-            return None
-
     async def get_suggestions(
         self,
         query: str,
-        session: AsyncSession,
         limit: int = 10
     ) -> List[str]:
         """
         Get auto-complete suggestions for a query.
 
+        Popular earlier searches come first, then product names from the
+        in-memory autocomplete index, so no database query is made per
+        keystroke.
+
         Args:
             query: Partial search query
-            session: Database session
             limit: Maximum suggestions
 
         Returns:
@@ -471,52 +413,25 @@ class EnhancedProductSearchService:
         if len(query_lower) < 2:
             return suggestions
 
-        # Get from recent searches if available
-        if self.redis_client:
-            try:
-                recent = await self.redis_client.lrange("search:recent", 0, 50)
-                for term in recent:
-                    if term.lower().startswith(query_lower):
-                        suggestions.append(term)
-                        if len(suggestions) >= limit:
-                            break
-            except Exception as e:
-                logger.warning(f"Failed to get recent searches: {e}")
+        # Get from popular searches, most popular first
+        for term, _score in await self.popularity.top_k(SEARCHES, SUGGESTION_SEARCH_POOL):
+            if term.startswith(query_lower) and term not in suggestions:
+                suggestions.append(term)
+                if len(suggestions) >= limit:
+                    break
 
         # Get from product names if needed
         if len(suggestions) < limit:
-            stmt = (
-                select(ProductDetail.name)
-                .where(ProductDetail.name.ilike(f"{query}%"))
-                .distinct()
-                .limit(limit - len(suggestions))
-            )
-
-            result = await session.execute(stmt)
-            for name, in result:
-                if name and name not in suggestions:
+            names = await get_product_autocomplete_index().suggest(query_lower, limit)
+            for name in names:
+                if name not in suggestions:
                     suggestions.append(name)
 
         return suggestions[:limit]
 
     async def get_recent_searches(self, limit: int = 20) -> List[str]:
         """Get recent search queries."""
-        if not self.redis_client:
-            return []
-
-        try:
-            recent = await self.redis_client.lrange("search:recent", 0, limit - 1)
-            # Remove duplicates while preserving order
-            seen = set()
-            unique = []
-            for term in recent:
-                if term not in seen:
-                    seen.add(term)
-                    unique.append(term)
-            return unique
-        except Exception as e:
-            logger.warning(f"Failed to get recent searches: {e}")
-            return []
+        return await self.popularity.recent_searches(limit)
 
     async def get_frequent_products(
         self,
@@ -535,46 +450,36 @@ class EnhancedProductSearchService:
         Returns:
             List of frequently used products
         """
-        # This would normally query from recipe ingredients
-        # For now, return popular products
+        # Most used products by decayed use count
+        top = await self.popularity.top_k(PRODUCTS, limit)
         stmt = (
             select(ProductDetail)
             .options(
                 selectinload(ProductDetail.allergens),
                 selectinload(ProductDetail.nutrients)
             )
-            .limit(limit)
         )
+        if top:
+            stmt = stmt.where(ProductDetail.gtin.in_([gtin for gtin, _score in top]))
+        else:
+            # Nothing tracked yet
+            stmt = stmt.limit(limit)
 
         result = await session.execute(stmt)
         products = result.scalars().all()
 
-        items = []
-        for product in products:
-            item = await self._format_product_result(product, session, 1.0)
-            items.append(item)
+        rank = {gtin: i for i, (gtin, _score) in enumerate(top)}
+        products = sorted(products, key=lambda p: rank.get(p.gtin, len(rank)))
 
-        return items
+        return await self._format_product_results([(product, 1.0) for product in products], session)
 
     async def track_product_use(self, gtin: str):
         """Track that a product was used in a recipe."""
-        if not self.redis_client or not gtin:
+        if not gtin:
             return
 
-        try:
-            # Increment use count
-            count_key = f"product:use_count:{gtin}"
-            await self.redis_client.incr(count_key)
-
-            # Update last used timestamp
-            time_key = f"product:last_used:{gtin}"
-            await self.redis_client.set(time_key, datetime.now().timestamp())
-
-            # Set expiry to 90 days
-            await self.redis_client.expire(count_key, 86400 * 90)
-            await self.redis_client.expire(time_key, 86400 * 90)
-        except Exception as e:
-            logger.warning(f"Failed to track product use: {e}")
+        get_product_autocomplete_index().record_use(gtin)
+        await self.popularity.record_product_use(gtin)
 
     # =========================================================================
     # Legacy search methods (consolidated from ProductSearchService)
@@ -639,18 +544,13 @@ class EnhancedProductSearchService:
                 count_result = await session.execute(count_stmt)
                 total = count_result.scalar()
 
+                # Linked products in tblprodukter, one query for the page
+                linked_products = await self._fetch_linked_products([p.gtin for p in products], session)
+
                 # Convert to response format
                 items = []
                 for product in products:
-                    # Try to find linked product in tblprodukter
-                    linked_product = None
-                    if product.gtin:
-                        normalized_gtin = normalize_gtin(product.gtin)
-                        linked_stmt = select(Produkter).where(
-                            func.lpad(func.regexp_replace(Produkter.ean_kode, r'[^0-9]', '', 'g'), 14, '0') == normalized_gtin
-                        )
-                        linked_result = await session.execute(linked_stmt)
-                        linked_product = linked_result.scalar_one_or_none()
+                    linked_product = linked_products.get(normalize_gtin(product.gtin)) if product.gtin else None
 
                     items.append({
                         "id": product.id,
@@ -741,119 +641,196 @@ class EnhancedProductSearchService:
 
         Requires ANYTHINGLLM_API_KEY configuration.
         """
-        import httpx
+        try:
+            llm_answer = await self._ask_llm(query)
+            return await self._llm_result(query, llm_answer, session, limit)
+        except Exception as e:
+            logger.error(f"LLM search error: {str(e)}")
+            return {
+                "success": False,
+                "source": "llm",
+                "query": query,
+                "error": str(e),
+                "items": []
+            }
 
-        anythingllm_url = settings.ANYTHINGLLM_API_URL if hasattr(settings, 'ANYTHINGLLM_API_URL') else None
-        anythingllm_key = settings.ANYTHINGLLM_API_KEY if hasattr(settings, 'ANYTHINGLLM_API_KEY') else None
-        workspace_slug = settings.ANYTHINGLLM_WORKSPACE_SLUG if hasattr(settings, 'ANYTHINGLLM_WORKSPACE_SLUG') else None
+    async def hybrid_search(
+        self,
+        query: str,
+        session: AsyncSession,
+        limit: int = 20,
+        use_llm: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Combine database and LLM search.
 
-        if not anythingllm_key:
+        The AnythingLLM request runs concurrently with the database search
+        under PRODUCT_SEARCH_DEADLINE_SECONDS, and its answer is cached
+        briefly. LLM results come first, then database results not already
+        found by the LLM. If the LLM is late or fails, the database results
+        are returned alone.
+        """
+        use_llm = use_llm and bool(getattr(settings, 'ANYTHINGLLM_API_KEY', None))
+        providers = [SearchProvider("database", lambda: self._search_database_items(query, session, limit))]
+        if use_llm:
+            providers.append(SearchProvider(
+                "llm",
+                lambda: self._ask_llm_items(query),
+                cache_key=make_cache_key("product_search", "llm", query.strip().lower())
+            ))
+
+        outcomes = {outcome.name: outcome for outcome in await run_providers(providers)}
+        database = outcomes["database"]
+        if not database.succeeded:
             return {
                 "success": False,
-                "source": "llm",
+                "source": "database",
                 "query": query,
-                "error": "AnythingLLM API key not configured",
+                "error": database.error or "Database search timed out",
                 "items": []
             }
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{anythingllm_url}/workspace/{workspace_slug}/chat",
-                    headers={
-                        "Authorization": f"Bearer {anythingllm_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "message": f"Finn produkter som matcher: {query}. Returner GTIN-koder for relevante produkter.",
-                        "mode": "query"
-                    },
-                    timeout=30.0
-                )
+        db_results = {
+            "success": True,
+            "source": "database",
+            "query": query,
+            "total": len(database.items),
+            "items": database.items
+        }
 
-                if response.status_code != 200:
-                    return {
-                        "success": False,
-                        "source": "llm",
-                        "query": query,
-                        "error": f"AnythingLLM API error: {response.status_code}",
-                        "items": []
-                    }
+        llm = outcomes.get("llm")
+        if not llm or not llm.succeeded:
+            if llm:
+                db_results["partial"] = True
+            return db_results
+
+        # The LLM only names GTINs; load those products now that the session is free
+        llm_results = await self._llm_result(query, llm.items[0] if llm.items else {}, session, limit)
+        if not (llm_results.get("success") and llm_results.get("items")):
+            return db_results
+
+        merged = merge_by_gtin(
+            [
+                ProviderOutcome("llm", llm_results["items"]),
+                ProviderOutcome("database", database.items),
+            ],
+            limit=len(llm_results["items"]) + len(database.items)
+        )
+        items = merged["llm"] + merged["database"]
+        return {
+            "success": True,
+            "source": "hybrid",
+            "query": query,
+            "total": len(items),
+            "items": items,
+            "sources_used": ["database", "llm"]
+        }
 
-                llm_response = response.json()
+    async def _search_database_items(self, query: str, session: AsyncSession, limit: int) -> List[Dict[str, Any]]:
+        result = await self.search_database(query, session, limit)
+        if not result["success"]:
+            raise RuntimeError(result.get("error", "Database search failed"))
+        return result["items"]
 
-                # Extract GTINs from LLM response
-                gtins = self._extract_gtins_from_response(llm_response.get("textResponse", ""))
+    async def _ask_llm_items(self, query: str) -> List[Dict[str, Any]]:
+        # Wrapped in a list so the answer can be cached as a provider result
+        return [await self._ask_llm(query)]
 
-                if not gtins:
-                    return {
-                        "success": True,
-                        "source": "llm",
-                        "query": query,
-                        "message": "No products found matching your query",
-                        "items": []
-                    }
+    async def _ask_llm(self, query: str) -> Dict[str, Any]:
+        """Ask AnythingLLM for products matching a query. Returns its JSON answer."""
+        import httpx
 
-                # Fetch products by GTINs
-                stmt = (
-                    select(ProductDetail)
-                    .where(ProductDetail.gtin.in_(gtins))
-                    .options(
-                        selectinload(ProductDetail.allergens),
-                        selectinload(ProductDetail.nutrients)
-                    )
-                    .limit(limit)
-                )
+        anythingllm_url = settings.ANYTHINGLLM_API_URL if hasattr(settings, 'ANYTHINGLLM_API_URL') else None
+        anythingllm_key = settings.ANYTHINGLLM_API_KEY if hasattr(settings, 'ANYTHINGLLM_API_KEY') else None
+        workspace_slug = settings.ANYTHINGLLM_WORKSPACE_SLUG if hasattr(settings, 'ANYTHINGLLM_WORKSPACE_SLUG') else None
 
-                result = await session.execute(stmt)
-                products = result.scalars().all()
+        if not anythingllm_key:
+            raise ValueError("AnythingLLM API key not configured")
+
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{anythingllm_url}/workspace/{workspace_slug}/chat",
+                headers={
+                    "Authorization": f"Bearer {anythingllm_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "message": f"Finn produkter som matcher: {query}. Returner GTIN-koder for relevante produkter.",
+                    "mode": "query"
+                },
+                timeout=30.0
+            )
 
-                items = []
-                for product in products:
-                    linked_product = None
-                    if product.gtin:
-                        normalized_gtin = normalize_gtin(product.gtin)
-                        linked_stmt = select(Produkter).where(
-                            func.lpad(func.regexp_replace(Produkter.ean_kode, r'[^0-9]', '', 'g'), 14, '0') == normalized_gtin
-                        )
-                        linked_result = await session.execute(linked_stmt)
-                        linked_product = linked_result.scalar_one_or_none()
+        if response.status_code != 200:
+            raise ValueError(f"AnythingLLM API error: {response.status_code}")
 
-                    items.append({
-                        "id": product.id,
-                        "gtin": product.gtin,
-                        "name": product.name,
-                        "producer": product.producername,
-                        "brand": product.brandname,
-                        "ingredients": product.ingredientstatement,
-                        "linked_product": {
-                            "produktid": linked_product.produktid,
-                            "produktnavn": linked_product.produktnavn,
-                            "pris": linked_product.pris,
-                            "lagermengde": linked_product.lagermengde
-                        } if linked_product else None,
-                        "relevance_reason": llm_response.get("sources", [])
-                    })
+        return response.json()
 
-                return {
-                    "success": True,
-                    "source": "llm",
-                    "query": query,
-                    "total": len(items),
-                    "items": items,
-                    "llm_response": llm_response.get("textResponse", "")
-                }
+    async def _llm_result(
+        self,
+        query: str,
+        llm_response: Dict[str, Any],
+        session: AsyncSession,
+        limit: int
+    ) -> Dict[str, Any]:
+        """Load the products an AnythingLLM answer refers to."""
+        # Extract GTINs from LLM response
+        gtins = self._extract_gtins_from_response(llm_response.get("textResponse", ""))
 
-        except Exception as e:
-            logger.error(f"LLM search error: {str(e)}")
+        if not gtins:
             return {
-                "success": False,
+                "success": True,
                 "source": "llm",
                 "query": query,
-                "error": str(e),
+                "message": "No products found matching your query",
                 "items": []
             }
 
+        # Fetch products by GTINs
+        stmt = (
+            select(ProductDetail)
+            .where(ProductDetail.gtin.in_(gtins))
+            .options(
+                selectinload(ProductDetail.allergens),
+                selectinload(ProductDetail.nutrients)
+            )
+            .limit(limit)
+        )
+
+        result = await session.execute(stmt)
+        products = result.scalars().all()
+
+        linked_products = await self._fetch_linked_products([p.gtin for p in products], session)
+
+        items = []
+        for product in products:
+            linked_product = linked_products.get(normalize_gtin(product.gtin)) if product.gtin else None
+
+            items.append({
+                "id": product.id,
+                "gtin": product.gtin,
+                "name": product.name,
+                "producer": product.producername,
+                "brand": product.brandname,
+                "ingredients": product.ingredientstatement,
+                "linked_product": {
+                    "produktid": linked_product.produktid,
+                    "produktnavn": linked_product.produktnavn,
+                    "pris": linked_product.pris,
+                    "lagermengde": linked_product.lagermengde
+                } if linked_product else None,
+                "relevance_reason": llm_response.get("sources", [])
+            })
+
+        return {
+            "success": True,
+            "source": "llm",
+            "query": query,
+            "total": len(items),
+            "items": items,
+            "llm_response": llm_response.get("textResponse", "")
+        }
+
     def _extract_gtins_from_response(self, text: str) -> List[str]:
         """Extract GTIN codes from LLM response text."""
         import re
@@ -0,0 +1,124 @@
+"""Concurrent product search across several sources.
+
+All providers start at once and share one deadline
+(``PRODUCT_SEARCH_DEADLINE_SECONDS``), so a search takes as long as its
+slowest provider up to that deadline, not the sum of all of them.
+Providers that are late or fail are reported and left out, and the rest
+is returned as a partial result. Results are merged in provider priority
+order and deduplicated by GTIN, so when several sources return the same
+product the higher priority source wins.
+
+Providers backed by external APIs can cache their results in Redis for a
+short TTL.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.core.cache import CACHE_TTL_SHORT, cache_get, cache_set
+from app.core.config import settings
+from app.core.gtin_utils import normalize_gtin
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchProvider:
+    """One source in a federated search, in priority order."""
+    name: str
+    search: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    cache_key: Optional[str] = None
+    cache_ttl: int = CACHE_TTL_SHORT
+
+
+@dataclass
+class ProviderOutcome:
+    """What a provider returned, or why it did not."""
+    name: str
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "ok"  # ok, cached, timeout or error
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status in ("ok", "cached")
+
+
+async def _run_provider(provider: SearchProvider) -> ProviderOutcome:
+    start = time.perf_counter()
+
+    if provider.cache_key:
+        cached = await cache_get(provider.cache_key)
+        if cached is not None:
+            return ProviderOutcome(
+                provider.name,
+                json.loads(cached),
+                "cached",
+                (time.perf_counter() - start) * 1000,
+            )
+
+    items = await provider.search()
+    if provider.cache_key:
+        await cache_set(provider.cache_key, json.dumps(items, default=str), provider.cache_ttl)
+    return ProviderOutcome(provider.name, items, "ok", (time.perf_counter() - start) * 1000)
+
+
+async def run_providers(
+    providers: Sequence[SearchProvider],
+    deadline: Optional[float] = None,
+) -> List[ProviderOutcome]:
+    """Run all providers concurrently. Returns one outcome per provider, in order."""
+    deadline = settings.PRODUCT_SEARCH_DEADLINE_SECONDS if deadline is None else deadline
+    tasks = [asyncio.create_task(_run_provider(provider)) for provider in providers]
+    if not tasks:
+        return []
+
+    _done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    outcomes = []
+    for provider, task in zip(providers, tasks):
+        if task in pending:
+            logger.warning(f"Search provider {provider.name} missed the {deadline}s deadline")
+            outcomes.append(ProviderOutcome(provider.name, status="timeout", elapsed_ms=deadline * 1000))
+        elif task.exception() is not None:
+            logger.warning(f"Search provider {provider.name} failed: {task.exception()}")
+            outcomes.append(ProviderOutcome(provider.name, status="error", error=str(task.exception())))
+        else:
+            outcomes.append(task.result())
+
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    return outcomes
+
+
+def merge_by_gtin(outcomes: Sequence[ProviderOutcome], limit: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Deduplicate items by GTIN in provider order and cap the total at limit.
+
+    Returns the kept items per provider name. Items without a GTIN are kept.
+    """
+    merged: Dict[str, List[Dict[str, Any]]] = {outcome.name: [] for outcome in outcomes}
+    seen = set()
+    total = 0
+
+    for outcome in outcomes:
+        for item in outcome.items:
+            if total >= limit:
+                return merged
+
+            gtin = normalize_gtin(item.get("gtin")) if item.get("gtin") else None
+            if gtin:
+                if gtin in seen:
+                    continue
+                seen.add(gtin)
+
+            merged[outcome.name].append(item)
+            total += 1
+
+    return merged
@@ -6,10 +6,15 @@ Priority:
 2. Ngdata (secondary) - Full nutrition data + price + stock (Meny/REITAN only)
 3. VetDuAt (fallback) - Basic product info and allergens only
 """
+import asyncio
 import logging
 from typing import Dict, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import make_cache_key
+from app.core.config import settings
+from app.services.federated_search import SearchProvider, merge_by_gtin, run_providers
+
 from app.services.matinfo_sync import MatinfoSyncService
 from app.services.ngdata_sync import NgdataSyncService
 from app.services.vetduat_sync import VetDuAtSyncService
@@ -179,67 +184,103 @@ class HybridProductSyncService:
 
     async def search_by_name(self, name: str, limit: int = 10) -> Dict:
         """
-        Search by name in Matinfo, Ngdata, and VetDuAt.
+        Search by name in Matinfo, Ngdata, and VetDuAt concurrently.
 
-        Returns combined results with Matinfo prioritized.
+        All sources start at once under PRODUCT_SEARCH_DEADLINE_SECONDS.
+        Results are combined with Matinfo prioritized, then Ngdata, then
+        VetDuAt, up to limit in total. A source that is late or fails is
+        left out and the result is marked partial. Ngdata and VetDuAt
+        results are cached briefly.
         """
-        results = {
+        # The AI name variations are shared by the Matinfo and VetDuAt searches
+        variations = asyncio.ensure_future(self.vetduat_service.name_cleaner.clean_product_name(name))
+        cache_name = name.strip().lower()
+
+        try:
+            outcomes = await run_providers([
+                SearchProvider("matinfo", lambda: self._search_matinfo(name, limit, variations)),
+                SearchProvider(
+                    "ngdata",
+                    lambda: self._search_ngdata(name, limit),
+                    cache_key=make_cache_key("product_search", "ngdata", cache_name, limit),
+                ),
+                SearchProvider(
+                    "vetduat",
+                    lambda: self._search_vetduat(limit, variations),
+                    cache_key=make_cache_key("product_search", "vetduat", cache_name, limit),
+                ),
+            ])
+        finally:
+            variations.cancel()
+
+        merged = merge_by_gtin(outcomes, limit)
+        return {
             "query": name,
-            "matinfo_results": [],
-            "ngdata_results": [],
-            "vetduat_results": [],
-            "total": 0
+            "matinfo_results": merged["matinfo"],
+            "ngdata_results": merged["ngdata"],
+            "vetduat_results": merged["vetduat"],
+            "total": sum(len(items) for items in merged.values()),
+            "partial": not all(outcome.succeeded for outcome in outcomes),
+            "sources": {outcome.name: outcome.status for outcome in outcomes},
         }
 
-        # Search Matinfo (priority 1)
-        matinfo_matches = await self.matinfo_service.search_by_name(name, limit=limit)
-        for match in matinfo_matches:
-            product = match["product"]
-            results["matinfo_results"].append({
-                "gtin": product.gtin,
-                "name": product.name,
-                "brand": product.brandname,
+    async def _search_matinfo(self, name: str, limit: int, variations: asyncio.Future) -> List[Dict]:
+        """Local Matinfo search (priority 1)."""
+        # Do not let a slow AI call cost the primary source: fall back to the plain name
+        try:
+            name_variations = await asyncio.wait_for(
+                asyncio.shield(variations),
+                timeout=settings.PRODUCT_SEARCH_DEADLINE_SECONDS / 2
+            )
+        except Exception:
+            name_variations = [name]
+
+        matches = await self.matinfo_service.search_by_name(name, limit=limit, name_variations=name_variations)
+        return [
+            {
+                "gtin": match["product"].gtin,
+                "name": match["product"].name,
+                "brand": match["product"].brandname,
                 "similarity": match["similarity"],
                 "source": "matinfo",
                 "has_nutrients": True,
                 "priority": 1
-            })
-
-        seen_gtins = {r["gtin"] for r in results["matinfo_results"]}
-
-        # Search Ngdata (priority 2) - only if Matinfo didn't return enough results
-        if len(results["matinfo_results"]) < limit:
-            ngdata_result = await self.ngdata_service.search_by_name_multi(name, limit=limit)
-
-            if ngdata_result:
-                for product in ngdata_result.get("products", []):
-                    gtin = product.get("ean")
-                    if gtin and gtin not in seen_gtins:
-                        seen_gtins.add(gtin)
-
-                        results["ngdata_results"].append({
-                            "gtin": gtin,
-                            "name": product.get("title"),
-                            "brand": product.get("brand"),
-                            "similarity": 0.9,  # Ngdata has good search
-                            "source": "ngdata",
-                            "has_nutrients": True,
-                            "priority": 2,
-                            "price": product.get("pricePerUnit"),
-                            "in_stock": not product.get("isOutOfStock", False)
-                        })
-
-        # Search VetDuAt (priority 3) - only if still not enough results
-        if len(results["matinfo_results"]) + len(results["ngdata_results"]) < limit:
-            # Use AI-powered name cleaning to generate variations
-            name_variations = await self.vetduat_service.name_cleaner.clean_product_name(name)
-
-            for variation in name_variations[:3]:  # Try top 3 variations
-                search_response = await self.vetduat_service.client.post(
+            }
+            for match in matches
+        ]
+
+    async def _search_ngdata(self, name: str, limit: int) -> List[Dict]:
+        """Ngdata search (priority 2)."""
+        ngdata_result = await self.ngdata_service.search_by_name_multi(name, limit=limit)
+        if not ngdata_result:
+            return []
+
+        return [
+            {
+                "gtin": product.get("ean"),
+                "name": product.get("title"),
+                "brand": product.get("brand"),
+                "similarity": 0.9,  # Ngdata has good search
+                "source": "ngdata",
+                "has_nutrients": True,
+                "priority": 2,
+                "price": product.get("pricePerUnit"),
+                "in_stock": not product.get("isOutOfStock", False)
+            }
+            for product in ngdata_result.get("products", [])
+            if product.get("ean")
+        ]
+
+    async def _search_vetduat(self, limit: int, variations: asyncio.Future) -> List[Dict]:
+        """VetDuAt search (priority 3), one request per name variation, all at once."""
+        name_variations = await variations
+        responses = await asyncio.gather(
+            *[
+                self.vetduat_service.client.post(
                     f"{self.vetduat_service.base_url}/search",
                     json={
                         "facets": ["Varemerke,count:10"],
-                        "top": limit - len(results["matinfo_results"]) - len(results["ngdata_results"]),
+                        "top": limit,
                         "skip": 0,
                         "count": True,
                         "search": variation
@@ -249,35 +290,43 @@ class HybridProductSyncService:
                         "Origin": "https://vetduat.no"
                     }
                 )
-
-                if search_response.status_code == 200:
-                    data = search_response.json()
-                    products = data.get("products", [])
-                    facets = data.get("facets", {})
-
-                    for product in products:
-                        gtin = product.get("gtin")
-                        if gtin and gtin not in seen_gtins:
-                            seen_gtins.add(gtin)
-
-                            # Extract brand from facets
-                            brand = ""
-                            if "Varemerke" in facets:
-                                brand_facets = facets["Varemerke"].get("facets", [])
-                                if brand_facets:
-                                    brand = brand_facets[0].get("value", "")
-
-                            results["vetduat_results"].append({
-                                "gtin": gtin,
-                                "name": product.get("fellesProduktnavn"),
-                                "brand": brand or product.get("firmaNavn"),
-                                "similarity": 0.8,  # Estimated
-                                "source": "vetduat",
-                                "has_nutrients": False,
-                                "priority": 3
-                            })
-
-        results["total"] = len(results["matinfo_results"]) + len(results["ngdata_results"]) + len(results["vetduat_results"])
+                for variation in name_variations[:3]  # Try top 3 variations
+            ],
+            return_exceptions=True
+        )
+
+        results = []
+        seen_gtins = set()
+        for search_response in responses:
+            if isinstance(search_response, Exception):
+                logger.warning(f"VetDuAt search failed: {search_response}")
+                continue
+            if search_response.status_code != 200:
+                continue
+
+            data = search_response.json()
+            facets = data.get("facets", {})
+
+            # Extract brand from facets
+            brand = ""
+            if "Varemerke" in facets:
+                brand_facets = facets["Varemerke"].get("facets", [])
+                if brand_facets:
+                    brand = brand_facets[0].get("value", "")
+
+            for product in data.get("products", []):
+                gtin = product.get("gtin")
+                if gtin and gtin not in seen_gtins:
+                    seen_gtins.add(gtin)
+                    results.append({
+                        "gtin": gtin,
+                        "name": product.get("fellesProduktnavn"),
+                        "brand": brand or product.get("firmaNavn"),
+                        "similarity": 0.8,  # Estimated
+                        "source": "vetduat",
+                        "has_nutrients": False,
+                        "priority": 3
+                    })
 
         return results
 
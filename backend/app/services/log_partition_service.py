@@ -0,0 +1,190 @@
+"""Monthly range partition management for log tables.
+
+`activity_logs` and `app_logs` are partitioned by month on `created_at`
+(see `PartitionLogTables` in app/core/migrations.py). This service keeps
+future partitions in place and implements retention by detaching and
+dropping whole partitions instead of running large DELETE statements.
+
+Each table also has a DEFAULT partition, so inserts keep working if no
+process has created the month's partition in time. Rows that land there
+are moved into their month's partition the next time partitions are
+ensured, and from then on retention drops them like any other month.
+"""
+import logging
+from datetime import date, datetime
+from typing import List, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_LOG_TABLES = ("activity_logs", "app_logs")
+
+# Number of months ahead that always have a partition ready
+DEFAULT_MONTHS_AHEAD = 3
+
+Executor = Union[AsyncSession, AsyncConnection]
+
+
+def month_start(value: Union[date, datetime]) -> date:
+    """Return the first day of the month containing ``value``."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Return the first day of the month ``months`` after ``value``."""
+    month_index = value.year * 12 + (value.month - 1) + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(table: str, start: date) -> str:
+    """Name of the partition holding the month starting at ``start``."""
+    return f"{table}_y{start.year:04d}m{start.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the partition catching rows outside every monthly partition."""
+    return f"{table}_default"
+
+
+def _check_table(table: str) -> None:
+    if table not in PARTITIONED_LOG_TABLES:
+        raise ValueError(f"{table} is not a partitioned log table")
+
+
+class LogPartitionService:
+    """Create and retire monthly partitions for log tables."""
+
+    def __init__(self, db: Executor):
+        self.db = db
+
+    async def is_partitioned(self, table: str) -> bool:
+        """Check whether ``table`` is a partitioned table."""
+        result = await self.db.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table},
+        )
+        return result.scalar() == "p"
+
+    async def list_partitions(self, table: str) -> List[Tuple[str, date, date]]:
+        """List (name, start, end) for each monthly partition of ``table``."""
+        _check_table(table)
+        result = await self.db.execute(
+            text("""
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = :table
+                ORDER BY child.relname
+            """),
+            {"table": table},
+        )
+        partitions = []
+        prefix = f"{table}_y"
+        for (name,) in result:
+            # Only our own yYYYYmMM partitions carry a parseable range
+            if not name.startswith(prefix):
+                continue
+            try:
+                start = date(int(name[len(prefix):len(prefix) + 4]), int(name[-2:]), 1)
+            except ValueError:
+                continue
+            partitions.append((name, start, add_months(start, 1)))
+        return partitions
+
+    async def _exists(self, name: str) -> bool:
+        result = await self.db.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+        return bool(result.scalar())
+
+    async def create_default_partition(self, table: str) -> str:
+        """Create the DEFAULT partition of ``table`` if missing."""
+        _check_table(table)
+        name = default_partition_name(table)
+        await self.db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} DEFAULT"))
+        return name
+
+    async def create_partition(self, table: str, start: date) -> str:
+        """Create the partition for the month starting at ``start`` if missing.
+
+        With a DEFAULT partition in place, rows of that month already caught
+        by it are moved into the new partition before it is attached.
+        """
+        _check_table(table)
+        start = month_start(start)
+        end = add_months(start, 1)
+        name = partition_name(table, start)
+        bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        default = default_partition_name(table)
+
+        # Serializes partition creation between processes until commit
+        await self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:table))"), {"table": table})
+        if await self._exists(name):
+            return name
+        if not await self._exists(default):
+            await self.db.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}"))
+            return name
+
+        in_month = f"created_at >= '{start.isoformat()}' AND created_at < '{end.isoformat()}'"
+        await self.db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+        await self.db.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_month}"))
+        await self.db.execute(text(f"DELETE FROM {default} WHERE {in_month}"))
+        await self.db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+        return name
+
+    async def default_partition_months(self, table: str) -> List[date]:
+        """Months that have rows in the DEFAULT partition (normally none)."""
+        _check_table(table)
+        default = default_partition_name(table)
+        if not await self._exists(default):
+            return []
+        result = await self.db.execute(text(
+            f"SELECT DISTINCT date_trunc('month', created_at)::date FROM {default}"
+        ))
+        return sorted(month for (month,) in result)
+
+    async def ensure_partitions(
+        self,
+        table: str,
+        months_ahead: int = DEFAULT_MONTHS_AHEAD,
+        from_date: Union[date, datetime, None] = None,
+    ) -> List[str]:
+        """Make sure partitions exist from ``from_date`` (default: this month) ahead.
+
+        Months with rows in the DEFAULT partition get their partition too.
+        """
+        start = month_start(from_date or datetime.utcnow())
+        months = {add_months(start, offset) for offset in range(months_ahead + 1)}
+        months.update(await self.default_partition_months(table))
+        return [await self.create_partition(table, month) for month in sorted(months)]
+
+    async def drop_partitions_before(self, table: str, cutoff: datetime) -> int:
+        """Detach and drop every partition that ends on or before ``cutoff``.
+
+        Partitions that still hold rows newer than the cutoff are kept whole,
+        so retention is rounded up to the month boundary. Returns the number
+        of rows removed, estimated from planner statistics instead of
+        counting every row of the dropped months.
+        """
+        deleted = 0
+        for name, _start, end in await self.list_partitions(table):
+            if datetime.combine(end, datetime.min.time()) > cutoff:
+                continue
+            estimate = await self.db.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+            )
+            deleted += max(0, int(estimate.scalar() or 0))
+            await self.db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            await self.db.execute(text(f"DROP TABLE {name}"))
+            logger.info(f"Dropped log partition {name}")
+        return deleted
+
+
+async def ensure_log_partitions(db: Executor, months_ahead: int = DEFAULT_MONTHS_AHEAD) -> None:
+    """Create the DEFAULT and upcoming partitions for every partitioned log table."""
+    service = LogPartitionService(db)
+    for table in PARTITIONED_LOG_TABLES:
+        if await service.is_partitioned(table):
+            await service.create_default_partition(table)
+            await service.ensure_partitions(table, months_ahead=months_ahead)
@@ -0,0 +1,191 @@
+"""Hourly rollups of activity and application logs.
+
+The admin dashboard statistics are read from `activity_log_hourly_stats` and
+`app_log_hourly_stats` instead of aggregating the raw log tables on every
+page load. A refresh recomputes every hour from the newest rolled-up hour
+onwards (the current, still open hour included), so it is idempotent and
+only ever reads a small, partition-pruned slice of the raw tables.
+
+Refreshing is a write and happens only from /cron/rollup-log-stats (and the
+initial backfill in the migration); the stats endpoints read the rollups as
+they stand, so they can run on the read replica.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import List, Sequence
+
+from sqlalchemy import and_, delete, func, insert, literal_column, select, text
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.activity_log import ActivityLog
+from app.models.app_log import AppLog
+from app.models.log_stats import ActivityLogHourlyStats, AppLogHourlyStats
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (exclusive) of the response time histogram buckets. The
+# histogram has one extra bucket for everything at or above the last bound.
+RESPONSE_TIME_BUCKETS_MS: List[int] = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# How far back the first refresh reaches when a rollup table is empty
+INITIAL_BACKFILL_DAYS = 90
+
+# pg_advisory_xact_lock keys, so concurrent refreshes do not double count
+ACTIVITY_ROLLUP_LOCK_KEY = 7_201_001
+APP_LOG_ROLLUP_LOCK_KEY = 7_201_002
+
+
+def histogram_percentile(histogram: Sequence[int], quantile: float) -> float:
+    """Estimate a percentile from bucket counts by interpolating within the bucket."""
+    total = sum(histogram)
+    if total == 0:
+        return 0.0
+
+    rank = quantile * total
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        if count and cumulative + count >= rank:
+            lower = RESPONSE_TIME_BUCKETS_MS[index - 1] if index > 0 else 0
+            # The open-ended last bucket is treated as ending at twice its lower bound
+            upper = (
+                RESPONSE_TIME_BUCKETS_MS[index]
+                if index < len(RESPONSE_TIME_BUCKETS_MS)
+                else lower * 2
+            )
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+    return float(RESPONSE_TIME_BUCKETS_MS[-1])
+
+
+def _histogram_expression(column):
+    """Build an ARRAY[count(*) FILTER (...), ...] expression over ``column``."""
+    buckets = []
+    lower = None
+    for upper in RESPONSE_TIME_BUCKETS_MS:
+        condition = column < upper if lower is None else and_(column >= lower, column < upper)
+        buckets.append(func.count().filter(condition))
+        lower = upper
+    buckets.append(func.count().filter(column >= lower))
+    return array(buckets)
+
+
+def _floor_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+class LogStatsRollupService:
+    """Maintain the hourly log statistics rollup tables."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _refresh_start(self, model) -> datetime:
+        """First hour to recompute: the newest rolled-up hour, or the backfill start."""
+        result = await self.db.execute(select(func.max(model.hour)))
+        newest = result.scalar()
+        if newest is None:
+            return _floor_hour(datetime.utcnow() - timedelta(days=INITIAL_BACKFILL_DAYS))
+        return newest
+
+    async def refresh_activity_stats(self) -> None:
+        """Recompute activity log rollups from the newest rolled-up hour onwards."""
+        await self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": ACTIVITY_ROLLUP_LOCK_KEY}
+        )
+        start = await self._refresh_start(ActivityLogHourlyStats)
+
+        await self.db.execute(
+            delete(ActivityLogHourlyStats).where(ActivityLogHourlyStats.hour >= start)
+        )
+
+        source = (
+            select(
+                func.date_trunc("hour", ActivityLog.created_at).label("hour"),
+                ActivityLog.action,
+                ActivityLog.resource_type,
+                func.coalesce(ActivityLog.response_status // 100, 0).label("status_class"),
+                ActivityLog.user_id,
+                ActivityLog.user_email,
+                ActivityLog.user_name,
+                func.count(),
+                func.count(ActivityLog.response_time_ms),
+                func.coalesce(func.sum(ActivityLog.response_time_ms), 0),
+                _histogram_expression(ActivityLog.response_time_ms),
+            )
+            .where(ActivityLog.created_at >= start)
+            .group_by(
+                "hour",
+                ActivityLog.action,
+                ActivityLog.resource_type,
+                "status_class",
+                ActivityLog.user_id,
+                ActivityLog.user_email,
+                ActivityLog.user_name,
+            )
+        )
+        await self.db.execute(
+            insert(ActivityLogHourlyStats).from_select(
+                [
+                    "hour", "action", "resource_type", "status_class",
+                    "user_id", "user_email", "user_name",
+                    "request_count", "response_time_count", "response_time_sum",
+                    "response_time_histogram",
+                ],
+                source,
+            )
+        )
+
+    async def refresh_app_log_stats(self) -> None:
+        """Recompute application log rollups from the newest rolled-up hour onwards."""
+        await self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": APP_LOG_ROLLUP_LOCK_KEY}
+        )
+        start = await self._refresh_start(AppLogHourlyStats)
+
+        await self.db.execute(
+            delete(AppLogHourlyStats).where(AppLogHourlyStats.hour >= start)
+        )
+
+        source = (
+            select(
+                func.date_trunc("hour", AppLog.created_at).label("hour"),
+                AppLog.level,
+                AppLog.logger_name,
+                AppLog.exception_type,
+                func.left(AppLog.exception_message, literal_column("200")).label("exception_message"),
+                func.count(),
+                func.max(AppLog.created_at),
+            )
+            .where(AppLog.created_at >= start)
+            .group_by(
+                "hour",
+                AppLog.level,
+                AppLog.logger_name,
+                AppLog.exception_type,
+                func.left(AppLog.exception_message, literal_column("200")),
+            )
+        )
+        await self.db.execute(
+            insert(AppLogHourlyStats).from_select(
+                [
+                    "hour", "level", "logger_name", "exception_type",
+                    "exception_message", "log_count", "last_occurrence",
+                ],
+                source,
+            )
+        )
+
+    async def refresh_all(self) -> None:
+        """Refresh both rollup tables and commit."""
+        await self.refresh_activity_stats()
+        await self.refresh_app_log_stats()
+        await self.db.commit()
+
+    @staticmethod
+    def histogram_sums(column) -> list:
+        """Element-wise SUM() expressions over a histogram array column."""
+        return [
+            func.coalesce(func.sum(column[index]), 0)
+            for index in range(1, len(RESPONSE_TIME_BUCKETS_MS) + 2)
+        ]
@@ -0,0 +1,98 @@
+"""Ranked search over Matinfo products.
+
+Each matinfo_products row carries two search columns:
+
+- ``search_document``: name, brand, producer and the start of the
+  ingredient statement, lowercased with punctuation collapsed to spaces.
+  The sync services set it through ``build_search_document`` whenever they
+  write a product, and the product API through ``refresh_search_document``. A GIN trigram index over it serves fuzzy matches.
+- ``search_vector``: a weighted Norwegian tsvector (name A, brand B,
+  producer C, ingredients D), generated by the database from the same
+  columns and indexed with GIN.
+
+``rank_matinfo_products`` runs one query that can use either index and
+ranks by trigram word similarity plus full-text rank, so every search entry
+point shares the same matching and ordering.
+"""
+import re
+from typing import Any, Dict, List, Mapping, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.matinfo_products import MatinfoProduct
+
+# Ingredient statements are long; only their start is worth matching on
+SEARCH_INGREDIENT_CHARS = 500
+
+SEARCH_DOCUMENT_FIELDS = ("name", "brandname", "producername")
+
+NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+ALLERGEN_LEVELS = {
+    0: "FREE_FROM",
+    1: "CROSS_CONTAMINATION",
+    2: "MAY_CONTAIN",
+    3: "CONTAINS",
+}
+
+RANKED_SEARCH_SQL = text("""
+    SELECT
+        p.id,
+        word_similarity(:search, p.search_document)
+            + ts_rank_cd(p.search_vector, q.query, 1) AS score
+    FROM matinfo_products p,
+         websearch_to_tsquery('norwegian', :search) AS q(query)
+    WHERE p.search_document %> :search
+       OR p.search_vector @@ q.query
+    ORDER BY score DESC, p.id
+    LIMIT :limit
+""")
+
+
+def normalize_search_text(value: str) -> str:
+    """Lowercase and collapse everything but letters and digits to single spaces."""
+    return " ".join(NON_WORD_PATTERN.split(value.lower())).strip()
+
+
+def build_search_document(product_data: Mapping[str, Any]) -> str:
+    """Build ``search_document`` from a product dict using model column names."""
+    parts = [product_data.get(field) or "" for field in SEARCH_DOCUMENT_FIELDS]
+    parts.append((product_data.get("ingredientstatement") or "")[:SEARCH_INGREDIENT_CHARS])
+    return normalize_search_text(" ".join(parts))
+
+
+def refresh_search_document(product: MatinfoProduct) -> None:
+    """Rebuild ``search_document`` from a product's current column values."""
+    fields = (*SEARCH_DOCUMENT_FIELDS, "ingredientstatement")
+    product.search_document = build_search_document({field: getattr(product, field) for field in fields})
+
+
+async def rank_matinfo_products(db: AsyncSession, query: str, limit: int) -> List[Tuple[str, float]]:
+    """Product ids and scores for a query, best match first."""
+    search = normalize_search_text(query)
+    if not search:
+        return []
+
+    result = await db.execute(RANKED_SEARCH_SQL, {"search": search, "limit": limit})
+    return [(row.id, float(row.score)) for row in result]
+
+
+async def search_matinfo_products(
+    db: AsyncSession,
+    query: str,
+    limit: int,
+) -> List[Tuple[MatinfoProduct, float]]:
+    """Ranked products with allergens and nutrients loaded."""
+    ranked = await rank_matinfo_products(db, query, limit)
+    if not ranked:
+        return []
+
+    result = await db.execute(
+        select(MatinfoProduct)
+        .options(selectinload(MatinfoProduct.allergens), selectinload(MatinfoProduct.nutrients))
+        .where(MatinfoProduct.id.in_([product_id for product_id, _ in ranked]))
+    )
+    products: Dict[str, MatinfoProduct] = {product.id: product for product in result.scalars()}
+    return [(products[product_id], score) for product_id, score in ranked if product_id in products]
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, or_
 
 from app.models.matinfo_products import MatinfoProduct, MatinfoAllergen, MatinfoNutrient
+from app.services.matinfo_search import build_search_document
 from app.services.product_name_cleaner import ProductNameCleaner
 from app.infrastructure.database.session import get_db
 from app.core.config import settings
@@ -146,7 +147,12 @@ class MatinfoSyncService:
         # Use sequence matcher for fuzzy matching
         return SequenceMatcher(None, search_lower, product_lower).ratio()
 
-    async def search_by_name(self, name: str, limit: int = 10) -> List[Dict]:
+    async def search_by_name(
+        self,
+        name: str,
+        limit: int = 10,
+        name_variations: Optional[List[str]] = None
+    ) -> List[Dict]:
         """
         Search for products by name in local matinfo_products table.
         Uses AI to generate name variations and similarity scoring to rank results.
@@ -154,12 +160,14 @@ class MatinfoSyncService:
         Args:
             name: Product name to search for.
             limit: Maximum number of results to return.
+            name_variations: Already generated variations, to skip the AI call.
 
         Returns:
             List of product dictionaries with similarity scores, ordered by relevance.
         """
         # Generate name variations using AI
-        name_variations = await self.name_cleaner.clean_product_name(name)
+        if not name_variations:
+            name_variations = await self.name_cleaner.clean_product_name(name)
         logger.info(f"Searching matinfo_products with {len(name_variations)} variations for '{name}'")
 
         all_matches = []
@@ -336,6 +344,7 @@ class MatinfoSyncService:
         try:
             # Transform data
             product_data = self._transform_product_data(matinfo_data)
+            product_data["search_document"] = build_search_document(product_data)
 
             # Check if product exists (using normalized GTIN)
             stmt = select(MatinfoProduct).where(MatinfoProduct.gtin == normalized_gtin)
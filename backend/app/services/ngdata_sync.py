@@ -5,6 +5,7 @@ import httpx
 from datetime import datetime
 
 from app.models.matinfo_products import MatinfoProduct, MatinfoAllergen, MatinfoNutrient
+from app.services.matinfo_search import build_search_document
 from app.services.product_name_cleaner import ProductNameCleaner
 from app.utils.gtin import normalize_gtin
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -391,6 +392,7 @@ class NgdataSyncService:
             # Transform to Matinfo format
             transformed_data = self._transform_to_matinfo_format(ngdata_product)
             product_data = transformed_data["product"]
+            product_data["search_document"] = build_search_document(product_data)
             allergen_data = transformed_data["allergens"]
             nutrient_data = transformed_data["nutrients"]
 
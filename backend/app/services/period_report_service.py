@@ -0,0 +1,167 @@
+"""Period menu report data shared by the PDF, Excel and JSON reports.
+
+A report lists every menu in a period with its products and the customers
+in the menu's menygruppe. The data is built with a fixed number of queries:
+the period, its menus (with products and group), and all customers for all
+involved menugrupper in one query, grouped in memory. Menus that share a
+menygruppe share the same customer list.
+"""
+import io
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from openpyxl import Workbook
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import Kunder, Meny, MenyProdukt, Periode, PeriodeMeny
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_COLUMNS = ("kundeid", "kundenavn", "adresse", "postnr", "sted", "telefonnummer", "e_post")
+
+
+@dataclass
+class PeriodMenuEntry:
+    """One menu in a period with its products and menygruppe customers."""
+    menu_group: Dict[str, Any]
+    menu: Dict[str, Any]
+    products: List[Dict[str, Any]]
+    customers: List[Dict[str, Any]]
+
+    def as_dict(self, float_prices: bool = False) -> Dict[str, Any]:
+        products = self.products
+        if float_prices:
+            products = [
+                {**product, "pris": float(product["pris"]) if product["pris"] else None}
+                for product in products
+            ]
+        return {
+            "menu_group": self.menu_group,
+            "customers": self.customers,
+            "menu": self.menu,
+            "products": products,
+        }
+
+
+@dataclass
+class PeriodReportData:
+    """Period × menygruppe × customers view for period menu reports."""
+    periode: Periode
+    entries: List[PeriodMenuEntry] = field(default_factory=list)
+    customers_by_group: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)
+
+    def period_header(self) -> Dict[str, Any]:
+        """Period information formatted for printed reports."""
+        return {
+            "ukenr": self.periode.ukenr,
+            "fradato": self.periode.fradato.strftime("%d.%m.%Y") if self.periode.fradato else "",
+            "tildato": self.periode.tildato.strftime("%d.%m.%Y") if self.periode.tildato else "",
+        }
+
+
+async def build_period_report(
+    db: AsyncSession,
+    periode_id: int,
+    menu_group_id: Optional[int] = None
+) -> Optional[PeriodReportData]:
+    """Load a period's menus, products and customers for reporting.
+
+    Args:
+        db: Database session
+        periode_id: Period to report on
+        menu_group_id: Only include menus in this menygruppe
+
+    Returns:
+        Report data, or None if the period does not exist
+    """
+    periode = await db.scalar(select(Periode).where(Periode.menyperiodeid == periode_id))
+    if not periode:
+        return None
+
+    # Get all menus for this period
+    periode_meny_query = select(PeriodeMeny).options(
+        selectinload(PeriodeMeny.meny).options(
+            selectinload(Meny.meny_produkter).selectinload(MenyProdukt.produkt),
+            selectinload(Meny.gruppe)
+        )
+    ).where(PeriodeMeny.periodeid == periode_id)
+
+    if menu_group_id:
+        periode_meny_query = periode_meny_query.join(Meny).where(Meny.menygruppe == menu_group_id)
+
+    result = await db.execute(periode_meny_query)
+    menus = [pm.meny for pm in result.scalars().all() if pm.meny]
+
+    # Batch query: all customers for all involved menu groups, grouped in memory
+    group_ids = {menu.menygruppe for menu in menus if menu.menygruppe}
+    customers_by_group: Dict[int, List[Dict[str, Any]]] = {group_id: [] for group_id in group_ids}
+    if group_ids:
+        customer_result = await db.execute(
+            select(*(getattr(Kunder, column) for column in CUSTOMER_COLUMNS), Kunder.menygruppeid)
+            .where(Kunder.menygruppeid.in_(group_ids))
+            .order_by(Kunder.kundenavn)
+        )
+        for row in customer_result:
+            customer = {column: getattr(row, column) for column in CUSTOMER_COLUMNS}
+            customers_by_group[int(row.menygruppeid)].append(customer)
+
+    entries = []
+    for menu in menus:
+        entries.append(PeriodMenuEntry(
+            menu_group={
+                "gruppeid": menu.gruppe.menygruppeid if menu.gruppe else None,
+                "gruppe": menu.gruppe.beskrivelse if menu.gruppe else None
+            },
+            menu={
+                "menyid": menu.menyid,
+                "beskrivelse": menu.beskrivelse
+            },
+            products=[
+                {
+                    "produktid": mp.produkt.produktid,
+                    "produktnavn": mp.produkt.produktnavn,
+                    "enhet": mp.produkt.pakningstype,
+                    "pris": mp.produkt.pris
+                }
+                for mp in menu.meny_produkter
+                if mp.produkt
+            ],
+            customers=customers_by_group.get(menu.menygruppe, []),
+        ))
+
+    return PeriodReportData(periode=periode, entries=entries, customers_by_group=customers_by_group)
+
+
+def create_period_menu_excel(data: PeriodReportData) -> bytes:
+    """Create an Excel workbook with one row per menu, product and customer sheet."""
+    workbook = Workbook(write_only=True)
+
+    menus_sheet = workbook.create_sheet("Menyer")
+    menus_sheet.append(["Menygruppe", "Meny", "Produkt-ID", "Produkt", "Enhet", "Pris"])
+    for entry in data.entries:
+        for product in entry.products:
+            menus_sheet.append([
+                entry.menu_group["gruppe"],
+                entry.menu["beskrivelse"],
+                product["produktid"],
+                product["produktnavn"],
+                product["enhet"],
+                float(product["pris"]) if product["pris"] is not None else None,
+            ])
+
+    customers_sheet = workbook.create_sheet("Kunder")
+    customers_sheet.append(["Menygruppe", "Kunde-ID", "Navn", "Adresse", "Postnr", "Sted", "Telefon", "E-post"])
+    group_names = {
+        entry.menu_group["gruppeid"]: entry.menu_group["gruppe"] for entry in data.entries
+    }
+    # Each menygruppe once, however many menus share it
+    for group_id, customers in data.customers_by_group.items():
+        for customer in customers:
+            customers_sheet.append([group_names.get(group_id)] + [customer[c] for c in CUSTOMER_COLUMNS])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -1,10 +1,11 @@
 """Service for periode view operations."""
 import logging
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, insert, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
 from app.models.periode import Periode
@@ -23,6 +24,9 @@ from app.schemas.periode_view import (
 
 logger = logging.getLogger(__name__)
 
+# Sequence behind tblmeny.menyid (see AddSequenceToTblmeny migration)
+MENY_ID_SEQUENCE = "tblmeny_menyid_seq"
+
 
 class PeriodeViewService:
     """Service for comprehensive period viewing and management."""
@@ -107,67 +111,143 @@ class PeriodeViewService:
 
         Hvis kopier_produkter=True: Oppretter nye menyer (kopier)
         Hvis kopier_produkter=False: Linker til eksisterende menyer
+
+        Kopieringen gjøres i databasen med INSERT ... SELECT, uten å laste
+        kildeperioden inn som ORM-objekter.
         """
-        kilde = await self.get_periode_med_komplett_meny(db, request.kilde_periode_id)
-        if not kilde:
+        kilde_finnes = await db.scalar(
+            select(Periode.menyperiodeid).where(Periode.menyperiodeid == request.kilde_periode_id)
+        )
+        if kilde_finnes is None:
             raise ValueError(f"Kilde-periode {request.kilde_periode_id} ikke funnet")
 
-        ny_periode = Periode(
-            ukenr=request.ukenr,
-            fradato=request.fradato,
-            tildato=request.tildato
+        ny_periode_id = await db.scalar(
+            insert(Periode)
+            .values(
+                ukenr=request.ukenr,
+                fradato=request.fradato,
+                tildato=request.tildato
+            )
+            .returning(Periode.menyperiodeid)
         )
-        db.add(ny_periode)
-        await db.flush()
-
-        kopierte_menyer = 0
-        kopierte_produkter = 0
 
         if request.kopier_produkter:
-            for gruppe in kilde.menygrupper:
-                for meny in gruppe.menyer:
-                    ny_meny = Meny(
-                        beskrivelse=meny.beskrivelse,
-                        menygruppe=meny.menygruppe
-                    )
-                    db.add(ny_meny)
-                    await db.flush()
-
-                    periode_meny = PeriodeMeny(
-                        periodeid=ny_periode.menyperiodeid,
-                        menyid=ny_meny.menyid
-                    )
-                    db.add(periode_meny)
-
-                    for produkt in meny.produkter:
-                        meny_produkt = MenyProdukt(
-                            menyid=ny_meny.menyid,
-                            produktid=produkt.produktid
-                        )
-                        db.add(meny_produkt)
-                        kopierte_produkter += 1
-
-                    kopierte_menyer += 1
+            kopierte_menyer, kopierte_produkter = await self._kopier_menyer(
+                db, request.kilde_periode_id, ny_periode_id
+            )
         else:
-            for gruppe in kilde.menygrupper:
-                for meny in gruppe.menyer:
-                    periode_meny = PeriodeMeny(
-                        periodeid=ny_periode.menyperiodeid,
-                        menyid=meny.menyid
-                    )
-                    db.add(periode_meny)
-                    kopierte_menyer += 1
-                    kopierte_produkter += len(meny.produkter)
+            kopierte_menyer = await self.link_periode_menyer(
+                db, request.kilde_periode_id, ny_periode_id
+            )
+            kopierte_produkter = await db.scalar(
+                select(func.count())
+                .select_from(MenyProdukt)
+                .join(PeriodeMeny, PeriodeMeny.menyid == MenyProdukt.menyid)
+                .where(PeriodeMeny.periodeid == request.kilde_periode_id)
+            ) or 0
 
         await db.commit()
 
         return KopierPeriodeResponse(
-            ny_periode_id=ny_periode.menyperiodeid,
+            ny_periode_id=ny_periode_id,
             kopierte_menyer=kopierte_menyer,
             kopierte_produkter=kopierte_produkter,
             message=f"Periode kopiert med {kopierte_menyer} menyer og {kopierte_produkter} produkter"
         )
 
+    async def _kopier_menyer(
+        self,
+        db: AsyncSession,
+        kilde_periode_id: int,
+        ny_periode_id: int
+    ) -> Tuple[int, int]:
+        """
+        Kopier alle menyer i en periode med produkter til en annen periode.
+
+        Nye menyid-er trekkes fra sekvensen i en CTE som gir en mapping fra
+        gammel til ny meny, slik at menyer, periodekoblinger og menyprodukter
+        settes inn i én og samme spørring.
+
+        Returns:
+            (antall kopierte menyer, antall kopierte produkter)
+        """
+        mapping = (
+            select(
+                Meny.menyid.label("gammel_menyid"),
+                func.nextval(MENY_ID_SEQUENCE).label("ny_menyid"),
+                Meny.beskrivelse,
+                Meny.menygruppe,
+            )
+            .join(PeriodeMeny, PeriodeMeny.menyid == Meny.menyid)
+            .where(PeriodeMeny.periodeid == kilde_periode_id)
+            .cte("meny_mapping")
+        )
+
+        nye_menyer = (
+            insert(Meny)
+            .from_select(
+                ["menyid", "beskrivelse", "menygruppe"],
+                select(mapping.c.ny_menyid, mapping.c.beskrivelse, mapping.c.menygruppe)
+            )
+            .returning(Meny.menyid)
+            .cte("nye_menyer")
+        )
+        nye_koblinger = (
+            insert(PeriodeMeny)
+            .from_select(
+                ["periodeid", "menyid"],
+                select(literal(ny_periode_id), mapping.c.ny_menyid)
+            )
+            .returning(PeriodeMeny.menyid)
+            .cte("nye_koblinger")
+        )
+        nye_produkter = (
+            insert(MenyProdukt)
+            .from_select(
+                ["menyid", "produktid"],
+                select(mapping.c.ny_menyid, MenyProdukt.produktid)
+                .join(MenyProdukt, MenyProdukt.menyid == mapping.c.gammel_menyid)
+            )
+            .returning(MenyProdukt.menyid)
+            .cte("nye_produkter")
+        )
+
+        query = select(
+            select(func.count()).select_from(nye_menyer).scalar_subquery(),
+            select(func.count()).select_from(nye_produkter).scalar_subquery(),
+        ).add_cte(nye_koblinger)
+
+        result = await db.execute(query)
+        kopierte_menyer, kopierte_produkter = result.one()
+        return kopierte_menyer, kopierte_produkter
+
+    async def link_periode_menyer(
+        self,
+        db: AsyncSession,
+        kilde_periode_id: int,
+        mal_periode_id: int
+    ) -> int:
+        """
+        Koble alle menyer i en periode til en annen periode (uten å kopiere dem).
+
+        Menyer som allerede er koblet til målperioden hoppes over.
+
+        Returns:
+            Antall nye koblinger
+        """
+        query = (
+            pg_insert(PeriodeMeny)
+            .from_select(
+                ["periodeid", "menyid"],
+                select(literal(mal_periode_id), PeriodeMeny.menyid)
+                .where(PeriodeMeny.periodeid == kilde_periode_id)
+            )
+            .on_conflict_do_nothing(index_elements=["periodeid", "menyid"])
+            .returning(PeriodeMeny.menyid)
+        )
+        result = await db.execute(query)
+        return len(result.all())
+
     async def get_tilgjengelige_menyer_for_periode(
         self,
         db: AsyncSession,
@@ -1,29 +1,120 @@
-"""Service for AI-powered pick list scanning using GPT-4o Vision.
+"""Service for AI-powered pick list scanning with vision models.
 
-Note: Vision capabilities require OpenAI GPT-4o or similar models with vision support.
-This service uses OpenAI directly as vision APIs vary significantly between providers.
+Photos are decoded, grayscaled, cropped to the sheet and downscaled in a
+worker thread before they are sent to the shared AI client. Parsed results
+are cached by image hash, so retrying the same photo does not call the
+model again.
+
+Note: Vision capabilities require a vision-capable model (e.g. gpt-4o).
 """
-import json
+import asyncio
 import base64
+import binascii
+import hashlib
+import io
+import json
 from typing import Optional, Dict, Any, List
 import logging
-import openai
+
+from PIL import Image, ImageOps
+
+from app.core.cache import CACHE_TTL_LONG, cache_get, cache_set, make_cache_key
 from app.core.config import settings
+from app.services.ai_client import AIClient, get_default_ai_client
 
 logger = logging.getLogger(__name__)
 
+# JPEG quality for images sent to the vision model
+SCAN_JPEG_QUALITY = 80
 
-class PickListScannerService:
-    """Service for analyzing scanned pick lists with AI Vision.
+# Side of the thumbnail used to find the sheet in a photo
+SHEET_DETECTION_SIZE = 256
+
+# Only crop when the detected sheet covers at least this share of the photo
+MIN_SHEET_AREA = 0.3
 
-    Note: Requires OpenAI API key and a vision-capable model (e.g., gpt-4o).
+
+def decode_image_base64(image_base64: str) -> bytes:
+    """Decode a base64 image, with or without a data: URL prefix."""
+    if image_base64.startswith("data:"):
+        image_base64 = image_base64.partition(",")[2]
+    try:
+        return base64.b64decode(image_base64, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("bildet er ikke gyldig base64") from e
+
+
+def find_sheet_bbox(image: Image.Image) -> Optional[tuple]:
     """
+    Find the bounding box of the bright sheet of paper in a grayscale photo.
+
+    Thresholds a small thumbnail halfway between its darkest and brightest
+    values and takes the box around the bright pixels. Returns None when no
+    plausible sheet is found.
+    """
+    thumbnail = image.copy()
+    thumbnail.thumbnail((SHEET_DETECTION_SIZE, SHEET_DETECTION_SIZE))
+    low, high = thumbnail.getextrema()
+    if high - low < 40:
+        return None
+
+    threshold = (low + high) // 2
+    bbox = thumbnail.point(lambda value: 255 if value > threshold else 0).getbbox()
+    if not bbox:
+        return None
+
+    left, top, right, bottom = bbox
+    area = (right - left) * (bottom - top)
+    if area < MIN_SHEET_AREA * thumbnail.width * thumbnail.height:
+        return None
+
+    scale_x = image.width / thumbnail.width
+    scale_y = image.height / thumbnail.height
+    return (
+        int(left * scale_x),
+        int(top * scale_y),
+        min(image.width, int(right * scale_x) + 1),
+        min(image.height, int(bottom * scale_y) + 1),
+    )
+
+
+def prepare_scan_image(image_bytes: bytes, max_side: int) -> str:
+    """
+    Grayscale, crop to the sheet and downscale a photo for the vision model.
+
+    Returns:
+        Base64 encoded JPEG
+    """
+    with Image.open(io.BytesIO(image_bytes)) as opened:
+        image = ImageOps.exif_transpose(opened).convert("L")
+
+    bbox = find_sheet_bbox(image)
+    if bbox:
+        image = image.crop(bbox)
+
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    image = ImageOps.autocontrast(image, cutoff=1)
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=SCAN_JPEG_QUALITY, optimize=True)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+class PickListScannerService:
+    """Service for analyzing scanned pick lists with AI Vision."""
+
+    def __init__(self, client: Optional[AIClient] = None):
+        self._client = client
+        # The configured chat model may not support vision
+        self.model = settings.AI_VISION_MODEL or (
+            "gpt-4o" if settings.AI_PROVIDER.lower() == "openai" else None
+        )
 
-    def __init__(self):
-        # Vision features require OpenAI directly
-        self.api_key = settings.OPENAI_API_KEY
-        # Use gpt-4o for vision capabilities (configured model may not support vision)
-        self.model = "gpt-4o"
+    @property
+    def client(self) -> AIClient:
+        if self._client is None:
+            self._client = get_default_ai_client()
+        return self._client
 
     async def analyze_pick_list_image(
         self,
@@ -34,7 +125,7 @@ class PickListScannerService:
         Analyze a scanned pick list image and extract picked quantities.
 
         Args:
-            image_base64: Base64 encoded image (without data:image prefix)
+            image_base64: Base64 encoded image, with or without data: URL prefix
             order_lines: List of order lines with {produktid, unik, produktnavn, antall}
 
         Returns:
@@ -46,14 +137,10 @@ class PickListScannerService:
                 "error": Optional[str]
             }
         """
-        if not self.api_key:
-            return {
-                "success": False,
-                "error": "AI ikke konfigurert. Sett OPENAI_API_KEY i miljøvariabler.",
-                "lines": [],
-                "confidence": 0.0,
-                "notes": ""
-            }
+        try:
+            client = self.client
+        except ValueError:
+            return self._error_result("AI ikke konfigurert. Sett API-nøkkel for AI_PROVIDER i miljøvariabler.")
 
         # Build product list for context
         products_context = "Produkter på ordren:\n"
@@ -91,98 +178,124 @@ Confidence-nivåer:
 Analyser bildet og finn plukket mengde for hvert produkt. Returner JSON med produktid, unik og plukket_antall for hver linje."""
 
         try:
-            client = openai.OpenAI(api_key=self.api_key)
-
-            # Ensure image has proper prefix for API
-            if not image_base64.startswith("data:"):
-                image_base64 = f"data:image/jpeg;base64,{image_base64}"
-
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": user_prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {"url": image_base64}
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=2000,
-                temperature=0.1,  # Low temperature for more consistent results
-            )
+            image_bytes = decode_image_base64(image_base64)
+        except ValueError as e:
+            return self._error_result(f"Ugyldig bilde: {e}")
 
-            response_text = response.choices[0].message.content.strip()
-
-            # Try to parse JSON from response
-            try:
-                # Handle markdown code blocks
-                if "```json" in response_text:
-                    response_text = response_text.split("```json")[1].split("```")[0]
-                elif "```" in response_text:
-                    response_text = response_text.split("```")[1].split("```")[0]
-
-                result = json.loads(response_text)
-
-                # Validate and fill in missing products with default values
-                scanned_lines = {(l["produktid"], l["unik"]): l["plukket_antall"] for l in result.get("lines", [])}
-
-                complete_lines = []
-                for line in order_lines:
-                    key = (line["produktid"], line["unik"])
-                    plukket = scanned_lines.get(key, line["antall"])
-                    complete_lines.append({
-                        "produktid": line["produktid"],
-                        "unik": line["unik"],
-                        "plukket_antall": float(plukket)
-                    })
-
-                return {
-                    "success": True,
-                    "lines": complete_lines,
-                    "confidence": float(result.get("confidence", 0.5)),
-                    "notes": result.get("notes", "")
-                }
+        cache_key = make_cache_key(
+            "picklist_scan",
+            hashlib.sha256(image_bytes + json.dumps(order_lines, sort_keys=True, default=str).encode()).hexdigest()
+        )
+        cached = await cache_get(cache_key)
+        if cached:
+            return json.loads(cached)
 
-            except json.JSONDecodeError:
-                # If JSON parsing fails, return defaults with low confidence
-                return {
-                    "success": True,
-                    "lines": [
+        try:
+            # Image work is CPU bound, keep it off the event loop
+            prepared_image = await asyncio.to_thread(
+                prepare_scan_image, image_bytes, settings.AI_VISION_MAX_IMAGE_SIDE
+            )
+        except OSError as e:
+            return self._error_result(f"Ugyldig bilde: {e}")
+
+        try:
+            response_text = await asyncio.wait_for(
+                client.chat_completion(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
                         {
-                            "produktid": line["produktid"],
-                            "unik": line["unik"],
-                            "plukket_antall": float(line["antall"])
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": user_prompt},
+                                {
+                                    "type": "image_url",
+                                    "image_url": {"url": f"data:image/jpeg;base64,{prepared_image}"}
+                                }
+                            ]
                         }
-                        for line in order_lines
                     ],
-                    "confidence": 0.3,
-                    "notes": "Kunne ikke tolke AI-respons. Bruker bestilte mengder som standard."
-                }
-
-        except openai.APIError as e:
-            logger.error(f"OpenAI API error in pick list scanner: {e}")
-            return {
-                "success": False,
-                "error": f"OpenAI API-feil: {str(e)}",
-                "lines": [],
-                "confidence": 0.0,
-                "notes": ""
-            }
+                    model=self.model,
+                    max_tokens=2000,
+                    temperature=0.1,  # Low temperature for more consistent results
+                ),
+                timeout=settings.AI_VISION_TIMEOUT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            logger.error("Pick list scan timed out")
+            return self._error_result("AI-tjenesten svarte ikke i tide. Prøv igjen.")
         except Exception as e:
-            logger.error(f"Unexpected error in pick list scanner: {e}")
+            logger.error(f"AI error in pick list scanner: {e}")
+            return self._error_result(f"AI-feil: {str(e)}")
+
+        result = self._parse_response(response_text.strip(), order_lines)
+        if result is None:
+            # Not cached, so scanning the same photo again asks the model again
+            return self._default_result(order_lines)
+
+        await cache_set(cache_key, json.dumps(result), ttl=CACHE_TTL_LONG)
+        return result
+
+    def _parse_response(self, response_text: str, order_lines: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Match the model's answer to the order lines, or None if it cannot be parsed."""
+        try:
+            # Handle markdown code blocks
+            if "```json" in response_text:
+                response_text = response_text.split("```json")[1].split("```")[0]
+            elif "```" in response_text:
+                response_text = response_text.split("```")[1].split("```")[0]
+
+            result = json.loads(response_text)
+
+            # Validate and fill in missing products with default values
+            scanned_lines = {(l["produktid"], l["unik"]): l["plukket_antall"] for l in result.get("lines", [])}
+
+            complete_lines = []
+            for line in order_lines:
+                key = (line["produktid"], line["unik"])
+                plukket = scanned_lines.get(key, line["antall"])
+                complete_lines.append({
+                    "produktid": line["produktid"],
+                    "unik": line["unik"],
+                    "plukket_antall": float(plukket)
+                })
+
             return {
-                "success": False,
-                "error": f"Uventet feil: {str(e)}",
-                "lines": [],
-                "confidence": 0.0,
-                "notes": ""
+                "success": True,
+                "lines": complete_lines,
+                "confidence": float(result.get("confidence", 0.5)),
+                "notes": result.get("notes", "")
             }
 
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _default_result(order_lines: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Ordered quantities with low confidence, for answers that could not be parsed."""
+        return {
+            "success": True,
+            "lines": [
+                {
+                    "produktid": line["produktid"],
+                    "unik": line["unik"],
+                    "plukket_antall": float(line["antall"])
+                }
+                for line in order_lines
+            ],
+            "confidence": 0.3,
+            "notes": "Kunne ikke tolke AI-respons. Bruker bestilte mengder som standard."
+        }
+
+    @staticmethod
+    def _error_result(error: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": error,
+            "lines": [],
+            "confidence": 0.0,
+            "notes": ""
+        }
+
 
 # Singleton instance
 _pick_list_scanner_service: Optional[PickListScannerService] = None
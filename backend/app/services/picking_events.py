@@ -0,0 +1,115 @@
+"""Live order status events for picking clients.
+
+Status changes are published to a Redis channel so every API process sees
+them. Each process keeps one Redis subscription and fans events out to its
+connected Server-Sent Events clients through bounded in-memory queues.
+Without Redis, events are delivered to clients of the current process only.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "plukking:events"
+
+# Events buffered per client before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Seconds between keep-alive comments on idle streams
+HEARTBEAT_SECONDS = 15
+
+
+class PickingEventBroker:
+    """Publishes status events and fans them out to local subscribers."""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(
+        self,
+        ordre_ids: List[int],
+        ordrestatusid: Optional[int],
+        event_type: str = "status_changed",
+        **fields: Any
+    ) -> None:
+        """Publish an event for one or more orders. Never raises."""
+        event = {
+            "type": event_type,
+            "ordre_ids": list(ordre_ids),
+            "ordrestatusid": ordrestatusid,
+            "timestamp": datetime.utcnow().isoformat(),
+            **fields,
+        }
+
+        try:
+            redis_client = await get_redis()
+            if redis_client:
+                await redis_client.publish(CHANNEL, json.dumps(event, default=str))
+                return
+        except Exception as e:
+            logger.warning(f"Could not publish picking event to Redis: {e}")
+
+        self._deliver(event)
+
+    async def subscribe(self) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield events as they arrive, and None after each idle heartbeat interval."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        await self._ensure_listener()
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._subscribers.discard(queue)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Slow client: drop its oldest event rather than block others
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _ensure_listener(self) -> None:
+        if self._listener is not None and not self._listener.done():
+            return
+
+        redis_client = await get_redis()
+        if redis_client:
+            self._listener = asyncio.create_task(self._listen(redis_client))
+
+    async def _listen(self, redis_client) -> None:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    self._deliver(json.loads(message["data"]))
+                except ValueError:
+                    logger.warning("Ignoring malformed picking event")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Picking event listener stopped: {e}")
+        finally:
+            await pubsub.close()
+
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Format an event, or a keep-alive comment for None, as an SSE frame."""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+picking_events = PickingEventBroker()
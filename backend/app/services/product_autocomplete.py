@@ -0,0 +1,186 @@
+"""In-memory prefix index for product name autocomplete.
+
+Product names from matinfo_products and tblprodukter are held per process
+in a sorted array. A prefix lookup is two bisects to find the matching
+range, then the most popular names in that range are picked. Suggestions
+therefore need no database round trip.
+
+Popularity is the decayed per-GTIN use count from
+``app.services.product_popularity``. Local uses are applied at once. Name
+changes and uses from other processes are picked up when the index is
+rebuilt, which happens in the background once the build is older than
+``PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS``. Lookups keep using the previous
+build meanwhile.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.gtin_utils import normalize_gtin
+from app.infrastructure.database.session import AsyncSessionLocal
+from app.models.matinfo_products import MatinfoProduct
+from app.models.produkter import Produkter
+from app.services.product_popularity import PRODUCTS, product_popularity
+
+logger = logging.getLogger(__name__)
+
+# Sorts after every character a prefix can be followed by
+PREFIX_END = "\U0010ffff"
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase and collapse whitespace."""
+    return " ".join(name.lower().split())
+
+
+@dataclass(frozen=True)
+class AutocompleteSnapshot:
+    """One build of the index: parallel arrays sorted by key."""
+    keys: List[str] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    gtins: List[Tuple[str, ...]] = field(default_factory=list)
+
+
+def build_snapshot(rows: Iterable[Tuple[Optional[str], Optional[str]]]) -> AutocompleteSnapshot:
+    """Build a snapshot from (name, gtin) rows.
+
+    Names that only differ in case or spacing share one entry, which keeps
+    the first display name seen and the GTINs of all of them.
+    """
+    entries: Dict[str, Tuple[str, set]] = {}
+    for name, gtin in rows:
+        if not name or not name.strip():
+            continue
+        key = normalize_name(name)
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = (name.strip(), set())
+        normalized_gtin = normalize_gtin(gtin) if gtin else None
+        if normalized_gtin:
+            entry[1].add(normalized_gtin)
+
+    keys = sorted(entries)
+    return AutocompleteSnapshot(
+        keys=keys,
+        names=[entries[key][0] for key in keys],
+        gtins=[tuple(entries[key][1]) for key in keys],
+    )
+
+
+class ProductAutocompleteIndex:
+    """Product names by prefix, most used first."""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self._refresh_seconds = (
+            settings.PRODUCT_AUTOCOMPLETE_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        )
+        self._snapshot = AutocompleteSnapshot()
+        self._popularity: Dict[str, float] = {}
+        self._built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._snapshot.keys)
+
+    async def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Suggestions for a prefix. Only the very first call waits for a build."""
+        if self._built_at is None:
+            await self.refresh(force=False)
+        elif time.monotonic() - self._built_at >= self._refresh_seconds:
+            self._schedule_refresh()
+        return self.lookup(prefix, limit)
+
+    def lookup(self, prefix: str, limit: int = 10) -> List[str]:
+        """Names starting with the prefix, by popularity, then shortest first."""
+        key = normalize_name(prefix)
+        if not key or limit <= 0:
+            return []
+
+        snapshot = self._snapshot
+        start = bisect.bisect_left(snapshot.keys, key)
+        end = bisect.bisect_left(snapshot.keys, key + PREFIX_END, start)
+
+        popularity = self._popularity
+        best = heapq.nsmallest(
+            limit,
+            range(start, end),
+            key=lambda i: (
+                -sum(popularity.get(gtin, 0) for gtin in snapshot.gtins[i]),
+                len(snapshot.keys[i]),
+                snapshot.keys[i],
+            ),
+        )
+        return [snapshot.names[i] for i in best]
+
+    def record_use(self, gtin: str) -> None:
+        """Count a use in this process without waiting for the next rebuild."""
+        normalized_gtin = normalize_gtin(gtin)
+        if normalized_gtin:
+            self._popularity[normalized_gtin] = self._popularity.get(normalized_gtin, 0.0) + 1.0
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh(force=False))
+
+    async def refresh(self, force: bool = True) -> None:
+        """Rebuild from the database and Redis. Keeps the old build on failure."""
+        async with self._lock:
+            if not force and self._built_at is not None and (
+                time.monotonic() - self._built_at < self._refresh_seconds
+            ):
+                return
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    matinfo = await db.execute(
+                        select(MatinfoProduct.name, MatinfoProduct.gtin).where(MatinfoProduct.name.isnot(None))
+                    )
+                    rows = matinfo.all()
+                    produkter = await db.execute(
+                        select(Produkter.produktnavn, Produkter.ean_kode).where(Produkter.produktnavn.isnot(None))
+                    )
+                    rows.extend(produkter.all())
+
+                snapshot = await asyncio.to_thread(build_snapshot, rows)
+                popularity = await self._load_popularity()
+            except Exception as e:
+                logger.warning(f"Could not rebuild product autocomplete index: {e}")
+            else:
+                self._snapshot = snapshot
+                self._popularity = popularity
+                logger.info(f"Built product autocomplete index with {len(snapshot.keys)} names")
+            finally:
+                # Also after a failure, so a broken database is retried once per interval
+                self._built_at = time.monotonic()
+
+    async def _load_popularity(self) -> Dict[str, float]:
+        top = await product_popularity.top_k(PRODUCTS, product_popularity.max_members)
+        if not top:
+            return dict(self._popularity)
+
+        popularity: Dict[str, float] = {}
+        for gtin, score in top:
+            normalized_gtin = normalize_gtin(gtin)
+            if normalized_gtin:
+                popularity[normalized_gtin] = popularity.get(normalized_gtin, 0.0) + score
+        return popularity
+
+
+_index: Optional[ProductAutocompleteIndex] = None
+
+
+def get_product_autocomplete_index() -> ProductAutocompleteIndex:
+    """Get the process-wide autocomplete index."""
+    global _index
+    if _index is None:
+        _index = ProductAutocompleteIndex()
+    return _index
@@ -1,237 +1,379 @@
-"""Service for exporting products for RAG system."""
+"""Service for exporting products for RAG system.
+
+Exports stream matinfo_products with keyset batching: each query reads up
+to ``shards_per_query`` shards after the last exported id, and its rows
+come in ``yield_per`` partitions of one shard each. The database is never
+asked to skip rows with OFFSET, and only a bounded number of shards is in
+memory at once.
+
+Shards are formatted and gzip-compressed in a process pool
+(``PRODUCT_EXPORT_WORKERS``) while the next rows are read, and each
+finished shard is written by its own task. The json format writes one
+file as a series of gzip members, which still decompresses as one
+document.
+
+Every export records a watermark, the highest ``updated`` value it
+covered. An incremental export only contains products updated after the
+watermark of the newest earlier export. Products with no ``updated``
+value are only included in full exports.
+
+Each export also saves the id and GTIN of every product that exists at
+that moment (``PRODUCT_IDS_FILE``). An incremental export lists products
+missing since the newest such list as deletions in its metadata.
+"""
+import asyncio
+import gzip
 import json
-import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
 from pathlib import Path
-import asyncio
 import aiofiles
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
+from app.core.config import settings
 from app.models.matinfo_products import MatinfoProduct
 import logging
 import zipfile
-import tempfile
 
 logger = logging.getLogger(__name__)
 
+BASE_URL = "http://localhost:3000"  # Frontend URL
+API_BASE_URL = "http://localhost:8000/api/v1"  # API URL
+
+EXPORT_COLUMNS = (
+    MatinfoProduct.id,
+    MatinfoProduct.gtin,
+    MatinfoProduct.name,
+    MatinfoProduct.producername,
+    MatinfoProduct.ingredientstatement,
+    MatinfoProduct.brandname,
+    MatinfoProduct.itemnumber,
+    MatinfoProduct.providername,
+    MatinfoProduct.updated,
+)
+
+SHARD_EXTENSIONS = {"jsonl": "jsonl", "markdown": "md"}
+
+# Ids and GTINs of all products at export time, for finding deletions
+PRODUCT_IDS_FILE = "product_ids.json.gz"
+
+
+def format_product(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a product row optimized for RAG search."""
+    # Create a search-optimized format with all key information
+    # Keep it concise but complete for better chunking
+    return {
+        "gtin": product["gtin"],
+        "name": product["name"],
+        "producer": product["producername"],
+        "ingredients": product["ingredientstatement"],
+        # Add searchable metadata
+        "search_text": create_search_text(product),
+        "metadata": {
+            "brand": product["brandname"],
+            "item_number": product["itemnumber"],
+            "provider": product["providername"]
+        },
+        # Add direct product links
+        "links": {
+            "view": f"{BASE_URL}/products/search?gtin={product['gtin']}",
+            "api": f"{API_BASE_URL}/products/{product['gtin']}"
+        }
+    }
+
+
+def create_search_text(product: Dict[str, Any]) -> str:
+    """Create optimized search text for RAG."""
+    # Combine key fields into a single searchable text
+    # This helps RAG systems find products more effectively
+    parts = []
+
+    if product["name"]:
+        parts.append(f"Produkt: {product['name']}")
+
+    if product["brandname"]:
+        parts.append(f"Merke: {product['brandname']}")
+
+    if product["producername"]:
+        parts.append(f"Produsent: {product['producername']}")
+
+    if product["ingredientstatement"]:
+        # Clean and format ingredients for better search
+        ingredients = product["ingredientstatement"].replace("<b>", "").replace("</b>", "")
+        parts.append(f"Ingredienser: {ingredients}")
+
+    # Join with delimiter that won't interfere with chunking
+    return " | ".join(parts)
+
+
+def create_markdown_format(products: List[Dict[str, Any]]) -> str:
+    """Create markdown format optimized for RAG chunking."""
+    # Use markdown format for better structure recognition
+    content = []
+
+    for product in products:
+        # Each product is a self-contained section
+        content.append(f"## {product['name']}")
+        content.append(f"**GTIN:** [{product['gtin']}]({product['links']['view']})")
+        content.append(f"**Produsent:** {product['producer'] or 'Ukjent'}")
+
+        if product['ingredients']:
+            # Clean HTML from ingredients
+            ingredients = product['ingredients'].replace("<b>", "**").replace("</b>", "**")
+            content.append(f"**Ingredienser:** {ingredients}")
+
+        if product['metadata']['brand']:
+            content.append(f"**Merke:** {product['metadata']['brand']}")
+
+        # Add product links
+        content.append(f"\n**Se produkt:** [Åpne i systemet]({product['links']['view']})")
+
+        # Add separator for clear boundaries
+        content.append("\n---\n")
+
+    return "\n".join(content)
+
+
+def create_jsonl_format(products: List[Dict[str, Any]]) -> str:
+    """Create JSONL format for structured processing."""
+    # JSONL allows each line to be processed independently
+    # Compact format for efficient storage
+    return "\n".join(json.dumps(product, ensure_ascii=False) for product in products)
+
+
+def render_shard(format: str, rows: List[Dict[str, Any]], first: bool, compress: bool) -> bytes:
+    """Format one shard of product rows. Runs in a worker process.
+
+    For the json format a shard is a piece of one array: the first shard
+    opens it and later shards continue it with a comma.
+    """
+    products = [format_product(row) for row in rows]
+    if format == "json":
+        body = ",\n".join(json.dumps(product, ensure_ascii=False) for product in products)
+        text = ("[\n" if first else ",\n") + body
+    elif format == "markdown":
+        text = create_markdown_format(products)
+    else:
+        text = create_jsonl_format(products) + "\n"
+
+    data = text.encode("utf-8")
+    return gzip.compress(data, compresslevel=6) if compress else data
+
+
 class ProductExporter:
     """Exports products in a format optimized for RAG systems."""
-    
-    def __init__(self, export_dir: str = "exportcatalog"):
+
+    def __init__(self, export_dir: str = "exportcatalog", workers: Optional[int] = None):
         self.export_dir = Path(export_dir)
         self.export_dir.mkdir(exist_ok=True)
-        
+
         # Optimize for chunk size 768 with overlap 20
         # Each product entry should be self-contained for better search
         # We'll batch products to create files around 50-100KB for efficient processing
         self.products_per_file = 100  # Adjust based on average product size
+        self.shards_per_query = 50
         self.chunk_size = 768
         self.overlap = 20
-    
+        self.workers = settings.PRODUCT_EXPORT_WORKERS if workers is None else workers
+        # Shards being formatted or written at once
+        self.max_in_flight = self.workers * 2
+
     def format_product_for_rag(self, product: MatinfoProduct) -> Dict[str, Any]:
         """Format a product optimized for RAG search."""
-        # Create a search-optimized format with all key information
-        # Keep it concise but complete for better chunking
-        base_url = "http://localhost:3000"  # Frontend URL
-        
-        return {
-            "gtin": product.gtin,
-            "name": product.name,
-            "producer": product.producername,
-            "ingredients": product.ingredientstatement,
-            # Add searchable metadata
-            "search_text": self._create_search_text(product),
-            "metadata": {
-                "brand": product.brandname,
-                "item_number": product.itemnumber,
-                "provider": product.providername
-            },
-            # Add direct product links
-            "links": {
-                "view": f"{base_url}/products/search?gtin={product.gtin}",
-                "api": f"http://localhost:8000/api/v1/products/{product.gtin}"
-            }
-        }
-    
-    def _create_search_text(self, product: MatinfoProduct) -> str:
-        """Create optimized search text for RAG."""
-        # Combine key fields into a single searchable text
-        # This helps RAG systems find products more effectively
-        parts = []
-        
-        if product.name:
-            parts.append(f"Produkt: {product.name}")
-        
-        if product.brandname:
-            parts.append(f"Merke: {product.brandname}")
-            
-        if product.producername:
-            parts.append(f"Produsent: {product.producername}")
-            
-        if product.ingredientstatement:
-            # Clean and format ingredients for better search
-            ingredients = product.ingredientstatement.replace("<b>", "").replace("</b>", "")
-            parts.append(f"Ingredienser: {ingredients}")
-        
-        # Join with delimiter that won't interfere with chunking
-        return " | ".join(parts)
-    
+        return format_product({column.key: getattr(product, column.key) for column in EXPORT_COLUMNS})
+
     def create_markdown_format(self, products: List[Dict[str, Any]]) -> str:
         """Create markdown format optimized for RAG chunking."""
-        # Use markdown format for better structure recognition
-        content = []
-        
-        for product in products:
-            # Each product is a self-contained section
-            content.append(f"## {product['name']}")
-            content.append(f"**GTIN:** [{product['gtin']}]({product['links']['view']})")
-            content.append(f"**Produsent:** {product['producer'] or 'Ukjent'}")
-            
-            if product['ingredients']:
-                # Clean HTML from ingredients
-                ingredients = product['ingredients'].replace("<b>", "**").replace("</b>", "**")
-                content.append(f"**Ingredienser:** {ingredients}")
-            
-            if product['metadata']['brand']:
-                content.append(f"**Merke:** {product['metadata']['brand']}")
-            
-            # Add product links
-            content.append(f"\n**Se produkt:** [Åpne i systemet]({product['links']['view']})")
-            
-            # Add separator for clear boundaries
-            content.append("\n---\n")
-        
-        return "\n".join(content)
-    
+        return create_markdown_format(products)
+
     def create_jsonl_format(self, products: List[Dict[str, Any]]) -> str:
         """Create JSONL format for structured processing."""
-        # JSONL allows each line to be processed independently
-        lines = []
-        for product in products:
-            # Compact format for efficient storage
-            lines.append(json.dumps(product, ensure_ascii=False))
-        return "\n".join(lines)
-    
-    async def export_products(self, session: AsyncSession, format: str = "jsonl") -> Dict[str, Any]:
-        """Export all products to files optimized for RAG.
-        
+        return create_jsonl_format(products)
+
+    def _create_executor(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def latest_watermark(self) -> Optional[str]:
+        """Watermark of the newest export that recorded one."""
+        for path in sorted(self.export_dir.iterdir(), reverse=True):
+            metadata_file = path / "export_metadata.json"
+            if path.is_dir() and metadata_file.exists():
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    watermark = json.load(f).get("watermark")
+                if watermark:
+                    return watermark
+        return None
+
+    def latest_product_ids(self) -> Dict[str, Optional[str]]:
+        """Product ids and GTINs saved by the newest export that has them."""
+        for path in sorted(self.export_dir.iterdir(), reverse=True):
+            ids_file = path / PRODUCT_IDS_FILE
+            if path.is_dir() and ids_file.exists():
+                with gzip.open(ids_file, 'rt', encoding='utf-8') as f:
+                    return json.load(f)
+        return {}
+
+    def _filters(self, since: Optional[str], until: Optional[str]) -> list:
+        # Full exports take every product, including those without an updated value
+        if since is None:
+            return []
+        filters = [MatinfoProduct.updated > since]
+        if until is not None:
+            filters.append(MatinfoProduct.updated <= until)
+        return filters
+
+    async def _stream_shards(
+        self,
+        session: AsyncSession,
+        since: Optional[str],
+        until: Optional[str],
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield product rows one shard at a time, ordered by id."""
+        query_size = self.products_per_file * self.shards_per_query
+        filters = self._filters(since, until)
+        last_id = None
+
+        while True:
+            stmt = select(*EXPORT_COLUMNS).where(*filters).order_by(MatinfoProduct.id).limit(query_size)
+            if last_id is not None:
+                stmt = stmt.where(MatinfoProduct.id > last_id)
+
+            result = await session.stream(stmt.execution_options(yield_per=self.products_per_file))
+            fetched = 0
+            async for partition in result.partitions():
+                rows = [dict(row._mapping) for row in partition]
+                fetched += len(rows)
+                last_id = rows[-1]["id"]
+                yield rows
+
+            if fetched < query_size:
+                return
+
+    async def _write_shard(self, rendered: asyncio.Future, path: Path, after: Optional[asyncio.Task]) -> None:
+        """Write a rendered shard. With after, append once that write is done."""
+        data = await rendered
+        if after is not None:
+            await after
+        async with aiofiles.open(path, 'ab' if after is not None else 'wb') as f:
+            await f.write(data)
+
+    async def export_products(
+        self,
+        session: AsyncSession,
+        format: str = "jsonl",
+        incremental: bool = False,
+        compress: bool = True,
+    ) -> Dict[str, Any]:
+        """Export products to files optimized for RAG.
+
         Args:
             session: Database session
             format: Export format - 'json', 'jsonl', or 'markdown'
+            incremental: Only export products updated since the newest export's watermark
+            compress: Gzip the exported files
         """
         try:
+            since = self.latest_watermark() if incremental else None
+            until = (await session.execute(select(func.max(MatinfoProduct.updated)))).scalar()
+            product_ids = dict((await session.execute(select(MatinfoProduct.id, MatinfoProduct.gtin))).all())
+
+            deleted: List[Dict[str, Optional[str]]] = []
+            if since is not None:
+                deleted = [
+                    {"id": product_id, "gtin": gtin}
+                    for product_id, gtin in sorted(self.latest_product_ids().items())
+                    if product_id not in product_ids
+                ]
+
             # Get total count
-            count_result = await session.execute(select(func.count()).select_from(MatinfoProduct))
+            count_result = await session.execute(
+                select(func.count()).select_from(MatinfoProduct).where(*self._filters(since, until))
+            )
             total_count = count_result.scalar()
-            
-            if total_count == 0:
+
+            if total_count == 0 and not deleted:
                 return {
                     "success": True,
-                    "message": "No products to export",
+                    "message": "No products changed since last export" if since else "No products to export",
                     "files_created": 0,
                     "total_products": 0
                 }
-            
+
             # Create timestamp for this export
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             export_subdir = self.export_dir / timestamp
             export_subdir.mkdir(exist_ok=True)
-            
-            # Export in batches
+            suffix = ".gz" if compress else ""
+
             files_created = 0
             products_exported = 0
-            offset = 0
-            
-            # For JSON format, collect all products first
+            shard_num = 0
+            loop = asyncio.get_running_loop()
+            in_flight: Deque[asyncio.Task] = deque()
+            previous_write: Optional[asyncio.Task] = None
+            json_path = export_subdir / f"products.json{suffix}"
+
+            with self._create_executor() as executor:
+                try:
+                    # Read, format and write overlap; at most max_in_flight shards are pending
+                    async for rows in self._stream_shards(session, since, until):
+                        shard_num += 1
+                        rendered = loop.run_in_executor(
+                            executor, render_shard, format, rows, shard_num == 1, compress
+                        )
+                        if format == "json":
+                            previous_write = asyncio.create_task(
+                                self._write_shard(rendered, json_path, previous_write)
+                            )
+                            task = previous_write
+                        else:
+                            path = export_subdir / f"products_{shard_num:04d}.{SHARD_EXTENSIONS[format]}{suffix}"
+                            task = asyncio.create_task(self._write_shard(rendered, path, None))
+                            files_created += 1
+                        in_flight.append(task)
+                        products_exported += len(rows)
+
+                        if len(in_flight) >= self.max_in_flight:
+                            await in_flight.popleft()
+
+                    while in_flight:
+                        await in_flight.popleft()
+                finally:
+                    for task in in_flight:
+                        task.cancel()
+
             if format == "json":
-                all_products = []
-                stmt = select(MatinfoProduct).order_by(MatinfoProduct.gtin)
-                result = await session.execute(stmt)
-                products = result.scalars().all()
-                
-                for product in products:
-                    all_products.append(self.format_product_for_rag(product))
-                
-                # Write single JSON file (async to not block event loop)
-                json_filename = export_subdir / "products.json"
-                async with aiofiles.open(json_filename, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(all_products, ensure_ascii=False, indent=2))
-                
+                closing = b"\n]\n" if shard_num else b"[]\n"
+                async with aiofiles.open(json_path, 'ab') as f:
+                    await f.write(gzip.compress(closing) if compress else closing)
                 files_created = 1
-                products_exported = len(products)
-                logger.info(f"Exported all {products_exported} products to JSON")
-            
-            # For Markdown format, one file per product
-            elif format == "markdown":
-                stmt = select(MatinfoProduct).order_by(MatinfoProduct.gtin)
-                result = await session.execute(stmt)
-                products = result.scalars().all()
-                
-                for idx, product in enumerate(products, 1):
-                    formatted_product = self.format_product_for_rag(product)
-                    
-                    # Create markdown content for single product
-                    md_content = self.create_markdown_format([formatted_product])
-                    
-                    # Use GTIN as filename, or index if GTIN not available
-                    filename = f"{product.gtin or f'product_{idx:06d}'}.md"
-                    md_filename = export_subdir / filename
 
-                    async with aiofiles.open(md_filename, 'w', encoding='utf-8') as f:
-                        await f.write(md_content)
-                    
-                    files_created += 1
-                    products_exported += 1
-                
-                logger.info(f"Exported {products_exported} products to Markdown files")
-            
-            # Default JSONL format (existing behavior)
-            else:
-                while offset < total_count:
-                    # Get batch of products
-                    stmt = (
-                        select(MatinfoProduct)
-                        .offset(offset)
-                        .limit(self.products_per_file)
-                        .order_by(MatinfoProduct.gtin)
-                    )
-                    result = await session.execute(stmt)
-                    products = result.scalars().all()
-                    
-                    if not products:
-                        break
-                    
-                    # Format products
-                    formatted_products = [
-                        self.format_product_for_rag(product) 
-                        for product in products
-                    ]
-                    
-                    # Create file number with padding for proper sorting
-                    file_num = (offset // self.products_per_file) + 1
-                    
-                    # Export JSONL format for RAG processing (async)
-                    jsonl_filename = export_subdir / f"products_{file_num:04d}.jsonl"
-                    async with aiofiles.open(jsonl_filename, 'w', encoding='utf-8') as f:
-                        await f.write(self.create_jsonl_format(formatted_products))
-                    
-                    files_created += 1
-                    products_exported += len(products)
-                    offset += self.products_per_file
-                    
-                    logger.info(f"Exported batch {file_num}: {len(products)} products")
-            
+            logger.info(f"Exported {products_exported} products in {shard_num} shards to {export_subdir}")
+
+            ids_data = await asyncio.to_thread(
+                lambda: gzip.compress(json.dumps(product_ids, ensure_ascii=False).encode("utf-8"))
+            )
+            async with aiofiles.open(export_subdir / PRODUCT_IDS_FILE, 'wb') as f:
+                await f.write(ids_data)
+
             # Create metadata file
             metadata = {
                 "export_timestamp": timestamp,
-                "total_products": total_count,
+                "total_products": products_exported,
                 "products_exported": products_exported,
                 "files_created": files_created,
-                "products_per_file": self.products_per_file if format == "jsonl" else 1,
+                "products_per_file": self.products_per_file,
                 "chunk_size": self.chunk_size,
                 "overlap": self.overlap,
                 "format": format,
+                "compressed": compress,
+                "incremental": since is not None,
+                "since": since,
+                "watermark": until,
+                "products_deleted": len(deleted),
+                "deleted": deleted,
                 "schema": {
                     "gtin": "Product GTIN/EAN code",
                     "name": "Product name",
@@ -242,34 +384,41 @@ class ProductExporter:
                     "links": "Direct links to view product in system"
                 }
             }
-            
+
             metadata_file = export_subdir / "export_metadata.json"
             async with aiofiles.open(metadata_file, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(metadata, ensure_ascii=False, indent=2))
-            
+
             # Create a README for the export
             format_description = {
-                "jsonl": "JSONL files (100 products per file)",
+                "jsonl": f"JSONL files ({self.products_per_file} products per file)",
                 "json": "Single JSON file containing all products",
-                "markdown": "Individual Markdown files (one per product)"
+                "markdown": f"Markdown files ({self.products_per_file} products per file)"
             }
-            
+
             readme_content = f"""# Product Export for RAG System
 
 Export Date: {timestamp}
-Total Products: {total_count}
-Files Created: {files_created} {format_description.get(format, format)} 
+Total Products: {products_exported}
+Files Created: {files_created} {format_description.get(format, format)}
 Export Format: {format.upper()}
+"""
+
+            if since is not None:
+                readme_content += f"""Incremental: products updated after {since}
+Deleted Products: {len(deleted)} (listed in export_metadata.json)
+"""
 
+            readme_content += """
 ## File Format
 
 """
-            
+
             if format == "jsonl":
-                readme_content += """### JSONL Files (.jsonl)
+                readme_content += f"""### JSONL Files (.jsonl)
 Machine-readable format where each line contains a complete product record.
 Optimized for RAG system processing with structured data for consistent embeddings.
-Each file contains up to 100 products for efficient batch processing.
+Each file contains up to {self.products_per_file} products for efficient batch processing.
 """
             elif format == "json":
                 readme_content += """### JSON File (products.json)
@@ -277,12 +426,17 @@ Single JSON file containing all products in an array format.
 Structured data with all product information in one convenient file.
 """
             elif format == "markdown":
-                readme_content += """### Markdown Files (.md)
-Individual markdown file for each product.
+                readme_content += f"""### Markdown Files (.md)
+Markdown files with one section per product.
 Human-readable format with structured sections.
-File names use product GTIN codes for easy identification.
+Each file contains up to {self.products_per_file} products, separated by horizontal rules.
 """
-            
+
+            if compress:
+                readme_content += """
+Files are gzip-compressed (.gz).
+"""
+
             readme_content += f"""
 ## Usage with RAG Systems
 
@@ -295,23 +449,24 @@ during chunking.
 The 'search_text' field combines key product information
 for improved search accuracy in Norwegian language.
 """
-            
+
             readme_file = export_subdir / "README.md"
             async with aiofiles.open(readme_file, 'w', encoding='utf-8') as f:
                 await f.write(readme_content)
-            
+
             # Create RAG context files (async)
-            await self._create_rag_context_files(export_subdir, format, total_count)
-            
+            await self._create_rag_context_files(export_subdir, format, products_exported)
+
             return {
                 "success": True,
                 "message": f"Export completed successfully",
                 "export_path": str(export_subdir),
                 "files_created": files_created,
                 "total_products": products_exported,
+                "products_deleted": len(deleted),
                 "timestamp": timestamp
             }
-            
+
         except Exception as e:
             logger.error(f"Export failed: {str(e)}")
             return {
@@ -320,7 +475,7 @@ for improved search accuracy in Norwegian language.
                 "files_created": 0,
                 "total_products": 0
             }
-    
+
     def create_zip_file(self, export_path: str) -> str:
         """Create a zip file from an export directory.
         
@@ -377,6 +532,9 @@ for improved search accuracy in Norwegian language.
                         "total_products": metadata.get("total_products", 0),
                         "files_created": metadata.get("files_created", 0),
                         "format": metadata.get("format", "unknown"),
+                        "incremental": metadata.get("incremental", False),
+                        "watermark": metadata.get("watermark"),
+                        "products_deleted": metadata.get("products_deleted", 0),
                         "size_bytes": total_size,
                         "size_mb": round(total_size / (1024 * 1024), 2)
                     })
@@ -0,0 +1,187 @@
+"""Time-decayed popularity of products and search queries in Redis.
+
+Uses and searches are counted in sorted sets with forward decay: an event
+at time t adds 2^((t - EPOCH) / half-life) to its member's score. Later
+events weigh more, so ranking by stored score is the same as ranking by
+decayed count. Dividing a score by the current weight gives the decayed
+count as of now.
+
+Left alone the weights would double every half-life and eventually
+overflow a double, so they are rebased every ``REBASE_HALF_LIVES``
+half-lives. Each such generation has its own sorted set. The first access
+in a new generation merges the previous set into it, scaled down by
+2^REBASE_HALF_LIVES, and deletes it in one transaction, so repeating the
+merge from another process changes nothing.
+
+Each sorted set is trimmed to ``POPULARITY_MAX_MEMBERS``, dropping the
+least popular members, so the long tail cannot grow without bound. All
+writes for an event go in one pipeline on the shared Redis client. Reads
+are batched with ZMSCORE and ZREVRANGE. Without Redis, writes are dropped
+and reads return nothing.
+"""
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS = "popularity:products"
+SEARCHES = "popularity:searches"
+PRODUCT_LAST_USED = "popularity:products:last_used"
+RECENT_SEARCHES = "popularity:searches:recent"
+
+# Recent searches kept, newest first
+RECENT_SEARCHES_SIZE = 100
+
+# Reference time for decay weights (2026-01-01 UTC)
+EPOCH = 1767225600.0
+
+# Half-lives per generation; event weights stay below 2^REBASE_HALF_LIVES
+REBASE_HALF_LIVES = 64
+
+
+class ProductPopularity:
+    """Decaying use counts for products (by GTIN) and search queries."""
+
+    def __init__(self, half_life_days: Optional[float] = None, max_members: Optional[int] = None):
+        half_life_days = settings.POPULARITY_HALF_LIFE_DAYS if half_life_days is None else half_life_days
+        self.half_life = half_life_days * 86400
+        self.max_members = settings.POPULARITY_MAX_MEMBERS if max_members is None else max_members
+        # Last generation each sorted set was rebased to by this process
+        self._rebased: Dict[str, int] = {}
+
+    def generation(self, now: Optional[float] = None) -> int:
+        """Weight generation at time now."""
+        now = time.time() if now is None else now
+        return math.floor((now - EPOCH) / self.half_life / REBASE_HALF_LIVES)
+
+    def weight(self, now: Optional[float] = None) -> float:
+        """Score an event adds at time now, relative to the start of its generation."""
+        now = time.time() if now is None else now
+        half_lives = (now - EPOCH) / self.half_life
+        return math.pow(2.0, half_lives - self.generation(now) * REBASE_HALF_LIVES)
+
+    def decayed(self, score: Optional[float], now: Optional[float] = None) -> float:
+        """Stored score as a decayed count as of now."""
+        return score / self.weight(now) if score else 0.0
+
+    async def record_product_use(self, gtin: str) -> None:
+        """Count a product use. Never raises."""
+        now = time.time()
+        await self._write(PRODUCTS, gtin, now, (PRODUCT_LAST_USED, self.max_members))
+
+    async def record_search(self, query: str) -> None:
+        """Count a search query. Never raises."""
+        now = time.time()
+        await self._write(SEARCHES, query, now, (RECENT_SEARCHES, RECENT_SEARCHES_SIZE))
+
+    async def _current_key(self, redis_client: Any, key: str, now: float) -> str:
+        """Sorted set of the current generation, merging the previous one into it first."""
+        generation = self.generation(now)
+        current = f"{key}:{generation}"
+        if self._rebased.get(key) != generation:
+            previous = f"{key}:{generation - 1}"
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.zunionstore(current, {current: 1.0, previous: math.pow(2.0, -REBASE_HALF_LIVES)})
+                pipe.delete(previous)
+                await pipe.execute()
+            self._rebased[key] = generation
+        return current
+
+    async def _write(self, key: str, member: str, now: float, recency: Tuple[str, int]) -> None:
+        redis_client = await get_redis()
+        if not redis_client or not member:
+            return
+
+        recency_key, recency_size = recency
+        try:
+            scores_key = await self._current_key(redis_client, key, now)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zincrby(scores_key, self.weight(now), member)
+                pipe.zremrangebyrank(scores_key, 0, -self.max_members - 1)
+                pipe.zadd(recency_key, {member: now})
+                pipe.zremrangebyrank(recency_key, 0, -recency_size - 1)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to record popularity for {key}: {e}")
+
+    async def top_k(self, key: str, k: int) -> List[Tuple[str, float]]:
+        """Most popular members with their decayed counts."""
+        redis_client = await get_redis()
+        if not redis_client or k <= 0:
+            return []
+
+        now = time.time()
+        try:
+            scores_key = await self._current_key(redis_client, key, now)
+            members = await redis_client.zrevrange(scores_key, 0, k - 1, withscores=True)
+        except Exception as e:
+            logger.warning(f"Failed to read popularity from {key}: {e}")
+            return []
+
+        weight = self.weight(now)
+        return [(member, score / weight) for member, score in members]
+
+    async def score_many(self, key: str, members: Sequence[str]) -> Dict[str, float]:
+        """Decayed counts for several members in one round trip. Unknown members count 0."""
+        redis_client = await get_redis()
+        if not redis_client or not members:
+            return {}
+
+        now = time.time()
+        try:
+            scores_key = await self._current_key(redis_client, key, now)
+            scores = await redis_client.zmscore(scores_key, list(members))
+        except Exception as e:
+            logger.warning(f"Failed to read popularity from {key}: {e}")
+            return {}
+
+        weight = self.weight(now)
+        return {member: (score or 0.0) / weight for member, score in zip(members, scores)}
+
+    async def product_usage(self, gtins: Sequence[str]) -> Dict[str, Tuple[float, Optional[str]]]:
+        """Decayed use count and last-used date (ISO) per GTIN, in one round trip."""
+        redis_client = await get_redis()
+        if not redis_client or not gtins:
+            return {}
+
+        gtins = list(gtins)
+        now = time.time()
+        try:
+            scores_key = await self._current_key(redis_client, PRODUCTS, now)
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zmscore(scores_key, gtins)
+                pipe.zmscore(PRODUCT_LAST_USED, gtins)
+                scores, last_used = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to read product usage: {e}")
+            return {}
+
+        weight = self.weight(now)
+        return {
+            gtin: (
+                (score or 0.0) / weight,
+                datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+            )
+            for gtin, score, timestamp in zip(gtins, scores, last_used)
+        }
+
+    async def recent_searches(self, limit: int) -> List[str]:
+        """Distinct recent search queries, newest first."""
+        redis_client = await get_redis()
+        if not redis_client or limit <= 0:
+            return []
+
+        try:
+            return await redis_client.zrevrange(RECENT_SEARCHES, 0, limit - 1)
+        except Exception as e:
+            logger.warning(f"Failed to read recent searches: {e}")
+            return []
+
+
+product_popularity = ProductPopularity()
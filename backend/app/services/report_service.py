@@ -1,6 +1,7 @@
 """Report generation service using ReportLab for PDF generation."""
+import asyncio
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence
 from io import BytesIO
 import openpyxl
 from docxtpl import DocxTemplate
@@ -10,6 +11,8 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 
+from app.utils.excel_export import build_xlsx, iter_xlsx
+
 
 class ReportService:
     """Service for generating reports from templates."""
@@ -719,6 +722,9 @@ class ReportService:
         """
         Generate Excel file from template.
 
+        Templates have to be loaded as full workbooks, so this runs in a
+        worker thread. Use stream_excel for large exports.
+
         Args:
             template_name: Name of .xlsx template file
             data: Dictionary with data to populate Excel
@@ -726,6 +732,9 @@ class ReportService:
         Returns:
             Excel file as bytes
         """
+        return await asyncio.to_thread(self._fill_excel_template, template_name, data)
+
+    def _fill_excel_template(self, template_name: str, data: Dict[str, Any]) -> bytes:
         template_path = self.template_dir / template_name
 
         # Load template
@@ -756,6 +765,8 @@ class ReportService:
         """
         Generate Excel file from scratch (no template).
 
+        Uses a write-only workbook in a worker thread.
+
         Args:
             headers: Column headers
             rows: Data rows
@@ -764,22 +775,25 @@ class ReportService:
         Returns:
             Excel file as bytes
         """
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = sheet_name
+        return await asyncio.to_thread(build_xlsx, headers, rows, sheet_name)
 
-        # Write headers
-        for col_idx, header in enumerate(headers, start=1):
-            ws.cell(row=1, column=col_idx, value=header)
-
-        # Write data rows
-        for row_idx, row in enumerate(rows, start=2):
-            for col_idx, value in enumerate(row, start=1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
+    def stream_excel(
+        self,
+        headers: list[str],
+        rows: AsyncIterator[Sequence[Any]],
+        sheet_name: str = "Sheet1",
+        format_row: Optional[Callable[[Sequence[Any]], Sequence[Any]]] = None
+    ) -> AsyncIterator[bytes]:
+        """
+        Generate Excel file from an async row source, such as a database cursor.
 
-        # Save to BytesIO
-        excel_bytes = BytesIO()
-        wb.save(excel_bytes)
-        excel_bytes.seek(0)
+        Args:
+            headers: Column headers
+            rows: Async iterator of data rows
+            sheet_name: Name of the Excel sheet
+            format_row: Optional conversion applied to each row
 
-        return excel_bytes.getvalue()
+        Returns:
+            Async iterator of .xlsx byte chunks for a StreamingResponse
+        """
+        return iter_xlsx(rows, headers, sheet_name=sheet_name, format_row=format_row)
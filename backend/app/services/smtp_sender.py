@@ -0,0 +1,250 @@
+"""Pooled, rate-limited SMTP delivery for bulk email.
+
+`EmailService.send_email` opens a new connection (and TLS handshake and
+login) per message. For bulk sends this module keeps a small pool of
+authenticated connections instead, sends messages over them in batches and
+applies a global rate limit. The blocking smtplib calls run in worker
+threads so the event loop stays responsive.
+"""
+import asyncio
+import logging
+import re
+import smtplib
+import time
+from dataclasses import dataclass
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+
+class CompiledTemplate:
+    """A ``{{variable}}`` template split into literal and placeholder parts once.
+
+    Rendering is then a single join per recipient instead of one
+    ``str.replace`` pass per variable. Unknown placeholders are left as-is,
+    matching ``EmailService._replace_variables``.
+    """
+
+    def __init__(self, source: Optional[str]):
+        self.source = source or ""
+        self._parts = _PLACEHOLDER.split(self.source)
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        rendered = []
+        for index, part in enumerate(self._parts):
+            if index % 2 == 0:
+                rendered.append(part)
+            elif part in variables:
+                rendered.append(str(variables[part]))
+            else:
+                rendered.append(f"{{{{{part}}}}}")
+        return "".join(rendered)
+
+
+@dataclass
+class OutgoingEmail:
+    """A fully rendered email ready for delivery."""
+    to_email: str
+    subject: str
+    html_content: str
+    text_content: Optional[str] = None
+    customer_id: Optional[int] = None
+
+
+@dataclass
+class DeliveryResult:
+    """Outcome of delivering one email."""
+    to_email: str
+    success: bool
+    customer_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+def build_mime_message(
+    from_email: str,
+    from_name: str,
+    to_email: str,
+    subject: str,
+    html_content: str,
+    text_content: Optional[str] = None,
+) -> MIMEMultipart:
+    """Build a multipart/alternative message with optional plain text part."""
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = f"{from_name} <{from_email}>"
+    msg["To"] = to_email
+
+    if text_content:
+        msg.attach(MIMEText(text_content, "plain", "utf-8"))
+    msg.attach(MIMEText(html_content, "html", "utf-8"))
+    return msg
+
+
+class RateLimiter:
+    """Spaces out acquisitions so at most ``rate`` happen per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class PooledSMTPSender:
+    """Deliver many emails over a bounded pool of reused SMTP connections."""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: Optional[bool] = None,
+        from_email: Optional[str] = None,
+        from_name: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        rate_limit_per_second: Optional[float] = None,
+        max_messages_per_connection: Optional[int] = None,
+        timeout: Optional[float] = None,
+        connection_factory: Optional[Callable[[], smtplib.SMTP]] = None,
+    ):
+        self.host = host if host is not None else settings.SMTP_HOST
+        self.port = port if port is not None else settings.SMTP_PORT
+        self.user = user if user is not None else settings.SMTP_USER
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+        self.use_tls = use_tls if use_tls is not None else settings.SMTP_USE_TLS
+        self.from_email = from_email or settings.SMTP_FROM_EMAIL
+        self.from_name = from_name or settings.SMTP_FROM_NAME
+        self.pool_size = max(1, pool_size or settings.SMTP_POOL_SIZE)
+        self.batch_size = max(1, batch_size or settings.SMTP_BATCH_SIZE)
+        self.rate_limiter = RateLimiter(
+            rate_limit_per_second
+            if rate_limit_per_second is not None
+            else settings.SMTP_RATE_LIMIT_PER_SECOND
+        )
+        self.max_messages_per_connection = (
+            max_messages_per_connection or settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        )
+        self.timeout = timeout or settings.SMTP_TIMEOUT
+        self._connection_factory = connection_factory or self._connect
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a new SMTP connection."""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        # Local sinks (MailHog, Mailpit) accept unauthenticated mail
+        if self.user:
+            server.login(self.user, self.password)
+        return server
+
+    @staticmethod
+    def _close(server: Optional[smtplib.SMTP]) -> None:
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _deliver(self, server: smtplib.SMTP, email: OutgoingEmail) -> None:
+        msg = build_mime_message(
+            self.from_email,
+            self.from_name,
+            email.to_email,
+            email.subject,
+            email.html_content,
+            email.text_content,
+        )
+        server.sendmail(self.from_email, email.to_email, msg.as_string())
+
+    async def _send_batch(self, batch: List[OutgoingEmail]) -> List[DeliveryResult]:
+        """Send one batch sequentially over a single connection."""
+        results: List[DeliveryResult] = []
+        server: Optional[smtplib.SMTP] = None
+        sent_on_connection = 0
+
+        try:
+            for email in batch:
+                await self.rate_limiter.acquire()
+                try:
+                    if server is None or sent_on_connection >= self.max_messages_per_connection:
+                        await asyncio.to_thread(self._close, server)
+                        server = await asyncio.to_thread(self._connection_factory)
+                        sent_on_connection = 0
+                    try:
+                        await asyncio.to_thread(self._deliver, server, email)
+                    except smtplib.SMTPServerDisconnected:
+                        # Server dropped an idle connection; reconnect once and retry
+                        server = await asyncio.to_thread(self._connection_factory)
+                        sent_on_connection = 0
+                        await asyncio.to_thread(self._deliver, server, email)
+                    sent_on_connection += 1
+                    results.append(DeliveryResult(email.to_email, True, email.customer_id))
+                except smtplib.SMTPAuthenticationError as e:
+                    logger.error(f"SMTP authentication failed: {e}")
+                    results.append(
+                        DeliveryResult(email.to_email, False, email.customer_id, str(e))
+                    )
+                    await asyncio.to_thread(self._close, server)
+                    server = None
+                except (smtplib.SMTPException, OSError) as e:
+                    logger.error(f"SMTP error sending email to {email.to_email}: {e}")
+                    results.append(
+                        DeliveryResult(email.to_email, False, email.customer_id, str(e))
+                    )
+                    # Recipient errors leave the connection usable; anything else does not
+                    if not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError)):
+                        await asyncio.to_thread(self._close, server)
+                        server = None
+        finally:
+            await asyncio.to_thread(self._close, server)
+
+        return results
+
+    async def send_all(self, emails: List[OutgoingEmail]) -> List[DeliveryResult]:
+        """Deliver all emails, at most ``pool_size`` connections at a time.
+
+        Returns one DeliveryResult per email, in input order.
+        """
+        if not emails:
+            return []
+
+        batches = [
+            emails[start:start + self.batch_size]
+            for start in range(0, len(emails), self.batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self.pool_size)
+
+        async def run(batch: List[OutgoingEmail]) -> List[DeliveryResult]:
+            async with semaphore:
+                return await self._send_batch(batch)
+
+        batch_results = await asyncio.gather(*(run(batch) for batch in batches))
+
+        results = [result for batch in batch_results for result in batch]
+        sent = sum(1 for result in results if result.success)
+        logger.info(
+            f"Pooled email delivery completed: {sent} sent, "
+            f"{len(results) - sent} failed out of {len(results)} total"
+        )
+        return results
@@ -5,6 +5,7 @@ import httpx
 from datetime import datetime
 
 from app.models.matinfo_products import MatinfoProduct, MatinfoAllergen, MatinfoNutrient
+from app.services.matinfo_search import build_search_document
 from app.services.product_name_cleaner import ProductNameCleaner
 from app.utils.gtin import normalize_gtin
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -473,6 +474,7 @@ class VetDuAtSyncService:
             # Transform to Matinfo format
             transformed_data = self._transform_to_matinfo_format(vetduat_product, facets)
             product_data = transformed_data["product"]
+            product_data["search_document"] = build_search_document(product_data)
             allergen_data = transformed_data["allergens"]
             nutrient_data = transformed_data["nutrients"]
 
@@ -1,6 +1,6 @@
 """Workflow Automation Service for managing workflows, execution, and scheduling."""
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
 
 from sqlalchemy import select, func, and_, desc, or_
@@ -12,6 +12,7 @@ from app.models.workflow_step import WorkflowStep
 from app.models.workflow_schedule import WorkflowSchedule
 from app.models.workflow_execution import WorkflowExecution
 from app.models.workflow_action_log import WorkflowActionLog
+from app.services.workflow_timing import calculate_next_run
 from app.schemas.workflow_automation import (
     WorkflowDefinitionCreate,
     WorkflowDefinitionUpdate,
@@ -83,6 +84,7 @@ class WorkflowAutomationService:
                 trigger_config=step_input.trigger_config,
                 action_config=step_input.action_config,
                 condition_config=step_input.condition_config,
+                parallel_group=step_input.parallel_group,
             )
             self.db.add(step)
 
@@ -219,6 +221,7 @@ class WorkflowAutomationService:
             trigger_config=data.trigger_config,
             action_config=data.action_config,
             condition_config=data.condition_config,
+            parallel_group=data.parallel_group,
             is_active=data.is_active,
         )
         self.db.add(step)
@@ -578,54 +581,65 @@ class WorkflowAutomationService:
     def _calculate_next_run(
         self,
         schedule_type: str,
-        schedule_config: Dict[str, Any]
+        schedule_config: Dict[str, Any],
+        now: Optional[datetime] = None,
     ) -> Optional[datetime]:
         """Calculate the next run time based on schedule configuration."""
-        now = datetime.utcnow()
-
-        if schedule_type == "daily":
-            # Daily at specific time
-            time_str = schedule_config.get("time", "09:00")
-            hour, minute = map(int, time_str.split(":"))
-            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            if next_run <= now:
-                next_run += timedelta(days=1)
-            return next_run
-
-        elif schedule_type == "weekly":
-            # Weekly on specific day
-            # TODO: Implement weekly scheduling logic
-            # For now, return next week same time
-            return now + timedelta(days=7)
-
-        elif schedule_type == "monthly":
-            # Monthly on specific day
-            # TODO: Implement monthly scheduling logic
-            return now + timedelta(days=30)
-
-        elif schedule_type == "cron":
-            # Cron expression
-            # TODO: Implement cron parsing (use croniter library)
-            logger.warning("Cron scheduling not yet implemented")
+        try:
+            return calculate_next_run(schedule_type, schedule_config, now)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Invalid {schedule_type} schedule config {schedule_config}: {e}")
             return None
 
-        return None
+    async def claim_due_workflows(self, limit: int = 100) -> List[int]:
+        """Claim workflows that are due to run and advance their next_run.
+
+        Due schedules are locked with FOR UPDATE SKIP LOCKED and moved to their
+        next run time in the same transaction, so concurrent schedulers (two
+        beat instances, or a beat tick racing a wake-up) never fire the same
+        run twice. Uses the partial index on next_run, so the cost depends on
+        the number of due workflows, not on how many are scheduled.
 
-    async def get_due_workflows(self) -> List[WorkflowDefinition]:
-        """Get all workflows that are due to run."""
+        Returns:
+            IDs of the claimed workflows
+        """
         now = datetime.utcnow()
         result = await self.db.execute(
-            select(WorkflowDefinition)
-            .join(WorkflowSchedule)
+            select(WorkflowSchedule)
+            .join(WorkflowDefinition)
             .where(
                 and_(
                     WorkflowDefinition.is_active == True,
                     WorkflowSchedule.next_run <= now
                 )
             )
-            .options(
-                selectinload(WorkflowDefinition.steps),
-                selectinload(WorkflowDefinition.schedule)
+            .order_by(WorkflowSchedule.next_run)
+            .limit(limit)
+            .with_for_update(of=WorkflowSchedule, skip_locked=True)
+        )
+        schedules = result.scalars().all()
+
+        for schedule in schedules:
+            schedule.last_run = now
+            schedule.next_run = self._calculate_next_run(
+                schedule.schedule_type,
+                schedule.schedule_config,
+                now
+            )
+        await self.db.commit()
+
+        return [schedule.workflow_id for schedule in schedules]
+
+    async def get_next_due_time(self) -> Optional[datetime]:
+        """Earliest next_run among active scheduled workflows."""
+        result = await self.db.execute(
+            select(func.min(WorkflowSchedule.next_run))
+            .join(WorkflowDefinition)
+            .where(
+                and_(
+                    WorkflowDefinition.is_active == True,
+                    WorkflowSchedule.next_run.is_not(None)
+                )
             )
         )
-        return result.scalars().all()
+        return result.scalar()
@@ -2,28 +2,42 @@
 
 This service handles the actual execution of workflows:
 1. Creating execution records
-2. Running steps in order
+2. Running steps in order (or concurrently within a parallel group)
 3. Handling different step types (email, conditions, etc.)
 4. Logging results
-5. Updating next run times for scheduled workflows
+5. Recording last run times for scheduled workflows
+6. Parking executions at wait_until steps and resuming them when due
 """
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import or_, select, update
 
 from app.models.workflow_definition import WorkflowDefinition
 from app.models.workflow_step import WorkflowStep
 from app.models.workflow_execution import WorkflowExecution
 from app.models.workflow_action_log import WorkflowActionLog
 from app.models.workflow_schedule import WorkflowSchedule
+from app.services.workflow_step_groups import group_steps, run_parallel_steps
 
 
 class WorkflowExecutionEngine:
     """Executes workflows and their steps."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+    ):
+        """Create an engine.
+
+        Args:
+            db: Session for the execution record and sequential steps
+            session_factory: Creates the extra sessions that parallel groups
+                need. Without it, parallel groups run sequentially.
+        """
         self.db = db
+        self.session_factory = session_factory
 
     async def execute_workflow(self, workflow_id: int) -> WorkflowExecution:
         """Execute all steps in a workflow.
@@ -58,36 +72,109 @@ class WorkflowExecutionEngine:
         await self.db.commit()
         await self.db.refresh(execution)
 
+        result = await self._run_steps(execution)
+
+        await self._record_last_run(workflow_id, execution.started_at)
+
+        return result
+
+    async def resume_execution(self, execution_id: int) -> Optional[WorkflowExecution]:
+        """Resume a waiting execution after the step it is parked on.
+
+        The execution is claimed with a conditional update, so duplicate
+        resume requests (a Celery ETA plus the due-time sweep, or redelivery)
+        run the remaining steps only once.
+
+        Args:
+            execution_id: ID of execution to resume
+
+        Returns:
+            WorkflowExecution record, or None if it was not waiting or not due
+        """
+        now = datetime.utcnow()
+        claimed = await self.db.execute(
+            update(WorkflowExecution)
+            .where(WorkflowExecution.id == execution_id)
+            .where(WorkflowExecution.status == "waiting")
+            .where(WorkflowExecution.resume_at <= now)
+            .values(status="running", resume_at=None)
+            .returning(WorkflowExecution.id)
+        )
+        if claimed.scalar_one_or_none() is None:
+            await self.db.rollback()
+            return None
+        await self.db.commit()
+
+        execution = await self.db.get(WorkflowExecution, execution_id, populate_existing=True)
+        return await self._run_steps(execution, after_step_order=execution.current_step)
+
+    async def get_due_execution_ids(self, limit: int = 500) -> List[int]:
+        """IDs of waiting executions whose resume time has passed."""
+        result = await self.db.execute(
+            select(WorkflowExecution.id)
+            .where(WorkflowExecution.status == "waiting")
+            .where(WorkflowExecution.resume_at <= datetime.utcnow())
+            .order_by(WorkflowExecution.resume_at)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def _run_steps(
+        self,
+        execution: WorkflowExecution,
+        after_step_order: Optional[int] = None,
+    ) -> WorkflowExecution:
+        """Run active steps in order, parking the execution at a pending wait.
+
+        Args:
+            execution: Execution to run steps for
+            after_step_order: Only run steps after this step_order (on resume)
+
+        Returns:
+            WorkflowExecution record with results
+        """
         try:
             # Get all active steps in order
             stmt = (
                 select(WorkflowStep)
-                .where(WorkflowStep.workflow_id == workflow_id)
+                .where(WorkflowStep.workflow_id == execution.workflow_id)
                 .where(WorkflowStep.is_active == True)
                 .order_by(WorkflowStep.step_order)
             )
+            if after_step_order is not None:
+                stmt = stmt.where(WorkflowStep.step_order > after_step_order)
             result = await self.db.execute(stmt)
             steps = list(result.scalars().all())
 
-            if not steps:
-                raise ValueError(f"No active steps found for workflow {workflow_id}")
+            if not steps and after_step_order is None:
+                raise ValueError(f"No active steps found for workflow {execution.workflow_id}")
 
-            # Execute each step
-            for step in steps:
-                execution.current_step = step.step_order
+            # Execute each stage: a single step or a parallel group
+            for stage in group_steps(steps):
+                execution.current_step = stage[-1].step_order
                 await self.db.commit()
 
+                if len(stage) > 1:
+                    await self._execute_parallel_group(execution.id, stage)
+                    continue
+
                 # Execute the step
-                await self.execute_step(execution.id, step.id)
+                step = stage[0]
+                log = await self.execute_step(execution.id, step.id)
+
+                # Park the execution until a wait step's resume time
+                resume_at = (log.result_data or {}).get("resume_at")
+                if step.step_type == "wait_until" and resume_at:
+                    resume_at = datetime.fromisoformat(resume_at)
+                    if resume_at > datetime.utcnow():
+                        await self._park_execution(execution, resume_at)
+                        return execution
 
             # Mark execution as completed
             execution.status = "completed"
             execution.completed_at = datetime.utcnow()
             await self.db.commit()
 
-            # Update next_run time for scheduled workflows
-            await self._update_next_run(workflow_id)
-
         except Exception as e:
             # Mark execution as failed
             execution.status = "failed"
@@ -99,6 +186,23 @@ class WorkflowExecutionEngine:
         await self.db.refresh(execution)
         return execution
 
+    async def _park_execution(self, execution: WorkflowExecution, resume_at: datetime) -> None:
+        """Persist a resume point and schedule the continuation.
+
+        The row (status "waiting" + resume_at) is the source of truth and is
+        picked up by the periodic due-time sweep; short waits additionally
+        get a Celery ETA so they resume on time.
+        """
+        from app.tasks.workflow_tasks import RESUME_ETA_MAX_SECONDS, resume_execution
+
+        execution.status = "waiting"
+        execution.resume_at = resume_at
+        await self.db.commit()
+
+        delay = (resume_at - datetime.utcnow()).total_seconds()
+        if delay <= RESUME_ETA_MAX_SECONDS:
+            resume_execution.apply_async(args=[execution.id], countdown=max(delay, 0))
+
     async def execute_step(self, execution_id: int, step_id: int) -> WorkflowActionLog:
         """Execute a single workflow step.
 
@@ -109,6 +213,55 @@ class WorkflowExecutionEngine:
         Returns:
             WorkflowActionLog with execution results
         """
+        log, error = await self._perform_step(execution_id, step_id)
+
+        self.db.add(log)
+        await self.db.commit()
+        if error is not None:
+            raise error
+
+        await self.db.refresh(log)
+        return log
+
+    async def _execute_parallel_group(
+        self,
+        execution_id: int,
+        steps: Sequence[WorkflowStep],
+    ) -> List[WorkflowActionLog]:
+        """Execute a parallel group and store its action logs in one batch.
+
+        Raises the first step error after all steps in the group finished.
+        """
+        step_ids = [step.id for step in steps]
+
+        if self.session_factory is None:
+            return [await self.execute_step(execution_id, step_id) for step_id in step_ids]
+
+        async def perform(db: AsyncSession, step_id: int):
+            engine = type(self)(db, self.session_factory)
+            return await engine._perform_step(execution_id, step_id)
+
+        outcomes = await run_parallel_steps(step_ids, perform, self.session_factory)
+
+        logs = [log for log, _ in outcomes]
+        self.db.add_all(logs)
+        await self.db.commit()
+
+        for _, error in outcomes:
+            if error is not None:
+                raise error
+        return logs
+
+    async def _perform_step(
+        self,
+        execution_id: int,
+        step_id: int,
+    ) -> Tuple[WorkflowActionLog, Optional[Exception]]:
+        """Run a step and build its action log without saving it.
+
+        Returns:
+            The action log and the step's error, if it failed
+        """
         # Get step
         stmt = select(WorkflowStep).where(WorkflowStep.id == step_id)
         result = await self.db.execute(stmt)
@@ -123,16 +276,12 @@ class WorkflowExecutionEngine:
             step_id=step_id,
             action_type=step.step_type,
             performed_at=datetime.utcnow(),
-            status="running",
         )
-        self.db.add(log)
-        await self.db.commit()
-        await self.db.refresh(log)
 
         try:
             # Execute based on step type
             if step.step_type == "send_email":
-                result = await self._execute_send_email(step)
+                result = await self._execute_send_email(execution_id, step)
             elif step.step_type == "check_condition":
                 result = await self._execute_check_condition(step)
             elif step.step_type == "wait_until":
@@ -142,31 +291,31 @@ class WorkflowExecutionEngine:
             else:
                 raise ValueError(f"Unknown step type: {step.step_type}")
 
-            # Update log with success
-            log.status = "success"
-            log.result_data = result
-            await self.db.commit()
-
         except Exception as e:
             # Update log with failure
             log.status = "failed"
             log.error_message = str(e)
-            await self.db.commit()
-            raise
+            return log, e
 
-        await self.db.refresh(log)
-        return log
+        # Update log with success
+        log.status = "success"
+        log.result_data = result
+        return log, None
 
-    async def _execute_send_email(self, step: WorkflowStep) -> Dict[str, Any]:
+    async def _execute_send_email(self, execution_id: int, step: WorkflowStep) -> Dict[str, Any]:
         """Execute send_email step.
 
+        Delivery is handed off to the ``emails`` Celery queue, which sends
+        over pooled SMTP connections and logs one action per recipient.
+
         Args:
+            execution_id: ID of current execution
             step: WorkflowStep with action_config containing email details
 
         Returns:
-            Dict with email send results
+            Dict with the queued email task details
         """
-        from app.services.email_service import EmailService
+        from app.tasks.email_tasks import send_workflow_emails
 
         config = step.action_config or {}
 
@@ -183,22 +332,21 @@ class WorkflowExecutionEngine:
 
         # Get email template or subject/body
         template_name = config.get("template")
-        subject = config.get("subject")
-        body_html = config.get("body_html")
-        body_text = config.get("body_text")
-
-        # Send emails
-        email_service = EmailService(self.db)
-        sent_count = await email_service.send_bulk_emails(
-            recipients=recipients,
+
+        # Queue emails
+        task = send_workflow_emails.delay(
+            execution_id,
+            step.id,
+            recipients,
             template_name=template_name,
-            subject=subject,
-            body_html=body_html,
-            body_text=body_text,
+            subject=config.get("subject"),
+            body_html=config.get("body_html"),
+            body_text=config.get("body_text"),
         )
 
         return {
-            "sent_count": sent_count,
+            "queued": True,
+            "task_id": task.id,
             "recipients_count": len(recipients),
             "template": template_name,
         }
@@ -242,20 +390,24 @@ class WorkflowExecutionEngine:
     async def _execute_wait_until(self, step: WorkflowStep) -> Dict[str, Any]:
         """Execute wait_until step.
 
+        Resolves the wait to an absolute resume time; the caller parks the
+        execution until then instead of blocking a worker.
+
         Args:
             step: WorkflowStep with trigger_config containing wait condition
 
         Returns:
-            Dict with wait results
+            Dict with the resume time
         """
+        from app.services.workflow_timing import resolve_wait_until
+
         config = step.trigger_config or {}
+        resume_at = resolve_wait_until(config, datetime.utcnow())
 
-        # For now, just log that we would wait
-        # In a real implementation, this might schedule the next step for later
         return {
             "wait_type": config.get("wait_type", "time"),
             "wait_config": config,
-            "message": "Wait step completed (not blocking)",
+            "resume_at": resume_at.isoformat(),
         }
 
     async def _execute_create_order(self, step: WorkflowStep) -> Dict[str, Any]:
@@ -286,7 +438,7 @@ class WorkflowExecutionEngine:
         Returns:
             List of dicts with email and name
         """
-        from app.models.kunde import Kunder
+        from app.models.kunder import Kunder
 
         recipients = []
 
@@ -320,30 +472,20 @@ class WorkflowExecutionEngine:
 
         return recipients
 
-    async def _update_next_run(self, workflow_id: int) -> None:
-        """Update next_run time for workflow's schedule.
+    async def _record_last_run(self, workflow_id: int, started_at: datetime) -> None:
+        """Record when a workflow last ran.
+
+        next_run is left alone: claim_due_workflows advances it while the
+        schedule row is locked, and manual runs do not move the schedule.
 
         Args:
-            workflow_id: ID of workflow to update
+            workflow_id: ID of workflow that ran
+            started_at: Start time of the execution
         """
-        from app.services.workflow_automation_service import WorkflowAutomationService
-
-        # Get workflow schedule
-        stmt = select(WorkflowSchedule).where(WorkflowSchedule.workflow_id == workflow_id)
-        result = await self.db.execute(stmt)
-        schedule = result.scalar_one_or_none()
-
-        if not schedule:
-            return  # No schedule, nothing to update
-
-        # Calculate next run time
-        service = WorkflowAutomationService(self.db)
-        next_run = service._calculate_next_run(
-            schedule.schedule_type,
-            schedule.schedule_config
+        await self.db.execute(
+            update(WorkflowSchedule)
+            .where(WorkflowSchedule.workflow_id == workflow_id)
+            .where(or_(WorkflowSchedule.last_run.is_(None), WorkflowSchedule.last_run < started_at))
+            .values(last_run=started_at)
         )
-
-        # Update schedule
-        schedule.last_run = datetime.utcnow()
-        schedule.next_run = next_run
         await self.db.commit()
@@ -0,0 +1,72 @@
+"""Parallel step groups for workflow executions.
+
+Steps run in step_order by default. Consecutive steps that share a
+``parallel_group`` form one stage and run concurrently, each on its own
+database session, with at most ``WORKFLOW_MAX_PARALLEL_STEPS`` at a time.
+Their action logs are written together once the whole group has finished.
+
+Used by both execution engines (backend and workflow service).
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.workflow_action_log import WorkflowActionLog
+from app.models.workflow_step import WorkflowStep
+
+# Steps that change the execution's flow always run on their own
+SEQUENTIAL_STEP_TYPES = {"wait_until"}
+
+StepOutcome = Tuple[WorkflowActionLog, Optional[Exception]]
+
+
+def group_steps(steps: Sequence[WorkflowStep]) -> List[List[WorkflowStep]]:
+    """Split ordered steps into stages that run one after another.
+
+    A stage is either a single step or a run of consecutive steps with the
+    same non-empty parallel_group.
+    """
+    stages: List[List[WorkflowStep]] = []
+    for step in steps:
+        previous = stages[-1][-1] if stages else None
+        if (
+            previous is not None
+            and step.parallel_group
+            and step.parallel_group == previous.parallel_group
+            and step.step_type not in SEQUENTIAL_STEP_TYPES
+            and previous.step_type not in SEQUENTIAL_STEP_TYPES
+        ):
+            stages[-1].append(step)
+        else:
+            stages.append([step])
+    return stages
+
+
+async def run_parallel_steps(
+    step_ids: Sequence[int],
+    perform_step: Callable[[AsyncSession, int], Awaitable[StepOutcome]],
+    session_factory: Callable[[], AsyncSession],
+    max_concurrency: Optional[int] = None,
+) -> List[StepOutcome]:
+    """Run steps concurrently, each with its own session.
+
+    Args:
+        step_ids: IDs of the steps in the group
+        perform_step: Runs one step on the given session and returns its
+            (unsaved) action log and error, if any
+        session_factory: Creates a new session per step
+        max_concurrency: Maximum steps running at once
+
+    Returns:
+        One (log, error) pair per step, in the order of ``step_ids``
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.WORKFLOW_MAX_PARALLEL_STEPS))
+
+    async def run(step_id: int) -> StepOutcome:
+        async with semaphore:
+            async with session_factory() as db:
+                return await perform_step(db, step_id)
+
+    return list(await asyncio.gather(*(run(step_id) for step_id in step_ids)))
@@ -0,0 +1,241 @@
+"""Time calculations for workflow schedules and waits.
+
+Wall-clock times in workflow configuration ("09:00", "thursday", cron
+expressions) are interpreted as naive UTC datetimes, compared against
+``datetime.utcnow()``, like the rest of the workflow tables.
+"""
+import calendar
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+WEEKDAYS = {
+    "monday": 0, "mandag": 0,
+    "tuesday": 1, "tirsdag": 1,
+    "wednesday": 2, "onsdag": 2,
+    "thursday": 3, "torsdag": 3,
+    "friday": 4, "fredag": 4,
+    "saturday": 5, "lordag": 5, "lørdag": 5,
+    "sunday": 6, "sondag": 6, "søndag": 6,
+}
+
+
+def parse_time(value: Optional[str], default: str = "09:00") -> tuple:
+    """Parse "HH:MM" into (hour, minute)."""
+    hour, minute = map(int, (value or default).split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time: {value}")
+    return hour, minute
+
+
+def parse_weekday(value: Any) -> int:
+    """Parse a weekday name (English or Norwegian) or number (0 = Monday)."""
+    if isinstance(value, int):
+        if not 0 <= value <= 6:
+            raise ValueError(f"Invalid weekday: {value}")
+        return value
+    try:
+        return WEEKDAYS[str(value).strip().lower()]
+    except KeyError:
+        raise ValueError(f"Invalid weekday: {value}")
+
+
+def next_weekday_at(now: datetime, weekday: int, hour: int, minute: int) -> datetime:
+    """First ``weekday`` at ``hour:minute`` strictly after ``now``."""
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    candidate += timedelta(days=(weekday - now.weekday()) % 7)
+    if candidate <= now:
+        candidate += timedelta(days=7)
+    return candidate
+
+
+def resolve_wait_until(config: Dict[str, Any], now: datetime) -> datetime:
+    """Resolve a wait_until step's trigger_config to an absolute resume time.
+
+    Supported configurations:
+    - {"until": "2026-10-22T10:00:00"}: absolute time, UTC unless it has an offset
+    - {"minutes": 30}, {"hours": 4}, {"days": 2}: delay from ``now``
+    - {"day": "thursday", "time": "10:00"}: next occurrence of a weekday
+    - {"time": "10:00"}: next occurrence of a time of day
+    """
+    if config.get("until"):
+        until = datetime.fromisoformat(str(config["until"]))
+        if until.tzinfo is not None:
+            until = until.astimezone(timezone.utc).replace(tzinfo=None)
+        return until
+
+    delay = timedelta(
+        days=float(config.get("days", 0)),
+        hours=float(config.get("hours", 0)),
+        minutes=float(config.get("minutes", 0)),
+    )
+    if delay:
+        return now + delay
+
+    if config.get("day") is not None:
+        hour, minute = parse_time(config.get("time"))
+        return next_weekday_at(now, parse_weekday(config["day"]), hour, minute)
+
+    if config.get("time"):
+        return next_daily(now, config)
+
+    raise ValueError(f"wait_until step needs until, a delay, day or time: {config}")
+
+
+def next_daily(now: datetime, config: Dict[str, Any]) -> datetime:
+    """Next run of a daily schedule: {"time": "09:00"}."""
+    hour, minute = parse_time(config.get("time"))
+    candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def next_weekly(now: datetime, config: Dict[str, Any]) -> datetime:
+    """Next run of a weekly schedule.
+
+    {"day": "monday", "time": "09:00"} or {"days": ["monday", "thursday"], "time": "09:00"}
+    """
+    hour, minute = parse_time(config.get("time"))
+    days = config.get("days") or [config.get("day", "monday")]
+    return min(next_weekday_at(now, parse_weekday(day), hour, minute) for day in days)
+
+
+def next_monthly(now: datetime, config: Dict[str, Any]) -> datetime:
+    """Next run of a monthly schedule: {"day_of_month": 1, "time": "09:00"}.
+
+    ``day_of_month`` may be "last"; days past the end of a short month run on
+    its last day.
+    """
+    hour, minute = parse_time(config.get("time"))
+    day = config.get("day_of_month", config.get("day", 1))
+
+    year, month = now.year, now.month
+    for _ in range(2):
+        last_day = calendar.monthrange(year, month)[1]
+        run_day = last_day if day == "last" else min(int(day), last_day)
+        candidate = datetime(year, month, run_day, hour, minute)
+        if candidate > now:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return candidate
+
+
+class CronExpression:
+    """Standard five-field cron expression (minute hour day-of-month month day-of-week).
+
+    Supports ``*``, lists, ranges, steps and month/weekday names. As in cron,
+    when both day-of-month and day-of-week are restricted a day matches if
+    either does. Day-of-week 0 and 7 are Sunday.
+    """
+
+    MONTH_NAMES = {
+        name: index for index, name in enumerate(
+            ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"],
+            start=1,
+        )
+    }
+    DAY_NAMES = {
+        name: index for index, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])
+    }
+
+    # Give up after this many days without a match (e.g. "0 0 31 2 *")
+    MAX_SEARCH_DAYS = 366 * 5
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = self._parse_field(fields[0], 0, 59)
+        self.hours = self._parse_field(fields[1], 0, 23)
+        self.days_of_month = self._parse_field(fields[2], 1, 31)
+        self.months = self._parse_field(fields[3], 1, 12, self.MONTH_NAMES)
+        # Cron weekdays count from Sunday; convert to datetime.weekday() (Monday = 0)
+        self.days_of_week = {
+            (day - 1) % 7 for day in self._parse_field(fields[4], 0, 7, self.DAY_NAMES)
+        }
+        self.dom_restricted = fields[2] != "*"
+        self.dow_restricted = fields[4] != "*"
+        self._sorted_minutes: List[int] = sorted(self.minutes)
+        self._sorted_hours: List[int] = sorted(self.hours)
+
+    @staticmethod
+    def _parse_value(value: str, names: Optional[Dict[str, int]]) -> int:
+        if names and value.lower() in names:
+            return names[value.lower()]
+        return int(value)
+
+    @classmethod
+    def _parse_field(
+        cls,
+        field: str,
+        minimum: int,
+        maximum: int,
+        names: Optional[Dict[str, int]] = None,
+    ) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+                if step < 1:
+                    raise ValueError(f"Invalid cron step: {field!r}")
+            if part == "*":
+                start, end = minimum, maximum
+            elif "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start, end = cls._parse_value(start_str, names), cls._parse_value(end_str, names)
+            else:
+                start = cls._parse_value(part, names)
+                end = maximum if step > 1 else start
+            if not (minimum <= start <= maximum and minimum <= end <= maximum and start <= end):
+                raise ValueError(f"Cron field out of range: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, value: datetime) -> bool:
+        dom = value.day in self.days_of_month
+        dow = value.weekday() in self.days_of_week
+        if self.dom_restricted and self.dow_restricted:
+            return dom or dow
+        return dom and dow
+
+    def next_after(self, now: datetime) -> datetime:
+        """First matching minute strictly after ``now``.
+
+        Skips whole days and hours that cannot match, so the cost is bounded
+        by the number of days searched rather than minutes.
+        """
+        candidate = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(self.MAX_SEARCH_DAYS):
+            if candidate.month in self.months and self._day_matches(candidate):
+                for hour in self._sorted_hours:
+                    if hour < candidate.hour:
+                        continue
+                    start_minute = candidate.minute if hour == candidate.hour else 0
+                    for minute in self._sorted_minutes:
+                        if minute >= start_minute:
+                            return candidate.replace(hour=hour, minute=minute)
+            candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+def calculate_next_run(
+    schedule_type: str,
+    schedule_config: Dict[str, Any],
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """Next run time strictly after ``now`` for a workflow schedule."""
+    now = now or datetime.utcnow()
+    config = schedule_config or {}
+
+    if schedule_type == "daily":
+        return next_daily(now, config)
+    elif schedule_type == "weekly":
+        return next_weekly(now, config)
+    elif schedule_type == "monthly":
+        return next_monthly(now, config)
+    elif schedule_type == "cron":
+        return CronExpression(config["cron"]).next_after(now)
+    return None
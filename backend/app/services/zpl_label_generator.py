@@ -1,9 +1,20 @@
 """Service for generating ZPL labels for Zebra printers."""
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Dict, Optional, Any
 import re
 
 
+def escape_zpl_field(value: Any) -> str:
+    """
+    Escape field data for use after ^FH_ (hex escapes with underscore).
+
+    ^ and ~ would otherwise be read as ZPL commands.
+    """
+    if value is None:
+        return ""
+    return str(value).replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+
 class ZPLLabelGenerator:
     """Generate ZPL labels for Zebra printers (203 DPI, 4x5 inch labels)."""
 
@@ -269,6 +280,91 @@ class ZPLLabelGenerator:
         return ingredients_text
 
 
+class DeliveryLabelZPL:
+    """Delivery labels (one per customer order) for route batches.
+
+    The label layout is compiled into a format string once, so rendering a
+    label is a single ``str.format`` call with escaped field values.
+    """
+
+    LABEL_WIDTH_DOTS = ZPLLabelGenerator.LABEL_WIDTH_DOTS
+    LABEL_HEIGHT_DOTS = ZPLLabelGenerator.LABEL_HEIGHT_DOTS
+    MARGIN = 40
+    CONTENT_WIDTH = LABEL_WIDTH_DOTS - 2 * MARGIN
+
+    PRODUCTS_Y = 420
+    PRODUCT_LINE_HEIGHT = 30
+    MAX_PRODUCT_LINES = 14
+
+    TEMPLATE = "\n".join([
+        "^XA",
+        f"^PW{LABEL_WIDTH_DOTS}",
+        f"^LL{LABEL_HEIGHT_DOTS}",
+        "^CI28",
+        f"^FO{MARGIN},{MARGIN}^A0N,50,40^FB{CONTENT_WIDTH},2,0,L^FH_^FD{{kundenavn}}^FS",
+        f"^FO{MARGIN},150^A0N,32,28^FH_^FD{{adresse}}^FS",
+        f"^FO{MARGIN},190^A0N,32,28^FH_^FD{{postnr}} {{sted}}^FS",
+        f"^FO{MARGIN},240^GB{CONTENT_WIDTH},2,2^FS",
+        f"^FO{MARGIN},260^A0N,30,25^FH_^FDRute: {{rute}}   Sone: {{sone}}^FS",
+        f"^FO{MARGIN},300^A0N,30,25^FH_^FDLevering: {{leveringsdato}}   Ordre: {{ordreid}}^FS",
+        f"^FO{MARGIN},340^A0N,30,25^FH_^FD{{menygruppe}}^FS",
+        f"^FO{MARGIN},{PRODUCTS_Y - 20}^GB{CONTENT_WIDTH},2,2^FS",
+        "{products}",
+        f"^FO{MARGIN},{LABEL_HEIGHT_DOTS - MARGIN - 100}^BY2^BCN,70,Y,N,N^FD{{ordreid}}^FS",
+        "^XZ",
+    ])
+
+    PRODUCT_LINE = f"^FO{MARGIN + 10},{{y}}^A0N,24,20^FB{CONTENT_WIDTH - 20},1,0,L^FH_^FD{{text}}^FS"
+
+    def render(self, kunde: Dict[str, Any], ordre: Dict[str, Any]) -> str:
+        """
+        Render the label for one customer order.
+
+        Args:
+            kunde: Customer fields (kundenavn, adresse, postnr, sted, rute, sone, menygruppe_beskrivelse)
+            ordre: Order fields (ordreid, leveringsdato, produkter)
+
+        Returns:
+            ZPL code as string
+        """
+        produkter = ordre.get("produkter") or []
+        lines = [self._product_text(produkt) for produkt in produkter[:self.MAX_PRODUCT_LINES]]
+        if len(produkter) > self.MAX_PRODUCT_LINES:
+            lines[-1] = f"+ {len(produkter) - self.MAX_PRODUCT_LINES + 1} flere produkter"
+
+        products = "\n".join(
+            self.PRODUCT_LINE.format(
+                y=self.PRODUCTS_Y + i * self.PRODUCT_LINE_HEIGHT,
+                text=escape_zpl_field(line),
+            )
+            for i, line in enumerate(lines)
+        )
+
+        leveringsdato = ordre.get("leveringsdato")
+        if isinstance(leveringsdato, (date, datetime)):
+            leveringsdato = leveringsdato.strftime("%d.%m.%Y")
+
+        return self.TEMPLATE.format(
+            kundenavn=escape_zpl_field(kunde.get("kundenavn")),
+            adresse=escape_zpl_field(kunde.get("adresse")),
+            postnr=escape_zpl_field(kunde.get("postnr")),
+            sted=escape_zpl_field(kunde.get("sted")),
+            rute=escape_zpl_field(kunde.get("rute")),
+            sone=escape_zpl_field(kunde.get("sone")),
+            menygruppe=escape_zpl_field(kunde.get("menygruppe_beskrivelse")),
+            leveringsdato=escape_zpl_field(leveringsdato),
+            ordreid=escape_zpl_field(ordre.get("ordreid")),
+            products=products,
+        )
+
+    @staticmethod
+    def _product_text(produkt: Dict[str, Any]) -> str:
+        antall = produkt.get("antall")
+        if antall is None:
+            return produkt.get("produktnavn") or ""
+        return f"{antall:g} x {produkt.get('produktnavn') or ''}"
+
+
 # Singleton instance
 _zpl_generator: Optional[ZPLLabelGenerator] = None
 
@@ -0,0 +1,101 @@
+"""Celery tasks for bulk email delivery.
+
+Tasks in this module are routed to the ``emails`` queue (see celery_app.py)
+so large mailings never hold up workflow workers. Templates are rendered
+once, messages are delivered over pooled SMTP connections, and the outcome
+for every recipient is written back to ``workflow_action_logs``.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.celery_app import app
+from app.models.workflow_action_log import WorkflowActionLog
+from app.tasks.workflow_tasks import AsyncCeleryTask, AsyncSessionLocal
+
+
+class SendWorkflowEmailsTask(AsyncCeleryTask):
+    """Send a workflow's emails and log one action per recipient.
+
+    Delivery failures for individual recipients are recorded as failed
+    action logs rather than retried; only errors raised before anything was
+    delivered trigger a task retry.
+    """
+
+    name = 'app.tasks.email_tasks.send_workflow_emails'
+    max_retries = 3
+    default_retry_delay = 120  # Retry after 2 minutes
+
+    async def run_async(
+        self,
+        execution_id: int,
+        step_id: int,
+        recipients: List[Dict[str, Any]],
+        template_name: Optional[str] = None,
+        subject: Optional[str] = None,
+        body_html: Optional[str] = None,
+        body_text: Optional[str] = None,
+    ):
+        """Render, deliver and log emails for one send_email step."""
+        from app.services.email_service import EmailService
+
+        results = None
+        try:
+            async with AsyncSessionLocal() as db:
+                email_service = EmailService(db)
+                emails = email_service.render_bulk_emails(
+                    recipients,
+                    template_name=template_name,
+                    subject=subject,
+                    body_html=body_html,
+                    body_text=body_text,
+                )
+                results = await email_service.deliver_bulk_emails(emails)
+
+                performed_at = datetime.utcnow()
+                if results:
+                    await db.execute(
+                        insert(WorkflowActionLog),
+                        [
+                            {
+                                "execution_id": execution_id,
+                                "step_id": step_id,
+                                "action_type": "send_email",
+                                "target_id": result.customer_id,
+                                "target_type": "customer",
+                                "performed_at": performed_at,
+                                "status": "success" if result.success else "failed",
+                                "result_data": {"email": result.to_email},
+                                "error_message": result.error,
+                            }
+                            for result in results
+                        ],
+                    )
+                    await db.commit()
+
+            sent_count = sum(1 for result in results if result.success)
+            return {
+                'execution_id': execution_id,
+                'step_id': step_id,
+                'recipients_count': len(recipients),
+                'sent_count': sent_count,
+                'failed_count': len(results) - sent_count,
+                'skipped_count': len(recipients) - len(results),
+                'template': template_name,
+                'status': 'success',
+            }
+
+        except Exception as e:
+            error_msg = f"Error sending emails for step {step_id}: {str(e)}"
+            print(error_msg)
+
+            # Never retry once delivery has happened, or recipients get duplicates
+            if results is not None:
+                raise
+
+            # Retry task
+            raise self.retry(exc=e)
+
+
+send_workflow_emails = app.register_task(SendWorkflowEmailsTask())
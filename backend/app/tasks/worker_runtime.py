@@ -0,0 +1,163 @@
+"""Per-process async runtime for Celery workers.
+
+Celery task bodies are synchronous, but our tasks use async SQLAlchemy. Each
+worker process therefore gets one long-lived event loop, running in a
+background thread, and one database engine bound to that loop. Both are
+created lazily after the worker has forked (never in the parent, so pooled
+connections are not shared between processes) and disposed when the
+worker process shuts down.
+
+Task bodies are submitted to the loop and the calling thread blocks until
+the result is ready. With the prefork pool this means one task per process
+at a time; with ``--pool=threads`` several tasks run concurrently on the
+same loop and engine, bounded by ``CELERY_ASYNC_CONCURRENCY``.
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.infrastructure.database.engine import create_engine_from_settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for in-flight work and engine disposal on shutdown
+SHUTDOWN_TIMEOUT_SECONDS = 30
+
+
+class WorkerRuntime:
+    """One event loop, engine and session factory per worker process."""
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+    ):
+        self.database_url = database_url or settings.DATABASE_URL
+        self.max_concurrency = max(1, max_concurrency or settings.CELERY_ASYNC_CONCURRENCY)
+        self.pool_size = pool_size or settings.CELERY_DB_POOL_SIZE
+        self.max_overflow = (
+            max_overflow if max_overflow is not None else settings.CELERY_DB_MAX_OVERFLOW
+        )
+
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None and self._pid == os.getpid()
+
+    def start(self) -> None:
+        """Create this process's loop and engine if they do not exist yet."""
+        with self._lock:
+            if self.started:
+                return
+            if self._pid is not None:
+                # Inherited from the parent through fork: the loop thread does
+                # not exist here and the pooled connections belong to the
+                # parent, so drop the references without closing anything.
+                self._engine = None
+                self._session_factory = None
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run_loop, name="celery-async-runtime", daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._engine = create_engine_from_settings(
+                self.database_url,
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+            )
+            self._session_factory = async_sessionmaker(
+                self._engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+                autocommit=False,
+                autoflush=False,
+            )
+            self._loop = loop
+            self._thread = thread
+            self._pid = os.getpid()
+            logger.info(f"Started async worker runtime in process {self._pid}")
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self.start()
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        self.start()
+        return self._session_factory
+
+    async def _bounded(self, awaitable: Awaitable[Any]) -> Any:
+        async with self._semaphore:
+            return await awaitable
+
+    def run(self, awaitable: Awaitable[Any]) -> Any:
+        """Run ``awaitable`` on this process's loop and block until it finishes."""
+        self.start()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("WorkerRuntime.run() cannot be called from the runtime loop")
+        future = asyncio.run_coroutine_threadsafe(self._bounded(awaitable), self._loop)
+        return future.result()
+
+    def shutdown(self) -> None:
+        """Dispose the engine and stop the loop thread."""
+        with self._lock:
+            if not self.started:
+                return
+            loop, thread, engine = self._loop, self._thread, self._engine
+            try:
+                asyncio.run_coroutine_threadsafe(engine.dispose(), loop).result(
+                    timeout=SHUTDOWN_TIMEOUT_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"Error disposing worker database engine: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=SHUTDOWN_TIMEOUT_SECONDS)
+            if not thread.is_alive():
+                loop.close()
+
+            self._loop = None
+            self._thread = None
+            self._semaphore = None
+            self._engine = None
+            self._session_factory = None
+            self._pid = None
+            logger.info(f"Stopped async worker runtime in process {os.getpid()}")
+
+
+runtime = WorkerRuntime()
+
+
+@worker_process_init.connect
+def _start_runtime_after_fork(**kwargs) -> None:
+    runtime.start()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_runtime(**kwargs) -> None:
+    runtime.shutdown()
@@ -0,0 +1,176 @@
+"""Streaming CSV export helpers.
+
+Exports are produced as an async iterator of byte chunks so they can be fed
+directly into a ``StreamingResponse`` without materialising the whole file.
+Two row sources are supported:
+
+- ``stream_rows``: server-side cursor via ``AsyncSession.stream`` + ``yield_per``
+- ``copy_query_csv``: PostgreSQL ``COPY (query) TO STDOUT`` through asyncpg,
+  which skips Python row handling entirely for very large exports
+"""
+import asyncio
+import csv
+import io
+import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the server-side cursor
+DEFAULT_YIELD_PER = 1000
+
+# Flush buffered CSV text to the client once it grows past this size
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Maximum number of COPY chunks buffered between asyncpg and the client
+COPY_QUEUE_SIZE = 16
+
+UTF8_BOM = "\ufeff"
+
+
+def iso_timestamp(column) -> ColumnElement:
+    """Render a timestamp column in SQL the way ``datetime.isoformat()`` does.
+
+    Export queries select timestamps through this so the cursor and COPY
+    paths produce identical text (COPY would otherwise use PostgreSQL's
+    ``2026-10-18 12:00:00`` output format).
+    """
+    return func.regexp_replace(
+        func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'), r"\.000000$", ""
+    )
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def is_long_range(date_from: Optional[datetime], date_to: Optional[datetime], days: int) -> bool:
+    """Whether a date range is open-ended or spans more than ``days``.
+
+    Aware datetimes, such as query string values with an offset, are
+    compared as naive UTC.
+    """
+    if date_from is None:
+        return True
+    end = _naive_utc(date_to) if date_to else datetime.utcnow()
+    return end - _naive_utc(date_from) > timedelta(days=days)
+
+
+async def stream_rows(
+    db: AsyncSession,
+    query: Select,
+    yield_per: int = DEFAULT_YIELD_PER,
+) -> AsyncIterator[Sequence[Any]]:
+    """Yield result rows from a server-side cursor, ``yield_per`` at a time."""
+    result = await db.stream(query.execution_options(yield_per=yield_per))
+    async for partition in result.partitions():
+        for row in partition:
+            yield row
+
+
+async def iter_csv(
+    rows: AsyncIterator[Sequence[Any]],
+    header: Iterable[str],
+    delimiter: str = ";",
+    bom: bool = False,
+    format_row: Optional[Callable[[Sequence[Any]], Iterable[Any]]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Encode rows as CSV and yield UTF-8 chunks of roughly ``chunk_size`` bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+
+    if bom:
+        buffer.write(UTF8_BOM)
+    writer.writerow(header)
+
+    async for row in rows:
+        writer.writerow(format_row(row) if format_row else row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream on the fly into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+async def copy_query_csv(
+    db: AsyncSession,
+    query: Select,
+    delimiter: str = ";",
+    null: str = "",
+    bom: bool = False,
+) -> AsyncIterator[bytes]:
+    """Stream ``COPY (query) TO STDOUT`` output as CSV chunks.
+
+    Column labels of ``query`` become the CSV header. The query is compiled
+    with the connection's dialect so bound parameters are passed to asyncpg
+    positionally instead of being rendered into the SQL string.
+    """
+    connection = await db.connection()
+    compiled = query.compile(dialect=connection.dialect)
+    params = [compiled.params[name] for name in (compiled.positiontup or [])]
+
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=COPY_QUEUE_SIZE)
+
+    async def sink(data: bytes) -> None:
+        await queue.put(data)
+
+    async def run_copy() -> None:
+        try:
+            await driver_connection.copy_from_query(
+                compiled.string,
+                *params,
+                output=sink,
+                format="csv",
+                header=True,
+                delimiter=delimiter,
+                null=null,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await queue.put(None)
+            raise
+        await queue.put(None)
+
+    if bom:
+        yield UTF8_BOM.encode("utf-8")
+
+    copy_task = asyncio.create_task(run_copy())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            yield chunk
+        # Re-raise any error from the COPY itself
+        await copy_task
+    finally:
+        if not copy_task.done():
+            copy_task.cancel()
+            try:
+                await copy_task
+            except (asyncio.CancelledError, Exception):
+                logger.debug("COPY export cancelled before completion")
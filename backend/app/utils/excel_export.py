@@ -0,0 +1,75 @@
+"""Streaming Excel export helpers.
+
+Workbooks are built with openpyxl in write-only mode, which writes each
+appended row to a temporary file instead of keeping cell objects in
+memory. Rows are appended in batches in a worker thread so the event loop
+stays free. The finished .xlsx is assembled in a spooled temporary file and
+yielded in chunks, so it can be fed into a ``StreamingResponse``.
+
+An .xlsx is a zip archive whose directory is written last, so no bytes can
+be sent before the last row is in; memory stays bounded either way.
+"""
+import asyncio
+import tempfile
+from io import BytesIO
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional, Sequence
+
+from openpyxl import Workbook
+
+from app.utils.csv_export import DEFAULT_CHUNK_SIZE, DEFAULT_YIELD_PER
+
+# Finished workbooks larger than this are spooled to disk instead of memory
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def _write_only_workbook(header: Iterable[str], sheet_name: str) -> tuple[Workbook, Any]:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(list(header))
+    return workbook, sheet
+
+
+def _append_rows(sheet: Any, rows: List[Sequence[Any]]) -> None:
+    for row in rows:
+        sheet.append(row)
+
+
+def build_xlsx(header: Iterable[str], rows: Iterable[Sequence[Any]], sheet_name: str = "Sheet1") -> bytes:
+    """Build a single-sheet workbook from in-memory rows. Blocking."""
+    workbook, sheet = _write_only_workbook(header, sheet_name)
+    for row in rows:
+        sheet.append(list(row))
+
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+async def iter_xlsx(
+    rows: AsyncIterator[Sequence[Any]],
+    header: Iterable[str],
+    sheet_name: str = "Sheet1",
+    format_row: Optional[Callable[[Sequence[Any]], Sequence[Any]]] = None,
+    batch_size: int = DEFAULT_YIELD_PER,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Write rows to a single-sheet workbook and yield the .xlsx in chunks."""
+    workbook, sheet = await asyncio.to_thread(_write_only_workbook, header, sheet_name)
+
+    batch: List[Sequence[Any]] = []
+    async for row in rows:
+        batch.append(list(format_row(row) if format_row else row))
+        if len(batch) >= batch_size:
+            await asyncio.to_thread(_append_rows, sheet, batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(_append_rows, sheet, batch)
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as output:
+        await asyncio.to_thread(workbook.save, output)
+        output.seek(0)
+        while True:
+            chunk = await asyncio.to_thread(output.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
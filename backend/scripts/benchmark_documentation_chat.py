@@ -0,0 +1,105 @@
+"""Benchmark prompt size and latency of the documentation chatbot.
+
+Compares the old prompt (the whole USER_DOCS guide in every request) with
+the retrieval prompt (top-k BM25 chunks from USER_DOCS and docs/) for a set
+of typical questions. Reports prompt tokens per answer and the time spent on
+retrieval. With --live, also sends both prompts to the configured AI
+provider and reports end-to-end latency.
+
+Tokens are counted with tiktoken when installed, otherwise estimated as
+characters / 4.
+
+Usage:
+    uv run python scripts/benchmark_documentation_chat.py
+    uv run python scripts/benchmark_documentation_chat.py --live --repeat 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.documentation_chat_service import USER_DOCS, DocumentationChatService
+
+QUESTIONS = [
+    "Hvordan oppretter jeg en ny oppskrift?",
+    "Hvordan legger jeg til ingredienser i en rett?",
+    "Hvordan skriver jeg ut etiketter på Zebra-skriveren?",
+    "Hvordan kopierer jeg en periode med menyer?",
+    "Hvordan registrerer jeg plukket mengde på en ordre?",
+    "Hvordan bytter jeg mellom lyst og mørkt tema?",
+    "Hvor finner jeg rapporter og statistikk?",
+    "Hvordan sletter jeg en ordre?",
+]
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text)), "tiktoken"
+    except ImportError:
+        return lambda text: len(text) // 4, "chars/4"
+
+
+async def _timed_completion(service: DocumentationChatService, system_prompt: str, question: str) -> float:
+    start = time.perf_counter()
+    await service.ai_client.chat_completion(
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": question},
+        ],
+        temperature=0.3,
+        max_tokens=1000,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="Also call the configured AI provider")
+    parser.add_argument("--repeat", type=int, default=1, help="Live calls per question and prompt")
+    args = parser.parse_args()
+
+    count_tokens, method = _token_counter()
+    service = DocumentationChatService()
+
+    start = time.perf_counter()
+    service.warm_up()
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(service.retriever.index.chunks)} chunks), tokens counted with {method}\n")
+
+    full_prompt = service._get_system_prompt(USER_DOCS)
+    header = f"{'question':<52} {'full tok':>9} {'rag tok':>8} {'retrieve ms':>12}"
+    if args.live:
+        header += f" {'full ms':>9} {'rag ms':>9}"
+    print(header)
+
+    full_tokens, rag_tokens, full_latency, rag_latency = [], [], [], []
+    for question in QUESTIONS:
+        start = time.perf_counter()
+        context = service._get_context(question)
+        retrieve_ms = (time.perf_counter() - start) * 1000
+        rag_prompt = service._get_system_prompt(context)
+
+        full_tokens.append(count_tokens(full_prompt) + count_tokens(question))
+        rag_tokens.append(count_tokens(rag_prompt) + count_tokens(question))
+        line = f"{question[:52]:<52} {full_tokens[-1]:>9} {rag_tokens[-1]:>8} {retrieve_ms:>12.2f}"
+
+        if args.live:
+            full_ms = [await _timed_completion(service, full_prompt, question) for _ in range(args.repeat)]
+            rag_ms = [await _timed_completion(service, rag_prompt, question) for _ in range(args.repeat)]
+            full_latency.append(statistics.median(full_ms))
+            rag_latency.append(statistics.median(rag_ms))
+            line += f" {full_latency[-1]:>9.0f} {rag_latency[-1]:>9.0f}"
+        print(line)
+
+    print(f"\nMean prompt tokens: full {statistics.mean(full_tokens):.0f}, "
+          f"retrieval {statistics.mean(rag_tokens):.0f} "
+          f"({100 * (1 - statistics.mean(rag_tokens) / statistics.mean(full_tokens)):.0f}% fewer)")
+    if args.live:
+        print(f"Median latency: full {statistics.median(full_latency):.0f} ms, "
+              f"retrieval {statistics.median(rag_latency):.0f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
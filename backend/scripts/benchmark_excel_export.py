@@ -0,0 +1,123 @@
+"""Benchmark Excel export of a large row set.
+
+Generates N synthetic order lines and times, with peak Python memory
+(tracemalloc):
+
+- the old export: a regular openpyxl workbook filled cell by cell and saved
+  to bytes, all on the event loop
+- the streaming export: app.utils.excel_export.iter_xlsx fed by an async
+  row source, with a write-only workbook in a worker thread
+
+While each export runs, a ticker task measures how long the event loop was
+blocked at most.
+
+Usage:
+    uv run python scripts/benchmark_excel_export.py
+    uv run python scripts/benchmark_excel_export.py --rows 100000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import date, timedelta
+from io import BytesIO
+
+import openpyxl
+
+from app.utils.excel_export import iter_xlsx
+
+HEADERS = ["Ordre", "Dato", "Kunde", "Produkt", "Antall", "Pris", "Merknad"]
+
+
+def _row(n: int) -> list:
+    return [
+        100000 + n // 8,
+        date(2026, 1, 1) + timedelta(days=n % 300),
+        f"Kunde {n % 750}",
+        f"Produkt {n % 2000}",
+        1 + n % 12,
+        round(12.5 + (n % 400) * 0.75, 2),
+        "Uten gluten" if n % 9 == 0 else None,
+    ]
+
+
+async def _rows(count: int):
+    for n in range(count):
+        yield _row(n)
+        if n % 1000 == 0:
+            # Stand-in for a cursor round trip
+            await asyncio.sleep(0)
+
+
+async def _old_export(count: int) -> int:
+    rows = [_row(n) async for n in _count(count)]
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for col_idx, header in enumerate(HEADERS, start=1):
+        ws.cell(row=1, column=col_idx, value=header)
+    for row_idx, row in enumerate(rows, start=2):
+        for col_idx, value in enumerate(row, start=1):
+            ws.cell(row=row_idx, column=col_idx, value=value)
+    output = BytesIO()
+    wb.save(output)
+    return len(output.getvalue())
+
+
+async def _count(count: int):
+    for n in range(count):
+        yield n
+
+
+async def _streaming_export(count: int) -> int:
+    size = 0
+    async for chunk in iter_xlsx(_rows(count), HEADERS, sheet_name="Ordrelinjer"):
+        size += len(chunk)
+    return size
+
+
+async def _measure(export, count: int) -> dict:
+    max_gap = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal max_gap
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            max_gap = max(max_gap, now - last - 0.01)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = await export(count)
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Let the ticker see the gap left by the export before it stops
+    await asyncio.sleep(0.02)
+    running = False
+    await tick
+
+    return {"seconds": elapsed, "peak_mb": peak / 1024 / 1024, "size_mb": size / 1024 / 1024, "blocked_ms": max_gap * 1000}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic order lines")
+    args = parser.parse_args()
+
+    print(f"{args.rows} rows\n")
+    print(f"{'export':<10} {'seconds':>8} {'peak MB':>8} {'file MB':>8} {'max loop block ms':>18}")
+    for name, export in (("old", _old_export), ("streaming", _streaming_export)):
+        result = await _measure(export, args.rows)
+        print(
+            f"{name:<10} {result['seconds']:>8.2f} {result['peak_mb']:>8.1f} "
+            f"{result['size_mb']:>8.1f} {result['blocked_ms']:>18.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
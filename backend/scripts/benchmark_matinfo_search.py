@@ -0,0 +1,156 @@
+"""Benchmark Matinfo product search on a synthetic catalogue.
+
+Creates a scratch schema with a matinfo_products table (same search columns
+and indexes as the real table), fills it with N synthetic products and
+times, per query:
+
+- the old search: OR-ed similarity()/LIKE tests over LOWER(name),
+  brandname and ingredientstatement, which no index can serve
+- the ranked search from app.services.matinfo_search against the indexed
+  search_document and search_vector columns
+
+Usage:
+    uv run python scripts/benchmark_matinfo_search.py
+    uv run python scripts/benchmark_matinfo_search.py --size 50000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.infrastructure.database.session import get_engine
+from app.services.matinfo_search import rank_matinfo_products
+
+SCHEMA = "matinfo_search_bench"
+
+QUERIES = ["helmelk", "tine yoghurt", "kyllingfilet", "grovbrød", "laks røkt", "smør", "gilde pølse"]
+
+OLD_SEARCH_SQL = text("""
+    SELECT
+        id,
+        GREATEST(
+            similarity(LOWER(name), :search),
+            similarity(LOWER(COALESCE(brandname, '')), :search),
+            similarity(LOWER(COALESCE(ingredientstatement, '')), :search)
+        ) as similarity_score
+    FROM matinfo_products
+    WHERE
+        LOWER(name) % :search
+        OR LOWER(COALESCE(brandname, '')) % :search
+        OR LOWER(COALESCE(ingredientstatement, '')) % :search
+        OR LOWER(name) LIKE :like_search
+        OR LOWER(COALESCE(brandname, '')) LIKE :like_search
+    ORDER BY similarity_score DESC
+    LIMIT :limit
+""")
+
+
+async def _create_schema(conn) -> None:
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(text(f"""
+        CREATE TABLE {SCHEMA}.matinfo_products (
+            id VARCHAR(24) PRIMARY KEY,
+            gtin VARCHAR(20) UNIQUE,
+            name VARCHAR(255),
+            producername VARCHAR(255),
+            brandname VARCHAR(255),
+            ingredientstatement TEXT,
+            search_document TEXT,
+            search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('norwegian', coalesce(name, '')), 'A')
+                || setweight(to_tsvector('norwegian', coalesce(brandname, '')), 'B')
+                || setweight(to_tsvector('norwegian', coalesce(producername, '')), 'C')
+                || setweight(to_tsvector('norwegian', left(coalesce(ingredientstatement, ''), 500)), 'D')
+            ) STORED
+        )
+    """))
+
+
+async def _populate(conn, size: int) -> None:
+    await conn.execute(text(f"""
+        INSERT INTO {SCHEMA}.matinfo_products (id, gtin, name, producername, brandname, ingredientstatement)
+        SELECT
+            'bench_' || n,
+            lpad(n::text, 13, '0'),
+            (ARRAY['Hel', 'Lett', 'Grov', 'Fin', 'Røkt', 'Fersk', 'Frossen', 'Økologisk'])[1 + n % 8]
+                || (ARRAY['melk', 'yoghurt', 'brød', 'laks', 'kyllingfilet', 'smør', 'pølse', 'ost',
+                          'skinke', 'juice', 'rundstykker', 'kjøttdeig'])[1 + (n / 8) % 12]
+                || ' ' || (1 + n % 20) * 50 || 'g',
+            (ARRAY['Tine SA', 'Nortura SA', 'Mills AS', 'Orkla Foods', 'Bama', 'Lerøy', 'Bakers'])[1 + (n / 96) % 7],
+            (ARRAY['Tine', 'Gilde', 'Prior', 'Mills', 'Stabburet', 'Lerøy', 'Bakers', 'Q'])[1 + (n / 7) % 8],
+            'Ingredienser: ' || (ARRAY['hvetemel', 'melk', 'salt', 'sukker', 'kylling', 'laks', 'rapsolje'])[1 + n % 7]
+                || ', ' || (ARRAY['vann', 'gjær', 'krydder', 'eddik', 'stivelse'])[1 + (n / 3) % 5]
+                || repeat(', tilsetningsstoff E' || (100 + n % 400), 1 + n % 6)
+        FROM generate_series(1, :size) AS n
+    """), {"size": size})
+    # Same normalization as matinfo_search.build_search_document
+    await conn.execute(text(f"""
+        UPDATE {SCHEMA}.matinfo_products
+        SET search_document = btrim(regexp_replace(
+            lower(
+                coalesce(name, '') || ' ' || coalesce(brandname, '') || ' '
+                || coalesce(producername, '') || ' '
+                || left(coalesce(ingredientstatement, ''), 500)
+            ),
+            '[^[:alnum:]]+', ' ', 'g'
+        ))
+    """))
+    await conn.execute(text(f"""
+        CREATE INDEX ON {SCHEMA}.matinfo_products USING gin(search_document gin_trgm_ops)
+    """))
+    await conn.execute(text(f"CREATE INDEX ON {SCHEMA}.matinfo_products USING gin(search_vector)"))
+    await conn.execute(text(f"ANALYZE {SCHEMA}.matinfo_products"))
+
+
+async def _time_old(conn, query: str, limit: int) -> float:
+    start = time.perf_counter()
+    await conn.execute(OLD_SEARCH_SQL, {"search": query, "like_search": f"%{query}%", "limit": limit})
+    return (time.perf_counter() - start) * 1000
+
+
+async def _time_ranked(conn, query: str, limit: int) -> float:
+    start = time.perf_counter()
+    await rank_matinfo_products(conn, query, limit)
+    return (time.perf_counter() - start) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=50_000, help="Synthetic products")
+    parser.add_argument("--limit", type=int, default=20, help="Results per search")
+    parser.add_argument("--repeat", type=int, default=10, help="Searches per query and method")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await _create_schema(conn)
+        await _populate(conn, args.size)
+
+    try:
+        print(f"{args.size} products\n")
+        print(f"{'query':<16} {'old ms (median)':>16} {'ranked ms (median)':>19}")
+        old_all, ranked_all = [], []
+        async with engine.connect() as conn:
+            await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+            for query in QUERIES:
+                old = [await _time_old(conn, query, args.limit) for _ in range(args.repeat)]
+                ranked = [await _time_ranked(conn, query, args.limit) for _ in range(args.repeat)]
+                old_all.extend(old)
+                ranked_all.extend(ranked)
+                print(f"{query:<16} {statistics.median(old):>16.2f} {statistics.median(ranked):>19.2f}")
+            await conn.rollback()
+
+        print(f"\nOverall median: old {statistics.median(old_all):.2f} ms, "
+              f"ranked {statistics.median(ranked_all):.2f} ms")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
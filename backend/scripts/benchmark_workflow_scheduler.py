@@ -0,0 +1,155 @@
+"""Benchmark the workflow scheduler claim as the number of schedules grows.
+
+Creates a scratch schema with workflow_definitions/workflow_schedules (same
+columns and next_run partial index as the real tables), fills it with N
+scheduled workflows of which only a handful are due, and times
+WorkflowAutomationService.claim_due_workflows() and get_next_due_time().
+The claim only touches due rows through the partial index, so its cost
+should stay flat as N grows.
+
+Also times next-run calculation for each schedule type.
+
+Usage:
+    uv run python scripts/benchmark_workflow_scheduler.py
+    uv run python scripts/benchmark_workflow_scheduler.py --sizes 1000,10000,100000 --due 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.infrastructure.database.session import get_engine
+from app.services.workflow_automation_service import WorkflowAutomationService
+from app.services.workflow_timing import calculate_next_run
+
+SCHEMA = "scheduler_bench"
+
+SCHEDULE_CONFIGS = [
+    ("daily", {"time": "09:00"}),
+    ("weekly", {"days": ["monday", "thursday"], "time": "07:30"}),
+    ("monthly", {"day_of_month": "last", "time": "08:00"}),
+    ("cron", {"cron": "*/15 6-18 * * mon-fri"}),
+]
+
+
+async def _create_schema(conn) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(text(f"""
+        CREATE TABLE {SCHEMA}.workflow_definitions (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            is_active BOOLEAN NOT NULL DEFAULT TRUE
+        )
+    """))
+    await conn.execute(text(f"""
+        CREATE TABLE {SCHEMA}.workflow_schedules (
+            id SERIAL PRIMARY KEY,
+            workflow_id INTEGER NOT NULL UNIQUE REFERENCES {SCHEMA}.workflow_definitions(id),
+            schedule_type VARCHAR(50) NOT NULL,
+            schedule_config JSONB NOT NULL,
+            next_run TIMESTAMP,
+            last_run TIMESTAMP
+        )
+    """))
+    await conn.execute(text(f"""
+        CREATE INDEX idx_bench_workflow_schedules_next_run
+        ON {SCHEMA}.workflow_schedules(next_run)
+        WHERE next_run IS NOT NULL
+    """))
+
+
+async def _populate(conn, size: int) -> None:
+    await conn.execute(text(f"TRUNCATE {SCHEMA}.workflow_schedules, {SCHEMA}.workflow_definitions RESTART IDENTITY"))
+    await conn.execute(text(f"""
+        INSERT INTO {SCHEMA}.workflow_definitions (name, is_active)
+        SELECT 'bench ' || n, TRUE FROM generate_series(1, :size) AS n
+    """), {"size": size})
+    # Spread next_run over the coming week so nothing is due yet
+    await conn.execute(text(f"""
+        INSERT INTO {SCHEMA}.workflow_schedules (workflow_id, schedule_type, schedule_config, next_run)
+        SELECT n, 'daily', '{{"time": "09:00"}}'::jsonb,
+               now() AT TIME ZONE 'utc' + (n % 10080 + 5) * interval '1 minute'
+        FROM generate_series(1, :size) AS n
+    """), {"size": size})
+    await conn.execute(text(f"ANALYZE {SCHEMA}.workflow_schedules"))
+
+
+async def _make_due(conn, due: int) -> None:
+    await conn.execute(text(f"""
+        UPDATE {SCHEMA}.workflow_schedules
+        SET next_run = now() AT TIME ZONE 'utc' - interval '1 minute'
+        WHERE id <= :due
+    """), {"due": due})
+
+
+async def benchmark_claim(sizes, due: int, repeat: int) -> None:
+    engine = get_engine()
+    bench_engine = engine.execution_options(schema_translate_map={None: SCHEMA})
+    session_factory = async_sessionmaker(bench_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await _create_schema(conn)
+
+    try:
+        print(f"{'schedules':>10} {'claim ms (median)':>18} {'next due ms':>12} {'claimed':>8}")
+        for size in sizes:
+            async with engine.begin() as conn:
+                await _populate(conn, size)
+
+            claim_times, next_due_times, claimed = [], [], 0
+            for _ in range(repeat):
+                async with engine.begin() as conn:
+                    await _make_due(conn, due)
+
+                async with session_factory() as db:
+                    service = WorkflowAutomationService(db)
+                    start = time.perf_counter()
+                    claimed = len(await service.claim_due_workflows())
+                    claim_times.append((time.perf_counter() - start) * 1000)
+
+                    start = time.perf_counter()
+                    await service.get_next_due_time()
+                    next_due_times.append((time.perf_counter() - start) * 1000)
+
+            print(
+                f"{size:>10} {statistics.median(claim_times):>18.2f} "
+                f"{statistics.median(next_due_times):>12.2f} {claimed:>8}"
+            )
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+def benchmark_next_run(iterations: int) -> None:
+    now = datetime.utcnow()
+    print(f"\n{'schedule type':>14} {'us per next_run':>16}")
+    for schedule_type, config in SCHEDULE_CONFIGS:
+        start = time.perf_counter()
+        for offset in range(iterations):
+            calculate_next_run(schedule_type, config, now + timedelta(minutes=offset * 37))
+        elapsed = (time.perf_counter() - start) / iterations * 1_000_000
+        print(f"{schedule_type:>14} {elapsed:>16.1f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma separated schedule counts")
+    parser.add_argument("--due", type=int, default=10, help="Due workflows per claim")
+    parser.add_argument("--repeat", type=int, default=20, help="Claims per size")
+    parser.add_argument("--skip-db", action="store_true", help="Only benchmark next-run calculation")
+    args = parser.parse_args()
+
+    if not args.skip_db:
+        sizes = [int(size) for size in args.sizes.split(",")]
+        await benchmark_claim(sizes, args.due, args.repeat)
+    benchmark_next_run(10_000)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""Unit tests for streaming CSV export helpers."""
+import gzip
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.app_log import AppLog
+from app.services.activity_log_service import EXPORT_COLUMNS as ACTIVITY_EXPORT_COLUMNS
+from app.services.app_log_service import EXPORT_COLUMNS as APP_LOG_EXPORT_COLUMNS
+from app.utils.csv_export import gzip_chunks, is_long_range, iso_timestamp, iter_csv
+
+
+async def _rows(n):
+    for i in range(n):
+        yield (i, f"navn {i}", None)
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+class TestIterCsv:
+    """Tests for iter_csv."""
+
+    @pytest.mark.asyncio
+    async def test_header_and_rows(self):
+        data = await _collect(iter_csv(_rows(2), header=["ID", "Navn", "Tom"]))
+        assert data.decode("utf-8").splitlines() == [
+            "ID;Navn;Tom",
+            "0;navn 0;",
+            "1;navn 1;",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bom_prefix(self):
+        data = await _collect(iter_csv(_rows(0), header=["ID"], bom=True))
+        assert data.startswith("\ufeff".encode("utf-8"))
+
+    @pytest.mark.asyncio
+    async def test_format_row(self):
+        data = await _collect(iter_csv(
+            _rows(1),
+            header=["ID", "Navn", "Tom"],
+            format_row=lambda row: [row[0], row[1].upper(), row[2] or "-"],
+        ))
+        assert data.decode("utf-8").splitlines()[1] == "0;NAVN 0;-"
+
+    @pytest.mark.asyncio
+    async def test_large_export_is_chunked(self):
+        chunks = [
+            chunk async for chunk in iter_csv(
+                _rows(5000), header=["ID", "Navn", "Tom"], chunk_size=1024
+            )
+        ]
+        assert len(chunks) > 1
+        assert all(len(chunk) < 2048 for chunk in chunks)
+        assert b"".join(chunks).decode("utf-8").count("\n") == 5001
+
+
+class TestGzipChunks:
+    """Tests for gzip_chunks."""
+
+    @pytest.mark.asyncio
+    async def test_roundtrip(self):
+        plain = await _collect(iter_csv(_rows(1000), header=["ID", "Navn", "Tom"]))
+        compressed = await _collect(
+            gzip_chunks(iter_csv(_rows(1000), header=["ID", "Navn", "Tom"]))
+        )
+        assert gzip.decompress(compressed) == plain
+        assert len(compressed) < len(plain)
+
+
+class TestIsLongRange:
+    """Tests for is_long_range."""
+
+    def test_open_ended(self):
+        assert is_long_range(None, datetime(2026, 10, 1), 31)
+
+    def test_naive_range(self):
+        assert not is_long_range(datetime(2026, 9, 1), datetime(2026, 9, 30), 31)
+        assert is_long_range(datetime(2026, 8, 1), datetime(2026, 9, 30), 31)
+
+    def test_aware_start_without_end(self):
+        date_from = datetime.now(timezone(timedelta(hours=2))) - timedelta(days=40)
+        assert is_long_range(date_from, None, 31)
+        assert not is_long_range(date_from + timedelta(days=30), None, 31)
+
+    def test_offsets_are_converted_to_utc(self):
+        date_from = datetime(2026, 9, 1, 1, 0, tzinfo=timezone(timedelta(hours=2)))
+        assert is_long_range(date_from, datetime(2026, 10, 1, 0, 30), 30)
+
+
+class TestIsoTimestamp:
+    """Tests for the SQL-side ISO 8601 timestamp rendering."""
+
+    def test_renders_isoformat_in_sql(self):
+        sql = str(iso_timestamp(AppLog.created_at).compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        ))
+        assert "to_char(app_logs.created_at, 'YYYY-MM-DD\"T\"HH24:MI:SS.US')" in sql
+        assert "regexp_replace" in sql
+
+    def test_exports_select_formatted_timestamps(self):
+        # COPY and cursor exports share the query, so both get the same text
+        for columns in (ACTIVITY_EXPORT_COLUMNS, APP_LOG_EXPORT_COLUMNS):
+            timestamp = columns[1][1]
+            assert getattr(timestamp, "name", None) == "regexp_replace"
@@ -0,0 +1,90 @@
+"""Unit tests for route-batch delivery labels."""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.delivery_label_service import (
+    build_label_query,
+    group_label_rows,
+    stream_zpl_labels,
+)
+from app.services.zpl_label_generator import DeliveryLabelZPL, escape_zpl_field
+
+
+def _row(kundeid, ordreid, produktid, produktnavn="Middag", antall=2.0):
+    return SimpleNamespace(
+        kundeid=kundeid, kundenavn=f"Kunde {kundeid}", leveringsdag=1, adresse="Gate 1",
+        postnr="0150", sted="Oslo", rute=3, sjaforparute=None, diett=False, menyinfo=None,
+        menygruppeid=1, menygruppe_beskrivelse="Hjemmeboende", sone="Sentrum",
+        ordreid=ordreid, produktid=produktid, produktnavn=produktnavn, pris=50.0,
+        antall=antall, leveringsdato=datetime(2026, 10, 19), ansattid=None,
+    )
+
+
+class StreamingSession:
+    """Serves rows through AsyncSession.stream-style partitions."""
+
+    def __init__(self, rows, partition_size=2):
+        self.rows = rows
+        self.partition_size = partition_size
+
+    async def stream(self, statement, params):
+        rows, size = self.rows, self.partition_size
+
+        class Result:
+            async def partitions(self):
+                for i in range(0, len(rows), size):
+                    yield rows[i:i + size]
+
+        return Result()
+
+
+ROWS = [_row(1, 10, 100), _row(1, 10, 101), _row(1, 11, 100), _row(2, 12, 102)]
+
+
+class TestGroupLabelRows:
+    """Tests for group_label_rows."""
+
+    def test_groups_by_customer_and_order(self):
+        kunder, total_ordrer = group_label_rows(ROWS)
+
+        assert total_ordrer == 3
+        assert [k["kundeid"] for k in kunder] == [1, 2]
+        assert [[p["produktid"] for p in o["produkter"]] for o in kunder[0]["ordrer"]] == [[100, 101], [100]]
+
+    def test_query_orders_lines_of_an_order_together(self):
+        query, params = build_label_query(datetime(2026, 10, 19), datetime(2026, 10, 19), rute=3)
+
+        assert "k.rute = :rute" in query and params["rute"] == 3
+        assert "sone_id" not in params
+        assert query.rstrip().endswith("k.kundeid, o.leveringsdato, o.ordreid, p.produktnavn")
+
+
+class TestStreamZplLabels:
+    """Tests for streaming ZPL labels."""
+
+    @pytest.mark.asyncio
+    async def test_one_label_per_order_across_partitions(self):
+        chunks = [chunk async for chunk in stream_zpl_labels(StreamingSession(ROWS), "", {})]
+
+        assert len(chunks) == 3
+        assert all(chunk.startswith(b"^XA") and chunk.rstrip().endswith(b"^XZ") for chunk in chunks)
+        assert b"Ordre: 10" in chunks[0] and chunks[0].count(b"x Middag") == 2
+
+    def test_field_data_is_escaped(self):
+        assert escape_zpl_field("A^B~C_D") == "A_5EB_7EC_5FD"
+
+        label = DeliveryLabelZPL().render(
+            {"kundenavn": "Kafé ^XZ"},
+            {"ordreid": 5, "leveringsdato": datetime(2026, 10, 19), "produkter": []},
+        )
+        assert "Kafé _5EXZ" in label
+        assert label.count("^XZ") == 1
+
+    def test_long_orders_are_truncated(self):
+        produkter = [{"produktnavn": f"P{i}", "antall": 1} for i in range(20)]
+        label = DeliveryLabelZPL().render({}, {"ordreid": 5, "produkter": produkter})
+
+        assert label.count("x P") == DeliveryLabelZPL.MAX_PRODUCT_LINES - 1
+        assert "+ 7 flere produkter" in label
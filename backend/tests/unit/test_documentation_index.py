@@ -0,0 +1,83 @@
+"""Unit tests for the documentation index."""
+import os
+
+from app.services.documentation_index import DocumentationIndex
+from app.services.documentation_service import DocumentationService
+
+
+def _write(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class CountingRenderer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return f"<p>{text}</p>"
+
+
+class TestDocumentationIndex:
+    """Tests for DocumentationIndex."""
+
+    def test_listing_and_search(self, tmp_path):
+        _write(tmp_path / "plukking.md", "# Plukking\n\nSlik plukker du ordrer. Plukkliste skrives ut fra ordren.")
+        _write(tmp_path / "guides" / "etiketter.md", "# Etiketter\n\nSkriv ut etiketter for ordrer på Zebra.")
+        index = DocumentationIndex(tmp_path, CountingRenderer(), refresh_seconds=0)
+
+        assert [f["path"] for f in index.list_files()] == ["guides/etiketter.md", "plukking.md"]
+        assert index.list_files()[0]["title"] == "Etiketter"
+
+        results = index.search("zebra etiketter")
+        assert [r["path"] for r in results] == ["guides/etiketter.md"]
+        assert "Zebra" in results[0]["snippet"]
+        assert {r["path"] for r in index.search("ordrer")} == {"plukking.md", "guides/etiketter.md"}
+        assert index.search("finnesikke") == []
+
+    def test_refreshes_only_changed_files(self, tmp_path):
+        doc = tmp_path / "a.md"
+        _write(doc, "# A\n\ngammel tekst", mtime=1_000_000)
+        renderer = CountingRenderer()
+        index = DocumentationIndex(tmp_path, renderer, refresh_seconds=0)
+
+        document = index.get("a.md")
+        index.get_html(document)
+        index.get_html(index.get("a.md"))
+        assert renderer.calls == 1
+        version = index.version
+
+        _write(doc, "# A\n\nny tekst", mtime=2_000_000)
+        assert index.search("gammel") == []
+        assert [r["path"] for r in index.search("ny")] == ["a.md"]
+        assert index.get_html(index.get("a.md")) == "<p># A\n\nny tekst</p>"
+        assert renderer.calls == 2
+        assert index.version == version + 1
+
+        doc.unlink()
+        assert index.list_files() == []
+        assert index.search("ny") == []
+
+    def test_refresh_is_throttled(self, tmp_path):
+        index = DocumentationIndex(tmp_path, CountingRenderer(), refresh_seconds=3600)
+        assert index.list_files() == []
+
+        _write(tmp_path / "new.md", "# New")
+        assert index.list_files() == []
+        assert index.refresh(force=True)
+        assert [f["path"] for f in index.list_files()] == ["new.md"]
+
+
+class TestDocumentationService:
+    """Tests for DocumentationService on top of the index."""
+
+    def test_rejects_traversal(self, tmp_path):
+        _write(tmp_path / "a.md", "# A")
+        service = DocumentationService(str(tmp_path))
+
+        assert service.get_file_content("a.md")["title"] == "A"
+        assert service.get_file_content("../a.md") is None
+        assert service.get_file_content("missing.md") is None
@@ -0,0 +1,93 @@
+"""Unit tests for documentation chatbot retrieval."""
+import pytest
+
+from app.services.documentation_chat_service import DocumentationChatService
+from app.services.documentation_retrieval import BM25Index, DocumentationRetriever, chunk_markdown
+
+GUIDE = """# Guide
+
+## Oppskrifter
+
+### Opprette oppskrift
+Klikk Ny oppskrift og fyll inn navn og porsjoner.
+
+## Etiketter
+Velg mal og skriv ut på Zebra-skriveren.
+
+```bash
+# ikke en overskrift
+```
+"""
+
+
+class FakeAIClient:
+    def __init__(self):
+        self.messages = None
+
+    def is_configured(self):
+        return True
+
+    async def chat_completion(self, messages, **kwargs):
+        self.messages = messages
+        return "svar"
+
+
+class TestChunkMarkdown:
+    """Tests for chunk_markdown."""
+
+    def test_chunks_follow_headings(self):
+        chunks = chunk_markdown(GUIDE, "guide.md")
+
+        assert [c.heading for c in chunks] == [
+            "Guide > Oppskrifter > Opprette oppskrift",
+            "Guide > Etiketter",
+        ]
+        assert "# ikke en overskrift" in chunks[1].text
+
+    def test_long_sections_are_split_at_paragraphs(self):
+        text = "# A\n\n" + "\n\n".join("avsnitt " * 20 for _ in range(10))
+        chunks = chunk_markdown(text, "a.md", max_chars=400)
+
+        assert len(chunks) > 1
+        assert all(len(c.text) <= 400 for c in chunks)
+
+
+class TestBM25Index:
+    """Tests for BM25Index."""
+
+    def test_ranks_matching_chunk_first(self):
+        index = BM25Index(chunk_markdown(GUIDE, "guide.md"))
+
+        results = index.search("skrive ut etiketter zebra", k=2)
+
+        assert results[0][0].heading == "Guide > Etiketter"
+        assert index.search("ukjentord", k=2) == []
+
+
+class TestDocumentationRetriever:
+    """Tests for DocumentationRetriever."""
+
+    def test_rebuilds_when_documents_change(self):
+        docs = {"a.md": "# A\nom plukking"}
+        version = [1]
+        retriever = DocumentationRetriever(
+            GUIDE, documents=lambda: list(docs.items()), version=lambda: version[0]
+        )
+
+        assert retriever.retrieve("fakturering", k=3) == []
+        docs["b.md"] = "# B\nom fakturering"
+        version[0] = 2
+
+        assert [c.source for c in retriever.retrieve("fakturering", k=3)] == ["b.md"]
+
+    @pytest.mark.asyncio
+    async def test_chat_prompt_only_contains_retrieved_chunks(self):
+        client = FakeAIClient()
+        service = DocumentationChatService(ai_client=client, retriever=DocumentationRetriever(GUIDE))
+
+        result = await service.chat("Hvordan skriver jeg ut på Zebra?")
+
+        system_prompt = client.messages[0]["content"]
+        assert result["success"]
+        assert "Zebra-skriveren" in system_prompt
+        assert "porsjoner" not in system_prompt
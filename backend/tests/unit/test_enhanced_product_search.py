@@ -1,6 +1,6 @@
 """Unit tests for EnhancedProductSearchService."""
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 from app.services.enhanced_product_search import EnhancedProductSearchService
 
 
@@ -36,10 +36,7 @@ class TestCalculateRelevanceScore:
     @pytest.fixture
     def service(self):
         """Create service with mocked Redis."""
-        with patch.object(EnhancedProductSearchService, 'init_redis'):
-            svc = EnhancedProductSearchService()
-            svc.redis_client = None
-            return svc
+        return EnhancedProductSearchService(popularity=MagicMock())
 
     def test_exact_name_match(self, service):
         """Test exact name match gets high score."""
@@ -120,16 +117,44 @@ class TestCalculateRelevanceScore:
         assert 0.0 <= score <= 1.0
 
 
+class TestScoreCandidates:
+    """Tests for batch scoring and batch usage lookups."""
+
+    @pytest.fixture
+    def service(self):
+        """Create service with mocked Redis."""
+        return EnhancedProductSearchService(popularity=MagicMock())
+
+    def test_batch_matches_single_scores(self, service):
+        """Test batch scores equal per-product scores, in input order."""
+        products = [
+            MockProduct(name="Helmelk 3.5%", brandname="Tine"),
+            MockProduct(),
+            MockProduct(producername="Tine SA", nutrients=[MockNutrient("FAT", 1)]),
+            MockProduct(name="Grovbrød", gtin="7038010000"),
+        ]
+        scores = service._score_candidates("tine", products)
+        assert scores == [service._calculate_relevance_score("tine", p) for p in products]
+        assert scores[1] == 0.0
+
+    def test_empty_candidates(self, service):
+        """Test no candidates gives no scores."""
+        assert service._score_candidates("melk", []) == []
+
+    def test_popularity_boost_is_bounded(self, service):
+        """Test popular products rank higher, but never above 1.0."""
+        assert service._boost_by_popularity(0.5, 0) == 0.5
+        assert 0.5 < service._boost_by_popularity(0.5, 5) < service._boost_by_popularity(0.5, 50) <= 0.6
+        assert service._boost_by_popularity(0.98, 1000) == 1.0
+
+
 class TestIsNutritionComplete:
     """Tests for _is_nutrition_complete method."""
 
     @pytest.fixture
     def service(self):
         """Create service with mocked Redis."""
-        with patch.object(EnhancedProductSearchService, 'init_redis'):
-            svc = EnhancedProductSearchService()
-            svc.redis_client = None
-            return svc
+        return EnhancedProductSearchService(popularity=MagicMock())
 
     def test_complete_nutrition(self, service):
         """Test with all mandatory nutrients present."""
@@ -182,10 +207,7 @@ class TestExtractUnit:
     @pytest.fixture
     def service(self):
         """Create service with mocked Redis."""
-        with patch.object(EnhancedProductSearchService, 'init_redis'):
-            svc = EnhancedProductSearchService()
-            svc.redis_client = None
-            return svc
+        return EnhancedProductSearchService(popularity=MagicMock())
 
     def test_extract_kg(self, service):
         """Test extracting kg unit."""
@@ -231,10 +253,7 @@ class TestMapAllergenLevel:
     @pytest.fixture
     def service(self):
         """Create service with mocked Redis."""
-        with patch.object(EnhancedProductSearchService, 'init_redis'):
-            svc = EnhancedProductSearchService()
-            svc.redis_client = None
-            return svc
+        return EnhancedProductSearchService(popularity=MagicMock())
 
     def test_free_from(self, service):
         """Test level 0 maps to FREE_FROM."""
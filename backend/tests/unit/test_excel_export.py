@@ -0,0 +1,53 @@
+"""Unit tests for streaming Excel export helpers."""
+from io import BytesIO
+
+import openpyxl
+import pytest
+
+from app.utils.excel_export import build_xlsx, iter_xlsx
+
+
+async def _rows(n):
+    for i in range(n):
+        yield (i, f"navn {i}", None)
+
+
+def _read(data):
+    sheet = openpyxl.load_workbook(BytesIO(data)).active
+    return sheet.title, [list(row) for row in sheet.iter_rows(values_only=True)]
+
+
+class TestIterXlsx:
+    """Tests for iter_xlsx."""
+
+    @pytest.mark.asyncio
+    async def test_header_and_rows(self):
+        chunks = [chunk async for chunk in iter_xlsx(_rows(2), ["ID", "Navn", "Tom"], sheet_name="Kunder")]
+        title, rows = _read(b"".join(chunks))
+        assert title == "Kunder"
+        assert rows == [["ID", "Navn", "Tom"], [0, "navn 0", None], [1, "navn 1", None]]
+
+    @pytest.mark.asyncio
+    async def test_format_row_and_batches(self):
+        chunks = [
+            chunk async for chunk in iter_xlsx(
+                _rows(2500),
+                ["ID", "Navn", "Tom"],
+                format_row=lambda row: [row[0], row[1].upper(), row[2] or ""],
+                batch_size=1000,
+                chunk_size=1024,
+            )
+        ]
+        assert len(chunks) > 1
+        _title, rows = _read(b"".join(chunks))
+        assert len(rows) == 2501
+        assert rows[-1] == [2499, "NAVN 2499", None]
+
+
+class TestBuildXlsx:
+    """Tests for build_xlsx."""
+
+    def test_in_memory_rows(self):
+        title, rows = _read(build_xlsx(["A", "B"], [[1, "x"], [2, "y"]], sheet_name="Ark"))
+        assert title == "Ark"
+        assert rows == [["A", "B"], [1, "x"], [2, "y"]]
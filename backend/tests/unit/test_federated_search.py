@@ -0,0 +1,91 @@
+"""Unit tests for the concurrent federated product search."""
+import asyncio
+import json
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.federated_search import ProviderOutcome, SearchProvider, merge_by_gtin, run_providers
+
+
+def _provider(name, items, delay=0.0, error=None, cache_key=None):
+    async def search():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return items
+    return SearchProvider(name, search, cache_key=cache_key)
+
+
+@pytest.fixture(autouse=True)
+def no_redis():
+    with patch("app.services.federated_search.cache_get", AsyncMock(return_value=None)), \
+            patch("app.services.federated_search.cache_set", AsyncMock(return_value=False)):
+        yield
+
+
+class TestRunProviders:
+    """Tests for run_providers."""
+
+    @pytest.mark.asyncio
+    async def test_providers_run_concurrently(self):
+        start = time.perf_counter()
+        outcomes = await run_providers(
+            [_provider("a", [{"gtin": "1"}], delay=0.1), _provider("b", [{"gtin": "2"}], delay=0.1)],
+            deadline=1.0,
+        )
+        assert time.perf_counter() - start < 0.19
+        assert [o.status for o in outcomes] == ["ok", "ok"]
+
+    @pytest.mark.asyncio
+    async def test_late_provider_is_left_out(self):
+        outcomes = await run_providers(
+            [_provider("fast", [{"gtin": "1"}]), _provider("slow", [{"gtin": "2"}], delay=1.0)],
+            deadline=0.05,
+        )
+        assert outcomes[0].items == [{"gtin": "1"}]
+        assert outcomes[1].status == "timeout"
+        assert outcomes[1].items == []
+
+    @pytest.mark.asyncio
+    async def test_failing_provider_is_reported(self):
+        outcomes = await run_providers([_provider("broken", [], error=ValueError("nede"))], deadline=1.0)
+        assert outcomes[0].status == "error"
+        assert outcomes[0].error == "nede"
+        assert not outcomes[0].succeeded
+
+    @pytest.mark.asyncio
+    async def test_cached_results_skip_provider(self):
+        provider = SearchProvider("ngdata", AsyncMock(), cache_key="k")
+        with patch("app.services.federated_search.cache_get", AsyncMock(return_value=json.dumps([{"gtin": "9"}]))):
+            outcomes = await run_providers([provider], deadline=1.0)
+        assert outcomes[0].status == "cached"
+        assert outcomes[0].items == [{"gtin": "9"}]
+        provider.search.assert_not_called()
+
+
+class TestMergeByGtin:
+    """Tests for merge_by_gtin."""
+
+    def test_higher_priority_wins_duplicates(self):
+        merged = merge_by_gtin(
+            [
+                ProviderOutcome("matinfo", [{"gtin": "7038010000010", "source": "matinfo"}]),
+                ProviderOutcome("ngdata", [{"gtin": "07038010000010"}, {"gtin": "7038010000027"}]),
+            ],
+            limit=10,
+        )
+        assert merged["matinfo"] == [{"gtin": "7038010000010", "source": "matinfo"}]
+        assert merged["ngdata"] == [{"gtin": "7038010000027"}]
+
+    def test_total_capped_in_priority_order(self):
+        merged = merge_by_gtin(
+            [
+                ProviderOutcome("a", [{"gtin": "1"}, {"gtin": "2"}]),
+                ProviderOutcome("b", [{"gtin": "3"}, {"gtin": "4"}]),
+            ],
+            limit=3,
+        )
+        assert len(merged["a"]) == 2
+        assert merged["b"] == [{"gtin": "3"}]
@@ -0,0 +1,104 @@
+"""Unit tests for log table partition helpers."""
+from datetime import date, datetime
+
+import pytest
+
+from app.services.log_partition_service import (
+    LogPartitionService,
+    add_months,
+    default_partition_name,
+    month_start,
+    partition_name,
+)
+
+
+class _Result:
+    def __init__(self, value=None, rows=()):
+        self.value = value
+        self.rows = rows
+
+    def scalar(self):
+        return self.value
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class _RecordingDb:
+    """Records SQL and answers to_regclass lookups from a set of existing tables."""
+
+    def __init__(self, existing=(), default_months=()):
+        self.existing = set(existing)
+        self.default_months = default_months
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        if "to_regclass(:name) IS NOT NULL" in sql:
+            return _Result(params["name"] in self.existing)
+        if "date_trunc" in sql:
+            return _Result(rows=[(month,) for month in self.default_months])
+        return _Result()
+
+
+class TestPartitionHelpers:
+    """Tests for month arithmetic and naming."""
+
+    def test_month_start(self):
+        assert month_start(datetime(2026, 3, 17, 12, 30)) == date(2026, 3, 1)
+
+    def test_add_months_within_year(self):
+        assert add_months(date(2026, 3, 1), 2) == date(2026, 5, 1)
+
+    def test_add_months_across_year(self):
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+
+    def test_add_months_negative(self):
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name(self):
+        assert partition_name("activity_logs", date(2026, 4, 1)) == "activity_logs_y2026m04"
+
+    def test_default_partition_name(self):
+        assert default_partition_name("app_logs") == "app_logs_default"
+
+
+class TestPartitionService:
+    """Tests for LogPartitionService."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_table(self):
+        service = LogPartitionService(db=None)
+        with pytest.raises(ValueError):
+            await service.create_partition("users", date(2026, 1, 1))
+
+    @pytest.mark.asyncio
+    async def test_create_partition_without_default(self):
+        db = _RecordingDb()
+        await LogPartitionService(db).create_partition("app_logs", date(2026, 4, 1))
+        assert any("PARTITION OF app_logs FOR VALUES" in sql for sql in db.statements)
+
+    @pytest.mark.asyncio
+    async def test_create_partition_moves_rows_out_of_default(self):
+        db = _RecordingDb(existing={"app_logs_default"})
+        await LogPartitionService(db).create_partition("app_logs", date(2026, 4, 1))
+        ddl = [sql for sql in db.statements if "to_regclass" not in sql and "advisory" not in sql]
+        assert ddl[0].startswith("CREATE TABLE app_logs_y2026m04 (LIKE app_logs")
+        assert ddl[1].startswith("INSERT INTO app_logs_y2026m04 SELECT * FROM app_logs_default")
+        assert ddl[2].startswith("DELETE FROM app_logs_default")
+        assert ddl[3].startswith("ALTER TABLE app_logs ATTACH PARTITION app_logs_y2026m04")
+
+    @pytest.mark.asyncio
+    async def test_create_partition_skips_existing(self):
+        db = _RecordingDb(existing={"app_logs_y2026m04"})
+        await LogPartitionService(db).create_partition("app_logs", date(2026, 4, 1))
+        assert not any(sql.startswith("CREATE") for sql in db.statements)
+
+    @pytest.mark.asyncio
+    async def test_ensure_partitions_covers_months_in_default(self):
+        db = _RecordingDb(existing={"app_logs_default"}, default_months=[date(2026, 1, 1)])
+        names = await LogPartitionService(db).ensure_partitions(
+            "app_logs", months_ahead=1, from_date=date(2026, 4, 1)
+        )
+        assert names == ["app_logs_y2026m01", "app_logs_y2026m04", "app_logs_y2026m05"]
@@ -0,0 +1,70 @@
+"""Unit tests for log statistics rollup helpers."""
+import pytest
+from sqlalchemy import Select
+
+from app.services.app_log_service import AppLogService
+from app.services.log_stats_rollup_service import (
+    RESPONSE_TIME_BUCKETS_MS,
+    histogram_percentile,
+)
+
+
+def _histogram(**counts_by_bucket_index):
+    histogram = [0] * (len(RESPONSE_TIME_BUCKETS_MS) + 1)
+    for index, count in counts_by_bucket_index.items():
+        histogram[int(index[1:])] = count
+    return histogram
+
+
+class TestHistogramPercentile:
+    """Tests for histogram_percentile."""
+
+    def test_empty_histogram(self):
+        assert histogram_percentile(_histogram(), 0.5) == 0.0
+
+    def test_single_bucket_interpolates(self):
+        # All requests between 50 and 100 ms
+        histogram = _histogram(b4=100)
+        assert histogram_percentile(histogram, 0.5) == 75.0
+        assert histogram_percentile(histogram, 0.95) == 97.5
+
+    def test_p95_lands_in_slow_bucket(self):
+        # 90 fast requests (<5 ms), 10 slow requests (1000-2500 ms)
+        histogram = _histogram(b0=90, b8=10)
+        assert histogram_percentile(histogram, 0.5) < 5
+        assert 1000 <= histogram_percentile(histogram, 0.95) <= 2500
+
+    def test_open_ended_last_bucket(self):
+        histogram = _histogram(b11=4)
+        value = histogram_percentile(histogram, 0.5)
+        assert RESPONSE_TIME_BUCKETS_MS[-1] <= value <= RESPONSE_TIME_BUCKETS_MS[-1] * 2
+
+
+class _ReadOnlySession:
+    """Session stub that answers every query with no rows and refuses writes."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self
+
+    def all(self):
+        return []
+
+    async def commit(self):
+        raise AssertionError("stats must not commit")
+
+
+class TestStatsAreReadOnly:
+    """The stats endpoints run on the replica, so they must only SELECT."""
+
+    @pytest.mark.asyncio
+    async def test_app_log_stats_only_select(self):
+        session = _ReadOnlySession()
+        stats = await AppLogService(session).get_stats(days=7)
+
+        assert stats.total_logs == 0
+        assert session.statements
+        assert all(isinstance(statement, Select) for statement in session.statements)
@@ -0,0 +1,74 @@
+"""Unit tests for the ranked Matinfo search helpers."""
+import pytest
+from unittest.mock import AsyncMock
+
+from app.models.matinfo_products import MatinfoProduct
+from app.services.matinfo_search import (
+    SEARCH_INGREDIENT_CHARS,
+    build_search_document,
+    normalize_search_text,
+    rank_matinfo_products,
+    refresh_search_document,
+)
+
+
+class TestNormalizeSearchText:
+    """Tests for normalize_search_text."""
+
+    def test_lowercases_and_collapses_punctuation(self):
+        assert normalize_search_text("  TINE® Helmelk, 1.0L ") == "tine helmelk 1 0l"
+
+    def test_keeps_norwegian_letters(self):
+        assert normalize_search_text("Røkt LAKS fra Ålesund") == "røkt laks fra ålesund"
+
+    def test_underscores_are_separators(self):
+        assert normalize_search_text("grov_brød") == "grov brød"
+
+
+class TestBuildSearchDocument:
+    """Tests for build_search_document."""
+
+    def test_combines_fields_in_order(self):
+        document = build_search_document({
+            "name": "Helmelk",
+            "brandname": "Tine",
+            "producername": "Tine SA",
+            "ingredientstatement": "Melk (100%)",
+        })
+        assert document == "helmelk tine tine sa melk 100"
+
+    def test_missing_fields(self):
+        assert build_search_document({"name": "Smør", "brandname": None}) == "smør"
+
+    def test_truncates_ingredients(self):
+        document = build_search_document({"name": "X", "ingredientstatement": "a" * (SEARCH_INGREDIENT_CHARS + 100)})
+        assert len(document) == len("x ") + SEARCH_INGREDIENT_CHARS
+
+    def test_refresh_follows_edited_columns(self):
+        product = MatinfoProduct(name="Helmelk", brandname="Tine")
+        refresh_search_document(product)
+        assert product.search_document == "helmelk tine"
+
+        product.name = "Lettmelk"
+        refresh_search_document(product)
+        assert product.search_document == "lettmelk tine"
+
+
+class TestRankMatinfoProducts:
+    """Tests for rank_matinfo_products."""
+
+    @pytest.mark.asyncio
+    async def test_blank_query_skips_database(self):
+        db = AsyncMock()
+        assert await rank_matinfo_products(db, " ,. ", 10) == []
+        db.execute.assert_not_called()
+
+
+class TestSearchColumns:
+    """The model must not write the generated search_vector column."""
+
+    def test_search_vector_is_computed(self):
+        column = MatinfoProduct.__table__.c.search_vector
+        assert column.computed is not None
+        assert column.computed.persisted is True
+        assert "norwegian" in str(column.computed.sqltext)
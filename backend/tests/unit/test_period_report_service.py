@@ -0,0 +1,85 @@
+"""Unit tests for the period menu report data builder."""
+import io
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from openpyxl import load_workbook
+
+from app.services.period_report_service import build_period_report, create_period_menu_excel
+
+
+def _menu(menyid, group_id, products=()):
+    return SimpleNamespace(
+        menyid=menyid,
+        beskrivelse=f"Meny {menyid}",
+        menygruppe=group_id,
+        gruppe=SimpleNamespace(menygruppeid=group_id, beskrivelse=f"Gruppe {group_id}"),
+        meny_produkter=[SimpleNamespace(produkt=product) for product in products],
+    )
+
+
+def _customer(kundeid, group_id):
+    return SimpleNamespace(
+        kundeid=kundeid, kundenavn=f"Kunde {kundeid}", adresse=None, postnr=None,
+        sted=None, telefonnummer=None, e_post=None, menygruppeid=float(group_id),
+    )
+
+
+class FakeSession:
+    """Returns the period, its menus and customer rows in query order."""
+
+    def __init__(self, periode, menus, customers):
+        self.periode = periode
+        self.results = [
+            SimpleNamespace(scalars=lambda: SimpleNamespace(
+                all=lambda: [SimpleNamespace(meny=menu) for menu in menus]
+            )),
+            customers,
+        ]
+        self.executed = 0
+
+    async def scalar(self, statement):
+        return self.periode
+
+    async def execute(self, statement):
+        self.executed += 1
+        return self.results.pop(0)
+
+
+PERIODE = SimpleNamespace(ukenr=42, fradato=datetime(2026, 10, 12), tildato=datetime(2026, 10, 18))
+
+
+class TestBuildPeriodReport:
+    """Tests for build_period_report."""
+
+    @pytest.mark.asyncio
+    async def test_loads_customers_once_for_shared_groups(self):
+        product = SimpleNamespace(produktid=7, produktnavn="Suppe", pakningstype="stk", pris=Decimal("12.50"))
+        menus = [_menu(1, 3, [product]), _menu(2, 3), _menu(3, 4)]
+        db = FakeSession(PERIODE, menus, [_customer(10, 3), _customer(11, 4), _customer(12, 3)])
+
+        data = await build_period_report(db, periode_id=1)
+
+        # One menu query and one customer query, however many menus
+        assert db.executed == 2
+        assert [c["kundeid"] for c in data.entries[0].customers] == [10, 12]
+        assert data.entries[0].customers is data.entries[1].customers
+        assert [c["kundeid"] for c in data.entries[2].customers] == [11]
+        assert data.entries[0].as_dict(float_prices=True)["products"][0]["pris"] == 12.5
+        assert data.period_header() == {"ukenr": 42, "fradato": "12.10.2026", "tildato": "18.10.2026"}
+
+    @pytest.mark.asyncio
+    async def test_missing_period(self):
+        assert await build_period_report(FakeSession(None, [], []), periode_id=1) is None
+
+    @pytest.mark.asyncio
+    async def test_excel_lists_each_group_once(self):
+        menus = [_menu(1, 3), _menu(2, 3)]
+        data = await build_period_report(FakeSession(PERIODE, menus, [_customer(10, 3)]), periode_id=1)
+
+        workbook = load_workbook(io.BytesIO(create_period_menu_excel(data)))
+
+        customer_rows = list(workbook["Kunder"].iter_rows(min_row=2, values_only=True))
+        assert customer_rows == [("Gruppe 3", 10, "Kunde 10", None, None, None, None, None)]
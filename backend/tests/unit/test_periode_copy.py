@@ -0,0 +1,53 @@
+"""Unit tests for set-based period copying in PeriodeViewService."""
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.periode_view_service import PeriodeViewService
+
+
+class RecordingSession:
+    """Collects executed statements and returns canned results."""
+
+    def __init__(self, one=(0, 0), rows=()):
+        self.statements = []
+        self._one = one
+        self._rows = list(rows)
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        session = self
+
+        class Result:
+            def one(self):
+                return session._one
+
+            def all(self):
+                return session._rows
+
+        return Result()
+
+
+class TestKopierMenyer:
+    """Tests for the INSERT ... SELECT period copy."""
+
+    @pytest.mark.asyncio
+    async def test_copies_menus_links_and_products_in_one_statement(self):
+        db = RecordingSession(one=(60, 1500))
+
+        result = await PeriodeViewService()._kopier_menyer(db, kilde_periode_id=1, ny_periode_id=2)
+
+        assert result == (60, 1500)
+        assert len(db.statements) == 1
+        sql = db.statements[0]
+        assert "nextval" in sql
+        for table in ("tblmeny", "tblperiodemeny", "tblmenyprodukt"):
+            assert f"INSERT INTO {table}" in sql
+
+    @pytest.mark.asyncio
+    async def test_link_skips_existing_assignments(self):
+        db = RecordingSession(rows=[(10,), (11,)])
+
+        linked = await PeriodeViewService().link_periode_menyer(db, kilde_periode_id=1, mal_periode_id=2)
+
+        assert linked == 2
+        assert "ON CONFLICT (periodeid, menyid) DO NOTHING" in db.statements[0]
@@ -0,0 +1,129 @@
+"""Unit tests for the pick list scanning pipeline."""
+import asyncio
+import base64
+import io
+import json
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services import pick_list_scanner_service as scanner_module
+from app.services.pick_list_scanner_service import PickListScannerService, prepare_scan_image
+
+ORDER_LINES = [
+    {"produktid": 1, "unik": 1, "produktnavn": "Melk", "antall": 4},
+    {"produktid": 2, "unik": 1, "produktnavn": "Brød", "antall": 2},
+]
+
+
+def _photo(size=(2400, 1800), sheet=(400, 200, 2000, 1600)) -> bytes:
+    """A dark table with a white sheet of paper on it."""
+    image = Image.new("RGB", size, (40, 35, 30))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle(sheet, fill=(245, 245, 240))
+    draw.text((sheet[0] + 50, sheet[1] + 50), "Melk 4", fill=(0, 0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class FakeAIClient:
+    def __init__(self, response="", delay=0.0):
+        self.response = response
+        self.delay = delay
+        self.calls = []
+
+    async def chat_completion(self, messages, **kwargs):
+        self.calls.append(messages)
+        await asyncio.sleep(self.delay)
+        return self.response
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    store = {}
+
+    async def cache_get(key):
+        return store.get(key)
+
+    async def cache_set(key, value, ttl=None):
+        store[key] = value
+        return True
+
+    monkeypatch.setattr(scanner_module, "cache_get", cache_get)
+    monkeypatch.setattr(scanner_module, "cache_set", cache_set)
+    return store
+
+
+class TestPrepareScanImage:
+    """Tests for prepare_scan_image."""
+
+    def test_crops_to_sheet_downscales_and_grayscales(self):
+        prepared = Image.open(io.BytesIO(base64.b64decode(prepare_scan_image(_photo(), max_side=800))))
+
+        assert prepared.mode == "L"
+        assert max(prepared.size) == 800
+        # Sheet is 1600x1400, so the aspect ratio follows the sheet, not the photo
+        assert abs(prepared.width / prepared.height - 1600 / 1400) < 0.05
+
+    def test_keeps_whole_image_without_a_sheet(self):
+        image = Image.new("RGB", (1000, 500), (128, 128, 128))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+
+        prepared = Image.open(io.BytesIO(base64.b64decode(prepare_scan_image(buffer.getvalue(), max_side=400))))
+
+        assert prepared.size == (400, 200)
+
+
+class TestAnalyzePickListImage:
+    """Tests for PickListScannerService.analyze_pick_list_image."""
+
+    @pytest.mark.asyncio
+    async def test_result_is_cached_by_image_hash(self, memory_cache):
+        client = FakeAIClient(json.dumps({"lines": [{"produktid": 1, "unik": 1, "plukket_antall": 3}], "confidence": 0.9}))
+        service = PickListScannerService(client=client)
+        image = base64.b64encode(_photo()).decode()
+
+        first = await service.analyze_pick_list_image(image, ORDER_LINES)
+        second = await service.analyze_pick_list_image(f"data:image/jpeg;base64,{image}", ORDER_LINES)
+
+        assert first["lines"] == [
+            {"produktid": 1, "unik": 1, "plukket_antall": 3.0},
+            {"produktid": 2, "unik": 1, "plukket_antall": 2.0},
+        ]
+        assert second == first
+        assert len(client.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_unparsable_answer_is_not_cached(self, memory_cache):
+        client = FakeAIClient("Beklager, jeg kan ikke lese arket.")
+        service = PickListScannerService(client=client)
+        image = base64.b64encode(_photo()).decode()
+
+        first = await service.analyze_pick_list_image(image, ORDER_LINES)
+        await service.analyze_pick_list_image(image, ORDER_LINES)
+
+        assert first["confidence"] == 0.3
+        assert [line["plukket_antall"] for line in first["lines"]] == [4.0, 2.0]
+        assert not memory_cache
+        assert len(client.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, memory_cache, monkeypatch):
+        monkeypatch.setattr(scanner_module.settings, "AI_VISION_TIMEOUT_SECONDS", 0.01)
+        service = PickListScannerService(client=FakeAIClient("{}", delay=1))
+
+        result = await service.analyze_pick_list_image(base64.b64encode(_photo()).decode(), ORDER_LINES)
+
+        assert result["success"] is False
+        assert not memory_cache
+
+    @pytest.mark.asyncio
+    async def test_invalid_image(self, memory_cache):
+        service = PickListScannerService(client=FakeAIClient())
+
+        result = await service.analyze_pick_list_image(base64.b64encode(b"not an image").decode(), ORDER_LINES)
+
+        assert result["success"] is False
+        assert result["error"].startswith("Ugyldig bilde")
@@ -0,0 +1,85 @@
+"""Unit tests for picking stats and live status events."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.plukking import get_plukking_stats
+from app.services import picking_events as picking_events_module
+from app.services.picking_events import PickingEventBroker, format_sse
+
+
+class RecordingSession:
+    """Collects executed statements and returns one canned row."""
+
+    def __init__(self, row):
+        self.statements = []
+        self._row = row
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(one=lambda: self._row)
+
+
+class TestPlukkingStats:
+    """Tests for get_plukking_stats."""
+
+    @pytest.mark.asyncio
+    async def test_counts_in_one_query(self):
+        db = RecordingSession(SimpleNamespace(total=12, klar_til_plukking=5, plukket=None))
+
+        stats = await get_plukking_stats(
+            kundegruppe_id=3, leveringsdato_fra=None, leveringsdato_til=None, db=db, current_user=None
+        )
+
+        assert (stats.total_ordrer, stats.klar_til_plukking, stats.plukket) == (12, 5, 0)
+        assert len(db.statements) == 1
+        assert db.statements[0].count("FILTER (WHERE") == 2
+
+
+class TestPickingEventBroker:
+    """Tests for PickingEventBroker without Redis."""
+
+    @pytest.fixture(autouse=True)
+    def no_redis(self, monkeypatch):
+        async def get_redis():
+            return None
+        monkeypatch.setattr(picking_events_module, "get_redis", get_redis)
+
+    @pytest.mark.asyncio
+    async def test_subscribers_receive_published_events(self):
+        broker = PickingEventBroker()
+        stream = broker.subscribe()
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+
+        await broker.publish([1, 2], 30)
+
+        event = await asyncio.wait_for(first, timeout=1)
+        assert event["type"] == "status_changed"
+        assert event["ordre_ids"] == [1, 2]
+        await stream.aclose()
+        assert not broker._subscribers
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest(self, monkeypatch):
+        monkeypatch.setattr(picking_events_module, "SUBSCRIBER_QUEUE_SIZE", 2)
+        broker = PickingEventBroker()
+        stream = broker.subscribe()
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        await broker.publish([1], 25)
+        await first
+
+        for ordre_id in (2, 3, 4):
+            await broker.publish([ordre_id], 25)
+
+        assert [(await stream.__anext__())["ordre_ids"] for _ in range(2)] == [[3], [4]]
+        await stream.aclose()
+
+    def test_format_sse(self):
+        assert format_sse(None) == ": keep-alive\n\n"
+        frame = format_sse({"type": "status_changed", "ordre_ids": [1]})
+        assert frame.startswith("event: status_changed\ndata: {")
+        assert frame.endswith("\n\n")
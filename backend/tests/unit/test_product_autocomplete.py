@@ -0,0 +1,77 @@
+"""Unit tests for the in-memory product autocomplete index."""
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.product_autocomplete import ProductAutocompleteIndex, build_snapshot
+
+
+ROWS = [
+    ("Helmelk 1L", "7038010000010"),
+    ("Lettmelk 1L", "7038010000027"),
+    ("Helmelk 1,75L", "7038010000034"),
+    ("HELMELK  1L", "07038010000010"),
+    ("Hvetemel", None),
+    (None, "7038010000041"),
+    ("   ", None),
+]
+
+
+def _index(rows=ROWS) -> ProductAutocompleteIndex:
+    index = ProductAutocompleteIndex(refresh_seconds=300)
+    index._snapshot = build_snapshot(rows)
+    return index
+
+
+class TestBuildSnapshot:
+    """Tests for build_snapshot."""
+
+    def test_sorted_and_deduplicated(self):
+        snapshot = build_snapshot(ROWS)
+        assert snapshot.keys == sorted(snapshot.keys)
+        assert snapshot.keys.count("helmelk 1l") == 1
+        assert "" not in snapshot.keys
+
+    def test_duplicate_names_share_gtins(self):
+        snapshot = build_snapshot(ROWS)
+        i = snapshot.keys.index("helmelk 1l")
+        assert snapshot.names[i] == "Helmelk 1L"
+        assert len(snapshot.gtins[i]) == 1
+
+
+class TestLookup:
+    """Tests for prefix lookups."""
+
+    def test_prefix_matches_only(self):
+        assert _index().lookup("helm") == ["Helmelk 1L", "Helmelk 1,75L"]
+
+    def test_case_and_spacing_insensitive(self):
+        assert _index().lookup("  HVE") == ["Hvetemel"]
+
+    def test_limit(self):
+        assert len(_index().lookup("h", limit=1)) == 1
+
+    def test_no_match(self):
+        assert _index().lookup("ost") == []
+
+    def test_recorded_use_ranks_first(self):
+        index = _index()
+        index.record_use("7038010000034")
+        assert index.lookup("helm")[0] == "Helmelk 1,75L"
+
+
+class TestSuggest:
+    """Tests for building on demand."""
+
+    @pytest.mark.asyncio
+    async def test_first_call_builds_once(self):
+        index = ProductAutocompleteIndex(refresh_seconds=300)
+
+        async def fake_refresh(force=True):
+            index._snapshot = build_snapshot(ROWS)
+            index._built_at = 0.0
+
+        with patch.object(index, "refresh", AsyncMock(side_effect=fake_refresh)) as refresh, \
+                patch("app.services.product_autocomplete.time.monotonic", return_value=1.0):
+            assert await index.suggest("lett") == ["Lettmelk 1L"]
+            assert await index.suggest("helm") == ["Helmelk 1L", "Helmelk 1,75L"]
+        refresh.assert_awaited_once()
@@ -0,0 +1,172 @@
+"""Unit tests for the streaming product export."""
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from app.models.matinfo_products import MatinfoProduct
+from app.services.product_export import PRODUCT_IDS_FILE, ProductExporter, render_shard
+
+
+def _row(n, updated="2026-10-01T12:00:00"):
+    return {
+        "id": f"id{n:04d}",
+        "gtin": f"70{n:011d}",
+        "name": f"Produkt {n}",
+        "producername": "Tine SA",
+        "ingredientstatement": "<b>Melk</b>",
+        "brandname": "Tine",
+        "itemnumber": None,
+        "providername": None,
+        "updated": updated,
+    }
+
+
+def _session(watermark, count, product_ids=None):
+    session = MagicMock()
+    max_result, ids_result, count_result = MagicMock(), MagicMock(), MagicMock()
+    max_result.scalar.return_value = watermark
+    ids_result.all.return_value = list((product_ids or {}).items())
+    count_result.scalar.return_value = count
+    session.execute = AsyncMock(side_effect=[max_result, ids_result, count_result])
+    return session
+
+
+def _exporter(tmp_path, shards):
+    exporter = ProductExporter(export_dir=str(tmp_path), workers=2)
+    exporter._create_executor = lambda: ThreadPoolExecutor(max_workers=2)
+
+    async def stream(session, since, until):
+        exporter.streamed_with = (since, until)
+        for rows in shards:
+            yield rows
+
+    exporter._stream_shards = stream
+    return exporter
+
+
+class TestRenderShard:
+    """Tests for render_shard."""
+
+    def test_jsonl_lines(self):
+        lines = render_shard("jsonl", [_row(1), _row(2)], True, False).decode().splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["Produkt 1", "Produkt 2"]
+        assert json.loads(lines[0])["search_text"] == "Produkt: Produkt 1 | Merke: Tine | Produsent: Tine SA | Ingredienser: Melk"
+
+    def test_json_shards_concatenate_to_one_document(self):
+        members = [
+            render_shard("json", [_row(1), _row(2)], True, True),
+            render_shard("json", [_row(3)], False, True),
+            gzip.compress(b"\n]\n"),
+        ]
+        products = json.loads(gzip.decompress(b"".join(members)))
+        assert [product["gtin"] for product in products] == [_row(n)["gtin"] for n in (1, 2, 3)]
+
+    def test_markdown_sections(self):
+        text = render_shard("markdown", [_row(1), _row(2)], True, False).decode()
+        assert text.count("## Produkt") == 2
+        assert "**Ingredienser:** **Melk**" in text
+
+
+class TestFilters:
+    """The watermark bounds only apply to incremental exports."""
+
+    def _exported_ids(self, tmp_path, since, until):
+        engine = create_engine("sqlite://")
+        with engine.connect() as conn:
+            conn.execute(text("CREATE TABLE matinfo_products (id TEXT, updated TEXT)"))
+            conn.execute(
+                text("INSERT INTO matinfo_products VALUES ('a', '2026-10-01T12:00:00'), ('b', NULL), "
+                     "('c', '2026-10-03T08:00:00')")
+            )
+            filters = ProductExporter(export_dir=str(tmp_path))._filters(since, until)
+            stmt = select(MatinfoProduct.id).where(*filters).order_by(MatinfoProduct.id)
+            return conn.execute(stmt).scalars().all()
+
+    def test_full_export_includes_products_without_updated(self, tmp_path):
+        assert self._exported_ids(tmp_path, None, "2026-10-01T12:00:00") == ["a", "b", "c"]
+
+    def test_incremental_export_between_watermarks(self, tmp_path):
+        assert self._exported_ids(tmp_path, "2026-10-01T12:00:00", "2026-10-03T08:00:00") == ["c"]
+
+
+class TestExportProducts:
+    """Tests for ProductExporter.export_products."""
+
+    @pytest.mark.asyncio
+    async def test_writes_one_compressed_file_per_shard(self, tmp_path):
+        exporter = _exporter(tmp_path, [[_row(1), _row(2)], [_row(3)]])
+
+        with patch.object(exporter, "_create_rag_context_files", AsyncMock()):
+            result = await exporter.export_products(_session("2026-10-01T12:00:00", 3), format="jsonl")
+
+        assert result["success"] is True
+        assert result["files_created"] == 2
+        assert result["total_products"] == 3
+        export_dir = tmp_path / result["timestamp"]
+        second = gzip.decompress((export_dir / "products_0002.jsonl.gz").read_bytes()).decode()
+        assert json.loads(second)["name"] == "Produkt 3"
+        metadata = json.loads((export_dir / "export_metadata.json").read_text())
+        assert metadata["watermark"] == "2026-10-01T12:00:00"
+        assert metadata["incremental"] is False
+
+    @pytest.mark.asyncio
+    async def test_json_export_is_one_document(self, tmp_path):
+        exporter = _exporter(tmp_path, [[_row(1)], [_row(2)], [_row(3)]])
+
+        with patch.object(exporter, "_create_rag_context_files", AsyncMock()):
+            result = await exporter.export_products(_session(None, 3), format="json", compress=False)
+
+        products = json.loads((tmp_path / result["timestamp"] / "products.json").read_text())
+        assert [product["name"] for product in products] == ["Produkt 1", "Produkt 2", "Produkt 3"]
+
+    @pytest.mark.asyncio
+    async def test_incremental_starts_at_previous_watermark(self, tmp_path):
+        previous = tmp_path / "20261001_000000"
+        previous.mkdir()
+        (previous / "export_metadata.json").write_text(json.dumps({"watermark": "2026-10-01T12:00:00"}))
+        exporter = _exporter(tmp_path, [[_row(4, updated="2026-10-02T08:00:00")]])
+
+        with patch.object(exporter, "_create_rag_context_files", AsyncMock()):
+            result = await exporter.export_products(_session("2026-10-02T08:00:00", 1), incremental=True)
+
+        assert exporter.streamed_with == ("2026-10-01T12:00:00", "2026-10-02T08:00:00")
+        metadata = json.loads((tmp_path / result["timestamp"] / "export_metadata.json").read_text())
+        assert metadata["since"] == "2026-10-01T12:00:00"
+        assert metadata["incremental"] is True
+
+    @pytest.mark.asyncio
+    async def test_incremental_lists_deleted_products(self, tmp_path):
+        previous = tmp_path / "20261001_000000"
+        previous.mkdir()
+        (previous / "export_metadata.json").write_text(json.dumps({"watermark": "2026-10-01T12:00:00"}))
+        (previous / PRODUCT_IDS_FILE).write_bytes(
+            gzip.compress(json.dumps({"id0001": "7000000000001", "id0009": "7000000000009"}).encode())
+        )
+        exporter = _exporter(tmp_path, [])
+
+        with patch.object(exporter, "_create_rag_context_files", AsyncMock()):
+            result = await exporter.export_products(
+                _session("2026-10-01T12:00:00", 0, {"id0001": "7000000000001"}),
+                format="json",
+                incremental=True,
+                compress=False,
+            )
+
+        assert result["products_deleted"] == 1
+        export_dir = tmp_path / result["timestamp"]
+        metadata = json.loads((export_dir / "export_metadata.json").read_text())
+        assert metadata["deleted"] == [{"id": "id0009", "gtin": "7000000000009"}]
+        assert json.loads((export_dir / "products.json").read_text()) == []
+        saved = json.loads(gzip.decompress((export_dir / PRODUCT_IDS_FILE).read_bytes()))
+        assert saved == {"id0001": "7000000000001"}
+
+    @pytest.mark.asyncio
+    async def test_nothing_changed(self, tmp_path):
+        exporter = _exporter(tmp_path, [])
+        result = await exporter.export_products(_session("2026-10-01T12:00:00", 0), incremental=True)
+        assert result["success"] is True
+        assert result["total_products"] == 0
@@ -0,0 +1,112 @@
+"""Unit tests for decaying product and search popularity."""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.product_popularity import (
+    EPOCH,
+    PRODUCT_LAST_USED,
+    PRODUCTS,
+    REBASE_HALF_LIVES,
+    ProductPopularity,
+)
+
+
+def _pipeline(results=None):
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=results or [])
+    pipe.__aenter__ = AsyncMock(return_value=pipe)
+    pipe.__aexit__ = AsyncMock(return_value=False)
+    return pipe
+
+
+def _redis_with_pipeline(results=None):
+    """Redis mock whose transactions (generation merges) use a separate pipeline."""
+    pipe, rebase = _pipeline(results), _pipeline()
+    redis_client = MagicMock()
+    redis_client.pipeline.side_effect = lambda transaction=True: rebase if transaction else pipe
+    redis_client.rebase = rebase
+    return redis_client, pipe
+
+
+class TestDecay:
+    """Tests for forward-decay weights."""
+
+    def test_weight_doubles_every_half_life(self):
+        popularity = ProductPopularity(half_life_days=7, max_members=100)
+        week = 7 * 86400
+        assert popularity.weight(EPOCH) == 1.0
+        assert popularity.weight(EPOCH + week) == pytest.approx(2.0)
+
+    def test_old_use_counts_half_after_half_life(self):
+        popularity = ProductPopularity(half_life_days=7, max_members=100)
+        score = popularity.weight(EPOCH + 86400)
+        assert popularity.decayed(score, EPOCH + 86400) == pytest.approx(1.0)
+        assert popularity.decayed(score, EPOCH + 8 * 86400) == pytest.approx(0.5)
+        assert popularity.decayed(None) == 0.0
+
+    def test_weights_restart_each_generation(self):
+        popularity = ProductPopularity(half_life_days=1, max_members=100)
+        generation = REBASE_HALF_LIVES * 86400
+        assert popularity.generation(EPOCH + generation - 1) == 0
+        assert popularity.weight(EPOCH + generation - 1) == pytest.approx(2.0 ** REBASE_HALF_LIVES, rel=1e-3)
+        assert popularity.generation(EPOCH + 10 * generation + 86400) == 10
+        assert popularity.weight(EPOCH + 10 * generation + 86400) == pytest.approx(2.0)
+
+
+class TestRedisAccess:
+    """Tests for pipelined writes and batched reads."""
+
+    @pytest.mark.asyncio
+    async def test_product_use_is_one_pipeline(self):
+        popularity = ProductPopularity(half_life_days=14, max_members=100)
+        redis_client, pipe = _redis_with_pipeline()
+        with patch("app.services.product_popularity.get_redis", AsyncMock(return_value=redis_client)):
+            await popularity.record_product_use("7038010000010")
+
+        scores_key = f"{PRODUCTS}:{popularity.generation()}"
+        pipe.execute.assert_awaited_once()
+        assert pipe.zincrby.call_args.args[0] == scores_key
+        pipe.zremrangebyrank.assert_any_call(scores_key, 0, -101)
+        assert PRODUCT_LAST_USED in pipe.zadd.call_args.args
+
+    @pytest.mark.asyncio
+    async def test_product_usage_batches_both_reads(self):
+        popularity = ProductPopularity(half_life_days=14, max_members=100)
+        weight = popularity.weight()
+        redis_client, pipe = _redis_with_pipeline([[3 * weight, None], [1700000000.0, None]])
+        with patch("app.services.product_popularity.get_redis", AsyncMock(return_value=redis_client)):
+            usage = await popularity.product_usage(["111", "222"])
+
+        pipe.execute.assert_awaited_once()
+        assert usage["111"][0] == pytest.approx(3.0, rel=1e-3)
+        assert usage["111"][1] is not None
+        assert usage["222"] == (0.0, None)
+
+    @pytest.mark.asyncio
+    async def test_without_redis(self):
+        popularity = ProductPopularity(half_life_days=14, max_members=100)
+        with patch("app.services.product_popularity.get_redis", AsyncMock(return_value=None)):
+            await popularity.record_search("melk")
+            assert await popularity.top_k(PRODUCTS, 10) == []
+            assert await popularity.score_many(PRODUCTS, ["1"]) == {}
+
+
+class TestGenerations:
+    """Sorted sets are carried into each new generation once."""
+
+    @pytest.mark.asyncio
+    async def test_previous_generation_is_merged_scaled_down(self):
+        popularity = ProductPopularity(half_life_days=14, max_members=100)
+        redis_client, _pipe = _redis_with_pipeline()
+        now = EPOCH + 3 * REBASE_HALF_LIVES * 14 * 86400 + 60
+        with patch("app.services.product_popularity.get_redis", AsyncMock(return_value=redis_client)), \
+                patch("app.services.product_popularity.time.time", return_value=now):
+            await popularity.record_product_use("7038010000010")
+            await popularity.top_k(PRODUCTS, 10)
+
+        rebase = redis_client.rebase
+        rebase.execute.assert_awaited_once()
+        rebase.zunionstore.assert_called_once_with(
+            f"{PRODUCTS}:3", {f"{PRODUCTS}:3": 1.0, f"{PRODUCTS}:2": 2.0 ** -REBASE_HALF_LIVES}
+        )
+        rebase.delete.assert_called_once_with(f"{PRODUCTS}:2")
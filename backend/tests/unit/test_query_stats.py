@@ -0,0 +1,128 @@
+"""Unit tests for per-request SQL instrumentation."""
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+
+from app.infrastructure.database.query_stats import (
+    UNMATCHED_ENDPOINT,
+    QueryStatsRegistry,
+    RequestQueryStats,
+    current_query_stats,
+    endpoint_template,
+    instrument_engine,
+    start_request_stats,
+    statement_shape,
+    stop_request_stats,
+)
+
+
+class TestStatementShape:
+    """Tests for statement_shape."""
+
+    def test_parameters_and_whitespace(self):
+        assert statement_shape("SELECT *\n  FROM tblkunder WHERE kundeid = $1 LIMIT 5") == (
+            "SELECT * FROM tblkunder WHERE kundeid = ? LIMIT ?"
+        )
+
+    def test_in_lists_of_any_length_share_a_shape(self):
+        assert statement_shape("SELECT 1 FROM t WHERE id IN ($1, $2, $3)") == (
+            statement_shape("SELECT 1 FROM t WHERE id IN ($1, $2)")
+        )
+
+    def test_identifiers_with_digits_are_kept(self):
+        assert "tbl_2" in statement_shape("SELECT * FROM tbl_2 WHERE x = :x_1")
+
+
+class TestRequestQueryStats:
+    """Tests for RequestQueryStats."""
+
+    def test_repeated_statements_above_threshold(self):
+        stats = RequestQueryStats(request_id="abc")
+        for i in range(12):
+            stats.record(f"SELECT * FROM tblprodukter WHERE produktid = {i}", 1.0)
+        stats.record("SELECT * FROM tblordrer", 2.0)
+
+        assert stats.statements == 13
+        assert stats.db_time_ms == 14.0
+        assert stats.repeated_statements(threshold=10) == [
+            ("SELECT * FROM tblprodukter WHERE produktid = ?", 12)
+        ]
+        assert stats.server_timing() == 'db;dur=14.0;desc="13 queries"'
+
+    def test_details_without_repeats(self):
+        stats = RequestQueryStats()
+        stats.record("SELECT 1", 0.5)
+        assert stats.as_details() == {"statements": 1, "db_time_ms": 0.5}
+
+
+class TestInstrumentEngine:
+    """Statements are only counted while a request is being tracked."""
+
+    def test_counts_statements_in_request(self):
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        instrument_engine(engine)  # Idempotent
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+            stats, token = start_request_stats("req1")
+            try:
+                for i in range(3):
+                    conn.execute(text("SELECT :value"), {"value": i})
+            finally:
+                stop_request_stats(token)
+
+            conn.execute(text("SELECT 2"))
+
+        assert current_query_stats.get() is None
+        assert stats.statements == 3
+        assert stats.shapes == {"SELECT ?": 3}
+
+
+class TestEndpointAggregates:
+    """Tests for endpoint_template and QueryStatsRegistry."""
+
+    @pytest.mark.asyncio
+    async def test_endpoint_template(self):
+        app = FastAPI()
+        names = []
+
+        @app.middleware("http")
+        async def record_name(request, call_next):
+            response = await call_next(request)
+            names.append(endpoint_template(request.method, request.scope))
+            return response
+
+        @app.get("/api/v1/ordrer/{ordre_id}/detaljer")
+        async def detaljer(ordre_id: int):
+            return {}
+
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            await client.get("/api/v1/ordrer/42/detaljer")
+            await client.get("/wp-login.php")
+            await client.delete("/api/v1/ordrer/42/detaljer")
+
+        assert names == ["GET /api/v1/ordrer/{ordre_id}/detaljer", UNMATCHED_ENDPOINT, UNMATCHED_ENDPOINT]
+
+    def test_registry_totals_and_sorting(self):
+        registry = QueryStatsRegistry()
+        light = RequestQueryStats(statements=2, db_time_ms=3.0)
+        heavy = RequestQueryStats(statements=40, db_time_ms=80.0)
+        heavy.shapes["SELECT * FROM tblprodukter WHERE produktid = ?"] = 38
+
+        registry.record("GET /light", light)
+        registry.record("GET /heavy", heavy)
+        registry.record("GET /heavy", light)
+
+        rows = registry.snapshot()
+        assert [row["endpoint"] for row in rows] == ["GET /heavy", "GET /light"]
+        assert rows[0]["requests"] == 2
+        assert rows[0]["max_statements"] == 40
+        assert rows[0]["avg_statements"] == 21.0
+        assert rows[0]["n_plus_one_requests"] == 1
+        assert rows[0]["repeated_statements"][0]["count"] == 38
+
+        registry.reset()
+        assert registry.snapshot() == []
@@ -0,0 +1,76 @@
+"""Unit tests for read replica routing."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.infrastructure.database import session as db_session
+from app.infrastructure.database.replica import ReplicaRouter
+
+
+def _router(lag=None, error=None, **kwargs):
+    router = ReplicaRouter(MagicMock(), max_lag_seconds=30, check_seconds=60, **kwargs)
+    router._measure_lag = AsyncMock(side_effect=error, return_value=lag)
+    return router
+
+
+class TestReplicaRouter:
+    """Tests for ReplicaRouter."""
+
+    @pytest.mark.asyncio
+    async def test_caught_up_replica_is_used(self):
+        router = _router(lag=0.4)
+        assert await router.is_usable() is True
+        assert router.status()["state"] == "in use"
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_is_skipped(self):
+        router = _router(lag=95.0)
+        assert await router.is_usable() is False
+        assert router.status() == {
+            "state": "lagging",
+            "lag_seconds": 95.0,
+            "max_lag_seconds": 30,
+            "error": None,
+        }
+
+    @pytest.mark.asyncio
+    async def test_unknown_lag_is_skipped(self):
+        assert await _router(lag=None).is_usable() is False
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_is_skipped(self):
+        router = _router(error=OSError("connection refused"))
+        assert await router.is_usable() is False
+        assert router.status()["state"] == "unavailable"
+        assert router.status()["error"] == "connection refused"
+
+    @pytest.mark.asyncio
+    async def test_lag_is_checked_once_per_interval(self):
+        router = _router(lag=1.0)
+        for _ in range(5):
+            await router.is_usable()
+        router._measure_lag.assert_awaited_once()
+
+
+class TestReadSessionFactory:
+    """get_read_session_factory picks the replica only while it is usable."""
+
+    @pytest.mark.asyncio
+    async def test_primary_without_replica(self):
+        with patch.object(db_session, "get_replica_router", return_value=None):
+            assert await db_session.get_read_session_factory() is db_session.get_session_factory()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_primary(self):
+        router = _router(lag=120.0)
+        with patch.object(db_session, "get_replica_router", return_value=router):
+            assert await db_session.get_read_session_factory() is db_session.get_session_factory()
+
+    @pytest.mark.asyncio
+    async def test_replica_when_usable(self):
+        router = _router(lag=0.0)
+        with patch.object(db_session, "get_replica_router", return_value=router), \
+                patch.object(db_session, "_read_session_local", None):
+            factory = await db_session.get_read_session_factory()
+            assert factory is not db_session.get_session_factory()
+            assert factory.kw["bind"] is router.engine
@@ -0,0 +1,189 @@
+"""Unit tests for pooled SMTP delivery against a local SMTP sink."""
+import socket
+import threading
+import time
+
+import pytest
+
+from app.services.smtp_sender import (
+    CompiledTemplate,
+    OutgoingEmail,
+    PooledSMTPSender,
+    RateLimiter,
+)
+
+
+class LocalSMTPSink:
+    """Minimal SMTP server that records connections and accepted messages."""
+
+    def __init__(self, reject_recipients=()):
+        self.reject_recipients = set(reject_recipients)
+        self.connections = 0
+        self.messages = []
+        self._lock = threading.Lock()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(16)
+        self.port = self._server.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def close(self):
+        self._running = False
+        self._server.close()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        reader = conn.makefile("rb")
+
+        def reply(line):
+            conn.sendall(line.encode() + b"\r\n")
+
+        reply("220 localhost sink")
+        recipients = []
+        try:
+            while True:
+                line = reader.readline()
+                if not line:
+                    return
+                command = line.decode().strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO"):
+                    reply("250 localhost")
+                elif verb == "MAIL":
+                    recipients = []
+                    reply("250 OK")
+                elif verb == "RCPT":
+                    address = command.split(":", 1)[1].strip().strip("<>")
+                    if address in self.reject_recipients:
+                        reply("550 No such user")
+                    else:
+                        recipients.append(address)
+                        reply("250 OK")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    while reader.readline() not in (b".\r\n", b""):
+                        pass
+                    with self._lock:
+                        self.messages.extend(recipients)
+                    reply("250 Queued")
+                elif verb in ("RSET", "NOOP"):
+                    reply("250 OK")
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    return
+                else:
+                    reply("502 Not implemented")
+        finally:
+            conn.close()
+
+
+@pytest.fixture
+def smtp_sink():
+    sink = LocalSMTPSink(reject_recipients={"missing@example.com"})
+    yield sink
+    sink.close()
+
+
+def _sender(sink, **kwargs):
+    options = dict(
+        host="127.0.0.1",
+        port=sink.port,
+        user="",
+        password="",
+        use_tls=False,
+        from_email="noreply@example.com",
+        from_name="Test",
+        pool_size=2,
+        batch_size=10,
+        rate_limit_per_second=0,
+        timeout=5,
+    )
+    options.update(kwargs)
+    return PooledSMTPSender(**options)
+
+
+def _emails(count):
+    return [
+        OutgoingEmail(f"customer{i}@example.com", "Hei", "<p>Hei</p>", customer_id=i)
+        for i in range(count)
+    ]
+
+
+class TestCompiledTemplate:
+    """Tests for CompiledTemplate."""
+
+    def test_renders_variables(self):
+        template = CompiledTemplate("Hei {{name}}, ordre {{order}}")
+        assert template.render({"name": "Kari", "order": 42}) == "Hei Kari, ordre 42"
+
+    def test_leaves_unknown_placeholders(self):
+        template = CompiledTemplate("Hei {{name}}")
+        assert template.render({}) == "Hei {{name}}"
+
+    def test_empty_source(self):
+        assert CompiledTemplate(None).render({"name": "Kari"}) == ""
+
+
+class TestPooledSMTPSender:
+    """Tests for PooledSMTPSender against a local sink."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_connections(self, smtp_sink):
+        results = await _sender(smtp_sink).send_all(_emails(25))
+
+        assert all(result.success for result in results)
+        assert len(smtp_sink.messages) == 25
+        # 25 emails in batches of 10 -> one connection per batch
+        assert smtp_sink.connections == 3
+
+    @pytest.mark.asyncio
+    async def test_reports_per_recipient_failures(self, smtp_sink):
+        emails = _emails(3)
+        emails.insert(1, OutgoingEmail("missing@example.com", "Hei", "<p>Hei</p>", customer_id=99))
+
+        results = await _sender(smtp_sink).send_all(emails)
+
+        assert [result.to_email for result in results] == [email.to_email for email in emails]
+        failed = [result for result in results if not result.success]
+        assert len(failed) == 1
+        assert failed[0].customer_id == 99
+        assert len(smtp_sink.messages) == 3
+        # A refused recipient does not cost a reconnect
+        assert smtp_sink.connections == 1
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_message_limit(self, smtp_sink):
+        await _sender(smtp_sink, max_messages_per_connection=2).send_all(_emails(5))
+        assert smtp_sink.connections == 3
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter."""
+
+    @pytest.mark.asyncio
+    async def test_spaces_acquisitions(self):
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.acquire()
+        # First slot is immediate, the next four are 20 ms apart
+        assert time.monotonic() - start >= 0.07
+
+    @pytest.mark.asyncio
+    async def test_disabled_when_rate_is_zero(self):
+        limiter = RateLimiter(0)
+        start = time.monotonic()
+        for _ in range(100):
+            await limiter.acquire()
+        assert time.monotonic() - start < 0.05
@@ -0,0 +1,27 @@
+"""Unit tests for the workflow execution engine."""
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.workflow_execution_engine import WorkflowExecutionEngine
+
+
+class TestRecordLastRun:
+    """Finishing a run records last_run without moving the schedule."""
+
+    @pytest.mark.asyncio
+    async def test_only_last_run_is_written(self):
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        engine = WorkflowExecutionEngine(db)
+
+        await engine._record_last_run(7, datetime(2026, 10, 18, 9, 0))
+
+        statement = db.execute.call_args.args[0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE workflow_schedules SET last_run=")
+        assert "next_run" not in sql
+        db.commit.assert_awaited_once()
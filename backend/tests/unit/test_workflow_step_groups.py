@@ -0,0 +1,62 @@
+"""Unit tests for workflow parallel step groups."""
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.workflow_step_groups import group_steps, run_parallel_steps
+
+
+def _step(step_id, parallel_group=None, step_type="send_email"):
+    return SimpleNamespace(id=step_id, parallel_group=parallel_group, step_type=step_type)
+
+
+def _ids(stages):
+    return [[step.id for step in stage] for stage in stages]
+
+
+class TestGroupSteps:
+    """Tests for group_steps."""
+
+    def test_sequential_by_default(self):
+        assert _ids(group_steps([_step(1), _step(2), _step(3)])) == [[1], [2], [3]]
+
+    def test_consecutive_group_members_share_a_stage(self):
+        steps = [_step(1), _step(2, "a"), _step(3, "a"), _step(4, "b"), _step(5, "b"), _step(6)]
+        assert _ids(group_steps(steps)) == [[1], [2, 3], [4, 5], [6]]
+
+    def test_wait_steps_run_alone(self):
+        steps = [_step(1, "a"), _step(2, "a", "wait_until"), _step(3, "a")]
+        assert _ids(group_steps(steps)) == [[1], [2], [3]]
+
+
+class TestRunParallelSteps:
+    """Tests for run_parallel_steps."""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_and_order(self):
+        sessions = []
+        in_flight = 0
+        peak = 0
+
+        @asynccontextmanager
+        async def session_factory():
+            session = object()
+            sessions.append(session)
+            yield session
+
+        async def perform(db, step_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 * (5 - step_id))
+            in_flight -= 1
+            return (step_id, db), None
+
+        outcomes = await run_parallel_steps([1, 2, 3, 4], perform, session_factory, max_concurrency=2)
+
+        assert [log[0] for log, _ in outcomes] == [1, 2, 3, 4]
+        # Each step gets its own session
+        assert len({id(log[1]) for log, _ in outcomes}) == 4
+        assert peak == 2
@@ -0,0 +1,104 @@
+"""Unit tests for workflow schedule and wait time calculations."""
+from datetime import datetime
+
+import pytest
+
+from app.services.workflow_timing import (
+    CronExpression,
+    calculate_next_run,
+    next_weekday_at,
+    parse_weekday,
+    resolve_wait_until,
+)
+
+# A Monday
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+class TestResolveWaitUntil:
+    """Tests for resolve_wait_until."""
+
+    def test_absolute_time(self):
+        assert resolve_wait_until({"until": "2026-10-22T10:00:00"}, NOW) == datetime(2026, 10, 22, 10, 0)
+
+    def test_absolute_time_with_offset(self):
+        assert resolve_wait_until({"until": "2026-10-22T10:00:00+02:00"}, NOW) == datetime(2026, 10, 22, 8, 0)
+
+    def test_delay(self):
+        assert resolve_wait_until({"hours": 2, "minutes": 30}, NOW) == datetime(2026, 10, 19, 14, 30)
+
+    def test_next_weekday(self):
+        config = {"day": "thursday", "time": "10:00"}
+        assert resolve_wait_until(config, NOW) == datetime(2026, 10, 22, 10, 0)
+
+    def test_same_weekday_already_passed_rolls_over(self):
+        config = {"day": "mandag", "time": "09:00"}
+        assert resolve_wait_until(config, NOW) == datetime(2026, 10, 26, 9, 0)
+
+    def test_time_of_day(self):
+        assert resolve_wait_until({"time": "08:00"}, NOW) == datetime(2026, 10, 20, 8, 0)
+
+    def test_invalid_config(self):
+        with pytest.raises(ValueError):
+            resolve_wait_until({"wait_type": "time"}, NOW)
+
+
+class TestWeekdayHelpers:
+    """Tests for weekday parsing and calculation."""
+
+    def test_parse_weekday(self):
+        assert parse_weekday("Torsdag") == 3
+        assert parse_weekday(6) == 6
+        with pytest.raises(ValueError):
+            parse_weekday("someday")
+
+    def test_next_weekday_later_today(self):
+        assert next_weekday_at(NOW, 0, 15, 0) == datetime(2026, 10, 19, 15, 0)
+
+
+class TestCalculateNextRun:
+    """Tests for schedule next-run calculation."""
+
+    def test_daily(self):
+        assert calculate_next_run("daily", {"time": "09:00"}, NOW) == datetime(2026, 10, 20, 9, 0)
+
+    def test_weekly_multiple_days(self):
+        config = {"days": ["friday", "tuesday"], "time": "07:00"}
+        assert calculate_next_run("weekly", config, NOW) == datetime(2026, 10, 20, 7, 0)
+
+    def test_monthly_clamps_to_month_end(self):
+        config = {"day_of_month": 31, "time": "08:00"}
+        assert calculate_next_run("monthly", config, datetime(2026, 1, 31, 9, 0)) == datetime(2026, 2, 28, 8, 0)
+
+    def test_monthly_last_day(self):
+        config = {"day_of_month": "last", "time": "08:00"}
+        assert calculate_next_run("monthly", config, NOW) == datetime(2026, 10, 31, 8, 0)
+
+    def test_cron(self):
+        assert calculate_next_run("cron", {"cron": "0 9 * * 1"}, NOW) == datetime(2026, 10, 26, 9, 0)
+
+
+class TestCronExpression:
+    """Tests for CronExpression."""
+
+    def test_steps_and_ranges(self):
+        cron = CronExpression("*/15 6-18 * * mon-fri")
+        assert cron.next_after(NOW) == datetime(2026, 10, 19, 12, 15)
+        # Friday evening rolls over to Monday morning
+        assert cron.next_after(datetime(2026, 10, 23, 18, 50)) == datetime(2026, 10, 26, 6, 0)
+
+    def test_day_of_month_or_day_of_week(self):
+        # Both restricted: the 13th or any Friday
+        assert CronExpression("0 9 13 * 5").next_after(NOW) == datetime(2026, 10, 23, 9, 0)
+
+    def test_leap_day(self):
+        assert CronExpression("0 0 29 2 *").next_after(NOW) == datetime(2028, 2, 29, 0, 0)
+
+    def test_sunday_as_seven(self):
+        assert CronExpression("0 10 * * 7").next_after(NOW) == datetime(2026, 10, 25, 10, 0)
+
+    def test_invalid_expression(self):
+        with pytest.raises(ValueError):
+            CronExpression("61 * * * *")
+        with pytest.raises(ValueError):
+            CronExpression("0 9 * *")
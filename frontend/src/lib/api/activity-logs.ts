@@ -22,6 +22,8 @@ export interface ActivityLogStats {
   total_errors: number
   error_rate: number
   avg_response_time_ms: number
+  p50_response_time_ms?: number | null
+  p95_response_time_ms?: number | null
   requests_by_action: Record<string, number>
   requests_by_resource: Record<string, number>
   requests_by_user: Array<{
@@ -5,35 +5,67 @@ These tasks are executed by Celery workers to:
 2. Execute workflows and their steps
 3. Handle retries and error logging
 """
-import asyncio
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from celery import Task
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from celery.app.task import Context
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.celery_app import app
-from app.core.config import settings
+from app.tasks.worker_runtime import runtime
 from app.models.workflow_definition import WorkflowDefinition
 from app.models.workflow_schedule import WorkflowSchedule
 
+# Waits up to this long are also scheduled with a Celery countdown. Longer
+# ones rely only on the due-time sweep, since Redis redelivers unacked ETA
+# tasks after the visibility timeout (3600 s).
+RESUME_ETA_MAX_SECONDS = 3000
 
-# Create async engine for Celery tasks
-# Note: We create a separate engine because Celery runs in a different process
-async_engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-)
+# Interval of the check-scheduled-workflows beat entry (celery_app.py)
+SCHEDULER_BEAT_INTERVAL_SECONDS = 60
 
-AsyncSessionLocal = async_sessionmaker(
-    async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+# Celery request of the task whose run_async is running in this asyncio task
+_current_request: ContextVar[Optional[Context]] = ContextVar("celery_task_request", default=None)
+
+
+async def _schedule_wake_up(next_due: Optional[datetime]) -> Optional[datetime]:
+    """Schedule check_scheduled_workflows at ``next_due`` if beat would be late.
+
+    A Redis key per wake-up time makes sure only one task is scheduled for
+    it, however many checks run in between. Without Redis the wake-up is
+    scheduled anyway; the claim in the check keeps duplicates harmless.
+
+    Returns:
+        The scheduled wake-up time, or None if beat covers it
+    """
+    from app.core.redis import get_redis
+
+    if next_due is None:
+        return None
+
+    delay = (next_due - datetime.utcnow()).total_seconds()
+    if delay >= SCHEDULER_BEAT_INTERVAL_SECONDS:
+        return None
+
+    redis_client = await get_redis()
+    if redis_client is not None:
+        key = f"workflow:scheduler:wake_up:{int(next_due.timestamp())}"
+        first = await redis_client.set(key, "1", nx=True, ex=SCHEDULER_BEAT_INTERVAL_SECONDS * 2)
+        if not first:
+            return None
+
+    check_scheduled_workflows.apply_async(countdown=max(delay, 0))
+    return next_due
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Open a session on this worker process's engine.
+
+    The engine is created lazily per worker process (after fork) by the
+    shared WorkerRuntime, instead of once at import time in the parent.
+    """
+    return runtime.session_factory()
 
 
 async def get_async_session() -> AsyncSession:
@@ -46,59 +78,70 @@ class AsyncCeleryTask(Task):
     """Base task class that handles async operations properly.
 
     Celery tasks run in a synchronous context, but we need to use
-    async SQLAlchemy. This base class handles the event loop setup.
+    async SQLAlchemy. This base class runs ``run_async`` on the worker
+    process's persistent event loop (see app.tasks.worker_runtime).
+
+    Celery keeps ``self.request`` per thread, and the loop runs in its own
+    thread, so the request is handed to ``run_async`` through a context
+    variable. Without it ``self.retry()`` would see a task called directly
+    and re-raise instead of retrying.
     """
 
     def __call__(self, *args, **kwargs):
-        """Execute task by running async method in event loop."""
-        # Get or create event loop
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        """Execute task by running async method on the worker's event loop."""
+        return runtime.run(self._run_with_request(self.request, args, kwargs))
 
-        # Run async task
-        return loop.run_until_complete(self.run_async(*args, **kwargs))
+    async def _run_with_request(self, request: Context, args: tuple, kwargs: dict):
+        _current_request.set(request)
+        return await self.run_async(*args, **kwargs)
+
+    def _get_request(self) -> Context:
+        request = _current_request.get()
+        return request if request is not None else super()._get_request()
+
+    request = property(_get_request)
 
     async def run_async(self, *args, **kwargs):
         """Override this method with async implementation."""
         raise NotImplementedError("Subclasses must implement run_async()")
 
 
-@app.task(
-    base=AsyncCeleryTask,
-    name='app.tasks.workflow_tasks.check_scheduled_workflows',
-    bind=True,
-    max_retries=3,
-    default_retry_delay=60,  # Retry after 60 seconds
-)
 class CheckScheduledWorkflowsTask(AsyncCeleryTask):
     """Check for workflows that are due to run and trigger their execution.
 
-    This task runs every minute via Celery Beat (configured in celery_app.py).
-    It finds all workflows with next_run <= now and triggers execute_workflow task for each.
+    Celery Beat runs this every minute as a safety net. Each run claims the
+    due workflows atomically, then looks up the earliest upcoming next_run
+    and, if it falls before the next beat tick, schedules one extra run for
+    exactly that moment.
     """
 
+    name = 'app.tasks.workflow_tasks.check_scheduled_workflows'
+    max_retries = 3
+    default_retry_delay = 60  # Retry after 60 seconds
+
     async def run_async(self):
-        """Check for due workflows and trigger execution."""
-        # Import from backend
+        """Claim due workflows, trigger execution and schedule the next wake-up."""
         from app.services.workflow_automation_service import WorkflowAutomationService
 
         async with AsyncSessionLocal() as db:
             try:
                 service = WorkflowAutomationService(db)
-                due_workflows = await service.get_due_workflows()
+                workflow_ids = await service.claim_due_workflows()
 
-                # Trigger execution for each due workflow
-                for workflow in due_workflows:
+                # Trigger execution for each claimed workflow
+                for workflow_id in workflow_ids:
                     # Enqueue execution task (async)
-                    execute_workflow.delay(workflow.id)
+                    execute_workflow.delay(workflow_id)
+
+                next_due = await service.get_next_due_time()
+                wake_up_at = await _schedule_wake_up(next_due)
 
                 result = {
                     'checked_at': datetime.utcnow().isoformat(),
-                    'due_count': len(due_workflows),
-                    'workflow_ids': [w.id for w in due_workflows],
+                    'due_count': len(workflow_ids),
+                    'workflow_ids': workflow_ids,
+                    'next_due': next_due.isoformat() if next_due else None,
+                    'wake_up_at': wake_up_at.isoformat() if wake_up_at else None,
                     'status': 'success'
                 }
 
@@ -113,13 +156,6 @@ class CheckScheduledWorkflowsTask(AsyncCeleryTask):
                 raise self.retry(exc=e)
 
 
-@app.task(
-    base=AsyncCeleryTask,
-    name='app.tasks.workflow_tasks.execute_workflow',
-    bind=True,
-    max_retries=3,
-    default_retry_delay=300,  # Retry after 5 minutes
-)
 class ExecuteWorkflowTask(AsyncCeleryTask):
     """Execute a complete workflow including all its steps.
 
@@ -130,6 +166,10 @@ class ExecuteWorkflowTask(AsyncCeleryTask):
     4. Updates next_run time for scheduled workflows
     """
 
+    name = 'app.tasks.workflow_tasks.execute_workflow'
+    max_retries = 3
+    default_retry_delay = 300  # Retry after 5 minutes
+
     async def run_async(self, workflow_id: int):
         """Execute workflow by ID."""
         # Import from workflow service
@@ -137,7 +177,7 @@ class ExecuteWorkflowTask(AsyncCeleryTask):
 
         async with AsyncSessionLocal() as db:
             try:
-                engine = WorkflowExecutionEngine(db)
+                engine = WorkflowExecutionEngine(db, session_factory=AsyncSessionLocal)
                 execution = await engine.execute_workflow(workflow_id)
 
                 result = {
@@ -159,19 +199,16 @@ class ExecuteWorkflowTask(AsyncCeleryTask):
                 raise self.retry(exc=e)
 
 
-@app.task(
-    base=AsyncCeleryTask,
-    name='app.tasks.workflow_tasks.execute_step',
-    bind=True,
-    max_retries=3,
-    default_retry_delay=60,
-)
 class ExecuteStepTask(AsyncCeleryTask):
     """Execute a single workflow step.
 
     This task executes one step in a workflow and logs the result.
     """
 
+    name = 'app.tasks.workflow_tasks.execute_step'
+    max_retries = 3
+    default_retry_delay = 60
+
     async def run_async(self, execution_id: int, step_id: int):
         """Execute a single step by ID."""
         # Import from workflow service
@@ -179,7 +216,7 @@ class ExecuteStepTask(AsyncCeleryTask):
 
         async with AsyncSessionLocal() as db:
             try:
-                engine = WorkflowExecutionEngine(db)
+                engine = WorkflowExecutionEngine(db, session_factory=AsyncSessionLocal)
                 log = await engine.execute_step(execution_id, step_id)
 
                 result = {
@@ -200,3 +237,97 @@ class ExecuteStepTask(AsyncCeleryTask):
 
                 # Retry task
                 raise self.retry(exc=e)
+
+
+
+class ResumeExecutionTask(AsyncCeleryTask):
+    """Resume a waiting workflow execution after its wait step.
+
+    Safe to deliver more than once: the engine claims the execution
+    atomically and ignores it if it is no longer waiting or not yet due.
+    """
+
+    name = 'app.tasks.workflow_tasks.resume_execution'
+    max_retries = 3
+    default_retry_delay = 300  # Retry after 5 minutes
+
+    async def run_async(self, execution_id: int):
+        """Resume execution by ID."""
+        # Import from workflow service
+        from app.services.execution_engine import WorkflowExecutionEngine
+
+        async with AsyncSessionLocal() as db:
+            try:
+                engine = WorkflowExecutionEngine(db, session_factory=AsyncSessionLocal)
+                execution = await engine.resume_execution(execution_id)
+
+                if execution is None:
+                    return {
+                        'execution_id': execution_id,
+                        'status': 'skipped',
+                    }
+
+                result = {
+                    'workflow_id': execution.workflow_id,
+                    'execution_id': execution.id,
+                    'status': execution.status,
+                    'current_step': execution.current_step,
+                    'resume_at': execution.resume_at.isoformat() if execution.resume_at else None,
+                    'error': execution.error_message if execution.error_message else None,
+                }
+
+                return result
+
+            except Exception as e:
+                error_msg = f"Error resuming execution {execution_id}: {str(e)}"
+                print(error_msg)
+
+                # Retry task
+                raise self.retry(exc=e)
+
+
+class ResumeWaitingExecutionsTask(AsyncCeleryTask):
+    """Enqueue resume_execution for every waiting execution that is due.
+
+    Runs every minute via Celery Beat. Uses the partial index on
+    workflow_executions.resume_at, so pending executions cost nothing until
+    they are due.
+    """
+
+    name = 'app.tasks.workflow_tasks.resume_waiting_executions'
+    max_retries = 3
+    default_retry_delay = 60
+
+    async def run_async(self):
+        """Find due executions and enqueue their continuation."""
+        # Import from workflow service
+        from app.services.execution_engine import WorkflowExecutionEngine
+
+        async with AsyncSessionLocal() as db:
+            try:
+                engine = WorkflowExecutionEngine(db, session_factory=AsyncSessionLocal)
+                execution_ids = await engine.get_due_execution_ids()
+
+                for execution_id in execution_ids:
+                    resume_execution.delay(execution_id)
+
+                return {
+                    'checked_at': datetime.utcnow().isoformat(),
+                    'due_count': len(execution_ids),
+                    'execution_ids': execution_ids,
+                    'status': 'success'
+                }
+
+            except Exception as e:
+                error_msg = f"Error checking waiting executions: {str(e)}"
+                print(error_msg)
+
+                # Retry task
+                raise self.retry(exc=e)
+
+
+check_scheduled_workflows = app.register_task(CheckScheduledWorkflowsTask())
+execute_workflow = app.register_task(ExecuteWorkflowTask())
+execute_step = app.register_task(ExecuteStepTask())
+resume_execution = app.register_task(ResumeExecutionTask())
+resume_waiting_executions = app.register_task(ResumeWaitingExecutionsTask())